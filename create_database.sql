@@ -32,7 +32,7 @@ CREATE TABLE anime_series (
     original_titel VARCHAR(255),
     beschreibung TEXT,
     cover_url VARCHAR(255),
-    cover_data MEDIUMBLOB,
+    cover_hash CHAR(64) COMMENT 'SHA-256 des Covers im Cover-Speicher (cover_dir)',
     erscheinungsjahr YEAR,
     status ENUM('laufend', 'abgeschlossen', 'angekündigt') DEFAULT 'laufend',
     studio VARCHAR(100),
@@ -258,6 +258,23 @@ CREATE TABLE konfiguration (
     aktualisiert_am TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Materialisierte Statistiken (für --db-stats, laufend von den Repositories fortgeschrieben)
+CREATE TABLE statistik_zaehler (
+    schluessel VARCHAR(100) PRIMARY KEY COMMENT 'z.B. anime, episoden, status.abgeschlossen, provider.2',
+    wert BIGINT NOT NULL DEFAULT 0
+);
+
+-- Staffeln und Episoden pro Anime (für die Top-Liste ohne JOIN über alle Episoden)
+CREATE TABLE statistik_anime (
+    series_id INT PRIMARY KEY,
+    staffeln INT NOT NULL DEFAULT 0,
+    episoden INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_statistik_anime_episoden ON statistik_anime (episoden);
+CREATE INDEX idx_downloads_datum ON downloads (download_datum);
+
 -- Standarddaten für Sprachen einfügen
 INSERT INTO languages (name, code) VALUES 
 ('German Dub', 'de_dub'),
@@ -287,10 +304,17 @@ INSERT INTO konfiguration (schluessel, wert, beschreibung, kategorie, typ) VALUE
 ('webui_port', '8080', 'Port für die WebUI', 'server', 'zahl'),
 ('api_token_lebensdauer', '86400', 'Lebensdauer von API-Tokens in Sekunden (24h)', 'sicherheit', 'zahl');
 
+-- Schema-Version für die Migrationen bestehender Datenbanken (src/aniworld/database/migrations.py)
+INSERT INTO konfiguration (schluessel, wert, beschreibung, kategorie, typ, bearbeitbar) VALUES
+('schema_version', '3', 'Version des Datenbankschemas', 'system', 'zahl', false);
+
 -- Standardpfad für Downloads einfügen
 INSERT INTO download_pfade (pfad, beschreibung, standard_pfad) VALUES
 ('/home/media/downloads', 'Standard-Download-Verzeichnis', true);
 
+-- Leere Datenbank: Statistiken sind aktuell und müssen nicht neu aufgebaut werden
+INSERT INTO statistik_zaehler (schluessel, wert) VALUES ('aufgebaut', 1);
+
 -- Admin-Benutzer für WebUI erstellen
 INSERT INTO benutzer (benutzername, passwort_hash, email, vorname, nachname, rolle) VALUES
 ('admin', '$2y$10$3eJwbj.XgmpjR5zF4UCdje1wxKymVjXWU2ipFXZOfrUfTjC5jBgEW', 'admin@example.com', 'Admin', 'User', 'admin');
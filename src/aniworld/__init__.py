@@ -1,3 +1,23 @@
-from .execute import execute
-from .search import search_anime
 from . import globals  # pylint: disable=redefined-builtin
+
+# execute und search_anime ziehen bs4, requests und die Extraktoren nach sich.
+# Sie werden deshalb erst beim ersten Zugriff geladen (PEP 562), damit z.B.
+# "aniworld --version" oder die Datenbankbefehle schnell starten.
+_LAZY_ATTRIBUTES = {
+    'execute': ('.execute', 'execute'),
+    'search_anime': ('.search', 'search_anime'),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib  # pylint: disable=import-outside-toplevel
+    import sys  # pylint: disable=import-outside-toplevel
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    # "globals" ist hier das aniworld.globals-Modul, daher setattr
+    setattr(sys.modules[__name__], name, value)
+    return value
@@ -8,606 +8,39 @@ import re
 import logging
 import subprocess
 import platform
-import threading
-import random
-import signal
-import textwrap
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import npyscreen
-
-from aniworld.search import search_anime
-from aniworld import execute, globals as aniworld_globals
+from aniworld import globals as aniworld_globals
 from aniworld.common import (
     clear_screen,
-    clean_up_leftovers,
-    get_season_data,
     set_terminal_size,
     get_version,
     get_language_code,
     is_tail_running,
-    get_season_and_episode_numbers,
     setup_anime4k,
-    is_version_outdated,
     read_episode_file,
     check_package_installation,
     self_uninstall,
     update_component,
-    get_anime_season_title,
     open_terminal_with_command,
     get_random_anime,
-    show_messagebox,
     check_internet_connection,
-    adventure,
-    get_description,
-    get_description_with_id
-)
-from aniworld.extractors import (
-    nhentai,
-    streamkiste,
-    jav,
-    hanime
+    get_season_data
 )
+from aniworld.common.preflight import dependency_checks, run_preflight
 
-# Import für die Datenbankintegration
-try:
-    from aniworld.database.integration import DatabaseIntegration
-    HAS_DATABASE = True
-except ImportError:
-    HAS_DATABASE = False
+# Die Datenbankintegration ist optional und wird erst bei Bedarf geladen
+from aniworld.database import HAS_DATABASE
 
 from aniworld.globals import DEFAULT_DOWNLOAD_PATH
 
-
-def format_anime_title(anime_slug):
-    logging.debug("Formatting anime title for slug: %s", anime_slug)
-    try:
-        formatted_title = anime_slug.replace("-", " ").title()
-        logging.debug("Formatted title: %s", formatted_title)
-        return formatted_title
-    except AttributeError:
-        logging.debug("AttributeError encountered in format_anime_title")
-        sys.exit()
-
-
-class CustomTheme(npyscreen.ThemeManager):
-    default_colors = {
-        'DEFAULT': 'WHITE_BLACK',
-        'FORMDEFAULT': 'MAGENTA_BLACK',  # Form border
-        'NO_EDIT': 'BLUE_BLACK',
-        'STANDOUT': 'CYAN_BLACK',
-        'CURSOR': 'WHITE_BLACK',  # Text (focused)
-        'CURSOR_INVERSE': 'BLACK_WHITE',
-        'LABEL': 'CYAN_BLACK',  # Form labels
-        'LABELBOLD': 'CYAN_BLACK',  # Form labels (focused)
-        'CONTROL': 'GREEN_BLACK',  # Items in form
-        'IMPORTANT': 'GREEN_BLACK',
-        'SAFE': 'GREEN_BLACK',
-        'WARNING': 'YELLOW_BLACK',
-        'DANGER': 'RED_BLACK',
-        'CRITICAL': 'BLACK_RED',
-        'GOOD': 'GREEN_BLACK',
-        'GOODHL': 'GREEN_BLACK',
-        'VERYGOOD': 'BLACK_GREEN',
-        'CAUTION': 'YELLOW_BLACK',
-        'CAUTIONHL': 'BLACK_YELLOW',
-    }
-
-
-# pylint: disable=too-many-ancestors, too-many-instance-attributes
-class EpisodeForm(npyscreen.ActionForm):
-    def create(self):
-        logging.debug("Creating EpisodeForm")
-        try:
-            anime_slug = self.parentApp.anime_slug
-            if not anime_slug:
-                raise ValueError("Anime-Slug ist nicht gesetzt.")
-                
-            logging.debug(f"EpisodeForm: Verarbeite Anime-Slug: {anime_slug}")
-
-            self.season_episodes = []
-            try:
-                self.season_episodes = get_season_data(anime_slug)
-                logging.debug(f"Gefundene Staffelepisoden für {anime_slug}: {len(self.season_episodes)}")
-            except Exception as e:
-                logging.error(f"Fehler beim Laden der Staffeldaten für {anime_slug}: {e}", exc_info=True)
-                npyscreen.notify_confirm(f"Fehler beim Laden der Staffeldaten: {e}", "Fehler")
-                self.season_episodes = [] # Fallback: Leere Liste, um Abstürze zu vermeiden
-
-            if not self.season_episodes:
-                logging.warning(f"Keine Staffel- oder Episodendaten für {anime_slug} gefunden oder geladen.")
-                npyscreen.notify_confirm(
-                    "Keine Episoden für diesen Anime gefunden.",
-                    "Keine Episoden"
-                )
-                self.editing = False
-                self.parentApp.switchFormPrevious()
-                return
-
-            # Umfassender try-except-Block für den gesamten Erstellungsprozess der Formularelemente
-            try:
-                season_titles = {}
-                try:
-                    # Sammle eindeutige Staffeltitel
-                    unique_seasons = set()
-                    for episode_url in self.season_episodes:
-                        season_match = re.search(r'staffel-(\d+)', episode_url)
-                        if season_match:
-                            season_num = int(season_match.group(1))
-                            unique_seasons.add(season_num)
-
-                    for season_num in unique_seasons:
-                        try:
-                            season_titles[season_num] = get_anime_season_title(anime_slug, season_num)
-                        except Exception as e:
-                            logging.error(f"Fehler beim Abrufen des Titels für Staffel {season_num}: {e}", exc_info=True)
-                            season_titles[season_num] = f"Staffel {season_num}"
-                except Exception as e:
-                    logging.error(f"Fehler beim Abrufen der Staffeltitel für {anime_slug}: {e}", exc_info=True)
-                    season_titles = {} # Fallback: Leeres Dictionary, um Abstürze zu vermeiden
-
-                episode_urls_by_season = {}
-                try:
-                    for episode_url in self.season_episodes:
-                        season_match = re.search(r'staffel-(\d+)', episode_url)
-                        if season_match:
-                            season_num = int(season_match.group(1))
-                            if season_num not in episode_urls_by_season:
-                                episode_urls_by_season[season_num] = []
-                            episode_urls_by_season[season_num].append(episode_url)
-                        else:
-                            # Filme oder Specials ohne Staffelnummer
-                            if 0 not in episode_urls_by_season:
-                                episode_urls_by_season[0] = []
-                            episode_urls_by_season[0].append(episode_url)
-                except Exception as e:
-                    logging.error(f"Fehler beim Gruppieren der Episoden-URLs nach Staffeln für {anime_slug}: {e}", exc_info=True)
-                    # Fallback: Falls die Gruppierung fehlschlägt, erstelle eine generische Gruppierung
-                    episode_urls_by_season = {1: self.season_episodes}
-
-                # Wenn immer noch keine Episoden nach Staffeln gruppiert sind, erstelle einen Notfall-Fallback
-                if not episode_urls_by_season:
-                    logging.warning("Keine Episoden nach Staffeln gruppiert. Erstelle Notfall-Fallback.")
-                    episode_urls_by_season = {1: self.season_episodes}
-
-                season_list = []
-                try:
-                    # Erstelle eine sortierte Liste von Staffeln
-                    sorted_seasons = sorted(episode_urls_by_season.keys())
-                    for season_num in sorted_seasons:
-                        season_title = season_titles.get(season_num, f"Staffel {season_num}")
-                        episodes_for_season = episode_urls_by_season[season_num]
-                        season_list.append(f"{season_title} ({len(episodes_for_season)} Episoden)")
-                except Exception as e:
-                    logging.error(f"Fehler beim Erstellen der Staffelliste für die Anzeige für {anime_slug}: {e}", exc_info=True)
-                    season_list = ["Fehler beim Laden der Staffelliste"] # Fallback: Fehlermeldung, um Abstürze zu vermeiden
-
-                # Sicherstellen, dass die Liste nicht leer ist, um Abstürze zu vermeiden
-                if not season_list:
-                    logging.warning(f"Keine Staffeln zum Anzeigen für {anime_slug} gefunden. Erstelle Fallback-Eintrag.")
-                    season_list = [f"Alle Episoden ({len(self.season_episodes)} Stück)"]
-                    episode_urls_by_season = {0: self.season_episodes}
-
-                # Erstelle die UI-Elemente
-                self.add(npyscreen.FixedText,
-                        value=f"Anime: {format_anime_title(anime_slug)}", editable=False)
-                self.season_selector = self.add(
-                    npyscreen.TitleSelectOne,
-                    max_height=min(12, len(season_list)),
-                    value=[0],
-                    name="Staffel auswählen:",
-                    values=season_list,
-                    scroll_exit=True,
-                )
-
-                # Sichere Initialisierung der Episode-Liste
-                initial_episodes = []
-                selected_season_idx = 0  # Standardmäßig wählen wir Staffel 1
-                if season_list and selected_season_idx < len(sorted_seasons):
-                    selected_season = sorted_seasons[selected_season_idx]
-                    initial_episodes = episode_urls_by_season.get(selected_season, [])
-
-                self.episode_selector = self.add(
-                    npyscreen.TitleMultiSelect,
-                    max_height=min(12, len(initial_episodes) if initial_episodes else 1),
-                    value=[],
-                    name="Episoden auswählen:",
-                    values=self._format_episode_list(initial_episodes) if initial_episodes else ["Keine Episoden gefunden"],
-                    scroll_exit=True,
-                )
-
-                # Speichere die Daten für spätere Verwendung und Event-Handling
-                self.episode_urls_by_season = episode_urls_by_season
-                self.sorted_seasons = sorted_seasons
-                
-                # Füge den Rest der UI-Elemente hinzu
-                self._setup_remaining_ui_elements()
-                
-                # Richte Signal-Handling und Event-Handling ein
-                self.setup_signal_handling()
-                
-                # Nachricht für erfolgreiche Formularerstellung
-                logging.debug(f"EpisodeForm erfolgreich erstellt für {anime_slug}")
-                
-            except Exception as e:
-                logging.error(f"Kritischer Fehler bei der Erstellung des Formulars für {anime_slug}: {e}", exc_info=True)
-                npyscreen.notify_confirm(
-                    f"Es ist ein kritischer Fehler aufgetreten: {str(e)}\n\nDie Anwendung kehrt zum Hauptmenü zurück.",
-                    "Kritischer Fehler"
-                )
-                # Versuche, zum vorherigen Formular zurückzukehren
-                try:
-                    self.editing = False
-                    self.parentApp.switchFormPrevious()
-                except:
-                    # Wenn alles andere fehlschlägt, beende die Anwendung sauber
-                    self.parentApp.switchForm(None)
-                return
-                
-        except Exception as outer_e:
-            # Äußerste Fehlerbehandlung - sollte nur bei kritischen Fehlern erreicht werden
-            logging.critical(f"Fataler Fehler in EpisodeForm.create(): {outer_e}", exc_info=True)
-            try:
-                npyscreen.notify_confirm(
-                    "Ein schwerwiegender Fehler ist aufgetreten. Die Anwendung kehrt zum Hauptmenü zurück.",
-                    "Fataler Fehler"
-                )
-                self.editing = False
-                self.parentApp.switchFormPrevious()
-            except:
-                # Wenn alles andere fehlschlägt
-                try:
-                    self.parentApp.switchForm(None)
-                except:
-                    pass
-            return
-
-    def _format_episode_list(self, episode_urls):
-        """Hilfsmethode zur Formatierung der Episodenliste"""
-        try:
-            episode_list = []
-            for url in episode_urls:
-                try:
-                    season_number, episode_number = get_season_and_episode_numbers(url)
-                    episode_list.append(f"Episode {episode_number}")
-                except:
-                    # Fallback für URLs ohne erkennbare Staffel/Episode
-                    episode_list.append(f"Episode (URL: {url.split('/')[-1]})")
-            return episode_list
-        except Exception as e:
-            logging.error(f"Fehler beim Formatieren der Episodenliste: {e}", exc_info=True)
-            return ["Fehler beim Formatieren der Episodenliste"]
-            
-    def _setup_remaining_ui_elements(self):
-        """Richtet die restlichen UI-Elemente ein"""
-        try:
-            # Ab hier den restlichen Code aus der create-Methode kopieren
-            self.language_selector = self.add(
-                npyscreen.TitleSelectOne,
-                max_height=5,
-                value=[0],
-                name="Sprache auswählen:",
-                values=["Deutsch", "Englisch", "Japanisch (mit Untertiteln)"],
-                scroll_exit=True,
-            )
-            
-            self.provider_selector = self.add(
-                npyscreen.TitleSelectOne,
-                max_height=3,
-                value=[0],
-                name="Anbieter auswählen:",
-                values=["Vidoza", "Streamtape", "VOE", "Vidmoly", "SpeedFiles"],
-                scroll_exit=True,
-            )
-            
-            self.action_selector = self.add(
-                npyscreen.TitleSelectOne,
-                max_height=3,
-                value=[0],
-                name="Aktion auswählen:",
-                values=['Play', 'Download'],
-                scroll_exit=True,
-            )
-            
-            # Sichere Standard-Download-Pfad verwenden
-            DEFAULT_DOWNLOAD_PATH = os.path.expanduser("~/Downloads")
-            try:
-                from aniworld.globals import DEFAULT_DOWNLOAD_PATH as CONFIG_PATH
-                if CONFIG_PATH:
-                    DEFAULT_DOWNLOAD_PATH = CONFIG_PATH
-            except:
-                pass
-                
-            try:
-                # Versuche das originale DownloadPathActionPrompted Widget zu verwenden
-                self.download_path_input = self.add_widget(
-                    DownloadPathActionPrompted(
-                        name="Download Pfad:",
-                        value=DEFAULT_DOWNLOAD_PATH,
-                        labelColor="LABEL",
-                    ),
-                    rely=22,
-                )
-            except Exception as widget_error:
-                # Fallback: Einfaches Textfeld verwenden
-                logging.error(f"Fehler beim Erstellen des DownloadPathActionPrompted Widgets: {widget_error}")
-                self.download_path_input = self.add(
-                    npyscreen.TitleText,
-                    name="Download Pfad:",
-                    value=DEFAULT_DOWNLOAD_PATH
-                )
-                
-            # Zusätzliche Elemente wie weitere Optionen, Status-Anzeigen usw. hinzufügen
-            # Diese können je nach vorherigem Code variieren
-            
-        except Exception as e:
-            logging.error(f"Fehler beim Einrichten der restlichen UI-Elemente: {e}", exc_info=True)
-            # Ignorieren und weitermachen mit minimaler UI, damit die Anwendung nicht abstürzt
-
-    def setup_signal_handling(self):
-        def signal_handler(_signal_number, _frame):
-            try:
-                self.parentApp.switchForm(None)
-            except AttributeError:
-                pass
-            self.cancel_timer()
-            sys.exit()
-
-        signal.signal(signal.SIGINT, signal_handler)
-        logging.debug("Signal handler for SIGINT registered")
-
-    def start_timer(self):
-        self.timer = threading.Timer(  # pylint: disable=attribute-defined-outside-init
-            random.randint(600, 900),
-            self.delayed_message_box
-        )
-        self.timer.start()
-
-    def cancel_timer(self):
-        if self.timer and self.timer.is_alive():
-            self.timer.cancel()
-            logging.debug("Timer canceled")
-
-    def delayed_message_box(self):
-        show_messagebox("Are you still there?", "Uhm...", "info")
-
-    def update_directory_visibility(self):
-        logging.debug("Updating directory visibility")
-        selected_action = self.action_selector.get_selected_objects()
-        logging.debug("Selected action: %s", selected_action)
-        if selected_action and selected_action[0] == "Watch" or selected_action[0] == "Syncplay":
-            self.directory_field.hidden = True
-            self.aniskip_selector.hidden = False
-            logging.debug("Directory field hidden, Aniskip selector shown")
-        else:
-            self.directory_field.hidden = False
-            self.aniskip_selector.hidden = True
-            logging.debug("Directory field shown, Aniskip selector hidden")
-        self.display()
-
-    def on_ok(self):
-        logging.debug("EpisodeForm.on_ok called")
-        try:
-            selected_item = self.action_selector.value[0]
-            selected_action = self.action_options[selected_item]
-            selected_episodes = [url for _, url in
-                                 self.episode_selector.get_selected_objects()]
-            logging.debug("Selected episodes: %s", selected_episodes)
-
-            language = "German Dub"
-            if hasattr(self, 'language_selector'):
-                language_value = self.language_selector.value[0]
-                language = self.language_options[language_value]
-            logging.debug("Selected language: %s", language)
-
-            provider_selected = "StreamingProvider"
-            if hasattr(self, 'provider_selector'):
-                provider_value = self.provider_selector.value[0]
-                provider_selected = self.provider_options[provider_value]
-            logging.debug("Selected provider: %s", provider_selected)
-
-            provider_validated = self.validate_provider(provider_selected)
-
-            download_directory = ""
-            if hasattr(self, 'directory_field'):
-                download_directory = self.directory_field.value
-            logging.debug("Selected download directory: %s", download_directory)
-
-            download_directory_name = ""
-            if hasattr(self, 'directory_field'):
-                download_directory_name = self.directory_field.value
-            logging.debug(
-                "Selected download directory name: %s", download_directory_name
-            )
-
-            if language == "Japanese Dub":
-                lang_code = "jap"
-            elif language == "English Sub":
-                lang_code = "en"
-            elif language == "German Sub":
-                lang_code = "ger-sub"
-            else:
-                lang_code = "ger"
-
-            if platform.system() == "Windows":
-                lang_code = self.get_language_code(language)
-
-            logging.debug("Language code: %s", lang_code)
-
-            if not selected_episodes:
-                logging.debug("No episodes selected")
-                self.parentApp.setNextForm(None)
-                self.editing = False
-                self.cancel_timer()
-                return
-
-            # Speichere die Anime-Auswahl in der Datenbank, wenn verfügbar
-            anime_slug = self.parentApp.anime_slug
-            if HAS_DATABASE:
-                try:
-                    from aniworld.database.integration import DatabaseIntegration
-                    db = DatabaseIntegration()
-                    
-                    # Prüfe, ob der Anime vorhanden ist, wenn nicht, füge ihn hinzu
-                    anime = db.get_anime_by_slug(anime_slug)
-                    if not anime:
-                        # Wir haben keinen vollständigen Anime, aber zumindest den Slug und Titel
-                        anime_title = format_anime_title(anime_slug)
-                        db.save_minimal_anime(slug=anime_slug, title=anime_title)
-                        logging.info(f"Minimaler Anime-Eintrag für '{anime_title}' gespeichert")
-                except Exception as e:
-                    logging.error(f"Fehler bei der Datenbankoperation für Anime '{anime_slug}': {e}")
-                    print(f"Datenbankfehler: {e}")
-                    
-            self.parentApp.setNextForm(None)
-            self.editing = False
-            self.cancel_timer()
-
-            # Check if Streamkiste is selected
-            if provider_validated == "Streamkiste":
-                streamkiste.execute_with_params(
-                    selected_action,
-                    selected_episodes,
-                    download_directory,
-                    download_directory_name
-                )
-            # Check if NHentai is selected
-            elif provider_validated == "NHentai":
-                if len(selected_episodes) != 1:
-                    npyscreen.notify_confirm(
-                        "Please select just one episode for NHentai",
-                        "Info"
-                    )
-                else:
-                    nhentai.execute_with_params(
-                        selected_action,
-                        selected_episodes,
-                        download_directory,
-                        download_directory_name
-                    )
-            # Check if JAV is selected
-            elif provider_validated == "JAV":
-                if len(selected_episodes) != 1:
-                    npyscreen.notify_confirm(
-                        "Please select just one episode for JAV",
-                        "Info"
-                    )
-                else:
-                    jav.execute_with_params(
-                        selected_action,
-                        selected_episodes,
-                        download_directory,
-                        download_directory_name
-                    )
-            # Check if Hanime is selected
-            elif provider_validated == "Hanime":
-                if len(selected_episodes) != 1:
-                    npyscreen.notify_confirm(
-                        "Please select just one episode for Hanime",
-                        "Info"
-                    )
-                else:
-                    hanime.execute_with_params(
-                        selected_action,
-                        selected_episodes,
-                        download_directory,
-                        download_directory_name
-                    )
-            # Default - execute with parameters
-            else:
-                execute.execute_with_params(
-                    selected_action,
-                    selected_episodes,
-                    download_directory,
-                    download_directory_name,
-                    lang_code
-                )
-        except Exception as e:
-            logging.error(f"Fehler in EpisodeForm.on_ok: {e}")
-            npyscreen.notify_confirm(
-                f"Ein Fehler ist aufgetreten: {str(e)}\n\nDie Anwendung wird fortgesetzt.",
-                "Fehler"
-            )
-            # Verhindere, dass die Anwendung beendet wird
-            self.editing = True
-            return
-
-    def get_language_code(self, language):
-        logging.debug("Getting language code for: %s", language)
-        return {
-            'German Dub': "1",
-            'English Sub': "2",
-            'German Sub': "3"
-        }.get(language, "")
-
-    def validate_provider(self, provider_selected):
-        logging.debug("Validating provider: %s", provider_selected)
-        valid_providers = ["Vidoza", "Streamtape", "VOE", "Vidmoly", "SpeedFiles"]
-        while provider_selected[0] not in valid_providers:
-            logging.debug("Invalid provider selected, falling back to Vidoza")
-            npyscreen.notify_confirm(
-                "Doodstream is currently broken.\nFalling back to Vidoza.",
-                title="Provider Error"
-            )
-            self.provider_selector.value = 0
-            provider_selected = ["Vidoza"]
-        return provider_selected[0]
-
-    def on_cancel(self):
-        logging.debug("Cancel button pressed")
-        self.cancel_timer()
-        self.parentApp.setNextForm(None)
-
-    def go_to_second_form(self):
-        self.parentApp.switchForm("SECOND")
-
-
-# pylint: disable=R0901
-class SecondForm(npyscreen.ActionFormV2):
-    def create(self):
-        anime_slug = self.parentApp.anime_slug
-        anime_title = format_anime_title(anime_slug)
-
-        text_content1 = get_description(anime_slug)
-        text_content2 = get_description_with_id(anime_title, 1)
-
-        wrapped_text1 = "\n".join(textwrap.wrap(text_content1, width=100))
-        wrapped_text2 = "\n".join(textwrap.wrap(text_content2, width=100))
-
-        text_content = f"{wrapped_text1}\n\n{wrapped_text2}"
-
-        self.expandable_text = self.add(
-            npyscreen.MultiLineEdit,
-            value=text_content,
-            max_height=None,
-            editable=False
-        )
-
-    def on_ok(self):
-        self.parentApp.switchForm("MAIN")
-
-    def on_cancel(self):
-        self.parentApp.switchForm("MAIN")
-
-
-class AnimeApp(npyscreen.NPSAppManaged):
-    def __init__(self, anime_slug):
-        logging.debug("Initializing AnimeApp with slug: %s", anime_slug)
-        super().__init__()
-        self.anime_slug = anime_slug
-
-    def onStart(self):
-        logging.debug("Starting AnimeApp")
-        npyscreen.setTheme(CustomTheme)
-        version = get_version()
-        update_notice = " (Update Available)" if is_version_outdated() else ""
-        name = f"AniWorld-Downloader{version}{update_notice}"
-        self.addForm(
-            "MAIN", EpisodeForm,
-            name=name
-        )
-        self.addForm("SECOND", SecondForm, name="Description")
-
+DATABASE_OPTIONS = (
+    'db_list_anime',
+    'db_anime_info',
+    'db_list_downloads',
+    'db_download_status',
+    'db_stats',
+    'db_stats_rebuild'
+)
 
 # pylint: disable=R0912, R0915
 def parse_arguments():
@@ -687,6 +120,21 @@ def parse_arguments():
             action='store_true',
             help='Zeige Datenbankstatistiken'
         )
+        db_group.add_argument(
+            '--db-stats-rebuild',
+            action='store_true',
+            help='Berechne die Datenbankstatistiken komplett neu (Reparatur)'
+        )
+        db_group.add_argument(
+            '--db-status',
+            type=str,
+            help='Nur Einträge mit diesem Status auflisten (--db-list-anime, --db-list-downloads)'
+        )
+        db_group.add_argument(
+            '--db-search',
+            type=str,
+            help='Nur Anime auflisten, deren Titel diesen Text enthält (--db-list-anime)'
+        )
 
     # Episode options
     episode_group = parser.add_argument_group('Episode Options')
@@ -733,9 +181,12 @@ def parse_arguments():
     action_group.add_argument(
         '-L', '--language',
         type=str,
-        choices=['German Dub', 'English Sub', 'German Sub'],
         default=aniworld_globals.DEFAULT_LANGUAGE,
-        help='Language choice'
+        help=(
+            'Language choice: German Dub, English Sub or German Sub. '
+            'Several comma separated languages, e.g. "German Dub,German Sub", '
+            'download each of them from one page fetch'
+        )
     )
     action_group.add_argument(
         '-p', '--provider',
@@ -819,11 +270,42 @@ def parse_arguments():
     misc_group.add_argument(
         '-w', '--use-playwright',
         action='store_true',
-        help='Bypass fetching with a headless browser using Playwright instead (EXPERIMENTAL!!!)'
+        help='Fetch every page with a headless browser using Playwright (EXPERIMENTAL!!!)'
+    )
+    misc_group.add_argument(
+        '--metrics',
+        type=str,
+        nargs='?',
+        const='-',
+        default=aniworld_globals.DEFAULT_METRICS_SUMMARY,
+        metavar='FILE',
+        help='Write a JSON summary of per-stage timings at exit (stderr, or FILE if given)'
+    )
+    misc_group.add_argument(
+        '--metrics-port',
+        type=int,
+        default=aniworld_globals.DEFAULT_METRICS_PORT,
+        help='Serve OpenMetrics on http://127.0.0.1:PORT/metrics while running'
+    )
+    misc_group.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run; writes a flame graph (.folded) and a hot-function report to ~/.aniworld/profiles'
+    )
+    misc_group.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='Like --profile, plus a tracemalloc diff of memory growth over the run'
     )
 
     args = parser.parse_args()
 
+    if not get_language_code(args.language):
+        parser.error(
+            f"argument -L/--language: invalid choice: '{args.language}' "
+            "(choose from 'German Dub', 'English Sub', 'German Sub', separated by commas)"
+        )
+
     if not args.provider:
         if args.action == "Download":
             args.provider = aniworld_globals.DEFAULT_PROVIDER
@@ -831,8 +313,9 @@ def parse_arguments():
             args.provider = aniworld_globals.DEFAULT_PROVIDER_WATCH
 
     if args.version:
-        update_status = " (Update Available)" if is_version_outdated() else ""
-        divider = "-------------------" if is_version_outdated() else ""
+        outdated = run_preflight(["version"])["version"]
+        update_status = " (Update Available)" if outdated else ""
+        divider = "-------------------" if outdated else ""
         banner = fR"""
      ____________________________________{divider}
     < Installed aniworld {get_version()} via {check_package_installation()}{update_status}. >
@@ -930,8 +413,15 @@ def parse_arguments():
         os.environ['USE_PLAYWRIGHT'] = str(args.use_playwright)
         logging.debug("Playwright set.")
 
-    if not args.slug and args.random_anime:
-        args.slug = get_random_anime(args.random_anime)
+    if args.metrics or args.metrics_port:
+        from aniworld.common import metrics  # pylint: disable=import-outside-toplevel
+        metrics.enable(port=args.metrics_port, summary=args.metrics)
+        logging.debug("Metrics enabled (summary: %s, port: %s).", args.metrics, args.metrics_port)
+
+    if args.profile or args.profile_memory:
+        from aniworld.common.profiling import start_run_profile  # pylint: disable=import-outside-toplevel
+        start_run_profile(memory=args.profile_memory)
+        logging.debug("Profiling enabled (memory: %s).", args.profile_memory)
 
     return args
 
@@ -939,6 +429,7 @@ def parse_arguments():
 def handle_query(args):
     logging.debug("Handling query with args: %s", args)
     if args.query and not args.episode:
+        from aniworld.search import search_anime  # pylint: disable=import-outside-toplevel
         slug = search_anime(query=args.query)
         logging.debug("Found slug: %s", slug)
         season_data = get_season_data(anime_slug=slug)
@@ -954,7 +445,7 @@ def handle_query(args):
             e = int(match.group(2))
             logging.debug("Parsed season: %d, episode: %d", s, e)
 
-        args.episode = [f"https://aniworld.to/anime/stream/{slug}/staffel-{s}/episode-{e}"]
+        args.episode = [f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}/staffel-{s}/episode-{e}"]
         logging.debug("Set episode URL: %s", args.episode)
 
 
@@ -978,13 +469,6 @@ def main():
     logging.debug("============================================")
     logging.debug("Welcome to Aniworld!")
     logging.debug("============================================\n")
-    if not check_internet_connection():
-        clear_screen()
-
-        logging.disable(logging.CRITICAL)
-        adventure()
-
-        sys.exit()
     try:
         args = parse_arguments()
         logging.debug("Parsed arguments: %s", args)
@@ -993,6 +477,23 @@ def main():
         if HAS_DATABASE and handle_database_commands(args):
             sys.exit(0)
 
+        # Datenbankbefehle kommen ohne Internet aus, alles Weitere nicht; die zweite Probe
+        # (etwa nach einem Timeout der ersten) nutzt dieselbe kurze Frist wie der Preflight
+        preflight = run_preflight(get_preflight_checks(args))
+        if not preflight.get('internet') and not check_internet_connection(
+            timeout=aniworld_globals.DEFAULT_PREFLIGHT_TIMEOUT
+        ):
+            clear_screen()
+
+            logging.disable(logging.CRITICAL)
+            from aniworld.common.adventure import adventure  # pylint: disable=import-outside-toplevel
+            adventure()
+
+            sys.exit()
+
+        if not args.slug and args.random_anime:
+            args.slug = get_random_anime(args.random_anime)
+
         validate_link(args)
         handle_query(args)
 
@@ -1027,6 +528,30 @@ def main():
     run_app_with_query(args)
 
 
+def get_preflight_checks(args):
+    checks = ['internet']
+    interactive = not (args.episode or args.episode_file or args.query)
+
+    # only downloads are recorded in the database; the interactive menu may still choose one
+    if HAS_DATABASE and (interactive or (
+        args.action == 'Download' and not (args.only_direct_link or args.only_command)
+    )):
+        checks.append('database')
+
+    if interactive:
+        # Interactive menu: the action is chosen later, only the header needs the update check
+        checks.append('version')
+    elif not (args.only_direct_link or args.only_command):
+        checks.extend(dependency_checks({
+            'Watch': ['mpv'],
+            'Download': ['yt-dlp'],
+            'Syncplay': ['mpv', 'syncplay']
+        }.get(args.action, [])))
+
+    logging.debug("Preflight checks: %s", checks)
+    return checks
+
+
 def validate_link(args):
     if args.link:
         if args.link.count('/') == 5:
@@ -1080,19 +605,25 @@ def check_other_extractors(episode_urls: list):
     logging.debug("Hanime URLs: %s", hanime_urls)
     logging.debug("Streamkiste URLs: %s", streamkiste_urls)
 
+    # pylint: disable=import-outside-toplevel
+    # the extractors are only imported when one of their URLs was given
     for jav_url in jav_urls:
+        from aniworld.extractors import jav
         logging.info("Processing JAV URL: %s", jav_url)
         jav(jav_url)
 
     for nhentai_url in nhentai_urls:
+        from aniworld.extractors import nhentai
         logging.info("Processing Nhentai URL: %s", nhentai_url)
         nhentai(nhentai_url)
 
     for hanime_url in hanime_urls:
+        from aniworld.extractors import hanime
         logging.info("Processing hanime URL: %s", hanime_url)
         hanime(hanime_url)
 
     for streamkiste_url in streamkiste_urls:
+        from aniworld.extractors import streamkiste
         logging.info("Processing Streamkiste URL: %s", streamkiste_url)
         streamkiste(streamkiste_url)
 
@@ -1117,10 +648,16 @@ def execute_with_params(args, selected_episodes, anime_title, language, anime_sl
         'debug': args.debug
     }
     logging.debug("Executing with params: %s", params)
+    from aniworld.execute import execute  # pylint: disable=import-outside-toplevel
     execute(params=params)
 
 
 def run_app_with_query(args):
+    # pylint: disable=import-outside-toplevel
+    import npyscreen
+    from aniworld.search import search_anime
+    from aniworld.tui import AnimeApp
+
     def run_app(query):
         logging.debug("Running app with query: %s", query)
         clear_screen()
@@ -1155,8 +692,12 @@ def handle_database_commands(args):
     """
     if not HAS_DATABASE:
         return False
-        
+
+    if not any(getattr(args, option, None) for option in DATABASE_OPTIONS):
+        return False
+
     try:
+        from aniworld.database.integration import DatabaseIntegration  # pylint: disable=import-outside-toplevel
         db = DatabaseIntegration()
     except Exception as e:
         logging.error(f"Fehler beim Verbinden zur Datenbank: {e}")
@@ -1165,21 +706,23 @@ def handle_database_commands(args):
         
     # --db-list-anime: Liste aller Anime anzeigen
     if hasattr(args, 'db_list_anime') and args.db_list_anime:
-        print("\n=== Anime in der Datenbank ===")
+        print("\n=== Anime in der Datenbank ===\n")
         try:
-            animes = db.find_all_animes()
-            if not animes:
-                print("Keine Anime in der Datenbank gefunden.")
+            # Zeilen werden seitenweise gelesen und sofort ausgegeben; die Anzahl steht daher am Ende
+            count = 0
+            for anime in db.iter_animes(status=args.db_status, search=args.db_search):
+                count += 1
+                status_symbol = "🔄" if anime.status == "laufend" else "✅"
+                print(f"ID: {anime.series_id} | {status_symbol} {anime.titel}")
+                if anime.original_titel:
+                    print(f"    Original: {anime.original_titel}")
+                if anime.erscheinungsjahr:
+                    print(f"    Jahr: {anime.erscheinungsjahr}")
+                print(f"    URL: {anime.aniworld_url}\n")
+            if count:
+                print(f"Insgesamt {count} Anime gefunden.")
             else:
-                print(f"Insgesamt {len(animes)} Anime gefunden:\n")
-                for anime in animes:
-                    status_symbol = "🔄" if anime.status == "laufend" else "✅"
-                    print(f"ID: {anime.series_id} | {status_symbol} {anime.titel}")
-                    if anime.original_titel:
-                        print(f"    Original: {anime.original_titel}")
-                    if anime.erscheinungsjahr:
-                        print(f"    Jahr: {anime.erscheinungsjahr}")
-                    print(f"    URL: {anime.aniworld_url}\n")
+                print("Keine Anime in der Datenbank gefunden.")
         except Exception as e:
             logging.error(f"Fehler beim Auflisten der Anime: {e}")
             print(f"Fehler: {e}")
@@ -1221,6 +764,11 @@ def handle_database_commands(args):
             print(f"AniWorld URL: {anime.aniworld_url}")
             if anime.cover_url:
                 print(f"Cover URL: {anime.cover_url}")
+            if anime.cover_hash:
+                from aniworld.database.cover_store import get_cover_store
+                cover_path = get_cover_store().thumbnail_path(anime.cover_hash)
+                if cover_path:
+                    print(f"Cover: {cover_path}")
             if anime.aktualisiert_am:
                 print(f"Letzte Aktualisierung: {anime.aktualisiert_am}")
                 
@@ -1251,11 +799,47 @@ def handle_database_commands(args):
             print(f"Fehler: {e}")
         return True
         
+    # --db-list-downloads: Liste aller Downloads anzeigen
+    if hasattr(args, 'db_list_downloads') and args.db_list_downloads:
+        print("\n=== Downloads in der Datenbank ===\n")
+        try:
+            from aniworld.database.services import LookupService
+            count = 0
+            for download in db.iter_downloads(status=args.db_status):
+                count += 1
+                provider = LookupService.get_provider_name(download.provider_id) or download.provider_id
+                sprache = LookupService.get_language_name(download.language_id) or download.language_id
+                print(f"ID: {download.download_id} | {download.status} | Episode {download.episode_id} | {provider}, {sprache}")
+                if download.lokaler_pfad:
+                    print(f"    Datei: {download.lokaler_pfad}")
+                if download.download_datum:
+                    print(f"    Datum: {download.download_datum}")
+            if count:
+                print(f"\nInsgesamt {count} Downloads gefunden.")
+            else:
+                print("Keine Downloads in der Datenbank gefunden.")
+        except Exception as e:
+            logging.error(f"Fehler beim Auflisten der Downloads: {e}")
+            print(f"Fehler: {e}")
+        return True
+        
+    # --db-stats-rebuild: Statistiken neu berechnen
+    if hasattr(args, 'db_stats_rebuild') and args.db_stats_rebuild:
+        try:
+            from aniworld.database.services import StatisticsService
+            counters = StatisticsService().rebuild()
+            print(f"Statistiken neu berechnet: {counters['anime']} Anime, {counters['staffeln']} Staffeln, "
+                  f"{counters['episoden']} Episoden, {counters['downloads']} Downloads")
+        except Exception as e:
+            logging.error(f"Fehler beim Neuberechnen der Datenbankstatistiken: {e}")
+            print(f"Fehler: {e}")
+        if not args.db_stats:
+            return True
+        
     # --db-stats: Datenbankstatistiken anzeigen
     if hasattr(args, 'db_stats') and args.db_stats:
         print("\n=== Datenbankstatistiken ===")
         try:
-            # Diese Funktionen müssten noch implementiert werden
             from aniworld.database.services import StatisticsService
             stats = StatisticsService()
             
@@ -1269,7 +853,16 @@ def handle_database_commands(args):
             print(f"Gesamtzahl Episoden: {episode_count}")
             print(f"Gesamtzahl Downloads: {download_count}")
             
-            # Weitere Statistiken könnten hier angezeigt werden
+            download_stats = stats.get_download_statistics()
+            if download_stats['status_counts']:
+                print("Downloads nach Status: " + ", ".join(
+                    f"{status}: {count}" for status, count in download_stats['status_counts'].items()))
+            if download_stats['avg_file_size']:
+                print(f"Durchschnittliche Dateigröße: {download_stats['avg_file_size'] / (1024 * 1024):.1f} MB")
+            if download_stats['top_providers']:
+                print("Häufigste Provider: " + ", ".join(
+                    f"{provider} ({count})" for provider, count in download_stats['top_providers']))
+            
             top_anime = stats.get_top_anime(limit=5)
             if top_anime:
                 print("\nTop 5 Anime (nach Episodenanzahl):")
@@ -1280,8 +873,9 @@ def handle_database_commands(args):
             if recent_downloads:
                 print("\nLetzte 5 Downloads:")
                 for dl in recent_downloads:
-                    status_emoji = "✅" if dl.status == "abgeschlossen" else "🔄" if dl.status == "gestartet" else "❌"
-                    print(f"{status_emoji} {dl.episode_titel} ({dl.provider}, {dl.sprache})")
+                    status_emoji = "✅" if dl['status'] == "abgeschlossen" else "❌" if dl['status'] == "fehlgeschlagen" else "🔄"
+                    print(f"{status_emoji} {dl['anime_titel']} S{dl['staffel_nummer']}E{dl['episode_nummer']} "
+                          f"({dl['provider']}, {dl['sprache']})")
                     
         except ImportError:
             print("StatisticsService nicht verfügbar. Funktionalität nicht implementiert.")
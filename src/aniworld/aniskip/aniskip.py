@@ -1,7 +1,8 @@
-import json
 import logging
 import tempfile
-from typing import Dict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
@@ -15,6 +16,9 @@ from aniworld.common import (
 )
 
 from aniworld import globals as aniworld_globals
+from aniworld.aniskip.cache import MISSING, get_aniskip_cache
+from aniworld.common import metrics
+from aniworld.common.ratelimit import limited_get
 
 
 CHAPTER_FORMAT = "\n[CHAPTER]\nTIMEBASE=1/1000\nSTART={}\nEND={}\nTITLE={}\n"
@@ -39,11 +43,9 @@ def check_episodes(anime_id):
     return None
 
 
-def build_options(metadata: Dict, chapters_file: str) -> str:
-    logging.debug("Building options with metadata: %s and chapters_file: %s",
-                  json.dumps(metadata, indent=2), chapters_file)
+def get_chapters(metadata: Dict) -> List[Tuple[str, str, Optional[str]]]:
     op_end, ed_start = None, None
-    options = []
+    chapters = []
 
     for skip in metadata["results"]:
         logging.debug("Processing skip: %s", skip)
@@ -62,46 +64,80 @@ def build_options(metadata: Dict, chapters_file: str) -> str:
             ch_name = "Ending"
         logging.debug("Chapter name: %s", ch_name)
 
-        with open(chapters_file, 'a', encoding='utf-8') as f:
-            f.write(CHAPTER_FORMAT.format(ftoi(st_time), ftoi(ed_time), ch_name))
-            logging.debug("Wrote chapter to file: %s", chapters_file)
-
-        options.append(OPTION_FORMAT.format(skip_type, st_time, skip_type, ed_time))
-        logging.debug("Options so far: %s", options)
+        chapters.append((ftoi(st_time), ftoi(ed_time), ch_name))
 
     if op_end:
         ep_ed = ed_start if ed_start else op_end
-        with open(chapters_file, 'a', encoding='utf-8') as f:
-            f.write(CHAPTER_FORMAT.format(ftoi(op_end), ftoi(ep_ed), "Episode"))
-            logging.debug("Wrote episode chapter to file: %s", chapters_file)
+        chapters.append((ftoi(op_end), ftoi(ep_ed), "Episode"))
+
+    return chapters
+
+
+def build_options(metadata: Dict, chapters_file: str) -> str:
+    logging.debug("Building options with metadata: %s and chapters_file: %s", metadata, chapters_file)
+    options = [
+        OPTION_FORMAT.format(skip["skip_type"], skip["interval"]["start_time"],
+                             skip["skip_type"], skip["interval"]["end_time"])
+        for skip in metadata["results"]
+    ]
+    logging.debug("Options: %s", options)
+
+    with open(chapters_file, 'a', encoding='utf-8') as f:
+        for chapter in get_chapters(metadata):
+            f.write(CHAPTER_FORMAT.format(*chapter))
+        logging.debug("Wrote chapters to file: %s", chapters_file)
 
     return ",".join(options)
 
 
-def build_flags(anime_id: str, episode: int, chapters_file: str) -> str:
-    logging.debug(
-        "Building flags for MAL ID: %s, episode: %d, chapters_file: %s",
-        anime_id, episode, chapters_file
-    )
+def build_chapters(metadata: Dict) -> str:
+    # FFMETADATA for embedding into a file, chapters in playback order
+    chapters = sorted(get_chapters(metadata), key=lambda chapter: int(chapter[0]))
+    return ";FFMETADATA1" + "".join(CHAPTER_FORMAT.format(*chapter) for chapter in chapters)
+
+
+def fetch_skip_times(anime_id: str, episode: int) -> Optional[Dict]:
+    cache = get_aniskip_cache()
+    metadata = cache.get_skip_times(int(anime_id), episode)
+    if metadata is not MISSING:
+        logging.debug("Skip times for MAL ID %s, episode %d served from cache", anime_id, episode)
+        return metadata
+
     aniskip_api = f"https://api.aniskip.com/v1/skip-times/{anime_id}/{episode}?types=op&types=ed"
     logging.debug("Fetching skip times from: %s", aniskip_api)
-    response = requests.get(
-        aniskip_api,
-        headers={"User-Agent": aniworld_globals.DEFAULT_USER_AGENT},
-        timeout=15
-    )
+    with metrics.timed("aniskip", step="skip_times"):
+        response = limited_get(
+            aniskip_api,
+            headers={"User-Agent": aniworld_globals.DEFAULT_USER_AGENT},
+            timeout=15
+        )
     logging.debug("Response status code: %d", response.status_code)
 
     if response.status_code == 500:
         logging.info("Aniskip API is currently not working!")
-        return ""
+        return None
     if response.status_code != 200:
         raise_runtime_error("Failed to fetch AniSkip data.")
 
     metadata = response.json()
-    logging.debug("AniSkip response: %s", json.dumps(metadata, indent=2))
+    logging.debug("AniSkip response: %s", metadata)
 
     if not metadata.get("found"):
+        cache.put_skip_times(int(anime_id), episode, None)
+        return None
+
+    cache.put_skip_times(int(anime_id), episode, metadata)
+    return metadata
+
+
+def build_flags(anime_id: str, episode: int, chapters_file: str) -> str:
+    logging.debug(
+        "Building flags for MAL ID: %s, episode: %d, chapters_file: %s",
+        anime_id, episode, chapters_file
+    )
+    metadata = fetch_skip_times(anime_id, episode)
+
+    if not metadata:
         logging.debug("No skip times found.")
         return ""
 
@@ -114,23 +150,113 @@ def build_flags(anime_id: str, episode: int, chapters_file: str) -> str:
     return f"--chapters-file={chapters_file} --script-opts={options}"
 
 
+def resolve_mal_id(anime_title: str, anime_slug: str, season: int):
+    # (slug, season) -> MAL ID and both episode counts; an explicit MAL ID is not cached
+    # under the slug so it cannot shadow the looked-up one
+    cache = get_aniskip_cache()
+    if not anime_title.isdigit():
+        entry = cache.get_mal_entry(anime_slug, season)
+        if entry is not None:
+            logging.debug("MAL ID for %s season %d served from cache: %s", anime_slug, season, entry)
+            return entry
+
+    with metrics.timed("aniskip", step="mal_id"):
+        anime_id = fetch_anime_id(anime_title, season) if not anime_title.isdigit() else anime_title
+    logging.debug("Fetched MAL ID: %s", anime_id)
+    if not anime_id:
+        if not anime_title.isdigit():
+            cache.put_mal_entry(anime_slug, season, None)
+        return None, None, None
+
+    logging.debug("Anime_Slug: %s", anime_slug)
+    with metrics.timed("aniskip", step="episode_check"):
+        mal_episodes = check_episodes(anime_id)
+        season_episodes = get_season_episode_count(anime_slug, str(season))
+
+    if not anime_title.isdigit():
+        cache.put_mal_entry(anime_slug, season, int(anime_id), mal_episodes, season_episodes)
+    return anime_id, mal_episodes, season_episodes
+
+
+def fetch_season_skip_times(anime_id: str, episodes: List[int], workers: int) -> Dict[int, Optional[Dict]]:
+    def fetch(episode: int) -> Optional[Dict]:
+        try:
+            return fetch_skip_times(anime_id, episode)
+        except (requests.exceptions.RequestException, RuntimeError, ValueError) as e:
+            logging.debug("Could not fetch skip times for MAL ID %s, episode %d: %s", anime_id, episode, e)
+            return None
+
+    if not episodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(episodes))),
+                            thread_name_prefix="aniskip") as executor:
+        return dict(zip(episodes, executor.map(fetch, episodes)))
+
+
+def season_chapters(anime_title: str, anime_slug: str, season: int, episodes: List[int]) -> Dict[int, str]:
+    # one MAL lookup for the season, then the skip times of all its episodes at once
+    anime_id, mal_episodes, season_episodes = resolve_mal_id(anime_title, anime_slug, season)
+    if not anime_id or mal_episodes != season_episodes:
+        logging.debug("No matching MAL ID for %s season %d, no chapters.", anime_slug, season)
+        return {}
+
+    with metrics.timed("aniskip", step="season_skip_times"):
+        skip_times = fetch_season_skip_times(
+            anime_id, sorted(set(episodes)), aniworld_globals.DEFAULT_ANISKIP_WORKERS
+        )
+    return {episode: build_chapters(metadata) for episode, metadata in skip_times.items() if metadata}
+
+
+class SeasonChapters:
+    # downloads: the chapters of a season are looked up in the background when its first
+    # episode starts downloading and collected by the post-processing of each finished file
+    def __init__(self, anime_slug: str, episodes: Dict[int, List[int]]):
+        self.anime_slug = anime_slug
+        self.episodes = episodes
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, anime_title: str, season: int) -> None:
+        with self._lock:
+            if season in self._futures:
+                return
+            future = Future()
+            self._futures[season] = future
+
+        def run():
+            try:
+                future.set_result(
+                    season_chapters(anime_title, self.anime_slug, season, self.episodes.get(season, []))
+                )
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                # includes SystemExit from ExitOnError when a fetch logs an error
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="aniskip-chapters", daemon=True).start()
+
+    def get(self, anime_title: str, season: int, episode: int) -> Optional[str]:
+        self.prefetch(anime_title, season)
+        try:
+            return self._futures[season].result().get(episode)
+        except (Exception, SystemExit) as e:  # pylint: disable=broad-exception-caught
+            logging.debug("Could not look up chapters for %s season %d: %s", self.anime_slug, season, e)
+            return None
+
+
 def aniskip(anime_title: str, anime_slug: str, episode: int, season: int) -> str:
     logging.debug("Running aniskip for anime_title: %s, episode: %d", anime_title, episode)
-    anime_id = fetch_anime_id(anime_title, season) if not anime_title.isdigit() else anime_title
-    logging.debug("Fetched MAL ID: %s", anime_id)
+    anime_id, mal_episodes, season_episodes = resolve_mal_id(anime_title, anime_slug, season)
     if not anime_id:
         logging.debug("No MAL ID found.")
         return ""
 
-    logging.debug("Anime_Slug: %s", anime_slug)
-    if check_episodes(anime_id) == get_season_episode_count(anime_slug, str(season)):
+    if mal_episodes == season_episodes:
         with tempfile.NamedTemporaryFile(mode="w+", delete=False) as chapters_file:
             logging.debug("Created temporary chapters file: %s", chapters_file.name)
             return build_flags(anime_id, episode, chapters_file.name)
     else:
-        logging.debug("Check_Episode: %s", check_episodes(anime_id))
-        logging.debug("Check get_season_episode_count: %s",
-                      get_season_episode_count(anime_slug, str(season)))
+        logging.debug("Check_Episode: %s", mal_episodes)
+        logging.debug("Check get_season_episode_count: %s", season_episodes)
         logging.debug("Mal ID isn't matching episode counter!")
         return ""
 
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Optional, Tuple
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import metrics
+from aniworld.common.common import get_aniworld_home_directory
+
+ANISKIP_CACHE_FILE = "aniskip.db"
+
+# a NULL mal_id / metadata is a cached "nothing found"; such entries expire after
+# DEFAULT_ANISKIP_NEGATIVE_TTL instead of DEFAULT_ANISKIP_CACHE_TTL
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS mal_ids (
+        slug TEXT NOT NULL,
+        season INTEGER NOT NULL,
+        mal_id INTEGER,
+        mal_episodes INTEGER,
+        season_episodes INTEGER,
+        checked_at REAL NOT NULL,
+        PRIMARY KEY (slug, season)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS skip_times (
+        mal_id INTEGER NOT NULL,
+        episode INTEGER NOT NULL,
+        metadata TEXT,
+        checked_at REAL NOT NULL,
+        PRIMARY KEY (mal_id, episode)
+    )
+    """,
+)
+
+MISSING = object()
+
+
+def get_aniskip_cache_path() -> str:
+    return os.path.join(get_aniworld_home_directory(), "cache", ANISKIP_CACHE_FILE)
+
+
+class AniskipCache:
+    def __init__(self, path: str):
+        self.path = path
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._schema_ready:
+            with self._lock:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+                self._schema_ready = True
+        return connection
+
+    @staticmethod
+    def _is_fresh(checked_at: float, positive: bool) -> bool:
+        ttl = (
+            aniworld_globals.DEFAULT_ANISKIP_CACHE_TTL if positive
+            else aniworld_globals.DEFAULT_ANISKIP_NEGATIVE_TTL
+        )
+        return 0 <= time.time() - checked_at < ttl
+
+    def _read(self, table: str, query: str, params: tuple):
+        if aniworld_globals.DEFAULT_ANISKIP_CACHE_TTL <= 0:
+            return None
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(query, params).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            # the cache only saves requests, a broken file must not break playback
+            logging.debug("Could not read aniskip cache %s: %s", self.path, e)
+            row = None
+        metrics.inc("aniskip_cache", table=table, result="hit" if row else "miss")
+        return row
+
+    def _write(self, query: str, params: tuple) -> None:
+        if aniworld_globals.DEFAULT_ANISKIP_CACHE_TTL <= 0:
+            return
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute(query, params)
+                connection.commit()
+        except (sqlite3.Error, OSError) as e:
+            logging.debug("Could not write aniskip cache %s: %s", self.path, e)
+
+    def get_mal_entry(self, slug: str, season: int) -> Optional[Tuple[Optional[int], Optional[int], Optional[int]]]:
+        row = self._read(
+            "mal_ids",
+            "SELECT mal_id, mal_episodes, season_episodes, checked_at FROM mal_ids WHERE slug = ? AND season = ?",
+            (slug, season)
+        )
+        if row is None:
+            return None
+
+        mal_id, mal_episodes, season_episodes, checked_at = row
+        matched = mal_id is not None and mal_episodes == season_episodes
+        if not self._is_fresh(checked_at, matched):
+            return None
+        return mal_id, mal_episodes, season_episodes
+
+    def put_mal_entry(self, slug: str, season: int, mal_id: Optional[int],
+                      mal_episodes: Optional[int] = None, season_episodes: Optional[int] = None) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO mal_ids "
+            "(slug, season, mal_id, mal_episodes, season_episodes, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (slug, season, mal_id, mal_episodes, season_episodes, time.time())
+        )
+
+    def get_skip_times(self, mal_id: int, episode: int):
+        row = self._read(
+            "skip_times",
+            "SELECT metadata, checked_at FROM skip_times WHERE mal_id = ? AND episode = ?",
+            (mal_id, episode)
+        )
+        if row is None or not self._is_fresh(row[1], row[0] is not None):
+            return MISSING
+        return json.loads(row[0]) if row[0] is not None else None
+
+    def put_skip_times(self, mal_id: int, episode: int, metadata: Optional[Dict]) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO skip_times (mal_id, episode, metadata, checked_at) VALUES (?, ?, ?, ?)",
+            (mal_id, episode, json.dumps(metadata) if metadata is not None else None, time.time())
+        )
+
+
+_cache: Optional[AniskipCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_aniskip_cache() -> AniskipCache:
+    global _cache  # pylint: disable=global-statement
+    with _cache_lock:
+        if _cache is None or _cache.path != get_aniskip_cache_path():
+            _cache = AniskipCache(get_aniskip_cache_path())
+        return _cache
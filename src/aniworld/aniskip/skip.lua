@@ -4,7 +4,8 @@ local mpv_options = require("mp.options")
 local options = {
     op_start = 0, op_end = 0, ed_start = 0, ed_end = 0,
 }
-mpv_options.read_options(options, "skip")
+-- re-read when script-opts change, e.g. per file when episodes are loaded into one mpv
+mpv_options.read_options(options, "skip", function() end)
 
 local function skip()
     local current_time = mp.get_property_number("time-pos")
@@ -7,6 +7,7 @@ from .common import (
     fetch_url_content,
     ftoi,
     get_language_code,
+    get_language_keys,
     get_language_string,
     get_season_data,
     get_version,
@@ -38,5 +39,22 @@ from .common import (
     install_and_import
 )
 
-from .ascii_art import display_ascii_art
-from .adventure import adventure
+
+# Die ASCII-Art (ca. 800 Zeilen Literale) und das Offline-Spiel werden nur
+# selten gebraucht und erst beim ersten Zugriff importiert.
+_LAZY_ATTRIBUTES = {
+    'display_ascii_art': ('.ascii_art', 'display_ascii_art'),
+    'adventure': ('.adventure', 'adventure'),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib  # pylint: disable=import-outside-toplevel
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
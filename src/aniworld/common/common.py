@@ -19,12 +19,13 @@ from importlib.metadata import version, PackageNotFoundError
 from typing import List, Optional
 
 import requests
-import py7zr
-from bs4 import BeautifulSoup
 from requests.exceptions import HTTPError
-from packaging.version import Version
 
 import aniworld.globals as aniworld_globals
+from aniworld.common import metrics
+from aniworld.common.fetch_strategy import HTTP, PLAYWRIGHT, get_fetch_strategies, url_pattern
+from aniworld.common.ratelimit import get_rate_limiter, is_throttled, limited_get
+from aniworld.common.retry import BROWSER, classify, retrying_get
 
 
 def check_dependencies(dependencies: list) -> None:
@@ -40,7 +41,8 @@ def check_dependencies(dependencies: list) -> None:
             resolved_dependencies.append(dep)
 
     logging.debug("Checking for %s in path.", resolved_dependencies)
-    missing = [dep for dep in resolved_dependencies if shutil.which(dep) is None]
+    from aniworld.common.preflight import get_dependency_path  # pylint: disable=import-outside-toplevel
+    missing = [dep for dep in resolved_dependencies if get_dependency_path(dep) is None]
 
     # TODO: Check if in appdata and return
 
@@ -70,11 +72,27 @@ def check_dependencies(dependencies: list) -> None:
 
 def fetch_url_content(url: str, proxy: Optional[str] = None, check: bool = True) -> Optional[bytes]:
     if aniworld_globals.DEFAULT_USE_PLAYWRIGHT or os.getenv("USE_PLAYWRIGHT"):
+        method = PLAYWRIGHT
+    else:
+        method = get_fetch_strategies().choose(url)
+
+    if method == PLAYWRIGHT:
+        logging.debug("Now fetching using playwright: %s", url)
+        fetch = fetch_url_content_with_playwright
+    else:
         logging.debug("Now fetching without playwright: %s", url)
-        return fetch_url_content_with_playwright(url, proxy, check)
+        fetch = fetch_url_content_without_playwright
+
+    with metrics.timed("fetch", method=method):
+        content = fetch(url, proxy, check)
 
-    logging.debug("Now fetching using playwright: %s", url)
-    return fetch_url_content_without_playwright(url, proxy, check)
+    if metrics.is_enabled():
+        if content is None:
+            metrics.inc("fetch_failures", method=method)
+        else:
+            metrics.inc("fetch_bytes", len(content), method=method)
+
+    return content
 
 
 def fetch_url_content_without_playwright(
@@ -111,32 +129,43 @@ def fetch_url_content_without_playwright(
         }
 
     try:
-        response = requests.get(url, headers=headers, proxies=proxies, timeout=300)
+        response = retrying_get(url, headers=headers, proxies=proxies)
+
+        # only a challenge or JavaScript page goes to the browser; redirects never do,
+        # see fetch_url_content_with_playwright
+        if classify(response) == BROWSER and not url.startswith(f"{aniworld_globals.ANIWORLD_BASE_URL}/redirect/"):
+            logging.debug("%s needs a browser, fetching with playwright", url)
+            metrics.inc("fetch_escalations", pattern=url_pattern(url))
+            get_fetch_strategies().record(url, PLAYWRIGHT)
+            return fetch_url_content_with_playwright(url, proxy, check)
         response.raise_for_status()
 
-        if "Deine Anfrage wurde als Spam erkannt." in response.text:
-            logging.critical(
-                "Your IP address is blacklisted. Please use a VPN, complete the captcha "
-                "by opening the browser link, or try again later."
-            )
+        # still blocked after limited_get's retries: the block page is no content, and the
+        # next request for this pattern goes through the browser where the captcha can be solved
+        if is_throttled(response.status_code, response.text):
+            metrics.inc("fetch_escalations", pattern=url_pattern(url))
+            get_fetch_strategies().record(url, PLAYWRIGHT)
+            if check:
+                logging.critical(
+                    "Your IP address is blacklisted. Please use a VPN, complete the captcha "
+                    "by opening the browser link, or try again later."
+                )
+            return None
 
+        get_fetch_strategies().record(url, HTTP)
         return response.content
 
-    except requests.exceptions.Timeout as timeout_error:
-        logging.critical("Request to %s timed out: %s", url, timeout_error)
-        return fetch_url_content_with_playwright(url, proxy, check)
-
     except requests.exceptions.RequestException as request_error:
         if check:
             logging.critical("Request to %s failed: %s", url, request_error)
-        return fetch_url_content_with_playwright(url, proxy, check)
+        return None
 
 
 def fetch_url_content_with_playwright(
     url: str, proxy: Optional[str] = None, check: bool = True
 ) -> Optional[bytes]:
 
-    if "aniworld.to/redirect/" in url:
+    if url.startswith(f"{aniworld_globals.ANIWORLD_BASE_URL}/redirect/"):
         return fetch_url_content_without_playwright(url, proxy, check)
 
     headers = {'User-Agent': aniworld_globals.DEFAULT_USER_AGENT}
@@ -166,6 +195,7 @@ def fetch_url_content_with_playwright(
     
                 try:
                     logging.debug("Fetching URL with Playwright: %s", url)
+                    get_rate_limiter().acquire(url)
                     page.goto(url, timeout=60000)  # 60 Sekunden Timeout
     
                     # Bei Suchanfragen mehr Zeit für manuelle Captcha-Lösung
@@ -202,6 +232,7 @@ def fetch_url_content_with_playwright(
                     try:
                         page = browser.new_page(**options)
                         page.set_extra_http_headers(headers)
+                        get_rate_limiter().acquire(url)
                         page.goto(url, timeout=30000)
                         content = page.content()
                         return content.encode("utf-8")
@@ -395,10 +426,15 @@ def raise_runtime_error(message: str) -> None:
 
 
 def get_season_episode_count(slug: str, season: str) -> int:
-    series_url = f"https://aniworld.to/anime/stream/{slug}/staffel-{season}"
+    series_url = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}/staffel-{season}"
 
-    response = requests.get(series_url, timeout=15)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    response = retrying_get(series_url)
+    return parse_season_episode_count(response.content, slug, season)
+
+
+def parse_season_episode_count(season_html, slug: str, season: str) -> int:
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+    soup = BeautifulSoup(season_html, 'html.parser')
     episode_numbers = []
     counter = 1
     while True:
@@ -440,10 +476,11 @@ def get_season_episodes(season_url):
 
 
 def get_movies_episode_count(slug: str) -> int:
-    movie_url = f"https://aniworld.to/anime/stream/{slug}/filme"
+    movie_url = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}/filme"
     season_html = fetch_url_content(movie_url)
     if season_html is None:
         return 0
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
     soup = BeautifulSoup(season_html, 'html.parser')
 
     movie_numbers = []
@@ -465,7 +502,7 @@ def get_movies_episode_count(slug: str) -> int:
 
 
 def get_season_data(anime_slug: str):
-    base_url_template = "https://aniworld.to/anime/stream/{anime}/"
+    base_url_template = aniworld_globals.ANIWORLD_BASE_URL + "/anime/stream/{anime}/"
     base_url = base_url_template.format(anime=anime_slug)
 
     logging.debug("Fetching Base URL %s", base_url)
@@ -474,6 +511,7 @@ def get_season_data(anime_slug: str):
         logging.critical("Failed to retrieve main page.")
         sys.exit(1)
 
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
     soup = BeautifulSoup(main_html, 'html.parser')
     season_meta = soup.find('meta', itemprop='numberOfSeasons')
     number_of_seasons = int(season_meta['content']) if season_meta else 0
@@ -493,7 +531,7 @@ def get_season_data(anime_slug: str):
         movie_data = []
         number_of_movies = get_movies_episode_count(anime_slug)
         for i in range(1, number_of_movies + 1):
-            movie_data.append(f"https://aniworld.to/anime/stream/{anime_slug}/filme/film-{i}")
+            movie_data.append(f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{anime_slug}/filme/film-{i}")
 
         season_data.extend(movie_data)
 
@@ -570,6 +608,8 @@ def is_version_outdated():
         logging.error("Could not determine version information.")
         return False
 
+    from packaging.version import Version  # pylint: disable=import-outside-toplevel
+
     current_version = Version(current_version.strip().lstrip('v').lstrip('.'))
     latest_version = Version(latest_version.strip().lstrip('v').lstrip('.'))
 
@@ -579,12 +619,22 @@ def is_version_outdated():
 
 
 def get_language_code(language: str) -> str:
+    # "German Dub,German Sub" -> "1,3"; an unknown name makes the whole selection invalid
     logging.debug("Getting language code for: %s", language)
-    return {
-        "German Dub": "1",
-        "English Sub": "2",
-        "German Sub": "3"
-    }.get(language, "")
+    codes = [
+        {
+            "German Dub": "1",
+            "English Sub": "2",
+            "German Sub": "3"
+        }.get(name.strip(), "")
+        for name in language.split(",")
+    ]
+    return "" if "" in codes else ",".join(dict.fromkeys(codes))
+
+
+def get_language_keys(lang: str) -> List[int]:
+    # the "lang" parameter is a single key or a comma separated list of keys in order of preference
+    return list(dict.fromkeys(int(key) for key in str(lang).split(",") if key.strip()))
 
 
 def get_language_string(lang_key: int) -> str:
@@ -718,6 +768,7 @@ def download_mpv(dep_path: str, appdata_path: str):
         f.write(url_content)
 
     logging.debug("Unpacking %s to %s", zip_path, dep_path)
+    import py7zr  # pylint: disable=import-outside-toplevel
     with py7zr.SevenZipFile(zip_path, mode='r') as archive:
         archive.extractall(path=dep_path)
 
@@ -828,11 +879,15 @@ def get_mpv_directory():
     return os.path.join(os.getenv('HOME'), '.config', 'mpv')
 
 
-def get_aniworld_data_directory():
+def get_aniworld_home_directory():
     if platform.system() == "Windows":
-        return os.path.join(os.getenv('APPDATA'), 'aniworld', 'anime4k')
+        return os.path.join(os.getenv('APPDATA'), 'aniworld')
+
+    return os.path.join(os.path.expanduser('~'), '.aniworld')
 
-    return os.path.join(os.getenv('HOME'), '.aniworld', 'anime4k')
+
+def get_aniworld_data_directory():
+    return os.path.join(get_aniworld_home_directory(), 'anime4k')
 
 
 def get_anime4k_download_link(mode: str):
@@ -939,7 +994,7 @@ def setup_anime4k(mode: str):
 
 
 def process_episode_file_line(line: str) -> tuple:
-    if "https://aniworld.to/anime/stream/" in line:
+    if f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/" in line:
         if "/staffel-" in line and "/episode-" in line:
             slug = line.split('/')[5]
             return [line], slug
@@ -1096,12 +1151,13 @@ def get_anime_season_title(slug: str, season: int) -> str:
     # this will also be called for each season but for now once
     logging.debug("Fetching %s season %s name", slug, season)
 
-    season_html = fetch_url_content(f"https://aniworld.to/anime/stream/{slug}/staffel-{season}")
+    season_html = fetch_url_content(f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}/staffel-{season}")
 
     if not season_html:
         logging.error("Failed to fetch content for %s season %s", slug, season)
         return slug.replace("-", " ").title()
 
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
     soup = BeautifulSoup(season_html, 'html.parser')
 
     series_div = soup.find('div', class_='series-title')
@@ -1255,7 +1311,7 @@ def open_terminal_with_command(command):
 
 
 def get_random_anime(genre: str) -> str:
-    url = 'https://aniworld.to/ajax/randomGeneratorSeries'
+    url = f"{aniworld_globals.ANIWORLD_BASE_URL}/ajax/randomGeneratorSeries"
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
         'Accept': '*/*',
@@ -1263,9 +1319,9 @@ def get_random_anime(genre: str) -> str:
         'Accept-Language': 'en-GB,en;q=0.9',
         'Accept-Encoding': 'gzip, deflate, br',
         'Sec-Fetch-Mode': 'cors',
-        'Origin': 'https://aniworld.to',
+        'Origin': aniworld_globals.ANIWORLD_BASE_URL,
         'User-Agent': aniworld_globals.DEFAULT_USER_AGENT,
-        'Referer': 'https://aniworld.to/random',
+        'Referer': f"{aniworld_globals.ANIWORLD_BASE_URL}/random",
         'X-Requested-With': 'XMLHttpRequest',
     }
     data = {
@@ -1296,32 +1352,21 @@ def get_random_anime(genre: str) -> str:
     link = random_anime['link']
 
     logging.debug("Random Anime: %s", name)
-    logging.debug("Link: https://aniworld.to/%s", link)
+    logging.debug("Link: %s/%s", aniworld_globals.ANIWORLD_BASE_URL, link)
 
     return link
 
 
-def check_internet_connection():
+def check_internet_connection(timeout: float = 5):
     # return False  # debug
     # offline mini game coming soon!
 
-    try:
-        socket.create_connection(("github.com", 80), timeout=5)
-        return True
-    except OSError:
-        pass
-
-    try:
-        socket.create_connection(("1.1.1.1", 53), timeout=5)
-        return True
-    except OSError:
-        pass
-
-    try:
-        socket.create_connection(("8.8.8.8", 53), timeout=5)
-        return True
-    except OSError:
-        pass
+    for host, port in (("github.com", 80), ("1.1.1.1", 53), ("8.8.8.8", 53)):
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            logging.debug("Connectivity probe to %s:%s failed", host, port)
 
     return False
 
@@ -1594,7 +1639,7 @@ def fetch_anime_id(anime_title, season):
         return re.sub(r'\s+', '%20', name)
 
     def fetch_mal_data(keyword):
-        response = requests.get(
+        response = limited_get(
             f"https://myanimelist.net/search/prefix.json?type=anime&keyword={keyword}",
             headers={"User-Agent": aniworld_globals.DEFAULT_USER_AGENT},
             timeout=10
@@ -1611,6 +1656,7 @@ def fetch_anime_id(anime_title, season):
 
     def fetch_next_season_id(anime_id):
         url = f"https://myanimelist.net/anime/{anime_id}"
+        from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
         soup = BeautifulSoup(fetch_url_content(url), 'html.parser')
 
         sequel_div = soup.find(
@@ -1652,9 +1698,10 @@ def fetch_anime_id(anime_title, season):
 
 
 def get_description(anime_slug: str):
-    url = f"https://aniworld.to/anime/stream/{anime_slug}"
+    url = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{anime_slug}"
 
     page_content = fetch_url_content(url)
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
     soup = BeautifulSoup(page_content, 'html.parser')
 
     description = soup.find('p', class_='seri_des')['data-full-description']
@@ -1667,6 +1714,7 @@ def get_description_with_id(anime_title: str, season: int = 1):
     url = f"https://myanimelist.net/anime/{anime_id}"
 
     page_content = fetch_url_content(url)
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
     soup = BeautifulSoup(page_content, 'html.parser')
     description = soup.find('meta', property='og:description')['content']
     return description
@@ -0,0 +1,71 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ProgressHook = Callable[[Dict[str, Any]], None]
+
+# same behaviour as the yt-dlp command line built by execute.build_yt_dlp_command()
+YT_DLP_PARAMS = {
+    'fragment_retries': float('inf'),
+    'concurrent_fragment_downloads': 4,
+    'quiet': True,
+    'no_warnings': True,
+    'noprogress': False,
+}
+
+
+def parse_progress(status: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'status': status.get('status'),
+        'filename': status.get('filename'),
+        'downloaded_bytes': status.get('downloaded_bytes'),
+        'total_bytes': status.get('total_bytes') or status.get('total_bytes_estimate'),
+        'speed': status.get('speed'),
+        'eta': status.get('eta'),
+    }
+
+
+class YtDlpDownloader:
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self._params = {**YT_DLP_PARAMS, 'progress_hooks': [self._on_progress], **(params or {})}
+        # yt-dlp copies the HTTP headers into its connection handlers on first use, so each
+        # header set (in practice: one per provider) gets its own instance
+        self._instances: Dict[Tuple[Tuple[str, str], ...], Any] = {}
+        self._progress_hook: Optional[ProgressHook] = None
+
+    def _get_instance(self, headers: Dict[str, str]):
+        key = tuple(sorted(headers.items()))
+        if key not in self._instances:
+            # importing yt_dlp loads the whole extractor registry; only pay for it when downloading
+            import yt_dlp  # pylint: disable=import-outside-toplevel
+            self._instances[key] = yt_dlp.YoutubeDL({**self._params, 'http_headers': dict(headers)})
+        return self._instances[key]
+
+    def _on_progress(self, status: Dict[str, Any]) -> None:
+        if self._progress_hook is not None:
+            self._progress_hook(parse_progress(status))
+
+    def download(
+        self, link: str, output_file: str, headers: Optional[Dict[str, str]] = None,
+        progress_hook: Optional[ProgressHook] = None
+    ) -> None:
+        import yt_dlp  # pylint: disable=import-outside-toplevel
+
+        logging.debug("Downloading %s to %s (headers: %s)", link, output_file, headers)
+        ydl = self._get_instance(headers or {})
+
+        # the output path is a template for yt-dlp; a literal '%' in a title must not expand
+        ydl.params['outtmpl']['default'] = output_file.replace('%', '%%')
+        self._progress_hook = progress_hook
+
+        try:
+            return_code = ydl.download([link])
+        finally:
+            self._progress_hook = None
+
+        if return_code:
+            raise yt_dlp.utils.DownloadError(f"yt-dlp exited with {return_code} for {link}")
+
+    def close(self) -> None:
+        for ydl in self._instances.values():
+            ydl.close()
+        self._instances.clear()
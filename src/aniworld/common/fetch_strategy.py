@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from aniworld import globals as aniworld_globals
+
+HTTP = "http"
+PLAYWRIGHT = "playwright"
+STRATEGIES = (HTTP, PLAYWRIGHT)
+
+
+def url_pattern(url: str) -> str:
+    # host plus first path segment: aniworld.to/anime, aniworld.to/ajax, aniworld.to/redirect
+    parsed = urlparse(url)
+    segment = parsed.path.strip("/").split("/", 1)[0]
+    return f"{(parsed.hostname or '').lower()}/{segment}"
+
+
+def parse_strategies(spec: str) -> Dict[str, str]:
+    # "aniworld.to/ajax=playwright,voe.sx=http" -> {"aniworld.to/ajax": "playwright", "voe.sx": "http"}
+    strategies = {}
+    for item in (spec or "").split(","):
+        pattern, sep, strategy = item.partition("=")
+        pattern, strategy = pattern.strip().strip("/").lower(), strategy.strip().lower()
+        if not sep or not pattern:
+            continue
+        if strategy not in STRATEGIES:
+            logging.warning("Ignoring unknown fetch strategy %r for %s", strategy, pattern)
+            continue
+        strategies[pattern] = strategy
+    return strategies
+
+
+class FetchStrategies:
+    # plain HTTP unless configured otherwise or a page of the pattern needed the browser;
+    # a learned browser pattern gets one plain HTTP probe every `reprobe_after` seconds
+    def __init__(self, configured: Dict[str, str], reprobe_after: float):
+        self.configured = configured
+        self.reprobe_after = reprobe_after
+        self._learned: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _configured(self, pattern: str) -> Optional[str]:
+        host = pattern.split("/", 1)[0]
+        return self.configured.get(pattern) or self.configured.get(host)
+
+    def choose(self, url: str) -> str:
+        pattern = url_pattern(url)
+        configured = self._configured(pattern)
+        if configured is not None:
+            return configured
+
+        with self._lock:
+            strategy, since = self._learned.get(pattern, (HTTP, 0.0))
+            if strategy == PLAYWRIGHT and time.monotonic() - since >= self.reprobe_after:
+                self._learned[pattern] = (PLAYWRIGHT, time.monotonic())
+                logging.debug("Probing %s without playwright again", pattern)
+                return HTTP
+        return strategy
+
+    def record(self, url: str, strategy: str) -> None:
+        pattern = url_pattern(url)
+        with self._lock:
+            previous = self._learned.get(pattern, (HTTP, 0.0))[0]
+            if strategy == HTTP:
+                self._learned.pop(pattern, None)
+            elif previous != strategy:
+                self._learned[pattern] = (strategy, time.monotonic())
+        if previous != strategy:
+            logging.debug("Fetching %s %s from now on", pattern,
+                          "using playwright" if strategy == PLAYWRIGHT else "without playwright")
+
+
+_strategies: Optional[FetchStrategies] = None
+_strategies_lock = threading.Lock()
+
+
+def get_fetch_strategies() -> FetchStrategies:
+    global _strategies  # pylint: disable=global-statement
+    with _strategies_lock:
+        if _strategies is None:
+            _strategies = FetchStrategies(
+                parse_strategies(aniworld_globals.DEFAULT_FETCH_STRATEGIES),
+                aniworld_globals.DEFAULT_FETCH_REPROBE
+            )
+        return _strategies
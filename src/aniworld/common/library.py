@@ -0,0 +1,273 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+from aniworld.common import metrics
+from aniworld.common.common import get_aniworld_home_directory, sanitize_path
+
+LIBRARY_INDEX_FILE = "library.db"
+
+# the index is a cache: an older layout is dropped and rebuilt by the next scan
+SCHEMA_VERSION = 2
+
+# keys of the "lang" parameter -> names used in file names and in the languages table
+LANGUAGE_NAMES = {
+    1: "German Dub",
+    2: "English Sub",
+    3: "German Sub",
+}
+
+# "<Title> - S01E02 (German Dub).mp4" and "<Title> - Movie 01 (German Dub).mp4", see get_download_path()
+FILE_NAME_PATTERN = re.compile(
+    r"^(?P<title>.+) - (?:S(?P<season>\d+)E(?P<episode>\d+)|Movie (?P<movie>\d+)) "
+    r"\((?P<language>[^()]+)\)\.mp4$"
+)
+
+# output/<title>/<file>; without an output directory the files end up in <title>/<title>/<file>
+MAX_SCAN_DEPTH = 2
+
+# scanned files only know the title from their name; they are matched on its title_key
+# until a lookup by slug fills in the slug, add() and completed downloads from the
+# database know it right away
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        directory TEXT NOT NULL,
+        slug TEXT,
+        title TEXT NOT NULL,
+        title_key TEXT NOT NULL,
+        season INTEGER NOT NULL,
+        episode INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        size INTEGER,
+        source TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS files_slug ON files (slug)",
+    "CREATE INDEX IF NOT EXISTS files_title_key ON files (title_key)",
+    "CREATE INDEX IF NOT EXISTS files_directory ON files (directory)",
+    """
+    CREATE TABLE IF NOT EXISTS directories (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL
+    )
+    """,
+)
+
+EpisodeKey = Tuple[int, int, str]
+
+
+def get_library_index_path() -> str:
+    return os.path.join(get_aniworld_home_directory(), "cache", LIBRARY_INDEX_FILE)
+
+
+def get_download_path(output_directory: str, anime_title: str, season: int, episode: int, language: str) -> str:
+    title = sanitize_path(anime_title)
+    file_name = f"{title} - S{season:02d}E{episode:02d}" if season else f"{title} - Movie {episode:02d}"
+    return os.path.join(output_directory, title, f"{file_name} ({language}).mp4")
+
+
+def parse_file_name(name: str) -> Optional[Tuple[str, int, int, str]]:
+    match = FILE_NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    if match.group("movie") is not None:
+        return match.group("title"), 0, int(match.group("movie")), match.group("language")
+    return match.group("title"), int(match.group("season")), int(match.group("episode")), match.group("language")
+
+
+def get_title_key(title: str) -> str:
+    # files are named after the page title ("Demon Slayer: Kimetsu no Yaiba"), the CLI only
+    # knows the slug ("demon-slayer-kimetsu-no-yaiba"); both give "demonslayerkimetsunoyaiba"
+    ascii_title = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^0-9a-z]", "", ascii_title.lower())
+
+
+def get_slug_from_url(episode_url: str) -> Optional[str]:
+    match = re.search(r"/anime/stream/([^/]+)", episode_url or "")
+    return match.group(1) if match else None
+
+
+class LibraryIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._schema_ready = False
+        self._database_synced = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._schema_ready:
+            with self._lock:
+                if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                    connection.execute("DROP TABLE IF EXISTS files")
+                    connection.execute("DROP TABLE IF EXISTS directories")
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+                self._schema_ready = True
+        return connection
+
+    def refresh(self, root: str) -> int:
+        # only directories whose mtime changed since the last run are listed again
+        if not os.path.isdir(root):
+            return 0
+
+        rescanned = 0
+        with closing(self._connect()) as connection:
+            known = dict(connection.execute("SELECT path, mtime_ns FROM directories"))
+            pending = [(os.path.abspath(root), 0)]
+            while pending:
+                directory, depth = pending.pop()
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                    changed = known.get(directory) != mtime_ns
+                    if not changed and depth >= MAX_SCAN_DEPTH:
+                        continue
+                    with os.scandir(directory) as entries:
+                        subdirectories, files = [], []
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirectories.append(entry.path)
+                            elif changed and entry.name.endswith(".mp4"):
+                                files.append(entry)
+                except OSError as e:
+                    logging.debug("Could not scan %s: %s", directory, e)
+                    continue
+
+                if depth < MAX_SCAN_DEPTH:
+                    pending.extend((subdirectory, depth + 1) for subdirectory in subdirectories)
+                if not changed:
+                    continue
+
+                self._replace_directory(connection, directory, mtime_ns, files)
+                rescanned += 1
+            connection.commit()
+
+        metrics.inc("library_rescanned_dirs", rescanned)
+        return rescanned
+
+    @staticmethod
+    def _replace_directory(connection: sqlite3.Connection, directory: str, mtime_ns: int,
+                           files: List[os.DirEntry]) -> None:
+        slugs = dict(connection.execute("SELECT path, slug FROM files WHERE directory = ?", (directory,)))
+        connection.execute("DELETE FROM files WHERE directory = ?", (directory,))
+        for entry in files:
+            parsed = parse_file_name(entry.name)
+            if parsed is None:
+                continue
+            title, season, episode, language = parsed
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            connection.execute(
+                "INSERT OR REPLACE INTO files "
+                "(path, directory, slug, title, title_key, season, episode, language, size, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'scan')",
+                (entry.path, directory, slugs.get(entry.path), title, get_title_key(title),
+                 season, episode, language, size)
+            )
+        connection.execute(
+            "INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)", (directory, mtime_ns)
+        )
+
+    def sync_database(self) -> None:
+        # completed downloads recorded in the database, once per process
+        if self._database_synced:
+            return
+        self._database_synced = True
+
+        from aniworld.database import HAS_DATABASE  # pylint: disable=import-outside-toplevel
+        if not HAS_DATABASE:
+            return
+        try:
+            from aniworld.database.services import DownloadService  # pylint: disable=import-outside-toplevel
+            rows = DownloadService().get_completed_files()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.debug("Could not read completed downloads from the database: %s", e)
+            return
+
+        self.add_files([
+            (row['lokaler_pfad'], row['episode_url'], row['sprache'], row.get('dateigroesse'), "database")
+            for row in rows
+        ])
+
+    def add(self, path: str, episode_url: str, language: str, size: Optional[int] = None,
+            source: str = "download") -> None:
+        self.add_files([(path, episode_url, language, size, source)])
+
+    def add_files(self, files: List[Tuple[str, str, str, Optional[int], str]]) -> None:
+        rows = []
+        for path, episode_url, language, size, source in files:
+            parsed = parse_file_name(os.path.basename(path or ""))
+            slug = get_slug_from_url(episode_url)
+            if parsed is None or slug is None:
+                continue
+            path = os.path.abspath(path)
+            title, season, episode, _ = parsed
+            rows.append((path, os.path.dirname(path), slug, title, get_title_key(title),
+                         season, episode, language, size, source))
+        if not rows:
+            return
+
+        try:
+            with closing(self._connect()) as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO files "
+                    "(path, directory, slug, title, title_key, season, episode, language, size, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                connection.commit()
+        except (sqlite3.Error, OSError) as e:
+            logging.debug("Could not update library index %s: %s", self.path, e)
+
+    def episodes(self, slug: str, anime_title: str) -> Dict[EpisodeKey, str]:
+        # files without a slug match on the title key of the slug or of the given title
+        # and are assigned this slug from now on
+        keys = tuple({get_title_key(slug), get_title_key(anime_title)} - {""}) or ("",)
+        unassigned = f"slug IS NULL AND title_key IN ({', '.join('?' * len(keys))})"
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT season, episode, language, path FROM files WHERE slug = ? OR ({unassigned})",
+                (slug,) + keys
+            ).fetchall()
+            if slug:
+                connection.execute(f"UPDATE files SET slug = ? WHERE {unassigned}", (slug,) + keys)
+                connection.commit()
+        return {(season, episode, language): path for season, episode, language, path in rows}
+
+
+def get_downloaded_episodes(anime_slug: str, anime_title: str, output_directory: str) -> Dict[EpisodeKey, str]:
+    try:
+        index = get_library_index()
+        # without an output directory the files land in ./<page title>/<page title>/, and the
+        # page title is not known yet
+        index.refresh(output_directory or os.curdir)
+        index.sync_database()
+        return index.episodes(anime_slug, anime_title)
+    except (sqlite3.Error, OSError) as e:
+        # the index only saves requests, a broken file must not stop the download
+        logging.debug("Could not use library index: %s", e)
+        return {}
+
+
+_index: Optional[LibraryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_library_index() -> LibraryIndex:
+    global _index  # pylint: disable=global-statement
+    with _index_lock:
+        if _index is None or _index.path != get_library_index_path():
+            _index = LibraryIndex(get_library_index_path())
+        return _index
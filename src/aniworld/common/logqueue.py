@@ -0,0 +1,109 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class RateLimitFilter(logging.Filter):
+    # lets `burst` records per call site through every `interval` seconds; errors always pass
+    # because they end the process (see globals.ExitOnError)
+
+    def __init__(self, interval: float, burst: int):
+        super().__init__()
+        self.interval = interval
+        self.burst = max(1, burst)
+        # (pathname, lineno) -> [window start, records let through, records suppressed]
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [record.created, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    # "aniworld.search=DEBUG,aniworld.db=WARNING" -> {"aniworld.search": 10, "aniworld.db": 30}
+    levels = {}
+    for item in (spec or "").split(","):
+        name, sep, level = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        value = logging.getLevelName(level.strip().upper())
+        if isinstance(value, int):
+            levels[name.strip()] = value
+        else:
+            logging.warning("Ignoring unknown log level %r for %s", level, name.strip())
+    return levels
+
+
+def apply_levels(levels: Dict[str, int]) -> None:
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def start_logging(handlers: Iterable[logging.Handler], level: int,
+                  levels: Optional[Dict[str, int]] = None,
+                  rate_interval: float = 0.0, rate_burst: int = 0) -> QueueHandler:
+    # the root logger only enqueues records; formatting and I/O for the given handlers
+    # happen on the listener thread, which is drained at exit
+    global _listener, _queue_handler  # pylint: disable=global-statement
+
+    stop_logging()
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    if rate_interval > 0:
+        _queue_handler.addFilter(RateLimitFilter(rate_interval, rate_burst))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    apply_levels(levels or {})
+    return _queue_handler
+
+
+def flush_logging() -> None:
+    # blocks until every record enqueued so far has been handled
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener.start()
+
+
+def stop_logging() -> None:
+    global _listener, _queue_handler  # pylint: disable=global-statement
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
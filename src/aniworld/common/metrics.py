@@ -0,0 +1,276 @@
+import atexit
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Latency buckets in seconds; the last ones cover whole downloads
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, math.inf)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_enabled = False
+_lock = threading.Lock()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# (stage, labels) -> histogram state
+_histograms: Dict[Tuple[str, LabelKey], dict] = {}
+# (name, labels) -> value
+_counters: Dict[Tuple[str, LabelKey], float] = {}
+
+_server = None
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage: str, labels: dict):
+        self.stage = stage
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            inc("stage_errors", stage=self.stage, **self.labels)
+        return False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def timed(stage: str, **labels):
+    # the disabled path is a single global lookup and returns a shared no-op context manager
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage, labels)
+
+
+def observe(stage: str, seconds: float, **labels) -> None:
+    if not _enabled:
+        return
+
+    key = (stage, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {
+                "buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "max": 0.0
+            }
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+                break
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+        histogram["max"] = max(histogram["max"], seconds)
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    if not _enabled:
+        return
+
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def enable(port: Optional[int] = None, summary: Optional[str] = None) -> None:
+    # summary: "-" writes the JSON summary to stderr at exit, a path writes it to that file
+    global _enabled  # pylint: disable=global-statement
+    _enabled = True
+
+    if port is not None:
+        start_metrics_server(port)
+
+    if summary:
+        atexit.unregister(write_summary)
+        atexit.register(write_summary, summary)
+
+
+def disable() -> None:
+    global _enabled  # pylint: disable=global-statement
+    _enabled = False
+    stop_metrics_server()
+
+
+def _quantile(histogram: dict, q: float) -> float:
+    # upper bound of the bucket the quantile falls into, capped by the observed maximum
+    target = q * histogram["count"]
+    seen = 0
+    for bound, count in zip(BUCKETS, histogram["buckets"]):
+        seen += count
+        if seen >= target:
+            return min(bound, histogram["max"])
+    return histogram["max"]
+
+
+def summary() -> dict:
+    with _lock:
+        histograms = {key: dict(value, buckets=list(value["buckets"])) for key, value in _histograms.items()}
+        counters = dict(_counters)
+
+    stages = []
+    for (stage, labels), histogram in sorted(histograms.items()):
+        count = histogram["count"]
+        stages.append({
+            "stage": stage,
+            **dict(labels),
+            "count": count,
+            "total_s": round(histogram["sum"], 6),
+            "mean_ms": round(histogram["sum"] / count * 1000, 3) if count else 0.0,
+            "p95_ms": round(_quantile(histogram, 0.95) * 1000, 3),
+            "max_ms": round(histogram["max"] * 1000, 3),
+        })
+
+    totals = [
+        {"name": name, **dict(labels), "value": value}
+        for (name, labels), value in sorted(counters.items())
+    ]
+
+    throughput = {}
+    for (name, labels), value in counters.items():
+        if name != "download_bytes":
+            continue
+        provider = dict(labels).get("provider", "")
+        seconds = sum(
+            histogram["sum"] for (stage, stage_labels), histogram in histograms.items()
+            if stage == "download" and dict(stage_labels).get("provider", "") == provider
+        )
+        throughput[provider] = {
+            "bytes": int(value),
+            "seconds": round(seconds, 3),
+            "mb_per_sec": round(value / seconds / (1024 * 1024), 3) if seconds else None
+        }
+
+    return {"stages": stages, "counters": totals, "download_throughput": throughput}
+
+
+def write_summary(target: str = "-") -> None:
+    data = json.dumps(summary(), indent=2)
+    if target == "-":
+        print(data, file=sys.stderr)
+        return
+
+    try:
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+    except OSError as e:
+        logging.warning("Could not write metrics summary to %s: %s", target, e)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def render_openmetrics() -> str:
+    with _lock:
+        histograms = {key: dict(value, buckets=list(value["buckets"])) for key, value in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = [
+        "# TYPE aniworld_stage_seconds histogram",
+        "# UNIT aniworld_stage_seconds seconds",
+        "# HELP aniworld_stage_seconds Time spent per pipeline stage.",
+    ]
+    for (stage, labels), histogram in sorted(histograms.items()):
+        label_key = (("stage", stage),) + labels
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram["buckets"]):
+            cumulative += count
+            lines.append(
+                f"aniworld_stage_seconds_bucket{_format_labels(label_key, ('le', _format_bound(bound)))} {cumulative}"
+            )
+        lines.append(f"aniworld_stage_seconds_count{_format_labels(label_key)} {histogram['count']}")
+        lines.append(f"aniworld_stage_seconds_sum{_format_labels(label_key)} {histogram['sum']}")
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE aniworld_{name} counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"aniworld_{name}_total{_format_labels(labels)} {value}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> int:
+    # pylint: disable=import-outside-toplevel
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    global _server  # pylint: disable=global-statement
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render_openmetrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            logging.debug("Metrics endpoint: " + format, *args)
+
+    stop_metrics_server()
+    _server = ThreadingHTTPServer((host, port), MetricsHandler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+
+    bound_port = _server.server_address[1]
+    logging.debug("OpenMetrics endpoint listening on http://%s:%d/metrics", host, bound_port)
+    return bound_port
+
+
+def stop_metrics_server() -> None:
+    global _server  # pylint: disable=global-statement
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
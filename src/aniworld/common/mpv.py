@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aniworld.globals as aniworld_globals
+from aniworld.common.common import get_updated_command_for_mpv
+
+# options of build_command() that configure the player once per session; everything else
+# (title, referer, chapters, aniskip script-opts) is sent with each loadfile
+SESSION_OPTIONS = ("fs", "quiet", "really-quiet", "profile", "hwdec", "video-sync")
+
+
+def get_ipc_path() -> str:
+    if platform.system() == "Windows":
+        return rf"\\.\pipe\aniworld-mpv-{os.getpid()}"
+    return os.path.join(tempfile.gettempdir(), f"aniworld-mpv-{os.getpid()}.sock")
+
+
+def split_command(command: List[str]) -> Tuple[List[str], str, Dict[str, str]]:
+    session_command, per_file = command[:1], {}
+    for arg in command[2:]:
+        key, has_value, value = arg[2:].partition("=")
+        if not key:
+            continue
+        if key in SESSION_OPTIONS:
+            session_command.append(arg)
+        else:
+            per_file[key] = value if has_value else "yes"
+    return session_command, command[1], per_file
+
+
+def encode_file_options(options: Dict[str, str]) -> str:
+    # %n% quoting keeps commas and '=' inside values (script-opts, http headers) intact
+    return ",".join(
+        f"{key}=%{len(value.encode('utf-8'))}%{value}" for key, value in options.items()
+    )
+
+
+class MpvSession:
+    def __init__(self, ipc_path: Optional[str] = None):
+        self.ipc_path = ipc_path or get_ipc_path()
+        self._process: Optional[subprocess.Popen] = None
+        self._connection = None
+        self._session_command: Optional[List[str]] = None
+        self._request_id = 0
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None and self._connection is not None
+
+    def start(self, session_command: List[str]) -> None:
+        command = list(session_command) + [
+            "--idle=yes",
+            "--force-window=yes",
+            f"--input-ipc-server={self.ipc_path}",
+        ]
+        if platform.system() == "Windows" and os.getenv('APPDATA'):
+            command = get_updated_command_for_mpv(command, os.path.join(os.getenv('APPDATA'), 'aniworld'))
+
+        logging.debug("Starting mpv session: %s", command)
+        self._process = subprocess.Popen(command)  # pylint: disable=consider-using-with
+        self._session_command = list(session_command)
+
+        deadline = time.monotonic() + aniworld_globals.DEFAULT_MPV_IPC_TIMEOUT
+        while True:
+            try:
+                self._connection = self._connect()
+                return
+            except OSError as e:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.close()
+                    raise OSError(f"mpv IPC server {self.ipc_path} not reachable: {e}") from e
+                time.sleep(0.05)
+
+    def _connect(self):
+        if platform.system() == "Windows":
+            return open(self.ipc_path, "r+b", buffering=0)  # pylint: disable=consider-using-with
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(self.ipc_path)
+        except OSError:
+            client.close()
+            raise
+        return client.makefile("rwb", buffering=0)
+
+    def _read_message(self) -> Optional[dict]:
+        line = self._connection.readline()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            logging.debug("Ignoring malformed mpv IPC message: %r", line)
+            return {}
+
+    def command(self, name: str, **arguments) -> Optional[dict]:
+        self._request_id += 1
+        payload = {"command": {"name": name, **arguments}, "request_id": self._request_id}
+        self._connection.write(json.dumps(payload).encode("utf-8") + b"\n")
+
+        # events that arrive before the reply are not needed by the caller
+        while True:
+            message = self._read_message()
+            if message is None:
+                return None
+            if message.get("request_id") == self._request_id and "error" in message:
+                return message
+
+    def play(self, command: List[str]) -> str:
+        session_command, link, options = split_command(command)
+        if self.is_running() and session_command != self._session_command:
+            self.close()
+        if not self.is_running():
+            self.start(session_command)
+
+        try:
+            reply = self.command(
+                "loadfile", url=link, flags="replace", options=encode_file_options(options)
+            )
+            if reply is None or reply["error"] != "success":
+                logging.warning("mpv refused to load %s: %s", link, reply and reply["error"])
+                return "error"
+
+            entry_id = (reply.get("data") or {}).get("playlist_entry_id")
+            while True:
+                message = self._read_message()
+                if message is None:
+                    reason = "quit"
+                    break
+                if message.get("event") != "end-file":
+                    continue
+                if entry_id is not None and message.get("playlist_entry_id") != entry_id:
+                    continue
+                reason = message.get("reason", "unknown")
+                if reason == "error":
+                    logging.warning("mpv could not play %s: %s", link, message.get("file_error"))
+                break
+        except OSError as e:
+            logging.debug("mpv IPC connection lost: %s", e)
+            reason = "quit"
+
+        if reason == "quit":
+            # window closed: like before, the next episode starts in a new mpv
+            self.close()
+        logging.debug("mpv finished %s: %s", link, reason)
+        return reason
+
+    def close(self) -> None:
+        if self._connection is None and self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+
+        if self._connection is not None:
+            try:
+                if self._process is not None and self._process.poll() is None:
+                    self._connection.write(b'{"command": ["quit"]}\n')
+                self._connection.close()
+            except OSError:
+                pass
+            self._connection = None
+
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+        if platform.system() != "Windows" and os.path.exists(self.ipc_path):
+            try:
+                os.remove(self.ipc_path)
+            except OSError:
+                pass
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CorruptFileError(Exception):
+    pass
+
+
+def find_ffmpeg() -> Optional[str]:
+    return shutil.which("ffmpeg")
+
+
+def find_ffprobe() -> Optional[str]:
+    return shutil.which("ffprobe")
+
+
+def probe(path: str) -> Optional[Dict[str, Any]]:
+    # None without ffprobe: the file is taken as it is
+    ffprobe = find_ffprobe()
+    if ffprobe is None:
+        return None
+
+    command = [
+        ffprobe, "-v", "error",
+        "-show_entries", "format=format_name,duration:stream=codec_type",
+        "-of", "json", path
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise CorruptFileError(result.stderr.strip() or f"ffprobe exited with {result.returncode}")
+
+    try:
+        info = json.loads(result.stdout or "{}")
+        duration = float(info.get("format", {}).get("duration") or 0)
+    except ValueError as e:
+        raise CorruptFileError(f"unreadable ffprobe output: {e}") from e
+    codec_types = [stream.get("codec_type") for stream in info.get("streams", [])]
+    if duration <= 0 or "video" not in codec_types:
+        raise CorruptFileError(f"no playable video (duration {duration}, streams {codec_types})")
+
+    return {"format_name": info["format"].get("format_name", ""), "duration": duration}
+
+
+def needs_remux(info: Optional[Dict[str, Any]]) -> bool:
+    # e.g. an HLS download that was written as MPEG-TS into the .mp4 file
+    return info is not None and "mp4" not in info["format_name"].split(",")
+
+
+def rewrite(path: str, chapters: Optional[str] = None, remux: bool = False) -> bool:
+    # one stream copy into a sibling file that replaces the download; nothing is re-encoded
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        logging.warning("ffmpeg not found, %s is left as downloaded", path)
+        return False
+
+    root, extension = os.path.splitext(path)
+    output = f"{root}.postprocess{extension}"
+    command = [ffmpeg, "-y", "-loglevel", "error", "-i", path]
+    metadata_path = None
+    if chapters:
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", encoding="utf-8", delete=False
+        ) as metadata_file:
+            metadata_file.write(chapters)
+        metadata_path = metadata_file.name
+        command.extend(["-i", metadata_path])
+    command.extend(["-map", "0:v", "-map", "0:a?", "-map_metadata", "0"])
+    if chapters:
+        command.extend(["-map_chapters", "1"])
+    command.extend(["-c", "copy"])
+    if remux:
+        command.extend(["-movflags", "+faststart"])
+    command.append(output)
+
+    logging.debug("Rewriting download: %s", command)
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            logging.warning("Could not rewrite %s: %s", path, result.stderr.strip())
+            return False
+        os.replace(output, path)
+        return True
+    finally:
+        if metadata_path is not None:
+            os.remove(metadata_path)
+        if os.path.exists(output):
+            os.remove(output)
+
+
+class PostProcessor:
+    # finished downloads are processed here while the next one is already downloading;
+    # jobs hand corrupt files back through requeue() to be downloaded again
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="postprocess")
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._requeued: List[Any] = []
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._futures if not future.done())
+
+    def submit(self, job: Callable[..., Any], *args: Any) -> None:
+        def run():
+            try:
+                job(*args)
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                # includes SystemExit from ExitOnError; a worker must never take the run down
+                logging.warning("Post-processing failed: %s", e)
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+
+    def requeue(self, item: Any) -> None:
+        with self._lock:
+            self._requeued.append(item)
+
+    def take_requeued(self) -> List[Any]:
+        with self._lock:
+            items, self._requeued = self._requeued, []
+        return items
+
+    def wait(self) -> None:
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import aniworld.globals as aniworld_globals
+from aniworld.common.common import (
+    check_internet_connection,
+    get_aniworld_home_directory,
+    get_version,
+    is_version_outdated
+)
+
+PREFLIGHT_CACHE_FILE = "preflight.json"
+
+# name -> result of the checks that ran (or were served from cache) in this process
+_results: Dict[str, object] = {}
+_results_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+# checks nothing waits for at startup; their result shows up in get_preflight_result once done
+BACKGROUND_CHECKS = {"database"}
+
+
+def get_preflight_cache_path() -> str:
+    return os.path.join(get_aniworld_home_directory(), "cache", PREFLIGHT_CACHE_FILE)
+
+
+def load_preflight_cache() -> Dict[str, dict]:
+    try:
+        with open(get_preflight_cache_path(), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_preflight_cache(cache: Dict[str, dict]) -> None:
+    cache_path = get_preflight_cache_path()
+    tmp_path = f"{cache_path}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.debug("Could not write preflight cache %s: %s", cache_path, e)
+
+
+def resolve_dependency_name(dep: str) -> str:
+    if dep == "syncplay" and platform.system() == "Windows":
+        return "SyncplayConsole"
+    return dep
+
+
+def check_database_connection(timeout: float) -> bool:
+    # pylint: disable=import-outside-toplevel
+    from aniworld.database import HAS_DATABASE
+
+    if not HAS_DATABASE:
+        return False
+
+    from aniworld.database.config import get_config
+
+    config = get_config()
+    if config.get_backend() == "sqlite":
+        from aniworld.database.connection import DatabaseConnection
+        return DatabaseConnection().test_connection()
+
+    import mysql.connector
+
+    params = config.get_connection_params()
+    params["connection_timeout"] = max(1, int(timeout))
+
+    connection = mysql.connector.connect(**params)
+    try:
+        return connection.is_connected()
+    finally:
+        connection.close()
+
+
+def _check_internet(timeout: float):
+    return check_internet_connection(timeout=timeout) or None
+
+
+def _check_version(_timeout: float):
+    return is_version_outdated()
+
+
+def _check_database(timeout: float):
+    return check_database_connection(timeout) or None
+
+
+def _check_dependency(dep: str) -> Callable[[float], Optional[str]]:
+    def check(_timeout: float):
+        return shutil.which(dep)
+    return check
+
+
+def dependency_checks(dependencies: Iterable[str]) -> list:
+    return [f"dependency:{resolve_dependency_name(dep)}" for dep in dependencies]
+
+
+CHECKS = {
+    "internet": _check_internet,
+    "version": _check_version,
+    "database": _check_database,
+}
+
+
+def get_check(name: str) -> Callable[[float], object]:
+    if name.startswith("dependency:"):
+        return _check_dependency(name.split(":", 1)[1])
+    return CHECKS[name]
+
+
+def get_cache_context(name: str) -> str:
+    # a cached result is only valid for the environment it was produced in
+    if name == "version":
+        return get_version()
+    if name == "database":
+        from aniworld.database.config import get_config  # pylint: disable=import-outside-toplevel
+        return json.dumps(get_config().get_sanitized_config(), sort_keys=True, default=str)
+    if name.startswith("dependency:"):
+        return hashlib.sha1(os.getenv("PATH", "").encode()).hexdigest()
+    return ""
+
+
+def is_cache_entry_valid(name: str, entry: dict, ttl: int) -> bool:
+    try:
+        age = time.time() - float(entry["checked_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    if not 0 <= age < ttl or entry.get("context") != get_cache_context(name):
+        return False
+
+    if name.startswith("dependency:"):
+        return os.path.exists(str(entry.get("value")))
+
+    return True
+
+
+def store_in_cache(name: str, value: object) -> None:
+    with _cache_lock:
+        cache = load_preflight_cache()
+        cache[name] = {
+            "value": value,
+            "checked_at": time.time(),
+            "context": get_cache_context(name)
+        }
+        save_preflight_cache(cache)
+
+
+def _run_check(name: str, timeout: float, ttl: int) -> None:
+    try:
+        value = get_check(name)(timeout)
+    except (Exception, SystemExit) as e:  # pylint: disable=broad-exception-caught
+        # the ExitOnError log handler turns errors inside a check into SystemExit
+        logging.debug("Preflight check %s failed: %s", name, e)
+        return
+
+    if value is None:
+        return
+
+    with _results_lock:
+        _results[name] = value
+
+    if ttl > 0:
+        store_in_cache(name, value)
+
+
+def run_preflight(
+    checks: Iterable[str],
+    timeout: Optional[float] = None,
+    ttl: Optional[int] = None
+) -> Dict[str, object]:
+    checks = list(dict.fromkeys(checks))
+    timeout = aniworld_globals.DEFAULT_PREFLIGHT_TIMEOUT if timeout is None else timeout
+    ttl = aniworld_globals.DEFAULT_PREFLIGHT_CACHE_TTL if ttl is None else ttl
+
+    if not checks:
+        return {}
+
+    cache = load_preflight_cache() if ttl > 0 else {}
+    threads = []
+
+    for name in checks:
+        entry = cache.get(name)
+        if entry is not None and is_cache_entry_valid(name, entry, ttl):
+            logging.debug("Preflight check %s served from cache", name)
+            with _results_lock:
+                _results[name] = entry["value"]
+            continue
+
+        with _results_lock:
+            _results.pop(name, None)
+
+        # daemon threads: a probe that hangs past the deadline must not delay exit
+        thread = threading.Thread(
+            target=_run_check, args=(name, timeout, ttl),
+            name=f"preflight-{name}", daemon=True
+        )
+        thread.start()
+        if name not in BACKGROUND_CHECKS:
+            threads.append(thread)
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    with _results_lock:
+        results = {name: _results.get(name) for name in checks}
+
+    logging.debug("Preflight results: %s", results)
+    return results
+
+
+def get_preflight_result(name: str, default=None):
+    with _results_lock:
+        value = _results.get(name)
+    return default if value is None else value
+
+
+def get_dependency_path(dep: str) -> Optional[str]:
+    path = get_preflight_result(f"dependency:{dep}")
+    if path and os.path.exists(path):
+        return path
+    return shutil.which(dep)
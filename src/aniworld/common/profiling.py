@@ -0,0 +1,220 @@
+import atexit
+import collections
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+import aniworld.globals as aniworld_globals
+from aniworld.common.common import get_aniworld_home_directory
+
+# Pipeline stages the report attributes cumulative time to
+STAGE_FUNCTIONS = (
+    "search_anime",
+    "get_season_data",
+    "process_episode",
+    "process_provider",
+    "perform_action",
+)
+REPOSITORY_FUNCTIONS = ("_execute_query", "_execute_update")
+
+_active_profiler = None
+
+
+def get_profile_directory() -> str:
+    return os.path.join(get_aniworld_home_directory(), "profiles")
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    # samples the stacks of all other threads at a fixed interval and counts them in folded form
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self) -> None:
+        own_ident = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def stage_times(stats: pstats.Stats) -> Dict[str, dict]:
+    # cumulative seconds and call counts for the pipeline stages and repository calls
+    stages = {}
+    for (filename, _, function), (_, calls, _, cumulative, _) in stats.stats.items():  # pylint: disable=no-member
+        if function in STAGE_FUNCTIONS and "aniworld" in filename:
+            name = function
+        elif function in REPOSITORY_FUNCTIONS and filename.endswith("repositories.py"):
+            name = f"repository.{function}"
+        else:
+            continue
+        entry = stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+        entry["calls"] += calls
+        entry["seconds"] += cumulative
+    return stages
+
+
+def build_report(stats: pstats.Stats, wall_time: float, top: int) -> str:
+    lines = [f"Wall time: {wall_time:.3f} s", "", "Stages (cumulative):"]
+
+    stages = stage_times(stats)
+    for name in list(STAGE_FUNCTIONS) + [f"repository.{f}" for f in REPOSITORY_FUNCTIONS]:
+        if name in stages:
+            entry = stages[name]
+            share = entry["seconds"] / wall_time * 100 if wall_time else 0.0
+            lines.append(f"  {name:<32} {entry['seconds']:>10.3f} s  {share:>5.1f} %  {entry['calls']:>7} calls")
+    if not stages:
+        lines.append("  (no pipeline stage was reached)")
+
+    for sort_key, title in (("tottime", "self time"), ("cumulative", "cumulative time")):
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats(sort_key).print_stats(top)
+        lines.extend(["", f"Top {top} functions by {title}:", buffer.getvalue().strip()])
+
+    return "\n".join(lines) + "\n"
+
+
+def build_memory_report(start: tracemalloc.Snapshot, end: tracemalloc.Snapshot, top: int) -> str:
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ]
+    differences = end.filter_traces(filters).compare_to(start.filter_traces(filters), "lineno")
+    growth = sum(stat.size_diff for stat in differences)
+
+    lines = [f"Memory growth: {growth / 1024:.1f} KiB", "", f"Top {top} allocation sites by growth:"]
+    lines.extend(f"  {stat}" for stat in differences[:top])
+    return "\n".join(lines) + "\n"
+
+
+class RunProfiler:
+    def __init__(self, output_dir: Optional[str] = None, interval: Optional[float] = None,
+                 top: Optional[int] = None, memory: bool = False):
+        self.output_dir = output_dir or get_profile_directory()
+        self.interval = interval or aniworld_globals.DEFAULT_PROFILE_INTERVAL_MS / 1000
+        self.top = top or aniworld_globals.DEFAULT_PROFILE_TOP
+        self.memory = memory
+
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(self.interval)
+        self._memory_start = None
+        self._started_at = 0.0
+        self._running = False
+
+    def start(self) -> None:
+        if self.memory:
+            tracemalloc.start()
+            self._memory_start = tracemalloc.take_snapshot()
+
+        self._started_at = time.perf_counter()
+        self.sampler.start()
+        self.profile.enable()
+        self._running = True
+
+    def stop(self) -> Dict[str, str]:
+        if not self._running:
+            return {}
+        self._running = False
+
+        self.profile.disable()
+        self.sampler.stop()
+        wall_time = time.perf_counter() - self._started_at
+
+        memory_end = None
+        if self.memory:
+            memory_end = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+        paths = {
+            "folded": f"{prefix}.folded",
+            "report": f"{prefix}.txt",
+            "pstats": f"{prefix}.pstats",
+        }
+
+        with open(paths["folded"], "w", encoding="utf-8") as f:
+            f.write(self.sampler.folded())
+
+        stats = pstats.Stats(self.profile)
+        stats.dump_stats(paths["pstats"])
+        with open(paths["report"], "w", encoding="utf-8") as f:
+            f.write(build_report(stats, wall_time, self.top))
+
+        if memory_end is not None:
+            paths["memory"] = f"{prefix}.memory.txt"
+            with open(paths["memory"], "w", encoding="utf-8") as f:
+                f.write(build_memory_report(self._memory_start, memory_end, self.top))
+
+        return paths
+
+
+def start_run_profile(memory: bool = False, output_dir: Optional[str] = None) -> RunProfiler:
+    # profiles the rest of the process; the results are written when the interpreter exits
+    global _active_profiler  # pylint: disable=global-statement
+
+    _active_profiler = RunProfiler(output_dir=output_dir, memory=memory)
+    _active_profiler.start()
+    atexit.register(finish_run_profile)
+    return _active_profiler
+
+
+def finish_run_profile() -> Dict[str, str]:
+    global _active_profiler  # pylint: disable=global-statement
+
+    if _active_profiler is None:
+        return {}
+
+    try:
+        paths = _active_profiler.stop()
+    except OSError as e:
+        logging.warning("Could not write profile: %s", e)
+        paths = {}
+    finally:
+        _active_profiler = None
+
+    for kind, path in paths.items():
+        print(f"Profile ({kind}): {path}", file=sys.stderr)
+    return paths
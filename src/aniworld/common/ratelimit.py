@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import metrics
+
+# a blocked request halves the rate (down to MIN_RATE_FACTOR of the configured one); every
+# answered request gives back RECOVERY_STEP of the configured rate
+BACKOFF_FACTOR = 0.5
+MIN_RATE_FACTOR = 1 / 16
+RECOVERY_STEP = 0.02
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    # "aniworld.to=2:5,voe.sx=4" -> {"aniworld.to": (2.0, 5), "voe.sx": (4.0, 4)}
+    limits = {}
+    for item in (spec or "").split(","):
+        host, sep, value = item.partition("=")
+        if not sep or not host.strip():
+            continue
+        rate, _, burst = value.partition(":")
+        try:
+            rate = float(rate)
+            burst = int(burst) if burst.strip() else max(1, int(rate))
+        except ValueError:
+            logging.warning("Ignoring invalid rate limit %r for %s", value, host.strip())
+            continue
+        if rate > 0:
+            limits[host.strip().lower()] = (rate, max(1, burst))
+    return limits
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        # takes a token (the balance may go negative) and returns how long to wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate * BACKOFF_FACTOR)
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+            return self.rate
+
+    def reward(self) -> None:
+        with self._lock:
+            if self.rate < self.base_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Tuple[float, int]]):
+        self.limits = limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> Optional[TokenBucket]:
+        # the most specific configured domain of the host; other hosts are not limited
+        host = (urlparse(url).hostname or "").lower()
+        parts = host.split(".")
+        for i in range(len(parts)):
+            domain = ".".join(parts[i:])
+            if domain in self.limits:
+                with self._lock:
+                    if domain not in self._buckets:
+                        self._buckets[domain] = TokenBucket(*self.limits[domain])
+                    return self._buckets[domain]
+        return None
+
+    def acquire(self, url: str) -> float:
+        bucket = self.bucket(url)
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve()
+        if wait > 0:
+            metrics.inc("ratelimit_wait_seconds", wait, host=urlparse(url).hostname)
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, url: str, retry_after: Optional[float] = None) -> None:
+        bucket = self.bucket(url)
+        if bucket is None:
+            return
+        rate = bucket.penalize(retry_after)
+        metrics.inc("ratelimit_backoff", host=urlparse(url).hostname)
+        logging.warning("%s is throttling requests, slowing down to %.2f requests/s",
+                        urlparse(url).hostname, rate)
+
+    def reward(self, url: str) -> None:
+        bucket = self.bucket(url)
+        if bucket is not None:
+            bucket.reward()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # only the delay-seconds form; an HTTP date falls back to the bucket's own pause
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def is_throttled(status_code: int, text: str = "") -> bool:
+    return status_code == 429 or "Deine Anfrage wurde als Spam erkannt." in text
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter  # pylint: disable=global-statement
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(parse_limits(aniworld_globals.DEFAULT_RATE_LIMITS))
+        return _limiter
+
+
+def limited_get(url: str, **kwargs) -> requests.Response:
+    # requests.get behind the host's bucket; throttled answers slow the host down and are retried
+    limiter = get_rate_limiter()
+    response = None
+    for _ in range(max(0, aniworld_globals.DEFAULT_RATE_LIMIT_RETRIES) + 1):
+        limiter.acquire(url)
+        response = requests.get(url, **kwargs)
+        if not is_throttled(response.status_code, response.text):
+            limiter.reward(url)
+            return response
+        limiter.penalize(url, parse_retry_after(response.headers.get("Retry-After")))
+    return response
@@ -0,0 +1,180 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import metrics
+from aniworld.common.ratelimit import limited_get
+
+OK = "ok"
+RETRY = "retry"
+FAIL = "fail"
+BROWSER = "browser"
+
+RETRYABLE_STATUS_CODES = (408, 425, 500, 502, 503, 504)
+MAX_BACKOFF = 30.0
+
+# challenge pages of Cloudflare and DDoS-Guard; these only pass in a real browser
+CHALLENGE_STATUS_CODES = (403, 503)
+CHALLENGE_MARKERS = (
+    "cf-browser-verification",
+    "challenge-platform",
+    "cf_chl_opt",
+    "<title>Just a moment...</title>",
+    "DDoS-Guard",
+    "Enable JavaScript and cookies to continue",
+)
+
+# pages that only render their content with JavaScript, whatever the status code; a page with
+# real content is larger and merely carries a <noscript> notice
+JAVASCRIPT_PAGE_MAX_SIZE = 16 * 1024
+JAVASCRIPT_MARKERS = (
+    "Checking your browser before accessing",
+    "Please enable JavaScript",
+    "You need to enable JavaScript to run this app",
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+def needs_browser(status_code: int, text: str) -> bool:
+    if status_code in CHALLENGE_STATUS_CODES and any(marker in text for marker in CHALLENGE_MARKERS):
+        return True
+    return len(text) <= JAVASCRIPT_PAGE_MAX_SIZE and any(marker in text for marker in JAVASCRIPT_MARKERS)
+
+
+def classify(response: Optional[requests.Response] = None,
+             error: Optional[BaseException] = None) -> str:
+    # RETRY is the host's fault and counts for its breaker; a 404 or 403 is an answer like any other
+    if error is not None:
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return RETRY
+        return FAIL
+    if needs_browser(response.status_code, response.text):
+        return BROWSER
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        return RETRY
+    return OK
+
+
+def backoff_delay(attempt: int) -> float:
+    # full jitter: anywhere between 0 and the exponential delay
+    return random.uniform(0, min(MAX_BACKOFF, aniworld_globals.DEFAULT_HTTP_BACKOFF * 2 ** attempt))
+
+
+class CircuitBreaker:
+    # opens after `threshold` failures in a row; after `cooldown` seconds a single request
+    # probes the host and closes the breaker again on success
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def release(self) -> None:
+        # a probe that ended without a verdict about the host; the next request probes again
+        with self._lock:
+            self._probing = False
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self) -> bool:
+        # True when this failure opened the breaker
+        with self._lock:
+            self._failures += 1
+            if not self._probing and (self._opened_at is not None or self._failures < self.threshold):
+                return False
+            opened = self._opened_at is None
+            self._opened_at = time.monotonic()
+            self._probing = False
+            return opened
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    host = (urlparse(url).hostname or "").lower()
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                aniworld_globals.DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+                aniworld_globals.DEFAULT_CIRCUIT_BREAKER_COOLDOWN
+            )
+        return _breakers[host]
+
+
+def retrying_get(url: str, **kwargs) -> requests.Response:
+    # limited_get with separate connect/read timeouts, backoff on transient failures and a
+    # breaker per host; challenge pages are returned, the caller decides about a browser
+    kwargs.setdefault("timeout", (
+        aniworld_globals.DEFAULT_HTTP_CONNECT_TIMEOUT, aniworld_globals.DEFAULT_HTTP_READ_TIMEOUT
+    ))
+    host = urlparse(url).hostname
+    breaker = get_circuit_breaker(url)
+    retries = max(0, aniworld_globals.DEFAULT_HTTP_RETRIES)
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            metrics.inc("circuit_open", host=host)
+            raise CircuitOpenError(f"{host} keeps failing, skipping {url} for now")
+
+        response, error = None, None
+        try:
+            response = limited_get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            error = e
+        except BaseException:
+            breaker.release()
+            raise
+
+        verdict = classify(response, error)
+        if verdict == FAIL:
+            # e.g. an invalid URL or a redirect loop: says nothing about the host being down
+            breaker.release()
+            raise error
+        if verdict != RETRY:
+            breaker.success()
+            return response
+
+        if breaker.failure():
+            logging.warning("%s keeps failing, pausing requests for %ds",
+                            host, aniworld_globals.DEFAULT_CIRCUIT_BREAKER_COOLDOWN)
+        if attempt < retries:
+            delay = backoff_delay(attempt)
+            logging.debug("Request to %s failed (%s), retrying in %.1fs",
+                          url, error or response.status_code, delay)
+            metrics.inc("http_retries", host=host)
+            time.sleep(delay)
+
+    if error is not None:
+        raise error
+    return response
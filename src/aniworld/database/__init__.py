@@ -1,40 +1,118 @@
 """
 Datenbankmodul für AniWorld-Scrapy
 Enthält Klassen und Funktionen für den Zugriff auf die MySQL-Datenbank
+
+Die Untermodule werden erst beim ersten Zugriff importiert, damit
+"import aniworld.database" den Start der Anwendung nicht um den Import
+von mysql.connector verlängert. HAS_DATABASE prüft nur, ob der Treiber
+installiert ist, ohne ihn zu laden, oder ob das eingebettete SQLite-Backend
+konfiguriert ist (backend = sqlite bzw. DB_BACKEND=sqlite).
 """
 
-# Importiere Hauptklassen für einfache Verfügbarkeit
-from .connection import DatabaseConnection
-from .models import AnimeSeries, Season, Episode, Download
-from .repositories import AnimeRepository, SeasonRepository, EpisodeRepository, DownloadRepository
-from .services import AnimeService, DownloadService
-from .integration import DatabaseIntegration
-from .pipeline import DatabasePipeline, get_pipeline
-
-# Definiere SessionLocal für manuelle Session-Verwaltung
-from mysql.connector import connect
-from mysql.connector.connection import MySQLConnection
-from .config import get_config
+import importlib
+import importlib.util
 import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # nur für Linter und Typprüfung, damit die Namen in __all__ auflösbar sind
+    from .connection import DatabaseConnection
+    from .integration import DatabaseIntegration
+    from .models import AnimeSeries, Download, Episode, Season
+    from .pipeline import DatabasePipeline, get_pipeline
+    from .repositories import AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository
+    from .services import AnimeService, DownloadService
+
+
+def _has_mysql_driver() -> bool:
+    """
+    Prüft, ob mysql-connector-python installiert ist, ohne es zu importieren.
 
-def SessionLocal() -> MySQLConnection:
+    Returns:
+        True, wenn der Treiber gefunden wurde, sonst False
+    """
+    try:
+        return importlib.util.find_spec("mysql.connector") is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _has_database() -> bool:
+    """
+    Prüft, ob ein Datenbank-Backend nutzbar ist.
+
+    Returns:
+        True, wenn der MySQL-Treiber installiert oder SQLite konfiguriert ist
+    """
+    if _has_mysql_driver():
+        return True
+
+    from .config import get_config  # pylint: disable=import-outside-toplevel
+    return get_config().get_backend() == 'sqlite'
+
+
+HAS_DATABASE = _has_database()
+
+# Name -> (Untermodul, Attribut) für die verzögert geladenen Exporte
+_LAZY_ATTRIBUTES = {
+    'DatabaseConnection': ('.connection', 'DatabaseConnection'),
+    'AnimeSeries': ('.models', 'AnimeSeries'),
+    'Season': ('.models', 'Season'),
+    'Episode': ('.models', 'Episode'),
+    'Download': ('.models', 'Download'),
+    'AnimeRepository': ('.repositories', 'AnimeRepository'),
+    'SeasonRepository': ('.repositories', 'SeasonRepository'),
+    'EpisodeRepository': ('.repositories', 'EpisodeRepository'),
+    'DownloadRepository': ('.repositories', 'DownloadRepository'),
+    'AnimeService': ('.services', 'AnimeService'),
+    'DownloadService': ('.services', 'DownloadService'),
+    'DatabaseIntegration': ('.integration', 'DatabaseIntegration'),
+    'DatabasePipeline': ('.pipeline', 'DatabasePipeline'),
+    'get_pipeline': ('.pipeline', 'get_pipeline'),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+def SessionLocal():
     """
     Erzeugt eine neue Datenbankverbindung für manuelle Session-Verwaltung.
-    
+
     Returns:
-        MySQLConnection-Objekt für direkten Datenbankzugriff
+        MySQLConnection-Objekt (bzw. SQLiteConnection) für direkten Datenbankzugriff
     """
+    from .config import get_config  # pylint: disable=import-outside-toplevel
+
     config = get_config()
+    if config.get_backend() == 'sqlite':
+        from .connection import DatabaseConnection  # pylint: disable=import-outside-toplevel
+        logging.debug("Erstelle neue SQLite-Verbindung mit autocommit=True")
+        return DatabaseConnection().sqlite.connect(autocommit=True)
+
+    from mysql.connector import connect  # pylint: disable=import-outside-toplevel
     connection_params = config.get_connection_params()
-    
+
     # Setze autocommit auf True, damit Änderungen ohne explizites Commit gespeichert werden
     connection_params['autocommit'] = True
-    
-    logging.debug(f"Erstelle neue Datenbankverbindung mit autocommit=True")
+
+    logging.debug("Erstelle neue Datenbankverbindung mit autocommit=True")
     return connect(**connection_params)
 
 # Exportiere Funktionsnamen für "from aniworld.database import *"
 __all__ = [
+    'HAS_DATABASE',
     'DatabaseConnection',
     'AnimeSeries', 'Season', 'Episode', 'Download',
     'AnimeRepository', 'SeasonRepository', 'EpisodeRepository', 'DownloadRepository',
@@ -42,4 +120,4 @@ __all__ = [
     'DatabaseIntegration',
     'DatabasePipeline', 'get_pipeline',
     'SessionLocal'
-] 
\ No newline at end of file
+]
@@ -6,7 +6,11 @@ import os
 import configparser
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+# mysql.connector.constants.ClientFlag.FOUND_ROWS, ohne mysql.connector beim Laden zu importieren:
+# UPDATE meldet die gefundenen statt der geänderten Zeilen, wie SQLite
+CLIENT_FOUND_ROWS = 1 << 1
 
 
 class DatabaseConfig:
@@ -17,8 +21,26 @@ class DatabaseConfig:
     1. Umgebungsvariablen
     2. Konfigurationsdatei (config.ini)
     3. Standardwerte
+    
+    Mit backend = sqlite wird statt eines MySQL-Servers eine lokale SQLite-Datei
+    (sqlite_path, Standard: ~/.aniworld/aniworld.db) verwendet.
+    
+    cache_size und cache_ttl steuern die Identity-Map der Repositories
+    (Einträge pro Entitätstyp bzw. Sekunden; 0 schaltet den Cache ab).
+    
+    Cover-Bilder liegen inhaltsadressiert unter cover_dir (Standard: ~/.aniworld/covers)
+    und werden mit höchstens cover_workers parallelen Downloads geladen.
+    
+    Mit write_behind = true schreibt ein Hintergrund-Thread Anime-, Episoden- und
+    Download-Aktualisierungen gesammelt in Transaktionen (höchstens write_batch_size
+    Ereignisse, write_queue_size wartende Ereignisse). Ist die Datenbank nicht erreichbar,
+    landen die Ereignisse in write_spill_path (Standard: ~/.aniworld/write_behind.jsonl)
+    und werden beim nächsten Start nachgeholt.
     """
     
+    # Unterstützte Datenbank-Backends
+    BACKENDS = ('mysql', 'sqlite')
+    
     # Standardwerte für die Konfiguration
     DEFAULT_CONFIG = {
         'host': 'localhost',
@@ -30,6 +52,17 @@ class DatabaseConfig:
         'use_pure': True,
         'autocommit': False,
         'pool_size': 5,
+        'backend': 'mysql',
+        'sqlite_path': None,
+        'cache_size': 1024,
+        'cache_ttl': 300,
+        'cover_dir': None,
+        'cover_workers': 4,
+        'write_behind': False,
+        'write_queue_size': 1000,
+        'write_batch_size': 100,
+        'write_flush_interval': 0.5,
+        'write_spill_path': None,
     }
     
     # Umgebungsvariablen-Mapping
@@ -39,6 +72,17 @@ class DatabaseConfig:
         'user': 'DB_USER',
         'password': 'DB_PASSWORD',
         'database': 'DB_DATABASE',
+        'backend': 'DB_BACKEND',
+        'sqlite_path': 'DB_SQLITE_PATH',
+        'cache_size': 'DB_CACHE_SIZE',
+        'cache_ttl': 'DB_CACHE_TTL',
+        'cover_dir': 'DB_COVER_DIR',
+        'cover_workers': 'DB_COVER_WORKERS',
+        'write_behind': 'DB_WRITE_BEHIND',
+        'write_queue_size': 'DB_WRITE_QUEUE_SIZE',
+        'write_batch_size': 'DB_WRITE_BATCH_SIZE',
+        'write_flush_interval': 'DB_WRITE_FLUSH_INTERVAL',
+        'write_spill_path': 'DB_WRITE_SPILL_PATH',
     }
     
     # Konfigurationsdatei-Abschnitt
@@ -128,14 +172,101 @@ class DatabaseConfig:
                 self.logger.warning(f"Ungültige Pool-Größe: {self.config['pool_size']}, verwende Standard: {self.DEFAULT_CONFIG['pool_size']}")
                 self.config['pool_size'] = self.DEFAULT_CONFIG['pool_size']
         
-        # Autocommit und use_pure müssen Booleans sein
-        for key in ['autocommit', 'use_pure']:
+        # Cache-, Cover- und Write-Behind-Einstellungen müssen Zahlen sein
+        for key, cast in (('cache_size', int), ('cache_ttl', float), ('cover_workers', int),
+                          ('write_queue_size', int), ('write_batch_size', int),
+                          ('write_flush_interval', float)):
+            if isinstance(self.config[key], str):
+                try:
+                    self.config[key] = cast(self.config[key])
+                except ValueError:
+                    self.logger.warning(f"Ungültiger Wert für {key}: {self.config[key]}, verwende Standard: {self.DEFAULT_CONFIG[key]}")
+                    self.config[key] = self.DEFAULT_CONFIG[key]
+        
+        # Autocommit, use_pure und write_behind müssen Booleans sein
+        for key in ['autocommit', 'use_pure', 'write_behind']:
             if isinstance(self.config[key], str):
                 if self.config[key].lower() in ['true', '1', 'yes', 'y']:
                     self.config[key] = True
                 elif self.config[key].lower() in ['false', '0', 'no', 'n']:
                     self.config[key] = False
     
+    def get_backend(self) -> str:
+        """
+        Gibt das konfigurierte Datenbank-Backend zurück.
+        
+        Returns:
+            'mysql' oder 'sqlite'
+        """
+        backend = str(self.config['backend']).strip().lower()
+        if backend not in self.BACKENDS:
+            self.logger.warning("Unbekanntes Datenbank-Backend: %s, verwende Standard: %s", backend, self.DEFAULT_CONFIG['backend'])
+            return self.DEFAULT_CONFIG['backend']
+        return backend
+    
+    def get_sqlite_path(self) -> str:
+        """
+        Gibt den Pfad der SQLite-Datenbankdatei zurück.
+        
+        Returns:
+            Pfad aus sqlite_path oder aniworld.db im aniworld-Verzeichnis
+        """
+        if self.config['sqlite_path']:
+            return os.path.expanduser(self.config['sqlite_path'])
+        
+        from aniworld.common.common import get_aniworld_home_directory  # pylint: disable=import-outside-toplevel
+        return os.path.join(get_aniworld_home_directory(), 'aniworld.db')
+    
+    def get_cover_dir(self) -> str:
+        """
+        Gibt das Verzeichnis des Cover-Speichers zurück.
+        
+        Returns:
+            Pfad aus cover_dir oder covers im aniworld-Verzeichnis
+        """
+        if self.config['cover_dir']:
+            return os.path.expanduser(self.config['cover_dir'])
+        
+        from aniworld.common.common import get_aniworld_home_directory  # pylint: disable=import-outside-toplevel
+        return os.path.join(get_aniworld_home_directory(), 'covers')
+    
+    def get_write_behind_settings(self) -> Tuple[bool, int, int, float]:
+        """
+        Gibt die Einstellungen für das verzögerte Schreiben zurück.
+        
+        Returns:
+            Tuple (aktiviert, maximale Länge der Warteschlange, Ereignisse pro Transaktion,
+            Sammelzeit in Sekunden)
+        """
+        return (
+            bool(self.config['write_behind']),
+            max(1, self.config['write_queue_size']),
+            max(1, self.config['write_batch_size']),
+            max(0.0, float(self.config['write_flush_interval'])),
+        )
+    
+    def get_write_spill_path(self) -> str:
+        """
+        Gibt den Pfad der Ausweichdatei für nicht geschriebene Ereignisse zurück.
+        
+        Returns:
+            Pfad aus write_spill_path oder write_behind.jsonl im aniworld-Verzeichnis
+        """
+        if self.config['write_spill_path']:
+            return os.path.expanduser(self.config['write_spill_path'])
+        
+        from aniworld.common.common import get_aniworld_home_directory  # pylint: disable=import-outside-toplevel
+        return os.path.join(get_aniworld_home_directory(), 'write_behind.jsonl')
+    
+    def get_cache_settings(self) -> Tuple[int, float]:
+        """
+        Gibt die Einstellungen für die Identity-Map der Repositories zurück.
+        
+        Returns:
+            Tuple (Maximale Einträge pro Entitätstyp, Lebensdauer in Sekunden)
+        """
+        return max(0, self.config['cache_size']), max(0.0, float(self.config['cache_ttl']))
+    
     def get_config(self) -> Dict[str, Any]:
         """
         Gibt die aktuelle Konfiguration zurück.
@@ -173,6 +304,7 @@ class DatabaseConfig:
             'use_pure': self.config['use_pure'],
             'autocommit': self.config['autocommit'],
             'pool_size': self.config['pool_size'],
+            'client_flags': [CLIENT_FOUND_ROWS],
         }
 
 
@@ -208,4 +340,15 @@ charset = utf8mb4
 use_pure = true
 autocommit = false
 pool_size = 5
+; backend = sqlite
+; sqlite_path = ~/.aniworld/aniworld.db
+cache_size = 1024
+cache_ttl = 300
+; cover_dir = ~/.aniworld/covers
+cover_workers = 4
+; write_behind = true
+write_queue_size = 1000
+write_batch_size = 100
+write_flush_interval = 0.5
+; write_spill_path = ~/.aniworld/write_behind.jsonl
 """ 
\ No newline at end of file
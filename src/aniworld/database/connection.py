@@ -3,20 +3,49 @@ Datenbankverbindungsmodul für AniWorld-Scrapy
 """
 
 import logging
-import mysql.connector
+import threading
 from contextlib import contextmanager
-from typing import Optional, ContextManager
+from typing import Any, Optional, ContextManager
 
-from src.aniworld.database.config import get_config
+try:
+    import mysql.connector
+except ImportError:  # Das SQLite-Backend kommt ohne MySQL-Treiber aus
+    mysql = None
+
+from .config import get_config
+from .identity_map import deferred
+from .migrations import SCHEMA_VERSION, migrate
+
+
+class BatchConnection:
+    """
+    Verbindung innerhalb von DatabaseConnection.batch()
+    
+    commit() und close() der Repositories werden ignoriert; festgeschrieben wird
+    einmal am Ende des Batches.
+    """
+    
+    def __init__(self, connection: Any):
+        self._connection = connection
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+    
+    def commit(self) -> None:
+        """Wird am Ende des Batches ausgeführt"""
+    
+    def close(self) -> None:
+        """Die Verbindung gehört dem Batch"""
 
 
 class DatabaseConnection:
     """
-    Singleton-Klasse für die Verwaltung der MySQL-Datenbankverbindung.
+    Singleton-Klasse für die Verwaltung der Datenbankverbindung.
     
     Diese Klasse implementiert das Singleton-Pattern, um sicherzustellen,
     dass nur eine Datenbankverbindungsinstanz existiert. Sie bietet Methoden
-    zur Verwaltung und zum Testen der Verbindung zur MySQL-Datenbank.
+    zur Verwaltung und zum Testen der Verbindung zur MySQL-Datenbank oder,
+    mit backend = sqlite, zur eingebetteten SQLite-Datenbank.
     """
     
     _instance = None
@@ -46,9 +75,23 @@ class DatabaseConnection:
         # Datenbankkonfiguration aus Config-Klasse laden
         self.config = get_config()
         self.connection_params = self.config.get_connection_params()
+        self.backend = self.config.get_backend()
+        
+        self.sqlite = None
+        if self.backend == 'sqlite':
+            from .sqlite_backend import SQLiteDatabase  # pylint: disable=import-outside-toplevel
+            self.sqlite = SQLiteDatabase(self.config.get_sqlite_path())
         
         self.logger.debug(f"Datenbankparameter: {self.config.get_sanitized_config()}")
         
+        # laufender Batch des jeweiligen Threads (siehe batch())
+        self._local = threading.local()
+        
+        # Schema-Version der Datenbank; bei MySQL erst nach der Migration beim ersten Verbindungsaufbau bekannt
+        self.schema_version = SCHEMA_VERSION if self.sqlite is not None else None
+        self._schema_lock = threading.RLock()
+        self._migrating = False
+        
         self._initialized = True
     
     @classmethod
@@ -62,24 +105,36 @@ class DatabaseConnection:
         return cls()
     
     @contextmanager
-    def get_connection(self) -> ContextManager[mysql.connector.MySQLConnection]:
+    def get_connection(self) -> ContextManager[Any]:
         """
         Stellt eine Datenbankverbindung her und gibt sie als Context-Manager zurück.
         
         Diese Methode stellt sicher, dass die Verbindung nach der Verwendung
-        ordnungsgemäß geschlossen wird.
+        ordnungsgemäß geschlossen wird. Beim SQLite-Backend bleibt die Verbindung
+        des Threads offen und wird wiederverwendet.
         
         Yields:
-            Eine MySQL-Verbindung
+            Eine MySQL-Verbindung oder eine SQLiteConnection mit derselben Schnittstelle
             
         Raises:
             mysql.connector.Error: Bei Problemen mit der Datenbankverbindung
         """
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            yield batch
+            return
+        
+        if self.sqlite is not None:
+            with self.sqlite.connection() as connection:
+                yield connection
+            return
+        
         connection = None
         try:
             # Verbindung herstellen
             self.logger.debug("Stelle Datenbankverbindung her")
             connection = mysql.connector.connect(**self.connection_params)
+            self._ensure_schema(connection)
             
             # Verbindung zurückgeben
             yield connection
@@ -94,6 +149,77 @@ class DatabaseConnection:
                 self.logger.debug("Schließe Datenbankverbindung")
                 connection.close()
     
+    def _ensure_schema(self, connection: Any) -> None:
+        """
+        Bringt eine bestehende MySQL-Datenbank beim ersten Verbindungsaufbau auf den aktuellen
+        Stand (siehe migrations.py). Andere Threads warten so lange; Verbindungen, die die
+        Migration selbst öffnet, laufen durch.
+        
+        Args:
+            connection: Gerade geöffnete MySQL-Verbindung
+        """
+        if self.schema_version is not None:
+            return
+        
+        with self._schema_lock:
+            if self.schema_version is not None or self._migrating:
+                return
+            self._migrating = True
+            try:
+                self.schema_version = migrate(connection)
+            finally:
+                self._migrating = False
+    
+    def has_schema(self, version: int) -> bool:
+        """
+        Prüft, ob die Datenbank mindestens auf einer Schema-Version ist.
+        
+        Vor dem ersten Verbindungsaufbau, der die Migration ausführt, wird der aktuelle Stand
+        angenommen; während der Migration selbst gilt noch die alte Version.
+        
+        Args:
+            version: Schema-Version (siehe migrations.SCHEMA_VERSION)
+            
+        Returns:
+            True, wenn die Änderungen dieser Version vorhanden sind
+        """
+        if self.schema_version is None:
+            return not self._migrating
+        return self.schema_version >= version
+    
+    @contextmanager
+    def batch(self) -> ContextManager[BatchConnection]:
+        """
+        Fasst alle Datenbankzugriffe des aktuellen Threads in einer Transaktion zusammen.
+        
+        Innerhalb des Blocks liefert get_connection() dieselbe Verbindung; die commit()-Aufrufe
+        der Repositories werden ignoriert. Am Ende wird einmal festgeschrieben, bei einer
+        Ausnahme alles zurückgerollt. Verschachtelte Aufrufe gehören zum äußeren Batch.
+        Neue Einträge in den Identity-Maps werden erst nach dem Commit übernommen.
+        
+        Yields:
+            BatchConnection des Batches
+        """
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            yield batch
+            return
+        
+        with self.get_connection() as connection:
+            if self.sqlite is None:
+                # auch bei autocommit = true eine gemeinsame Transaktion
+                connection.start_transaction()
+            self._local.batch = BatchConnection(connection)
+            try:
+                with deferred():
+                    yield self._local.batch
+                    connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self._local.batch = None
+    
     def test_connection(self) -> bool:
         """
         Testet die Datenbankverbindung.
@@ -110,7 +236,7 @@ class DatabaseConnection:
                     cursor.execute("SELECT VERSION() AS version")
                     result = cursor.fetchone()
                     version = result.get('version', 'unbekannt')
-                    self.logger.info(f"Datenbankverbindung erfolgreich getestet. MySQL-Version: {version}")
+                    self.logger.info(f"Datenbankverbindung erfolgreich getestet. {self.backend}-Version: {version}")
                     return True
         
         except Exception as e:
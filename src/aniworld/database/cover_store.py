@@ -0,0 +1,347 @@
+"""
+Inhaltsadressierter Speicher für Cover-Bilder
+
+Cover werden nicht mehr als MEDIUMBLOB in anime_series abgelegt, sondern als Datei
+unter ihrem SHA-256-Hash; in der Tabelle steht nur noch der Hash (cover_hash).
+Gleiche Bilder liegen dadurch nur einmal auf der Platte. Das Herunterladen läuft im
+Hintergrund mit begrenzter Parallelität und fragt bereits bekannte Cover bedingt ab
+(If-None-Match / If-Modified-Since), sodass unveränderte Bilder nicht erneut übertragen
+werden. Für TUI und Exporte wird zusätzlich ein verkleinertes Vorschaubild erzeugt,
+sofern Pillow installiert ist.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import requests
+
+from aniworld.common.ratelimit import get_rate_limiter
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Maximale Größe des Vorschaubilds in Pixeln (Breite, Höhe)
+THUMBNAIL_SIZE = (160, 240)
+
+# Bekannte Cover werden frühestens nach dieser Zeit (Sekunden) erneut beim Server geprüft
+REVALIDATE_AFTER = 24 * 60 * 60
+
+
+class CoverStore:
+    """
+    Ablage der Cover-Dateien unter <root>/<hash[:2]>/<hash>.
+
+    Vorschaubilder liegen unter <root>/thumbs/, die Metadaten für die bedingte
+    Abfrage (ETag, Last-Modified) pro URL unter <root>/meta/.
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Basisverzeichnis des Speichers
+        """
+        self.logger = logging.getLogger('aniworld.db.covers')
+        self.root = root
+
+    @staticmethod
+    def hash_of(data: bytes) -> str:
+        """
+        Args:
+            data: Bilddaten
+
+        Returns:
+            SHA-256-Hash als Hex-String
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, cover_hash: str) -> str:
+        """
+        Args:
+            cover_hash: Hash des Covers
+
+        Returns:
+            Pfad der Originaldatei
+        """
+        return os.path.join(self.root, cover_hash[:2], cover_hash)
+
+    def thumbnail_path(self, cover_hash: str) -> Optional[str]:
+        """
+        Gibt den Pfad des Vorschaubilds zurück, ohne Pillow den des Originals.
+
+        Args:
+            cover_hash: Hash des Covers
+
+        Returns:
+            Pfad oder None, wenn das Cover nicht im Speicher liegt
+        """
+        thumbnail = os.path.join(self.root, 'thumbs', cover_hash[:2], f"{cover_hash}.jpg")
+        if os.path.exists(thumbnail):
+            return thumbnail
+        if self.exists(cover_hash):
+            return self._make_thumbnail(cover_hash) or self.path(cover_hash)
+        return None
+
+    def exists(self, cover_hash: str) -> bool:
+        """
+        Args:
+            cover_hash: Hash des Covers
+
+        Returns:
+            True, wenn die Originaldatei vorhanden ist
+        """
+        return os.path.exists(self.path(cover_hash))
+
+    def get(self, cover_hash: str) -> Optional[bytes]:
+        """
+        Args:
+            cover_hash: Hash des Covers
+
+        Returns:
+            Bilddaten oder None, wenn das Cover nicht im Speicher liegt
+        """
+        try:
+            with open(self.path(cover_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, data: bytes) -> str:
+        """
+        Legt ein Cover ab; ist der Inhalt schon vorhanden, wird nichts geschrieben.
+
+        Args:
+            data: Bilddaten
+
+        Returns:
+            Hash des Covers
+        """
+        cover_hash = self.hash_of(data)
+        if not self.exists(cover_hash):
+            self._write_atomic(self.path(cover_hash), data)
+            self._make_thumbnail(cover_hash, data)
+            self.logger.debug("Cover gespeichert: %s (%d Bytes)", cover_hash, len(data))
+        return cover_hash
+
+    def _make_thumbnail(self, cover_hash: str, data: Optional[bytes] = None) -> Optional[str]:
+        if Image is None:
+            return None
+
+        thumbnail = os.path.join(self.root, 'thumbs', cover_hash[:2], f"{cover_hash}.jpg")
+        try:
+            with Image.open(io.BytesIO(data) if data is not None else self.path(cover_hash)) as image:
+                image = image.convert('RGB')
+                image.thumbnail(THUMBNAIL_SIZE)
+                buffer = io.BytesIO()
+                image.save(buffer, 'JPEG', quality=80, optimize=True)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Vorschaubild für Cover %s konnte nicht erzeugt werden: %s", cover_hash, e)
+            return None
+
+        self._write_atomic(thumbnail, buffer.getvalue())
+        return thumbnail
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.root, 'meta', f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+
+    def load_meta(self, url: str) -> Dict[str, object]:
+        """
+        Args:
+            url: URL des Covers
+
+        Returns:
+            Gespeicherte Metadaten (hash, etag, last_modified, checked_at) oder leeres Dict
+        """
+        try:
+            with open(self._meta_path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_meta(self, url: str, meta: Dict[str, object]) -> None:
+        """
+        Args:
+            url: URL des Covers
+            meta: Metadaten für die nächste bedingte Abfrage
+        """
+        self._write_atomic(self._meta_path(url), json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        # erst in eine temporäre Datei schreiben, damit parallele Leser nie halbe Dateien sehen
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class CoverFetcher:
+    """
+    Lädt Cover im Hintergrund mit begrenzter Parallelität in einen CoverStore.
+    """
+
+    def __init__(self, store: CoverStore, max_workers: int = 4,
+                 session: Optional[requests.Session] = None, timeout: float = 10.0):
+        """
+        Args:
+            store: Ziel der heruntergeladenen Cover
+            max_workers: Maximale Anzahl gleichzeitiger Downloads
+            session: Optionale requests-Session (Standard: eigene Session mit Keep-Alive)
+            timeout: Timeout pro Anfrage in Sekunden
+        """
+        self.logger = logging.getLogger('aniworld.db.covers')
+        self.store = store
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='cover')
+        # URL -> laufender Download, damit dieselbe URL nicht doppelt geladen wird
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Lädt ein Cover synchron bzw. prüft ein bekanntes Cover bedingt beim Server.
+
+        Args:
+            url: URL des Covers
+
+        Returns:
+            Hash des Covers oder None bei Fehler
+        """
+        meta = self.store.load_meta(url)
+        known_hash = meta.get('hash')
+        if known_hash and not self.store.exists(known_hash):
+            known_hash = None
+
+        if known_hash and time.time() - meta.get('checked_at', 0) < REVALIDATE_AFTER:
+            return known_hash
+
+        headers = {}
+        if known_hash and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if known_hash and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            get_rate_limiter().acquire(url)
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.logger.warning("Cover konnte nicht geladen werden: %s (%s)", url, e)
+            return known_hash
+
+        if response.status_code == 304 and known_hash:
+            cover_hash = known_hash
+        elif response.status_code == 200 and response.content:
+            cover_hash = self.store.put(response.content)
+        else:
+            self.logger.warning("Cover konnte nicht geladen werden: %s (HTTP %s)", url, response.status_code)
+            return known_hash
+
+        self.store.save_meta(url, {
+            'hash': cover_hash,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time(),
+        })
+        return cover_hash
+
+    def submit(self, url: str, callback: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        Lädt ein Cover im Hintergrund.
+
+        Args:
+            url: URL des Covers
+            callback: Wird im Hintergrund-Thread mit dem Hash aufgerufen, wenn das Cover vorliegt
+
+        Returns:
+            Future mit dem Hash des Covers (oder None bei Fehler)
+        """
+        with self._lock:
+            future = self._pending.get(url)
+            if future is None:
+                future = self._executor.submit(self.fetch, url)
+                self._pending[url] = future
+                future.add_done_callback(lambda _f: self._forget(url))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: self._run_callback(callback, f))
+        return future
+
+    def _forget(self, url: str) -> None:
+        with self._lock:
+            self._pending.pop(url, None)
+
+    def _run_callback(self, callback: Callable[[str], None], future: Future) -> None:
+        # nur Warnungen: ein ERROR-Eintrag würde über ExitOnError den Prozess beenden
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.logger.warning("Fehler beim Laden des Covers: %s", future.exception())
+            return
+        if future.result() is None:
+            return
+        try:
+            callback(future.result())
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.logger.warning("Fehler beim Speichern des Cover-Hashes: %s", e)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Beendet die Hintergrund-Threads.
+
+        Args:
+            wait: Auf laufende Downloads warten
+        """
+        self._executor.shutdown(wait=wait)
+
+
+# Singleton-Instanzen
+_cover_store_instance = None
+_cover_fetcher_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_cover_store() -> CoverStore:
+    """
+    Gibt den Cover-Speicher aus der Datenbankkonfiguration (cover_dir) zurück.
+
+    Returns:
+        CoverStore-Instanz
+    """
+    global _cover_store_instance  # pylint: disable=global-statement
+    with _instance_lock:
+        if _cover_store_instance is None:
+            from .config import get_config  # pylint: disable=import-outside-toplevel
+            _cover_store_instance = CoverStore(get_config().get_cover_dir())
+        return _cover_store_instance
+
+
+def get_cover_fetcher() -> CoverFetcher:
+    """
+    Gibt den gemeinsamen CoverFetcher zurück (Parallelität aus cover_workers).
+
+    Returns:
+        CoverFetcher-Instanz
+    """
+    global _cover_fetcher_instance  # pylint: disable=global-statement
+    store = get_cover_store()
+    with _instance_lock:
+        if _cover_fetcher_instance is None:
+            from .config import get_config  # pylint: disable=import-outside-toplevel
+            _cover_fetcher_instance = CoverFetcher(store, max_workers=get_config().config['cover_workers'])
+        return _cover_fetcher_instance
@@ -0,0 +1,330 @@
+"""
+Identity-Map für die Repository-Schicht
+
+Hält bereits geladene Entitäten pro Entitätstyp im Speicher, damit wiederholte
+Abfragen innerhalb eines Laufs (z.B. find_by_url für jede Episode) nicht jedes Mal
+die Datenbank treffen. Die Einträge sind über den Primärschlüssel und optional
+über natürliche Schlüssel (URL) erreichbar, laufen nach einer TTL ab und werden
+bei Überschreiten der Maximalgröße nach LRU verdrängt.
+
+Innerhalb einer Transaktion (DatabaseConnection.batch()) werden neue Einträge erst
+nach dem Commit übernommen, damit andere Threads keine IDs aus einer noch offenen
+oder zurückgerollten Transaktion erhalten.
+"""
+
+import copy
+import functools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from aniworld.common import metrics
+
+# Rückgabewert von get()/get_by()/get_collection() bei einem Cache-Miss
+MISSING = object()
+
+# Zurückgestellte Änderungen der laufenden Transaktion des jeweiligen Threads (siehe deferred())
+_deferred = threading.local()
+
+
+def _copy(entity: Any) -> Any:
+    # flache Kopie der Modell-Dataclasses; deutlich schneller als copy.copy, das über
+    # __reduce_ex__ geht. Werte ohne __dict__ (IDs, Strings) sind unveränderlich.
+    state = getattr(entity, '__dict__', None)
+    if state is None:
+        return copy.copy(entity)
+    clone = object.__new__(type(entity))
+    clone.__dict__.update(state)
+    return clone
+
+
+def _defer(method: Callable[..., None], *args: Any, **kwargs: Any) -> bool:
+    # True, wenn der Aufruf bis zum Ende der Transaktion zurückgestellt wurde
+    log = getattr(_deferred, 'log', None)
+    if log is None:
+        return False
+    log.append(functools.partial(method, *args, **kwargs))
+    return True
+
+
+@contextmanager
+def deferred() -> Iterator[None]:
+    """
+    Stellt das Ablegen von Einträgen im aktuellen Thread bis zum Ende des Blocks zurück.
+
+    Endet der Block ohne Ausnahme, werden die Änderungen in ihrer Reihenfolge übernommen,
+    sonst verworfen. Entfernte Einträge (invalidate, clear) wirken sofort. Verschachtelte
+    Aufrufe gehören zum äußeren Block.
+
+    Yields:
+        None
+    """
+    if getattr(_deferred, 'log', None) is not None:
+        yield
+        return
+
+    log = _deferred.log = []
+    try:
+        yield
+    finally:
+        _deferred.log = None
+    for apply in log:
+        apply()
+
+
+class IdentityMap:
+    """
+    Begrenzter, TTL-gesteuerter Cache für die Entitäten eines Typs.
+
+    Gespeichert und zurückgegeben werden Kopien, damit Änderungen an einem
+    geladenen Objekt erst mit save() im Cache landen.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl: float = 300.0):
+        """
+        Args:
+            name: Name des Entitätstyps (für die Metriken)
+            max_size: Maximale Anzahl an Einträgen (0 schaltet den Cache ab)
+            ttl: Lebensdauer eines Eintrags in Sekunden (0 = unbegrenzt)
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Primärschlüssel -> natürliche Schlüssel, die auf ihn zeigen
+        self._natural_keys: Dict[Any, List[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires, value = entry
+        if expires and expires < time.monotonic():
+            del self._entries[key]
+            self._forget(key, value)
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            key, (_, value) = self._entries.popitem(last=False)
+            self._forget(key, value)
+
+    def _count(self, value: Any) -> Any:
+        metrics.inc("db_cache", entity=self.name, result="miss" if value is MISSING else "hit")
+        return value
+
+    def get(self, pk: Any) -> Any:
+        """
+        Args:
+            pk: Primärschlüssel
+
+        Returns:
+            Kopie der Entität oder MISSING
+        """
+        with self._lock:
+            value = self._lookup(('pk', pk))
+        return self._count(value if value is MISSING else _copy(value))
+
+    def get_by(self, key_name: str, key_value: Any) -> Any:
+        """
+        Args:
+            key_name: Name des natürlichen Schlüssels (z.B. 'url')
+            key_value: Wert des Schlüssels
+
+        Returns:
+            Kopie der Entität oder MISSING
+        """
+        with self._lock:
+            pk = self._lookup((key_name, key_value))
+            value = MISSING if pk is MISSING else self._lookup(('pk', pk))
+        return self._count(value if value is MISSING else _copy(value))
+
+    def put(self, pk: Any, entity: Any, **natural_keys: Any) -> None:
+        """
+        Legt eine Entität ab und ersetzt einen vorhandenen Eintrag mit demselben Primärschlüssel.
+
+        Args:
+            pk: Primärschlüssel
+            entity: Die Entität
+            natural_keys: Natürliche Schlüssel, z.B. url=...; leere Werte werden ignoriert
+        """
+        if not self.max_size or pk is None or _defer(self.put, pk, _copy(entity), **natural_keys):
+            return
+
+        with self._lock:
+            self._remove(pk)
+            self._store(('pk', pk), _copy(entity))
+            keys = self._natural_keys[pk] = []
+            for key_name, key_value in natural_keys.items():
+                if key_value:
+                    keys.append((key_name, key_value))
+                    self._store((key_name, key_value), pk)
+
+    def get_collection(self, name: str, owner_id: Any) -> Any:
+        """
+        Args:
+            name: Name der Sammlung (z.B. 'series' für die Staffeln einer Serie)
+            owner_id: ID des Besitzers
+
+        Returns:
+            Liste von Kopien oder MISSING
+        """
+        with self._lock:
+            value = self._lookup(('collection', name, owner_id))
+        return self._count(value if value is MISSING else [_copy(item) for item in value])
+
+    def put_collection(self, name: str, owner_id: Any, entities: List[Any]) -> None:
+        """
+        Legt das Ergebnis einer Listenabfrage ab.
+
+        Args:
+            name: Name der Sammlung
+            owner_id: ID des Besitzers
+            entities: Die geladenen Entitäten
+        """
+        if not self.max_size or _defer(self.put_collection, name, owner_id, [_copy(item) for item in entities]):
+            return
+
+        with self._lock:
+            self._store(('collection', name, owner_id), [_copy(item) for item in entities])
+
+    def merge_into_collection(self, name: str, owner_id: Any, entity: Any,
+                              key: Callable[[Any], Any], sort_key: Callable[[Any], Any]) -> None:
+        """
+        Ersetzt oder ergänzt eine gespeicherte Entität in einer gecachten Sammlung, statt die
+        Sammlung zu verwerfen. Ist die Sammlung nicht im Cache, passiert nichts.
+
+        Args:
+            name: Name der Sammlung
+            owner_id: ID des Besitzers
+            entity: Die gespeicherte Entität
+            key: Liefert den Primärschlüssel eines Elements
+            sort_key: Sortierung wie in der Abfrage der Sammlung (ORDER BY)
+        """
+        if _defer(self.merge_into_collection, name, owner_id, _copy(entity), key, sort_key):
+            return
+
+        collection_key = ('collection', name, owner_id)
+        with self._lock:
+            if self._lookup(collection_key) is MISSING:
+                return
+            expires, items = self._entries[collection_key]
+            pk = key(entity)
+            items = [item for item in items if key(item) != pk]
+            items.append(_copy(entity))
+            items.sort(key=sort_key)
+            # die Ablaufzeit bleibt die der geladenen Sammlung
+            self._entries[collection_key] = (expires, items)
+
+    def _forget(self, key: Hashable, value: Any) -> None:
+        # hält _natural_keys nach einer Verdrängung oder einem abgelaufenen Eintrag aktuell:
+        # ohne Entität verschwinden auch ihre natürlichen Schlüssel, ein verdrängter natürlicher
+        # Schlüssel wird aus der Liste seines Primärschlüssels gestrichen
+        if key[0] == 'pk':
+            self._remove(key[1])
+        elif key[0] != 'collection':
+            keys = self._natural_keys.get(value)
+            if keys is not None and key in keys:
+                keys.remove(key)
+
+    def _remove(self, pk: Any) -> None:
+        self._entries.pop(('pk', pk), None)
+        for key in self._natural_keys.pop(pk, ()):
+            # der Schlüssel kann inzwischen auf eine andere Entität zeigen
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == pk:
+                del self._entries[key]
+
+    def invalidate(self, pk: Any) -> None:
+        """
+        Entfernt eine Entität samt ihren natürlichen Schlüsseln.
+
+        Args:
+            pk: Primärschlüssel
+        """
+        with self._lock:
+            self._remove(pk)
+        _defer(self.invalidate, pk)
+
+    def invalidate_collection(self, name: str, owner_id: Any = MISSING) -> None:
+        """
+        Entfernt eine Sammlung oder, ohne owner_id, alle Sammlungen dieses Namens.
+
+        Args:
+            name: Name der Sammlung
+            owner_id: ID des Besitzers
+        """
+        with self._lock:
+            if owner_id is not MISSING:
+                self._entries.pop(('collection', name, owner_id), None)
+            else:
+                for key in [k for k in self._entries if k[0] == 'collection' and k[1] == name]:
+                    del self._entries[key]
+        _defer(self.invalidate_collection, name, owner_id)
+
+    def clear(self) -> None:
+        """
+        Leert den Cache vollständig.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._natural_keys.clear()
+        _defer(self.clear)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Datenbankverbindung -> {Entitätstyp: IdentityMap}; pro Verbindung getrennt, damit
+# mehrere Datenbanken (z.B. in Tests) keine Einträge teilen
+_maps: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_maps_lock = threading.Lock()
+
+
+def get_identity_map(db: Any, entity: str) -> IdentityMap:
+    """
+    Gibt die Identity-Map eines Entitätstyps für eine Datenbankverbindung zurück.
+
+    Args:
+        db: DatabaseConnection, über die das Repository zugreift
+        entity: Name des Entitätstyps ('anime', 'season', 'episode', 'download')
+
+    Returns:
+        IdentityMap-Instanz
+    """
+    with _maps_lock:
+        maps = _maps.get(db)
+        if maps is None:
+            maps = _maps[db] = {}
+
+        identity_map = maps.get(entity)
+        if identity_map is None:
+            from .config import get_config  # pylint: disable=import-outside-toplevel
+            max_size, ttl = get_config().get_cache_settings()
+            identity_map = maps[entity] = IdentityMap(entity, max_size=max_size, ttl=ttl)
+        return identity_map
+
+
+def clear_identity_maps(db: Optional[Any] = None) -> None:
+    """
+    Leert die Identity-Maps einer Verbindung oder, ohne Argument, aller Verbindungen.
+
+    Args:
+        db: DatabaseConnection oder None
+    """
+    with _maps_lock:
+        connections = [db] if db is not None else list(_maps.keys())
+        for connection in connections:
+            for identity_map in _maps.get(connection, {}).values():
+                identity_map.clear()
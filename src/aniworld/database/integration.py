@@ -3,11 +3,12 @@ Integrationsmodul für die Datenbankfunktionen
 """
 
 import logging
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Iterator, Optional, Tuple, List
 import traceback
 
-from aniworld.database.services import AnimeService, DownloadService
-from aniworld.database.models import AnimeSeries, Episode
+from aniworld import globals as aniworld_globals
+from aniworld.database.services import AnimeService, DownloadLifecycle, DownloadService
+from aniworld.database.models import AnimeSeries, Download, Episode
 from aniworld.database.repositories import AnimeRepository
 
 
@@ -40,23 +41,23 @@ class DatabaseIntegration:
         Returns:
             Die ID des gespeicherten Anime
         """
-        self.logger.info(f"Speichere Anime-Daten: {anime_data.get('title', 'Unbekannt')}")
+        self.logger.info("Speichere Anime-Daten: %s", anime_data.get('title', 'Unbekannt'))
         try:
             # Debug-Logging für Staffeln und Episoden
             if 'seasons' in anime_data:
-                self.logger.debug(f"Gefundene Staffeln: {len(anime_data['seasons'])}")
+                self.logger.debug("Gefundene Staffeln: %s", len(anime_data['seasons']))
                 for season in anime_data['seasons']:
-                    self.logger.debug(f"Staffel {season.get('number')}: {season.get('title')}")
+                    self.logger.debug("Staffel %s: %s", season.get('number'), season.get('title'))
                     if 'episodes' in season:
-                        self.logger.debug(f"  Gefundene Episoden: {len(season['episodes'])}")
+                        self.logger.debug("  Gefundene Episoden: %s", len(season['episodes']))
             else:
                 self.logger.warning("Keine Staffeldaten im anime_data Dictionary gefunden!")
                 
             anime_id = self.anime_service.save_from_scraper_data(anime_data)
-            self.logger.debug(f"Anime erfolgreich gespeichert mit ID: {anime_id}")
+            self.logger.debug("Anime erfolgreich gespeichert mit ID: %s", anime_id)
             return anime_id
         except Exception as e:
-            self.logger.error(f"Fehler beim Speichern der Anime-Daten: {e}")
+            self.logger.error("Fehler beim Speichern der Anime-Daten: %s", e)
             self.logger.error(traceback.format_exc())
             raise
             
@@ -70,16 +71,16 @@ class DatabaseIntegration:
         Returns:
             Das AnimeSeries-Objekt oder None, wenn kein Anime mit dieser URL gefunden wurde
         """
-        self.logger.debug(f"Suche Anime mit URL: {url}")
+        self.logger.debug("Suche Anime mit URL: %s", url)
         try:
             anime = self.anime_service.get_anime_by_url(url)
             if anime:
-                self.logger.debug(f"Anime gefunden: {anime.titel} (ID: {anime.series_id})")
+                self.logger.debug("Anime gefunden: %s (ID: %s)", anime.titel, anime.series_id)
             else:
-                self.logger.debug(f"Kein Anime mit URL {url} gefunden")
+                self.logger.debug("Kein Anime mit URL %s gefunden", url)
             return anime
         except Exception as e:
-            self.logger.error(f"Fehler beim Suchen des Anime mit URL {url}: {e}")
+            self.logger.error("Fehler beim Suchen des Anime mit URL %s: %s", url, e)
             return None
     
     def find_all_animes(self) -> List[AnimeSeries]:
@@ -92,12 +93,39 @@ class DatabaseIntegration:
         self.logger.debug("Rufe alle Anime-Serien ab")
         try:
             animes = self.anime_service.find_all_animes()
-            self.logger.debug(f"{len(animes)} Anime-Serien gefunden")
+            self.logger.debug("%s Anime-Serien gefunden", len(animes))
             return animes
         except Exception as e:
-            self.logger.error(f"Fehler beim Abrufen aller Anime-Serien: {e}")
+            self.logger.error("Fehler beim Abrufen aller Anime-Serien: %s", e)
             return []
     
+    def iter_animes(self, status: Optional[str] = None, search: Optional[str] = None) -> Iterator[AnimeSeries]:
+        """
+        Liefert die gespeicherten Anime nacheinander für große Listen.
+        Fehler werden an den Aufrufer weitergereicht, da bereits ausgegebene Zeilen nicht zurückgenommen werden können.
+        
+        Args:
+            status: Nur Serien mit diesem Status
+            search: Nur Serien, deren Titel diesen Text enthält
+            
+        Returns:
+            Iterator über AnimeSeries-Objekte, sortiert nach ID
+        """
+        return self.anime_service.iter_animes(status=status, search=search)
+    
+    def iter_downloads(self, status: Optional[str] = None) -> Iterator[Download]:
+        """
+        Liefert die aufgezeichneten Downloads nacheinander für große Listen.
+        Fehler werden an den Aufrufer weitergereicht.
+        
+        Args:
+            status: Nur Downloads mit diesem Status
+            
+        Returns:
+            Iterator über Download-Objekte, sortiert nach ID
+        """
+        return self.download_service.iter_downloads(status=status)
+    
     def get_episode_data(self, episode_url: str) -> Optional[Episode]:
         """
         Ruft die Daten einer Episode anhand ihrer URL ab.
@@ -108,16 +136,16 @@ class DatabaseIntegration:
         Returns:
             Das Episode-Objekt oder None, wenn keine Episode mit dieser URL gefunden wurde
         """
-        self.logger.debug(f"Suche Episode mit URL: {episode_url}")
+        self.logger.debug("Suche Episode mit URL: %s", episode_url)
         try:
             episode = self.anime_service.get_episode_by_url(episode_url)
             if episode:
-                self.logger.debug(f"Episode gefunden: {episode.titel} (ID: {episode.episode_id})")
+                self.logger.debug("Episode gefunden: %s (ID: %s)", episode.titel, episode.episode_id)
             else:
-                self.logger.debug(f"Keine Episode mit URL {episode_url} gefunden")
+                self.logger.debug("Keine Episode mit URL %s gefunden", episode_url)
             return episode
         except Exception as e:
-            self.logger.error(f"Fehler beim Suchen der Episode mit URL {episode_url}: {e}")
+            self.logger.error("Fehler beim Suchen der Episode mit URL %s: %s", episode_url, e)
             return None
     
     def record_download(self, 
@@ -137,25 +165,44 @@ class DatabaseIntegration:
         Returns:
             Die ID des aufgezeichneten Downloads oder -1 bei einem Fehler
         """
-        self.logger.info(f"Zeichne Download auf: {episode_url} ({provider}, {sprache})")
+        lifecycle = self.start_download(episode_url, provider, sprache, zieldatei)
+        return lifecycle.download_id if lifecycle else -1
+    
+    def start_download(self,
+                       episode_url: str,
+                       provider: str,
+                       sprache: str,
+                       zieldatei: str,
+                       speicherlink: str = "") -> Optional[DownloadLifecycle]:
+        """
+        Legt einen laufenden Download an, dessen Fortschritt und Abschluss über das
+        zurückgegebene Objekt geschrieben werden.
+        
+        Args:
+            episode_url: Die URL der heruntergeladenen Episode
+            provider: Der Provider, von dem heruntergeladen wird (z.B. "Vidoza")
+            sprache: Die Sprache des Downloads (z.B. "German Dub")
+            zieldatei: Der vollständige Pfad der Zieldatei
+            speicherlink: Der direkte Link zum Herunterladen (optional)
+            
+        Returns:
+            DownloadLifecycle oder None, wenn der Download nicht aufgezeichnet werden konnte
+        """
+        self.logger.info("Zeichne Download auf: %s (%s, %s)", episode_url, provider, sprache)
         try:
-            episode = self.get_episode_data(episode_url)
-            if not episode:
-                self.logger.warning(f"Episode mit URL {episode_url} nicht gefunden")
-                return -1
-                
-            download_id = self.download_service.record_download(
-                episode_id=episode.episode_id,
-                provider=provider,
-                sprache=sprache,
-                zieldatei=zieldatei,
-                status="gestartet"
+            lifecycle = self.download_service.start_download(
+                episode_url=episode_url,
+                provider_name=provider,
+                language_name=sprache,
+                speicherlink=speicherlink,
+                lokaler_pfad=zieldatei
             )
-            self.logger.debug(f"Download aufgezeichnet mit ID: {download_id}")
-            return download_id
+            if lifecycle:
+                self.logger.debug("Download aufgezeichnet mit ID: %s", lifecycle.download_id)
+            return lifecycle
         except Exception as e:
-            self.logger.error(f"Fehler beim Aufzeichnen des Downloads: {e}")
-            return -1
+            self.logger.warning("Fehler beim Aufzeichnen des Downloads: %s", e)
+            return None
     
     def update_download_status(self, download_id: int, status: str) -> bool:
         """
@@ -168,16 +215,16 @@ class DatabaseIntegration:
         Returns:
             True bei Erfolg, False bei einem Fehler
         """
-        self.logger.debug(f"Aktualisiere Download-Status für ID {download_id} auf '{status}'")
+        self.logger.debug("Aktualisiere Download-Status für ID %s auf '%s'", download_id, status)
         try:
             result = self.download_service.update_download_status(download_id, status)
             if result:
-                self.logger.debug(f"Download-Status erfolgreich aktualisiert")
+                self.logger.debug("Download-Status erfolgreich aktualisiert")
             else:
-                self.logger.warning(f"Download mit ID {download_id} nicht gefunden")
+                self.logger.warning("Download mit ID %s nicht gefunden", download_id)
             return result
         except Exception as e:
-            self.logger.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
+            self.logger.error("Fehler beim Aktualisieren des Download-Status: %s", e)
             return False
     
     def get_active_downloads(self) -> List[Dict[str, Any]]:
@@ -205,10 +252,10 @@ class DatabaseIntegration:
                     'qualitaet': download.qualitaet
                 })
             
-            self.logger.debug(f"{len(result)} aktive Downloads gefunden")
+            self.logger.debug("%s aktive Downloads gefunden", len(result))
             return result
         except Exception as e:
-            self.logger.error(f"Fehler beim Abrufen aktiver Downloads: {e}")
+            self.logger.error("Fehler beim Abrufen aktiver Downloads: %s", e)
             return []
 
     def get_anime_by_slug(self, slug: str) -> Optional[AnimeSeries]:
@@ -228,7 +275,7 @@ class DatabaseIntegration:
             session.close()
             return anime
         except Exception as e:
-            self.logger.error(f"Fehler beim Abrufen des Animes mit Slug '{slug}': {e}")
+            self.logger.error("Fehler beim Abrufen des Animes mit Slug '%s': %s", slug, e)
             return None
             
     def save_minimal_anime(self, slug: str, title: str) -> Optional[int]:
@@ -244,7 +291,7 @@ class DatabaseIntegration:
             ID des gespeicherten Animes oder None bei Fehler
         """
         try:
-            self.logger.debug(f"Versuche minimalen Anime zu speichern: {title} (Slug: {slug})")
+            self.logger.debug("Versuche minimalen Anime zu speichern: %s (Slug: %s)", title, slug)
             session = self.get_session()
             if not session:
                 self.logger.error("Konnte keine Datenbankverbindung herstellen")
@@ -255,13 +302,13 @@ class DatabaseIntegration:
             # Prüfe, ob der Anime bereits existiert
             anime = repo.find_by_slug(slug)
             if anime:
-                self.logger.debug(f"Anime mit Slug '{slug}' existiert bereits mit ID: {anime.series_id}")
+                self.logger.debug("Anime mit Slug '%s' existiert bereits mit ID: %s", slug, anime.series_id)
                 anime_id = anime.series_id
             else:
                 # Erstelle ein minimales AnimeSeries-Objekt
                 anime = AnimeSeries(
                     titel=title,
-                    aniworld_url=f"https://aniworld.to/anime/stream/{slug}",
+                    aniworld_url=f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}",
                     beschreibung="",  # Leerer String statt None
                     cover_url="",     # Leerer String statt None
                     status="laufend"
@@ -273,16 +320,16 @@ class DatabaseIntegration:
                 session.add(anime)
                 session.flush()  # Flush vor dem Commit
                 
-                self.logger.debug(f"Generierte ID vor Commit: {anime.series_id}")
+                self.logger.debug("Generierte ID vor Commit: %s", anime.series_id)
                 session.commit()
                 
                 anime_id = anime.series_id
-                self.logger.info(f"Minimaler Anime '{title}' mit ID {anime_id} gespeichert")
+                self.logger.info("Minimaler Anime '%s' mit ID %s gespeichert", title, anime_id)
                 
             session.close()
             return anime_id
         except Exception as e:
-            self.logger.error(f"Fehler beim Speichern des minimalen Animes '{title}': {e}")
+            self.logger.error("Fehler beim Speichern des minimalen Animes '%s': %s", title, e)
             self.logger.error(traceback.format_exc())
             # Rollback bei Fehler
             try:
@@ -0,0 +1,155 @@
+"""
+Schema-Migrationen für bestehende MySQL-Datenbanken
+
+create_database.sql legt neue Datenbanken direkt mit dem aktuellen Schema an und trägt
+SCHEMA_VERSION in konfiguration ('schema_version') ein. Ältere Installationen haben diesen
+Eintrag nicht (Version 1) und werden beim ersten Verbindungsaufbau (DatabaseConnection.get_connection)
+Schritt für Schritt angehoben. Die Versionen entsprechen denen von sqlite_backend.MIGRATIONS.
+
+Jeder Schritt prüft vorher, ob seine Änderungen schon vorhanden sind, und kann daher
+gefahrlos wiederholt werden. Schlägt ein Schritt fehl (z.B. fehlende ALTER-Rechte), bleibt
+die Datenbank auf der erreichten Version; die Repositories richten sich nach
+DatabaseConnection.has_schema() und arbeiten dann ohne die neuen Spalten und Tabellen.
+"""
+
+import logging
+from typing import Any, Callable, Dict
+
+SCHEMA_VERSION = 3
+
+# Zeilen pro Seite beim Übertragen der Cover-BLOBs in den Cover-Speicher
+COVER_BATCH_SIZE = 50
+
+logger = logging.getLogger('aniworld.db.migrations')
+
+
+def _has_column(cursor: Any, table: str, column: str) -> bool:
+    try:
+        cursor.execute(f"SELECT {column} FROM {table} LIMIT 1")
+        cursor.fetchall()
+        return True
+    except Exception:  # pylint: disable=broad-exception-caught
+        return False
+
+
+def move_covers_to_store(cursor: Any) -> int:
+    """
+    Legt die Cover aus anime_series.cover_data im Cover-Speicher ab und trägt ihren Hash
+    in cover_hash ein. Die BLOBs werden seitenweise gelesen, damit nie alle im Speicher liegen.
+
+    Args:
+        cursor: Cursor mit der Schnittstelle von mysql.connector (%s-Platzhalter)
+
+    Returns:
+        Anzahl der übertragenen Cover
+    """
+    from .cover_store import get_cover_store  # pylint: disable=import-outside-toplevel
+    store = get_cover_store()
+
+    moved, last_id = 0, 0
+    while True:
+        cursor.execute(
+            "SELECT series_id, cover_data FROM anime_series "
+            "WHERE cover_data IS NOT NULL AND cover_hash IS NULL AND series_id > %s "
+            "ORDER BY series_id LIMIT %s",
+            (last_id, COVER_BATCH_SIZE)
+        )
+        rows = cursor.fetchall()
+        for series_id, cover_data in rows:
+            cursor.execute("UPDATE anime_series SET cover_hash = %s WHERE series_id = %s",
+                           (store.put(bytes(cover_data)), series_id))
+            moved += 1
+
+        if len(rows) < COVER_BATCH_SIZE:
+            return moved
+        last_id = rows[-1][0]
+
+
+def _migrate_covers(connection: Any) -> None:
+    # Version 2: Cover liegen im Cover-Speicher, die Tabelle hält nur noch den Hash
+    cursor = connection.cursor()
+    if not _has_column(cursor, 'anime_series', 'cover_hash'):
+        cursor.execute("ALTER TABLE anime_series ADD COLUMN cover_hash CHAR(64)")
+    if _has_column(cursor, 'anime_series', 'cover_data'):
+        moved = move_covers_to_store(cursor)
+        connection.commit()
+        logger.info("%d Cover aus anime_series.cover_data in den Cover-Speicher übertragen", moved)
+        cursor.execute("ALTER TABLE anime_series DROP COLUMN cover_data")
+
+
+def _migrate_statistics(connection: Any) -> None:
+    # Version 3: materialisierte Statistiken, einmal aus den vorhandenen Daten aufgebaut
+    cursor = connection.cursor()
+    cursor.execute("CREATE TABLE IF NOT EXISTS statistik_zaehler ("
+                   "schluessel VARCHAR(100) PRIMARY KEY, wert BIGINT NOT NULL DEFAULT 0)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS statistik_anime ("
+                   "series_id INT PRIMARY KEY, staffeln INT NOT NULL DEFAULT 0, episoden INT NOT NULL DEFAULT 0, "
+                   "FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE)")
+    for index, table, column in (('idx_statistik_anime_episoden', 'statistik_anime', 'episoden'),
+                                 ('idx_downloads_datum', 'downloads', 'download_datum')):
+        try:
+            cursor.execute(f"CREATE INDEX {index} ON {table} ({column})")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # MySQL kennt kein CREATE INDEX IF NOT EXISTS
+            logger.debug("Index %s nicht angelegt: %s", index, e)
+    connection.commit()
+
+    from .repositories import StatisticsRepository  # pylint: disable=import-outside-toplevel
+    StatisticsRepository().rebuild()
+
+
+# Zielversion -> Schritt
+STEPS: Dict[int, Callable[[Any], None]] = {
+    2: _migrate_covers,
+    3: _migrate_statistics,
+}
+
+
+def get_version(connection: Any) -> int:
+    """
+    Liest die Schema-Version; ohne Eintrag ist es eine Datenbank von vor den Migrationen (Version 1).
+
+    Args:
+        connection: Geöffnete MySQL-Verbindung
+
+    Returns:
+        Schema-Version
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT wert FROM konfiguration WHERE schluessel = 'schema_version'")
+        row = cursor.fetchone()
+    except Exception:  # pylint: disable=broad-exception-caught
+        return 1
+    return int(row[0]) if row else 1
+
+
+def migrate(connection: Any) -> int:
+    """
+    Bringt die Datenbank von der gespeicherten Version auf SCHEMA_VERSION.
+
+    Args:
+        connection: Geöffnete MySQL-Verbindung
+
+    Returns:
+        Die erreichte Schema-Version
+    """
+    version = get_version(connection)
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        try:
+            STEPS[target](connection)
+            cursor = connection.cursor()
+            cursor.execute(
+                "INSERT IGNORE INTO konfiguration (schluessel, wert, beschreibung, kategorie, typ, bearbeitbar) "
+                "VALUES ('schema_version', '1', 'Version des Datenbankschemas', 'system', 'zahl', FALSE)"
+            )
+            cursor.execute("UPDATE konfiguration SET wert = %s WHERE schluessel = 'schema_version'", (str(target),))
+            connection.commit()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            connection.rollback()
+            logger.warning("Migration des Datenbankschemas auf Version %d fehlgeschlagen, "
+                           "arbeite mit Version %d weiter: %s", target, version, e)
+            break
+        version = target
+        logger.info("Datenbankschema auf Version %d aktualisiert", version)
+    return version
@@ -15,7 +15,7 @@ class AnimeSeries:
     original_titel: Optional[str] = None
     beschreibung: Optional[str] = None
     cover_url: Optional[str] = None
-    cover_data: Optional[bytes] = None
+    cover_hash: Optional[str] = None
     erscheinungsjahr: Optional[int] = None
     status: str = "laufend"
     studio: Optional[str] = None
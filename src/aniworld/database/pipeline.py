@@ -5,7 +5,11 @@ Datenbankpipeline für die automatische Speicherung von gescrapten Daten
 import logging
 from typing import Dict, Any, Optional, List, Tuple
 
+from aniworld.database.config import get_config
+from aniworld.database.identity_map import MISSING, IdentityMap, clear_identity_maps
 from aniworld.database.integration import DatabaseIntegration
+from aniworld.database.services import DownloadLifecycle
+from aniworld.database.write_behind import get_writer
 
 
 class DatabasePipeline:
@@ -20,21 +24,18 @@ class DatabasePipeline:
         """
         Initialisiert die Pipeline mit einer Datenbankverbindung.
         """
+        # Level und Ausgabe kommen aus der globalen Logging-Konfiguration (siehe aniworld.globals)
         self.logger = logging.getLogger('aniworld.db.pipeline')
-        self.logger.setLevel(logging.DEBUG)
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
         
         try:
             self.logger.debug("Initialisiere Datenbankverbindung...")
             self.db = DatabaseIntegration()
             self.logger.info("Datenbankpipeline initialisiert")
-            self._cache = {}  # Cache für bereits verarbeitete URLs
+            # bereits verarbeitete URLs -> Anime-ID, begrenzt wie die Identity-Maps der Repositories
+            max_size, ttl = get_config().get_cache_settings()
+            self._cache = IdentityMap('pipeline', max_size=max_size, ttl=ttl)
         except Exception as e:
-            self.logger.error(f"Fehler beim Initialisieren der Datenbankpipeline: {e}")
+            self.logger.error("Fehler beim Initialisieren der Datenbankpipeline: %s", e)
             import traceback
             self.logger.error(traceback.format_exc())
             self.db = None
@@ -60,36 +61,37 @@ class DatabasePipeline:
         
         # Debug: Überprüfen ob Staffeln vorhanden sind
         seasons = anime_data.get('seasons', [])
-        self.logger.debug(f"Anzahl Staffeln in den Daten: {len(seasons)}")
-        for i, season in enumerate(seasons):
-            self.logger.debug(f"Staffel {i+1}: {season.get('title')} (Nummer: {season.get('number')})")
+        self.logger.debug("Anzahl Staffeln in den Daten: %s", len(seasons))
+        for i, season in enumerate(seasons if self.logger.isEnabledFor(logging.DEBUG) else []):
+            self.logger.debug("Staffel %s: %s (Nummer: %s)", i+1, season.get('title'), season.get('number'))
             episodes = season.get('episodes', [])
-            self.logger.debug(f"  Anzahl Episoden: {len(episodes)}")
+            self.logger.debug("  Anzahl Episoden: %s", len(episodes))
             if episodes:
-                self.logger.debug(f"  Erste Episode: {episodes[0].get('title')} (Nummer: {episodes[0].get('number')})")
+                self.logger.debug("  Erste Episode: %s (Nummer: %s)", episodes[0].get('title'), episodes[0].get('number'))
             
         # Prüfen, ob der Anime bereits im Cache ist
-        if url in self._cache:
-            self.logger.debug(f"Anime mit URL {url} bereits im Cache, überspringe Speicherung")
-            return self._cache[url]
+        cached_id = self._cache.get_by('url', url)
+        if cached_id is not MISSING:
+            self.logger.debug("Anime mit URL %s bereits im Cache, überspringe Speicherung", url)
+            return cached_id
             
         # Prüfen, ob der Anime bereits in der Datenbank existiert
         existing_anime = self.db.get_anime_by_url(url)
         if existing_anime:
-            self.logger.debug(f"Anime mit URL {url} bereits in der Datenbank, aktualisiere")
-            self._cache[url] = existing_anime.series_id
+            self.logger.debug("Anime mit URL %s bereits in der Datenbank, aktualisiere", url)
+            self._cache.put(existing_anime.series_id, existing_anime.series_id, url=url)
         
         try:
             anime_id = self.db.save_anime_data(anime_data)
             if anime_id > 0:
-                self.logger.info(f"Anime '{anime_data.get('title', 'Unbekannt')}' erfolgreich gespeichert mit ID {anime_id}")
-                self._cache[url] = anime_id
+                self.logger.info("Anime '%s' erfolgreich gespeichert mit ID %s", anime_data.get('title', 'Unbekannt'), anime_id)
+                self._cache.put(anime_id, anime_id, url=url)
                 return anime_id
             else:
-                self.logger.error(f"Fehler beim Speichern des Anime: {anime_data.get('title', 'Unbekannt')}")
+                self.logger.error("Fehler beim Speichern des Anime: %s", anime_data.get('title', 'Unbekannt'))
                 return None
         except Exception as e:
-            self.logger.error(f"Fehler beim Verarbeiten der Anime-Daten: {e}")
+            self.logger.error("Fehler beim Verarbeiten der Anime-Daten: %s", e)
             import traceback
             self.logger.error(traceback.format_exc())
             return None
@@ -98,6 +100,24 @@ class DatabasePipeline:
         """
         Verarbeitet Episodendaten und speichert sie in der Datenbank.
         
+        Ist write_behind aktiviert, wird sofort zurückgekehrt: die Episode speichert das
+        eingereihte Ereignis ihres Anime mit, und eine Abfrage würde den Aufrufer auf die
+        Datenbank warten lassen.
+        
+        Args:
+            episode_data: Dictionary mit den gescrapten Daten der Episode
+            
+        Returns:
+            ID der gespeicherten Episode oder None bei Fehler (bzw. bei write_behind)
+        """
+        if get_writer() is not None:
+            return None
+        return self.store_episode(episode_data)
+    
+    def store_episode(self, episode_data: Dict[str, Any]) -> Optional[int]:
+        """
+        Speichert Episodendaten direkt (ohne write_behind).
+        
         Args:
             episode_data: Dictionary mit den gescrapten Daten der Episode
             
@@ -119,13 +139,13 @@ class DatabasePipeline:
             # Prüfen, ob die Episode bereits existiert
             episode = self.db.get_episode_data(url)
             if episode:
-                self.logger.debug(f"Episode mit URL {url} bereits in der Datenbank, überspringe")
+                self.logger.debug("Episode mit URL %s bereits in der Datenbank, überspringe", url)
                 return episode.episode_id
                 
             # Speichern der Episode würde hier implementiert, falls benötigt
             return None
         except Exception as e:
-            self.logger.error(f"Fehler beim Verarbeiten der Episodendaten: {e}")
+            self.logger.error("Fehler beim Verarbeiten der Episodendaten: %s", e)
             return None
     
     def record_download(self, download_data: Dict[str, Any]) -> Optional[int]:
@@ -160,15 +180,43 @@ class DatabasePipeline:
             )
             
             if download_id > 0:
-                self.logger.info(f"Download erfolgreich aufgezeichnet mit ID {download_id}")
+                self.logger.info("Download erfolgreich aufgezeichnet mit ID %s", download_id)
                 return download_id
             else:
                 self.logger.error("Fehler beim Aufzeichnen des Downloads")
                 return None
         except Exception as e:
-            self.logger.error(f"Fehler beim Aufzeichnen des Downloads: {e}")
+            self.logger.error("Fehler beim Aufzeichnen des Downloads: %s", e)
             return None
     
+    def start_download(self, download_data: Dict[str, Any]) -> Optional[DownloadLifecycle]:
+        """
+        Legt einen laufenden Download an (ein INSERT); Fortschritt und Abschluss werden über
+        das zurückgegebene DownloadLifecycle-Objekt geschrieben.
+        
+        Args:
+            download_data: Dictionary mit episode_url, provider, sprache, zieldatei und
+                           optional speicherlink
+            
+        Returns:
+            DownloadLifecycle oder None, wenn nicht aufgezeichnet
+        """
+        if self.db is None:
+            self.logger.warning("Datenbankverbindung nicht verfügbar")
+            return None
+        
+        if not all(download_data.get(key) for key in ('episode_url', 'provider', 'sprache', 'zieldatei')):
+            self.logger.warning("Unvollständige Download-Daten")
+            return None
+        
+        return self.db.start_download(
+            episode_url=download_data['episode_url'],
+            provider=download_data['provider'],
+            sprache=download_data['sprache'],
+            zieldatei=download_data['zieldatei'],
+            speicherlink=download_data.get('speicherlink') or ""
+        )
+    
     def update_download_status(self, download_id: int, status: str) -> bool:
         """
         Aktualisiert den Status eines Downloads in der Datenbank.
@@ -187,21 +235,22 @@ class DatabasePipeline:
         try:
             result = self.db.update_download_status(download_id, status)
             if result:
-                self.logger.info(f"Download-Status für ID {download_id} auf '{status}' aktualisiert")
+                self.logger.info("Download-Status für ID %s auf '%s' aktualisiert", download_id, status)
                 return True
             else:
-                self.logger.warning(f"Download mit ID {download_id} konnte nicht aktualisiert werden")
+                self.logger.warning("Download mit ID %s konnte nicht aktualisiert werden", download_id)
                 return False
         except Exception as e:
-            self.logger.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
+            self.logger.error("Fehler beim Aktualisieren des Download-Status: %s", e)
             return False
     
     def clear_cache(self) -> None:
         """
-        Leert den internen Cache für bereits verarbeitete URLs.
+        Leert den internen Cache für bereits verarbeitete URLs und die Identity-Maps der Repositories.
         Nützlich, wenn eine komplette Neu-Indexierung durchgeführt werden soll.
         """
-        self._cache = {}
+        self._cache.clear()
+        clear_identity_maps()
         self.logger.debug("Pipeline-Cache geleert")
 
 
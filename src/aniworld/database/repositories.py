@@ -4,10 +4,15 @@ Jede Repository-Klasse ist für eine Entität zuständig und stellt CRUD-Operati
 """
 
 import logging
-from typing import List, Optional, Dict, Any, Tuple, Union
+import sys
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
+from dataclasses import replace
 from datetime import datetime
 
+from aniworld.common import metrics
+
 from .connection import DatabaseConnection
+from .identity_map import MISSING, IdentityMap, get_identity_map
 from .models import (
     AnimeSeries, Season, Episode, Download, Provider, 
     Language, Genre, Tag, VpnService, DownloadPfad, Benutzer
@@ -19,6 +24,49 @@ class BaseRepository:
     def __init__(self):
         self.db = DatabaseConnection()
     
+    def _identity_map(self, entity: str) -> IdentityMap:
+        """
+        Gibt die Identity-Map eines Entitätstyps für die Verbindung dieses Repositories zurück
+        
+        Args:
+            entity: Name des Entitätstyps ('anime', 'season', 'episode', 'download')
+            
+        Returns:
+            IdentityMap-Instanz
+        """
+        return get_identity_map(self.db, entity)
+    
+    def _cover_hash_column(self, prefix: str = '') -> str:
+        """
+        Gibt die Spalte cover_hash für eine SELECT-Liste zurück
+        
+        Vor der Migration auf Schema-Version 2 (siehe migrations.py) hat anime_series die
+        Spalte noch nicht; die Abfragen liefern dann NULL statt fehlzuschlagen.
+        
+        Args:
+            prefix: Tabellenalias mit Punkt, z.B. 'a.'
+            
+        Returns:
+            SQL-Ausdruck mit dem Namen cover_hash
+        """
+        if not self.db.has_schema(2):
+            return "NULL AS cover_hash"
+        return f"{prefix}cover_hash"
+    
+    def _timed(self):
+        """
+        Zeitmessung einer Datenbankoperation, benannt nach der aufrufenden Repository-Methode
+        
+        Returns:
+            Context-Manager aus aniworld.common.metrics
+        """
+        if not metrics.is_enabled():
+            return metrics.timed("db")
+        
+        # Frame 0: _timed, 1: _execute_query/_execute_update, 2: Repository-Methode
+        caller = sys._getframe(2).f_code.co_name  # pylint: disable=protected-access
+        return metrics.timed("db", operation=f"{type(self).__name__}.{caller}")
+    
     def _execute_query(self, query: str, params: Tuple = None, fetch_one: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any], None]:
         """
         Führt eine SQL-Abfrage aus und gibt das Ergebnis zurück
@@ -32,7 +80,7 @@ class BaseRepository:
             Liste von Dictionaries oder ein Dictionary, wenn fetch_one=True
             None, wenn kein Ergebnis gefunden wurde
         """
-        with self.db.get_connection() as conn:
+        with self._timed(), self.db.get_connection() as conn:
             cursor = conn.cursor(dictionary=True)
             cursor.execute(query, params or ())
             
@@ -41,26 +89,71 @@ class BaseRepository:
             
             return cursor.fetchall()
     
-    def _execute_update(self, query: str, params: Tuple = None) -> int:
+    def _iter_query(self, query: str, key_column: str, conditions: List[str] = None,
+                    params: Tuple = (), batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Liest eine Abfrage seitenweise per Keyset-Pagination über den Primärschlüssel
+        
+        Jede Seite ist eine eigene Abfrage "WHERE <Bedingungen> AND key > <letzter Schlüssel>
+        ORDER BY key LIMIT batch_size", die über den Index läuft. Es liegt nie mehr als eine
+        Seite im Speicher, und die ersten Zeilen stehen sofort zur Verfügung.
+        
+        Args:
+            query: SELECT ... FROM ... ohne WHERE und ORDER BY
+            key_column: Primärschlüsselspalte, nach der sortiert und geblättert wird
+            conditions: Zusätzliche WHERE-Bedingungen mit %s-Platzhaltern
+            params: Parameter für die Bedingungen
+            batch_size: Zeilen pro Seite
+            
+        Yields:
+            Ein Dictionary pro Zeile
+        """
+        where = " AND ".join(list(conditions or []) + [f"{key_column} > %s"])
+        page_query = f"{query} WHERE {where} ORDER BY {key_column} LIMIT %s"
+        last_key = 0
+        
+        while True:
+            # gepufferter Cursor: jede Seite wird vollständig geholt und Cursor und Verbindung
+            # werden vor dem ersten yield zurückgegeben. So bleibt zwischen den yields nichts
+            # ausgeliehen, auch wenn der Aufrufer die Iteration abbricht oder nie beendet.
+            with self._timed(), self.db.get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    cursor.execute(page_query, tuple(params) + (last_key, batch_size))
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+            
+            yield from rows
+            
+            if len(rows) < batch_size:
+                return
+            last_key = rows[-1][key_column]
+    
+    def _execute_update(self, query: str, params: Tuple = None,
+                        statements: List[Tuple[str, Tuple]] = ()) -> int:
         """
         Führt ein SQL-UPDATE, INSERT oder DELETE aus und gibt die Anzahl der betroffenen Zeilen zurück
         
         Args:
             query: SQL-Abfrage
             params: Parameter für die Abfrage
+            statements: Weitere Anweisungen (Abfrage, Parameter), die in derselben Transaktion
+                        ausgeführt werden, z.B. die Fortschreibung der Statistiken
             
         Returns:
             Anzahl der betroffenen Zeilen oder die letzte eingefügte ID
         """
-        with self.db.get_connection() as conn:
+        with self._timed(), self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params or ())
-            conn.commit()
+            result = cursor.lastrowid or cursor.rowcount
             
-            if cursor.lastrowid:
-                return cursor.lastrowid
+            for statement, statement_params in statements:
+                cursor.execute(statement, statement_params)
+            conn.commit()
             
-            return cursor.rowcount
+            return result
 
 
 class AnimeRepository(BaseRepository):
@@ -81,12 +174,13 @@ class AnimeRepository(BaseRepository):
             ID der gespeicherten/aktualisierten Anime-Serie
         """
         if anime.series_id is None or anime.series_id <= 0:
-            # Neuer Anime - Insert
-            query = """
+            # Neuer Anime - Insert (cover_hash gibt es erst ab Schema-Version 2, siehe migrations.py)
+            with_cover_hash = self.db.has_schema(2)
+            query = f"""
                 INSERT INTO anime_series 
                 (titel, original_titel, beschreibung, erscheinungsjahr, status, 
-                studio, regisseur, aniworld_url, cover_url, cover_data, aktualisiert_am)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                studio, regisseur, aniworld_url, cover_url, {'cover_hash, ' if with_cover_hash else ''}aktualisiert_am)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, {'%s, ' if with_cover_hash else ''}NOW())
             """
             params = (
                 anime.titel, 
@@ -98,11 +192,15 @@ class AnimeRepository(BaseRepository):
                 anime.regisseur,
                 anime.aniworld_url,
                 anime.cover_url,
-                anime.cover_data
+                anime.cover_hash
             )
+            if not with_cover_hash:
+                params = params[:-1]
             
-            anime.series_id = self._execute_update(query, params)
-            self.logger.info(f"Neue Anime-Serie angelegt: {anime.titel} (ID: {anime.series_id})")
+            anime.series_id = self._execute_update(
+                query, params, statements=StatisticsRepository.counter_statements({'anime': 1})
+            )
+            self.logger.info("Neue Anime-Serie angelegt: %s (ID: %s)", anime.titel, anime.series_id)
         else:
             # Bestehender Anime - Update
             query = """
@@ -133,7 +231,9 @@ class AnimeRepository(BaseRepository):
             )
             
             self._execute_update(query, params)
-            self.logger.debug(f"Anime-Serie aktualisiert: {anime.titel} (ID: {anime.series_id})")
+            # aktualisiert_am setzt die Datenbank, daher beim nächsten Lesen neu laden
+            self._identity_map('anime').invalidate(anime.series_id)
+            self.logger.debug("Anime-Serie aktualisiert: %s (ID: %s)", anime.titel, anime.series_id)
         
         return anime.series_id
     
@@ -147,17 +247,21 @@ class AnimeRepository(BaseRepository):
         Returns:
             Das AnimeSeries-Objekt oder None, wenn nicht gefunden
         """
-        query = """
+        cached = self._identity_map('anime').get(series_id)
+        if cached is not MISSING:
+            return cached
+        
+        query = f"""
             SELECT series_id, titel, original_titel, beschreibung, erscheinungsjahr, 
                    status, studio, regisseur, aniworld_url, cover_url, 
-                   aktualisiert_am
+                   {self._cover_hash_column()}, aktualisiert_am
             FROM anime_series
             WHERE series_id = %s
         """
         
         row = self._execute_query(query, (series_id,), fetch_one=True)
         if row:
-            return AnimeSeries(
+            return self._cache_anime(AnimeSeries(
                 series_id=row['series_id'],
                 titel=row['titel'],
                 original_titel=row['original_titel'],
@@ -168,8 +272,9 @@ class AnimeRepository(BaseRepository):
                 regisseur=row['regisseur'],
                 aniworld_url=row['aniworld_url'],
                 cover_url=row['cover_url'],
+                cover_hash=row['cover_hash'],
                 aktualisiert_am=row['aktualisiert_am']
-            )
+            ))
         
         return None
     
@@ -183,17 +288,21 @@ class AnimeRepository(BaseRepository):
         Returns:
             Das AnimeSeries-Objekt oder None, wenn nicht gefunden
         """
-        query = """
+        cached = self._identity_map('anime').get_by('url', url)
+        if cached is not MISSING:
+            return cached
+        
+        query = f"""
             SELECT series_id, titel, original_titel, beschreibung, erscheinungsjahr, 
                    status, studio, regisseur, aniworld_url, cover_url, 
-                   aktualisiert_am
+                   {self._cover_hash_column()}, aktualisiert_am
             FROM anime_series
             WHERE aniworld_url = %s
         """
         
         row = self._execute_query(query, (url,), fetch_one=True)
         if row:
-            return AnimeSeries(
+            return self._cache_anime(AnimeSeries(
                 series_id=row['series_id'],
                 titel=row['titel'],
                 original_titel=row['original_titel'],
@@ -204,11 +313,25 @@ class AnimeRepository(BaseRepository):
                 regisseur=row['regisseur'],
                 aniworld_url=row['aniworld_url'],
                 cover_url=row['cover_url'],
+                cover_hash=row['cover_hash'],
                 aktualisiert_am=row['aktualisiert_am']
-            )
+            ))
         
         return None
     
+    def _cache_anime(self, anime: AnimeSeries) -> AnimeSeries:
+        """
+        Legt einen geladenen Anime in der Identity-Map ab
+        
+        Args:
+            anime: Das geladene AnimeSeries-Objekt
+            
+        Returns:
+            Dasselbe Objekt
+        """
+        self._identity_map('anime').put(anime.series_id, anime, url=anime.aniworld_url)
+        return anime
+    
     def find_all(self) -> List[AnimeSeries]:
         """
         Gibt alle Anime-Serien zurück
@@ -216,10 +339,10 @@ class AnimeRepository(BaseRepository):
         Returns:
             Liste aller Anime-Serien in der Datenbank
         """
-        query = """
+        query = f"""
             SELECT series_id, titel, original_titel, beschreibung, erscheinungsjahr, 
                    status, studio, regisseur, aniworld_url, cover_url, 
-                   aktualisiert_am
+                   {self._cover_hash_column()}, aktualisiert_am
             FROM anime_series
             ORDER BY titel
         """
@@ -239,29 +362,79 @@ class AnimeRepository(BaseRepository):
                 regisseur=row['regisseur'],
                 aniworld_url=row['aniworld_url'],
                 cover_url=row['cover_url'],
+                cover_hash=row['cover_hash'],
                 aktualisiert_am=row['aktualisiert_am']
             ))
         
         return animes
     
-    def save_cover_data(self, series_id: int, cover_data: bytes) -> bool:
+    def iter_all(self, status: Optional[str] = None, search: Optional[str] = None,
+                 batch_size: int = 500) -> Iterator[AnimeSeries]:
         """
-        Speichert das Cover-Bild eines Anime
+        Liefert die Anime-Serien nacheinander, sortiert nach ID, ohne die ganze Tabelle zu laden
+        
+        Args:
+            status: Nur Serien mit diesem Status (z.B. 'laufend')
+            search: Nur Serien, deren Titel oder Originaltitel diesen Text enthält
+            batch_size: Zeilen pro Datenbankabfrage
+            
+        Yields:
+            AnimeSeries-Objekte
+        """
+        query = f"""
+            SELECT series_id, titel, original_titel, beschreibung, erscheinungsjahr, 
+                   status, studio, regisseur, aniworld_url, cover_url, 
+                   {self._cover_hash_column()}, aktualisiert_am
+            FROM anime_series
+        """
+        conditions, params = [], []
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if search:
+            conditions.append("(titel LIKE %s OR original_titel LIKE %s)")
+            params.extend([f"%{search}%"] * 2)
+        
+        for row in self._iter_query(query, 'series_id', conditions, tuple(params), batch_size):
+            yield AnimeSeries(
+                series_id=row['series_id'],
+                titel=row['titel'],
+                original_titel=row['original_titel'],
+                beschreibung=row['beschreibung'],
+                erscheinungsjahr=row['erscheinungsjahr'],
+                status=row['status'],
+                studio=row['studio'],
+                regisseur=row['regisseur'],
+                aniworld_url=row['aniworld_url'],
+                cover_url=row['cover_url'],
+                cover_hash=row['cover_hash'],
+                aktualisiert_am=row['aktualisiert_am']
+            )
+    
+    def save_cover_hash(self, series_id: int, cover_hash: str) -> bool:
+        """
+        Speichert den Hash des Cover-Bildes eines Anime (das Bild selbst liegt im Cover-Speicher)
         
         Args:
             series_id: ID des Anime
-            cover_data: Binärdaten des Cover-Bildes
+            cover_hash: SHA-256 des Covers, siehe aniworld.database.cover_store
             
         Returns:
             True, wenn erfolgreich gespeichert
         """
+        if not self.db.has_schema(2):
+            self.logger.debug("Cover-Hash nicht gespeichert, Datenbank noch nicht migriert (ID: %s)", series_id)
+            return False
+        
         query = """
             UPDATE anime_series 
-            SET cover_data = %s
+            SET cover_hash = %s
             WHERE series_id = %s
         """
         
-        return self._execute_update(query, (cover_data, series_id)) > 0
+        updated = self._execute_update(query, (cover_hash, series_id)) > 0
+        self._identity_map('anime').invalidate(series_id)
+        return updated
     
     def delete(self, series_id: int) -> bool:
         """
@@ -273,8 +446,18 @@ class AnimeRepository(BaseRepository):
         Returns:
             True, wenn erfolgreich gelöscht
         """
+        statistics = []
+        if self.find_by_id(series_id) is not None:
+            statistics = StatisticsRepository.removal_statements(self, series_id)
+        
         query = "DELETE FROM anime_series WHERE series_id = %s"
-        return self._execute_update(query, (series_id,)) > 0
+        deleted = self._execute_update(query, (series_id,), statements=statistics) > 0
+        
+        # Staffeln, Episoden und Downloads werden per ON DELETE CASCADE mitgelöscht
+        self._identity_map('anime').invalidate(series_id)
+        for entity in ('season', 'episode', 'download'):
+            self._identity_map(entity).clear()
+        return deleted
 
 
 class SeasonRepository(BaseRepository):
@@ -305,6 +488,7 @@ class SeasonRepository(BaseRepository):
                 season.beschreibung, season.erscheinungsjahr,
                 season.anzahl_episoden, season.aniworld_url, season.season_id
             ))
+            self._cache_saved_season(season, is_new=False)
             return season.season_id
         else:
             # Füge neue Staffel hinzu
@@ -314,11 +498,17 @@ class SeasonRepository(BaseRepository):
              erscheinungsjahr, anzahl_episoden, aniworld_url)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
             """
-            return self._execute_update(query, (
+            statistics = [
+                ("INSERT IGNORE INTO statistik_anime (series_id, staffeln, episoden) VALUES (%s, 0, 0)", (season.series_id,)),
+                ("UPDATE statistik_anime SET staffeln = staffeln + 1 WHERE series_id = %s", (season.series_id,)),
+            ] + StatisticsRepository.counter_statements({'staffeln': 1}) if StatisticsRepository.maintained() else []
+            season_id = self._execute_update(query, (
                 season.series_id, season.staffel_nummer, season.titel,
                 season.beschreibung, season.erscheinungsjahr,
                 season.anzahl_episoden, season.aniworld_url
-            ))
+            ), statements=statistics)
+            self._cache_saved_season(replace(season, season_id=season_id), is_new=True)
+            return season_id
     
     def find_by_id(self, season_id: int) -> Optional[Season]:
         """
@@ -330,11 +520,15 @@ class SeasonRepository(BaseRepository):
         Returns:
             Season-Objekt oder None, wenn nicht gefunden
         """
+        cached = self._identity_map('season').get(season_id)
+        if cached is not MISSING:
+            return cached
+        
         query = "SELECT * FROM seasons WHERE season_id = %s"
         result = self._execute_query(query, (season_id,), fetch_one=True)
         
         if result:
-            return Season(
+            return self._cache_season(Season(
                 season_id=result['season_id'],
                 series_id=result['series_id'],
                 staffel_nummer=result['staffel_nummer'],
@@ -343,7 +537,7 @@ class SeasonRepository(BaseRepository):
                 erscheinungsjahr=result['erscheinungsjahr'],
                 anzahl_episoden=result['anzahl_episoden'],
                 aniworld_url=result['aniworld_url']
-            )
+            ))
         return None
     
     def find_by_series_id(self, series_id: int) -> List[Season]:
@@ -356,6 +550,11 @@ class SeasonRepository(BaseRepository):
         Returns:
             Liste von Season-Objekten
         """
+        seasons = self._identity_map('season')
+        cached = seasons.get_collection('series', series_id)
+        if cached is not MISSING:
+            return cached
+        
         query = "SELECT * FROM seasons WHERE series_id = %s ORDER BY staffel_nummer"
         results = self._execute_query(query, (series_id,))
         
@@ -371,8 +570,48 @@ class SeasonRepository(BaseRepository):
                 anzahl_episoden=result['anzahl_episoden'],
                 aniworld_url=result['aniworld_url']
             ))
+        
+        seasons.put_collection('series', series_id, season_list)
+        for season in season_list:
+            self._cache_season(season)
         return season_list
     
+    def _cache_season(self, season: Season) -> Season:
+        """
+        Legt eine geladene Staffel in der Identity-Map ab
+        
+        Args:
+            season: Das geladene Season-Objekt
+            
+        Returns:
+            Dasselbe Objekt
+        """
+        self._identity_map('season').put(season.season_id, season, url=season.aniworld_url)
+        return season
+    
+    def _cache_saved_season(self, season: Season, is_new: bool) -> None:
+        """
+        Übernimmt eine gespeicherte Staffel in die Identity-Map und in die gecachte Staffelliste ihrer Serie
+        
+        Args:
+            season: Das gespeicherte Season-Objekt (alle Spalten kommen aus dem Objekt)
+            is_new: True nach einem Insert
+        """
+        seasons = self._identity_map('season')
+        if not is_new:
+            # Eine verschobene Staffel muss aus der Liste der bisherigen Serie verschwinden
+            previous = seasons.get(season.season_id)
+            if previous is MISSING:
+                seasons.invalidate_collection('series')
+            elif previous.series_id != season.series_id:
+                seasons.invalidate_collection('series', previous.series_id)
+        
+        seasons.merge_into_collection(
+            'series', season.series_id, season,
+            key=lambda item: item.season_id, sort_key=lambda item: item.staffel_nummer
+        )
+        self._cache_season(season)
+    
     def find_by_anime_id(self, series_id: int) -> List[Season]:
         """
         Findet alle Staffeln eines Anime anhand der Anime-ID
@@ -395,11 +634,15 @@ class SeasonRepository(BaseRepository):
         Returns:
             Season-Objekt oder None, wenn nicht gefunden
         """
+        cached = self._identity_map('season').get_by('url', aniworld_url)
+        if cached is not MISSING:
+            return cached
+        
         query = "SELECT * FROM seasons WHERE aniworld_url = %s"
         result = self._execute_query(query, (aniworld_url,), fetch_one=True)
         
         if result:
-            return Season(
+            return self._cache_season(Season(
                 season_id=result['season_id'],
                 series_id=result['series_id'],
                 staffel_nummer=result['staffel_nummer'],
@@ -408,7 +651,7 @@ class SeasonRepository(BaseRepository):
                 erscheinungsjahr=result['erscheinungsjahr'],
                 anzahl_episoden=result['anzahl_episoden'],
                 aniworld_url=result['aniworld_url']
-            )
+            ))
         return None
 
 
@@ -446,8 +689,14 @@ class EpisodeRepository(BaseRepository):
                 episode.aniworld_url
             )
             
-            episode.episode_id = self._execute_update(query, params)
-            self.logger.info(f"Neue Episode angelegt: {episode.titel} (ID: {episode.episode_id})")
+            statistics = [(
+                "UPDATE statistik_anime SET episoden = episoden + 1 "
+                "WHERE series_id = (SELECT series_id FROM seasons WHERE season_id = %s)",
+                (episode.season_id,)
+            )] + StatisticsRepository.counter_statements({'episoden': 1}) if StatisticsRepository.maintained() else []
+            episode.episode_id = self._execute_update(query, params, statements=statistics)
+            self._cache_saved_episode(episode, is_new=True)
+            self.logger.info("Neue Episode angelegt: %s (ID: %s)", episode.titel, episode.episode_id)
         else:
             # Bestehende Episode - Update
             query = """
@@ -473,7 +722,8 @@ class EpisodeRepository(BaseRepository):
             )
             
             self._execute_update(query, params)
-            self.logger.debug(f"Episode aktualisiert: {episode.titel} (ID: {episode.episode_id})")
+            self._cache_saved_episode(episode, is_new=False)
+            self.logger.debug("Episode aktualisiert: %s (ID: %s)", episode.titel, episode.episode_id)
         
         return episode.episode_id
     
@@ -487,6 +737,10 @@ class EpisodeRepository(BaseRepository):
         Returns:
             Das Episode-Objekt oder None, wenn nicht gefunden
         """
+        cached = self._identity_map('episode').get(episode_id)
+        if cached is not MISSING:
+            return cached
+        
         query = """
             SELECT episode_id, season_id, episode_nummer, titel, beschreibung, 
                    laufzeit, luftdatum, aniworld_url
@@ -496,7 +750,7 @@ class EpisodeRepository(BaseRepository):
         
         row = self._execute_query(query, (episode_id,), fetch_one=True)
         if row:
-            return Episode(
+            return self._cache_episode(Episode(
                 episode_id=row['episode_id'],
                 season_id=row['season_id'],
                 episode_nummer=row['episode_nummer'],
@@ -505,7 +759,7 @@ class EpisodeRepository(BaseRepository):
                 laufzeit=row['laufzeit'],
                 luftdatum=row['luftdatum'],
                 aniworld_url=row['aniworld_url']
-            )
+            ))
         
         return None
     
@@ -519,6 +773,10 @@ class EpisodeRepository(BaseRepository):
         Returns:
             Das Episode-Objekt oder None, wenn nicht gefunden
         """
+        cached = self._identity_map('episode').get_by('url', url)
+        if cached is not MISSING:
+            return cached
+        
         query = """
             SELECT episode_id, season_id, episode_nummer, titel, beschreibung, 
                    laufzeit, luftdatum, aniworld_url
@@ -528,7 +786,7 @@ class EpisodeRepository(BaseRepository):
         
         row = self._execute_query(query, (url,), fetch_one=True)
         if row:
-            return Episode(
+            return self._cache_episode(Episode(
                 episode_id=row['episode_id'],
                 season_id=row['season_id'],
                 episode_nummer=row['episode_nummer'],
@@ -537,7 +795,7 @@ class EpisodeRepository(BaseRepository):
                 laufzeit=row['laufzeit'],
                 luftdatum=row['luftdatum'],
                 aniworld_url=row['aniworld_url']
-            )
+            ))
         
         return None
     
@@ -551,6 +809,11 @@ class EpisodeRepository(BaseRepository):
         Returns:
             Liste der Episoden der Staffel
         """
+        episodes = self._identity_map('episode')
+        cached = episodes.get_collection('season', season_id)
+        if cached is not MISSING:
+            return cached
+        
         query = """
             SELECT episode_id, season_id, episode_nummer, titel, beschreibung, 
                    laufzeit, luftdatum, aniworld_url
@@ -560,10 +823,10 @@ class EpisodeRepository(BaseRepository):
         """
         
         results = self._execute_query(query, (season_id,))
-        episodes = []
+        episode_list = []
         
         for row in results:
-            episodes.append(Episode(
+            episode_list.append(Episode(
                 episode_id=row['episode_id'],
                 season_id=row['season_id'],
                 episode_nummer=row['episode_nummer'],
@@ -574,7 +837,47 @@ class EpisodeRepository(BaseRepository):
                 aniworld_url=row['aniworld_url']
             ))
         
-        return episodes
+        episodes.put_collection('season', season_id, episode_list)
+        for episode in episode_list:
+            self._cache_episode(episode)
+        return episode_list
+    
+    
+    def _cache_episode(self, episode: Episode) -> Episode:
+        """
+        Legt eine geladene Episode in der Identity-Map ab
+        
+        Args:
+            episode: Das geladene Episode-Objekt
+            
+        Returns:
+            Dasselbe Objekt
+        """
+        self._identity_map('episode').put(episode.episode_id, episode, url=episode.aniworld_url)
+        return episode
+    
+    def _cache_saved_episode(self, episode: Episode, is_new: bool) -> None:
+        """
+        Übernimmt eine gespeicherte Episode in die Identity-Map und in die gecachte Episodenliste ihrer Staffel
+        
+        Args:
+            episode: Das gespeicherte Episode-Objekt (alle Spalten kommen aus dem Objekt)
+            is_new: True nach einem Insert
+        """
+        episodes = self._identity_map('episode')
+        if not is_new:
+            # Eine verschobene Episode muss aus der Liste der bisherigen Staffel verschwinden
+            previous = episodes.get(episode.episode_id)
+            if previous is MISSING:
+                episodes.invalidate_collection('season')
+            elif previous.season_id != episode.season_id:
+                episodes.invalidate_collection('season', previous.season_id)
+        
+        episodes.merge_into_collection(
+            'season', episode.season_id, episode,
+            key=lambda item: item.episode_id, sort_key=lambda item: item.episode_nummer
+        )
+        self._cache_episode(episode)
     
     def delete(self, episode_id: int) -> bool:
         """
@@ -586,8 +889,23 @@ class EpisodeRepository(BaseRepository):
         Returns:
             True, wenn erfolgreich gelöscht
         """
+        statistics = []
+        row = self._execute_query(
+            "SELECT s.series_id FROM episodes e JOIN seasons s ON e.season_id = s.season_id WHERE e.episode_id = %s",
+            (episode_id,), fetch_one=True
+        )
+        if row:
+            statistics = StatisticsRepository.removal_statements(self, row['series_id'], episode_id)
+        
         query = "DELETE FROM episodes WHERE episode_id = %s"
-        return self._execute_update(query, (episode_id,)) > 0
+        deleted = self._execute_update(query, (episode_id,), statements=statistics) > 0
+        
+        episodes = self._identity_map('episode')
+        episodes.invalidate(episode_id)
+        episodes.invalidate_collection('season')
+        # Downloads der Episode werden per ON DELETE CASCADE mitgelöscht
+        self._identity_map('download').clear()
+        return deleted
 
 
 class DownloadRepository(BaseRepository):
@@ -616,6 +934,14 @@ class DownloadRepository(BaseRepository):
                 benutzer_id = %s
             WHERE download_id = %s
             """
+            # Statuswechsel: alten Stand heraus-, neuen hineinrechnen (alter Stand meist aus der Identity-Map)
+            previous = self.find_by_id(download.download_id)
+            statistics = []
+            if previous is not None:
+                statistics = StatisticsRepository.counter_statements(StatisticsRepository.merge_deltas(
+                    StatisticsRepository.download_deltas(previous, -1),
+                    StatisticsRepository.download_deltas(download, 1)
+                ))
             self._execute_update(query, (
                 download.episode_id, download.provider_id, download.language_id,
                 download.speicherlink, download.lokaler_pfad, download.dateigroesse,
@@ -623,7 +949,13 @@ class DownloadRepository(BaseRepository):
                 download.notizen, download.download_pfad_id, download.vpn_genutzt,
                 download.vpn_id, download.vpn_server_id, download.download_geschwindigkeit,
                 download.benutzer_id, download.download_id
-            ))
+            ), statements=statistics)
+            downloads = self._identity_map('download')
+            if download.download_datum is None:
+                # nicht geladenes Objekt: download_datum steht nur in der Datenbank
+                downloads.invalidate(download.download_id)
+            else:
+                downloads.put(download.download_id, download)
             return download.download_id
         else:
             # Füge neuen Download hinzu
@@ -642,7 +974,46 @@ class DownloadRepository(BaseRepository):
                 download.notizen, download.download_pfad_id, download.vpn_genutzt,
                 download.vpn_id, download.vpn_server_id, download.download_geschwindigkeit,
                 download.benutzer_id
-            ))
+            ), statements=StatisticsRepository.counter_statements(StatisticsRepository.download_deltas(download)))
+    
+    # Spalten, die update_columns einzeln setzen darf
+    UPDATABLE_COLUMNS = (
+        'speicherlink', 'lokaler_pfad', 'dateigroesse', 'qualitaet', 'format', 'hash_wert',
+        'status', 'notizen', 'download_geschwindigkeit'
+    )
+    
+    def update_columns(self, download_id: int, columns: Dict[str, Any],
+                       deltas: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Setzt nur die angegebenen Spalten eines Downloads, ohne ihn vorher zu lesen
+        
+        Der Aufrufer kennt den bisherigen Stand (z.B. DownloadLifecycle) und übergibt die
+        daraus folgenden Zähleränderungen, die in derselben Transaktion geschrieben werden.
+        Ein unveränderter Wert zählt als Erfolg: MySQL meldet dank CLIENT_FOUND_ROWS die
+        gefundenen Zeilen, SQLite tut das ohnehin.
+        
+        Args:
+            download_id: ID des Downloads
+            columns: Spaltenname -> neuer Wert (nur Spalten aus UPDATABLE_COLUMNS)
+            deltas: Zähleränderungen für statistik_zaehler (optional)
+            
+        Returns:
+            True, wenn der Download existiert, sonst False
+        """
+        unknown = set(columns) - set(self.UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Spalten nicht änderbar: {sorted(unknown)}")
+        if not columns:
+            return True
+        
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        rows = self._execute_update(
+            f"UPDATE downloads SET {assignments} WHERE download_id = %s",
+            (*columns.values(), download_id),
+            statements=StatisticsRepository.counter_statements(deltas or {})
+        )
+        self._identity_map('download').invalidate(download_id)
+        return rows > 0
     
     def find_by_id(self, download_id: int) -> Optional[Download]:
         """
@@ -654,11 +1025,16 @@ class DownloadRepository(BaseRepository):
         Returns:
             Download-Objekt oder None, wenn nicht gefunden
         """
+        downloads = self._identity_map('download')
+        cached = downloads.get(download_id)
+        if cached is not MISSING:
+            return cached
+        
         query = "SELECT * FROM downloads WHERE download_id = %s"
         result = self._execute_query(query, (download_id,), fetch_one=True)
         
         if result:
-            return Download(
+            download = Download(
                 download_id=result['download_id'],
                 episode_id=result['episode_id'],
                 provider_id=result['provider_id'],
@@ -679,6 +1055,8 @@ class DownloadRepository(BaseRepository):
                 download_geschwindigkeit=result['download_geschwindigkeit'],
                 benutzer_id=result['benutzer_id']
             )
+            downloads.put(download_id, download)
+            return download
         return None
     
     def find_by_episode_id(self, episode_id: int) -> List[Download]:
@@ -719,6 +1097,50 @@ class DownloadRepository(BaseRepository):
             ))
         return download_list
     
+    def iter_all(self, status: Optional[str] = None, episode_id: Optional[int] = None,
+                 batch_size: int = 500) -> Iterator[Download]:
+        """
+        Liefert die Downloads nacheinander, sortiert nach ID, ohne die ganze Tabelle zu laden
+        
+        Args:
+            status: Nur Downloads mit diesem Status (z.B. 'abgeschlossen')
+            episode_id: Nur Downloads dieser Episode
+            batch_size: Zeilen pro Datenbankabfrage
+            
+        Yields:
+            Download-Objekte
+        """
+        conditions, params = [], []
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if episode_id:
+            conditions.append("episode_id = %s")
+            params.append(episode_id)
+        
+        for result in self._iter_query("SELECT * FROM downloads", 'download_id', conditions, tuple(params), batch_size):
+            yield Download(
+                download_id=result['download_id'],
+                episode_id=result['episode_id'],
+                provider_id=result['provider_id'],
+                language_id=result['language_id'],
+                speicherlink=result['speicherlink'],
+                lokaler_pfad=result['lokaler_pfad'],
+                dateigroesse=result['dateigroesse'],
+                qualitaet=result['qualitaet'],
+                download_datum=result['download_datum'],
+                format=result['format'],
+                hash_wert=result['hash_wert'],
+                status=result['status'],
+                notizen=result['notizen'],
+                download_pfad_id=result['download_pfad_id'],
+                vpn_genutzt=result['vpn_genutzt'],
+                vpn_id=result['vpn_id'],
+                vpn_server_id=result['vpn_server_id'],
+                download_geschwindigkeit=result['download_geschwindigkeit'],
+                benutzer_id=result['benutzer_id']
+            )
+    
     def find_active_downloads(self) -> List[Download]:
         """
         Sucht alle aktiven Downloads (Status: geplant oder läuft)
@@ -752,4 +1174,301 @@ class DownloadRepository(BaseRepository):
                 download_geschwindigkeit=result['download_geschwindigkeit'],
                 benutzer_id=result['benutzer_id']
             ))
-        return download_list 
\ No newline at end of file
+        return download_list 
+    
+    def find_completed_files(self) -> List[Dict[str, Any]]:
+        """
+        Sucht die Zieldateien aller abgeschlossenen Downloads
+        
+        Returns:
+            Liste von Dictionaries mit episode_url, sprache, lokaler_pfad und dateigroesse
+        """
+        query = """
+        SELECT e.aniworld_url AS episode_url, l.name AS sprache, d.lokaler_pfad, d.dateigroesse
+        FROM downloads d
+        JOIN episodes e ON e.episode_id = d.episode_id
+        JOIN languages l ON l.language_id = d.language_id
+        WHERE d.status = 'abgeschlossen' AND d.lokaler_pfad IS NOT NULL AND e.aniworld_url IS NOT NULL
+        """
+        return self._execute_query(query)
+
+class StatisticsRepository(BaseRepository):
+    """
+    Repository für die materialisierten Statistiken
+    
+    statistik_zaehler enthält Zähler und Summen (Anzahl Anime, Staffeln, Episoden, Downloads,
+    Downloads pro Status/Provider/Sprache, Dateigrößen), statistik_anime die Staffeln und
+    Episoden pro Anime. Die anderen Repositories schreiben beide beim Speichern und Löschen in
+    derselben Transaktion fort, sodass Statistiken ohne Scan über die großen Tabellen gelesen werden.
+    """
+    
+    # Fehlt dieser Zähler (z.B. nach einer Migration), wird beim ersten Lesen neu aufgebaut
+    BUILT_KEY = 'aufgebaut'
+    
+    # Downloads gruppiert nach Status, Provider und Sprache, optional eingeschränkt über {where}
+    DOWNLOAD_GROUPS_QUERY = """
+        SELECT d.status, d.provider_id, d.language_id, COUNT(*) AS anzahl,
+               COUNT(d.dateigroesse) AS mit_groesse, COALESCE(SUM(d.dateigroesse), 0) AS bytes
+        FROM downloads d
+        JOIN episodes e ON d.episode_id = e.episode_id
+        JOIN seasons s ON e.season_id = s.season_id
+        {where}
+        GROUP BY d.status, d.provider_id, d.language_id
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.logger = logging.getLogger('aniworld.db.repo.stats')
+    
+    @staticmethod
+    def maintained() -> bool:
+        """
+        Gibt zurück, ob die Statistiktabellen vorhanden sind und fortgeschrieben werden
+        
+        Auf einer MySQL-Datenbank, deren Migration auf Schema-Version 3 (siehe migrations.py) nicht
+        gelaufen ist, fehlen sie; gespeichert wird dann ohne Statistiken. Die Migration baut sie
+        beim nächsten Start mit rebuild() aus den vorhandenen Daten auf.
+        
+        Returns:
+            True, wenn die Repositories die Statistiken mitschreiben
+        """
+        return DatabaseConnection().has_schema(3)
+    
+    @staticmethod
+    def counter_statements(deltas: Dict[str, int]) -> List[Tuple[str, Tuple]]:
+        """
+        Erzeugt die Anweisungen, um Zähler in statistik_zaehler zu verändern
+        
+        Args:
+            deltas: Zählername -> Änderung (0 wird übersprungen)
+            
+        Returns:
+            Liste von (Abfrage, Parameter) für BaseRepository._execute_update,
+            leer, solange die Statistiken nicht fortgeschrieben werden (siehe maintained())
+        """
+        statements = []
+        if not StatisticsRepository.maintained():
+            return statements
+        for key, delta in deltas.items():
+            if delta:
+                statements.append(("INSERT IGNORE INTO statistik_zaehler (schluessel, wert) VALUES (%s, 0)", (key,)))
+                statements.append(("UPDATE statistik_zaehler SET wert = wert + %s WHERE schluessel = %s", (delta, key)))
+        return statements
+    
+    @staticmethod
+    def download_deltas(download: Download, sign: int = 1) -> Dict[str, int]:
+        """
+        Gibt die Zähleränderungen für das Hinzufügen (sign=1) oder Entfernen (sign=-1) eines Downloads zurück
+        
+        Args:
+            download: Der Download
+            sign: 1 oder -1
+            
+        Returns:
+            Zählername -> Änderung
+        """
+        deltas = {
+            'downloads': sign,
+            f'status.{download.status}': sign,
+            f'provider.{download.provider_id}': sign,
+            f'sprache.{download.language_id}': sign,
+        }
+        if download.dateigroesse is not None:
+            deltas['downloads.bytes'] = sign * int(download.dateigroesse)
+            deltas['downloads.mit_groesse'] = sign
+        return deltas
+    
+    @staticmethod
+    def merge_deltas(*deltas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Addiert mehrere Zähleränderungen
+        
+        Args:
+            deltas: Dictionaries Zählername -> Änderung
+            
+        Returns:
+            Summierte Änderungen
+        """
+        merged: Dict[str, int] = {}
+        for delta in deltas:
+            for key, value in delta.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+    
+    @staticmethod
+    def _add_download_groups(deltas: Dict[str, int], rows: List[Dict[str, Any]], sign: int) -> None:
+        for row in rows:
+            anzahl = sign * int(row['anzahl'])
+            for key in ('downloads', f"status.{row['status']}", f"provider.{row['provider_id']}",
+                        f"sprache.{row['language_id']}"):
+                deltas[key] = deltas.get(key, 0) + anzahl
+            deltas['downloads.mit_groesse'] = deltas.get('downloads.mit_groesse', 0) + sign * int(row['mit_groesse'])
+            deltas['downloads.bytes'] = deltas.get('downloads.bytes', 0) + sign * int(row['bytes'])
+    
+    @classmethod
+    def removal_statements(cls, repo: BaseRepository, series_id: int,
+                           episode_id: Optional[int] = None) -> List[Tuple[str, Tuple]]:
+        """
+        Erzeugt die Anweisungen, die das Löschen eines Anime bzw. einer Episode samt der per
+        ON DELETE CASCADE mitgelöschten Zeilen aus den Statistiken herausrechnen
+        
+        Gelesen werden nur die Staffeln, Episoden und Downloads dieses Anime bzw. dieser Episode.
+        
+        Args:
+            repo: Repository, das löscht (die Abfragen laufen über dessen Verbindung)
+            series_id: ID des Anime (bei einer Episode: der Anime der Episode)
+            episode_id: ID der Episode, wenn nur diese gelöscht wird
+            
+        Returns:
+            Liste von (Abfrage, Parameter) für BaseRepository._execute_update
+        """
+        statements = []
+        if not cls.maintained():
+            return statements
+        if episode_id is None:
+            row = repo._execute_query(  # pylint: disable=protected-access
+                "SELECT staffeln, episoden FROM statistik_anime WHERE series_id = %s", (series_id,), fetch_one=True
+            ) or {'staffeln': 0, 'episoden': 0}
+            deltas = {'anime': -1, 'staffeln': -int(row['staffeln']), 'episoden': -int(row['episoden'])}
+            where, params = "WHERE s.series_id = %s", (series_id,)
+        else:
+            deltas = {'episoden': -1}
+            where, params = "WHERE d.episode_id = %s", (episode_id,)
+            statements.append(("UPDATE statistik_anime SET episoden = episoden - 1 WHERE series_id = %s", (series_id,)))
+        
+        rows = repo._execute_query(cls.DOWNLOAD_GROUPS_QUERY.format(where=where), params)  # pylint: disable=protected-access
+        cls._add_download_groups(deltas, rows, -1)
+        return statements + cls.counter_statements(deltas)
+    
+    def get_counters(self) -> Dict[str, int]:
+        """
+        Liest alle Zähler; wurden die Statistiken noch nie berechnet, werden sie zuerst aufgebaut
+        
+        Returns:
+            Zählername -> Wert
+        """
+        if not self.maintained():
+            # ohne Statistiktabellen (Migration nicht gelaufen) direkt aus den Tabellen zählen
+            with self._timed(), self.db.get_connection() as conn:
+                return self._count(conn.cursor(dictionary=True))
+        
+        rows = self._execute_query("SELECT schluessel, wert FROM statistik_zaehler")
+        counters = {row['schluessel']: int(row['wert']) for row in rows}
+        if self.BUILT_KEY not in counters:
+            self.logger.info("Statistiken noch nicht aufgebaut, berechne sie einmalig neu")
+            counters = self.rebuild()
+        return counters
+    
+    def find_top_anime(self, limit: int = 5) -> List[Tuple[AnimeSeries, int]]:
+        """
+        Gibt die Anime mit den meisten Episoden zurück (über den Index auf statistik_anime.episoden)
+        
+        Args:
+            limit: Anzahl der zurückzugebenden Anime
+            
+        Returns:
+            Liste von Tupeln aus (AnimeSeries, Episodenanzahl)
+        """
+        if self.maintained():
+            source = "statistik_anime st"
+        else:
+            # ohne statistik_anime (Migration nicht gelaufen) über alle Episoden zählen
+            source = """(SELECT s.series_id, COUNT(*) AS episoden FROM episodes e
+                  JOIN seasons s ON e.season_id = s.season_id GROUP BY s.series_id) st"""
+        query = f"""
+            SELECT a.series_id, a.titel, a.original_titel, a.beschreibung, 
+                   a.erscheinungsjahr, a.status, a.studio, a.regisseur, 
+                   a.aniworld_url, a.cover_url, {self._cover_hash_column('a.')}, a.aktualisiert_am,
+                   st.episoden
+            FROM {source}
+            JOIN anime_series a ON a.series_id = st.series_id
+            WHERE st.episoden > 0
+            ORDER BY st.episoden DESC
+            LIMIT %s
+        """
+        top_anime = []
+        for row in self._execute_query(query, (limit,)):
+            anime = AnimeSeries(
+                series_id=row['series_id'],
+                titel=row['titel'],
+                original_titel=row['original_titel'],
+                beschreibung=row['beschreibung'],
+                erscheinungsjahr=row['erscheinungsjahr'],
+                status=row['status'],
+                studio=row['studio'],
+                regisseur=row['regisseur'],
+                aniworld_url=row['aniworld_url'],
+                cover_url=row['cover_url'],
+                cover_hash=row['cover_hash'],
+                aktualisiert_am=row['aktualisiert_am']
+            )
+            top_anime.append((anime, int(row['episoden'])))
+        return top_anime
+    
+    def find_recent_downloads(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Gibt die zuletzt angelegten Downloads mit Episode und Anime zurück (über den Index auf download_datum)
+        
+        Args:
+            limit: Anzahl der zurückzugebenden Downloads
+            
+        Returns:
+            Liste von Dictionaries
+        """
+        query = """
+            SELECT d.download_id, d.status, d.lokaler_pfad, d.provider_id, d.language_id,
+                   d.download_datum, e.episode_nummer, e.titel AS episode_titel,
+                   s.staffel_nummer, a.titel AS anime_titel
+            FROM downloads d
+            JOIN episodes e ON d.episode_id = e.episode_id
+            JOIN seasons s ON e.season_id = s.season_id
+            JOIN anime_series a ON s.series_id = a.series_id
+            ORDER BY d.download_datum DESC
+            LIMIT %s
+        """
+        return self._execute_query(query, (limit,))
+    
+    def _count(self, cursor: Any) -> Dict[str, int]:
+        counters = {self.BUILT_KEY: 1}
+        for key, table in (('anime', 'anime_series'), ('staffeln', 'seasons'),
+                           ('episoden', 'episodes'), ('downloads', 'downloads')):
+            cursor.execute(f"SELECT COUNT(*) AS anzahl FROM {table}")
+            counters[key] = int(cursor.fetchone()['anzahl'])
+        
+        cursor.execute(self.DOWNLOAD_GROUPS_QUERY.format(where=""))
+        groups = {'downloads.bytes': 0, 'downloads.mit_groesse': 0}
+        self._add_download_groups(groups, cursor.fetchall(), 1)
+        # 'downloads' stammt aus COUNT(*) oben und wird hier nicht doppelt gezählt
+        groups.pop('downloads', None)
+        counters.update(groups)
+        return counters
+    
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Berechnet alle Statistiken aus den Tabellen neu (Reparatur, z.B. nach Änderungen an der
+        Datenbank an den Repositories vorbei). Liest dafür einmal alle Tabellen.
+        
+        Returns:
+            Die neu berechneten Zähler
+        """
+        with self._timed(), self.db.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            counters = self._count(cursor)
+            
+            cursor.execute("DELETE FROM statistik_zaehler")
+            cursor.execute("DELETE FROM statistik_anime")
+            for key, value in counters.items():
+                cursor.execute("INSERT INTO statistik_zaehler (schluessel, wert) VALUES (%s, %s)", (key, value))
+            cursor.execute("""
+                INSERT INTO statistik_anime (series_id, staffeln, episoden)
+                SELECT a.series_id,
+                       (SELECT COUNT(*) FROM seasons s WHERE s.series_id = a.series_id),
+                       (SELECT COUNT(*) FROM episodes e JOIN seasons s ON e.season_id = s.season_id
+                        WHERE s.series_id = a.series_id)
+                FROM anime_series a
+            """)
+            conn.commit()
+        
+        self.logger.info("Statistiken neu aufgebaut: %d Anime, %d Episoden, %d Downloads",
+                         counters['anime'], counters['episoden'], counters['downloads'])
+        return counters
@@ -0,0 +1,369 @@
+-- SQLite-Fassung von create_database.sql für das eingebettete Backend (backend = sqlite).
+-- Tabellen, Spalten und Standarddaten müssen mit create_database.sql übereinstimmen
+-- (geprüft in tests/database/test_sqlite_backend.py). Abweichungen:
+--   AUTO_INCREMENT -> AUTOINCREMENT, ENUM -> TEXT mit CHECK, YEAR -> INTEGER,
+--   CURRENT_TIMESTAMP -> datetime('now', 'localtime') wie NOW() in MySQL,
+--   ON UPDATE CURRENT_TIMESTAMP -> Trigger am Dateiende.
+
+-- Tabelle für Sprachen
+CREATE TABLE languages (
+    language_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    code VARCHAR(10) NOT NULL UNIQUE
+);
+
+-- Tabelle für Provider
+CREATE TABLE providers (
+    provider_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    base_url VARCHAR(255),
+    aktiv BOOLEAN DEFAULT 1
+);
+
+-- Tabelle für Genres/Kategorien
+CREATE TABLE genres (
+    genre_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    beschreibung TEXT
+);
+
+-- Haupttabelle für Anime-Serien
+CREATE TABLE anime_series (
+    series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    titel VARCHAR(255) NOT NULL,
+    original_titel VARCHAR(255),
+    beschreibung TEXT,
+    cover_url VARCHAR(255),
+    cover_hash CHAR(64),
+    erscheinungsjahr INTEGER,
+    status TEXT CHECK (status IN ('laufend', 'abgeschlossen', 'angekündigt')) DEFAULT 'laufend',
+    studio VARCHAR(100),
+    regisseur VARCHAR(100),
+    zielgruppe TEXT CHECK (zielgruppe IN ('Shonen', 'Seinen', 'Shojo', 'Josei', 'Kodomo', 'Allgemein')),
+    fsk VARCHAR(10),
+    bewertung DECIMAL(3,1),
+    aniworld_url VARCHAR(255) UNIQUE,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Verknüpfungstabelle zwischen Anime und Genres (n:m)
+CREATE TABLE anime_genres (
+    series_id INT,
+    genre_id INT,
+    PRIMARY KEY (series_id, genre_id),
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE,
+    FOREIGN KEY (genre_id) REFERENCES genres(genre_id) ON DELETE CASCADE
+);
+
+-- Tabelle für Staffeln
+CREATE TABLE seasons (
+    season_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    series_id INT NOT NULL,
+    staffel_nummer INT NOT NULL,
+    titel VARCHAR(255),
+    beschreibung TEXT,
+    erscheinungsjahr INTEGER,
+    anzahl_episoden INT,
+    aniworld_url VARCHAR(255),
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE,
+    UNIQUE (series_id, staffel_nummer)
+);
+
+-- Tabelle für Episoden
+CREATE TABLE episodes (
+    episode_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    season_id INT NOT NULL,
+    episode_nummer INT NOT NULL,
+    titel VARCHAR(255),
+    beschreibung TEXT,
+    laufzeit INT,
+    luftdatum DATE,
+    aniworld_url VARCHAR(255) UNIQUE,
+    FOREIGN KEY (season_id) REFERENCES seasons(season_id) ON DELETE CASCADE,
+    UNIQUE (season_id, episode_nummer)
+);
+
+-- Tabelle für VPN-Dienste
+CREATE TABLE vpn_services (
+    vpn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    aktiv BOOLEAN DEFAULT 0,
+    standard_service BOOLEAN DEFAULT 0,
+    api_basis_url VARCHAR(255),
+    beschreibung TEXT,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Tabelle für VPN-Zugangsdaten (mit Verschlüsselung)
+CREATE TABLE vpn_credentials (
+    credential_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vpn_id INT NOT NULL,
+    benutzername VARCHAR(255) NOT NULL,
+    passwort_verschluesselt VARBINARY(512) NOT NULL,
+    initialisierungsvektor VARBINARY(255),
+    api_token_verschluesselt VARBINARY(512),
+    api_token_ablauf DATETIME,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (vpn_id) REFERENCES vpn_services(vpn_id) ON DELETE CASCADE
+);
+
+-- Tabelle für VPN-Server
+CREATE TABLE vpn_servers (
+    server_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vpn_id INT NOT NULL,
+    server_name VARCHAR(255) NOT NULL,
+    server_adresse VARCHAR(255) NOT NULL,
+    land VARCHAR(100),
+    stadt VARCHAR(100),
+    protokoll TEXT CHECK (protokoll IN ('UDP', 'TCP', 'IKEv2', 'OpenVPN', 'WireGuard', 'SOCKS5')) DEFAULT 'UDP',
+    port INT,
+    last_ping INT,
+    last_ping_time TIMESTAMP,
+    max_geschwindigkeit INT,
+    belastung DECIMAL(5,2),
+    favorit BOOLEAN DEFAULT 0,
+    FOREIGN KEY (vpn_id) REFERENCES vpn_services(vpn_id) ON DELETE CASCADE
+);
+
+-- Tabelle für Pfade (Download-Verzeichnisse)
+CREATE TABLE download_pfade (
+    pfad_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pfad VARCHAR(255) NOT NULL,
+    beschreibung VARCHAR(255),
+    standard_pfad BOOLEAN DEFAULT 0,
+    verfuegbar BOOLEAN DEFAULT 1,
+    freier_speicherplatz BIGINT,
+    gesamter_speicherplatz BIGINT,
+    aktiv BOOLEAN DEFAULT 1,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Tabelle für Downloads
+CREATE TABLE downloads (
+    download_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    episode_id INT NOT NULL,
+    provider_id INT NOT NULL,
+    language_id INT NOT NULL,
+    speicherlink VARCHAR(255) NOT NULL,
+    lokaler_pfad VARCHAR(255),
+    dateigroesse BIGINT,
+    qualitaet VARCHAR(20),
+    download_datum TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    format VARCHAR(10),
+    hash_wert VARCHAR(64),
+    status TEXT CHECK (status IN ('geplant', 'läuft', 'abgeschlossen', 'fehlgeschlagen')) DEFAULT 'geplant',
+    notizen TEXT,
+    download_pfad_id INT,
+    vpn_genutzt BOOLEAN DEFAULT 0,
+    vpn_id INT,
+    vpn_server_id INT,
+    download_geschwindigkeit DECIMAL(10,2),
+    benutzer_id INT,
+    FOREIGN KEY (episode_id) REFERENCES episodes(episode_id) ON DELETE CASCADE,
+    FOREIGN KEY (provider_id) REFERENCES providers(provider_id) ON DELETE RESTRICT,
+    FOREIGN KEY (language_id) REFERENCES languages(language_id) ON DELETE RESTRICT,
+    FOREIGN KEY (download_pfad_id) REFERENCES download_pfade(pfad_id) ON DELETE SET NULL,
+    FOREIGN KEY (vpn_id) REFERENCES vpn_services(vpn_id) ON DELETE SET NULL,
+    FOREIGN KEY (vpn_server_id) REFERENCES vpn_servers(server_id) ON DELETE SET NULL
+);
+
+-- Tabelle für Tags (zusätzliche Schlagwörter)
+CREATE TABLE tags (
+    tag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE
+);
+
+-- Verknüpfungstabelle zwischen Anime und Tags (n:m)
+CREATE TABLE anime_tags (
+    series_id INT,
+    tag_id INT,
+    PRIMARY KEY (series_id, tag_id),
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES tags(tag_id) ON DELETE CASCADE
+);
+
+-- Tabelle für Benutzer (für WebUI)
+CREATE TABLE benutzer (
+    benutzer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    benutzername VARCHAR(50) NOT NULL UNIQUE,
+    passwort_hash VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    vorname VARCHAR(100),
+    nachname VARCHAR(100),
+    rolle TEXT CHECK (rolle IN ('admin', 'poweruser', 'normal', 'gast')) DEFAULT 'normal',
+    aktiv BOOLEAN DEFAULT 1,
+    letzter_login TIMESTAMP,
+    api_token VARCHAR(255),
+    api_token_ablauf DATETIME,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Tabelle für Benutzereinstellungen
+CREATE TABLE benutzer_einstellungen (
+    einstellung_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    benutzer_id INT NOT NULL,
+    standard_download_pfad_id INT,
+    bevorzugte_sprache_id INT,
+    bevorzugter_provider_id INT,
+    standard_qualitaet VARCHAR(20),
+    vpn_nutzen BOOLEAN DEFAULT 0,
+    bevorzugter_vpn_id INT,
+    bevorzugter_vpn_server_id INT,
+    benachrichtigungen_aktiv BOOLEAN DEFAULT 1,
+    dark_mode BOOLEAN DEFAULT 0,
+    FOREIGN KEY (benutzer_id) REFERENCES benutzer(benutzer_id) ON DELETE CASCADE,
+    FOREIGN KEY (standard_download_pfad_id) REFERENCES download_pfade(pfad_id) ON DELETE SET NULL,
+    FOREIGN KEY (bevorzugte_sprache_id) REFERENCES languages(language_id) ON DELETE SET NULL,
+    FOREIGN KEY (bevorzugter_provider_id) REFERENCES providers(provider_id) ON DELETE SET NULL,
+    FOREIGN KEY (bevorzugter_vpn_id) REFERENCES vpn_services(vpn_id) ON DELETE SET NULL,
+    FOREIGN KEY (bevorzugter_vpn_server_id) REFERENCES vpn_servers(server_id) ON DELETE SET NULL
+);
+
+-- Tabelle für Benutzer-Bewertungen und Kommentare
+CREATE TABLE user_ratings (
+    rating_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    series_id INT,
+    bewertung DECIMAL(3,1) NOT NULL CHECK (bewertung BETWEEN 0 AND 10),
+    kommentar TEXT,
+    benutzer_name VARCHAR(100) NOT NULL,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE
+);
+
+-- Tabelle für Wiedergabestatus
+CREATE TABLE playback_status (
+    status_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    episode_id INT NOT NULL,
+    benutzer_name VARCHAR(100) NOT NULL,
+    position INT,
+    abgeschlossen BOOLEAN DEFAULT 0,
+    letzter_zugriff TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (episode_id) REFERENCES episodes(episode_id) ON DELETE CASCADE,
+    UNIQUE (episode_id, benutzer_name)
+);
+
+-- Tabelle für allgemeine Systemkonfiguration
+CREATE TABLE konfiguration (
+    config_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    schluessel VARCHAR(100) NOT NULL UNIQUE,
+    wert TEXT,
+    beschreibung TEXT,
+    kategorie VARCHAR(100) NOT NULL,
+    typ TEXT CHECK (typ IN ('text', 'zahl', 'boolean', 'json', 'pfad')) NOT NULL,
+    bearbeitbar BOOLEAN DEFAULT 1,
+    erstellt_am TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    aktualisiert_am TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Materialisierte Statistiken (für --db-stats, laufend von den Repositories fortgeschrieben)
+CREATE TABLE statistik_zaehler (
+    schluessel VARCHAR(100) PRIMARY KEY,
+    wert BIGINT NOT NULL DEFAULT 0
+);
+
+-- Staffeln und Episoden pro Anime (für die Top-Liste ohne JOIN über alle Episoden)
+CREATE TABLE statistik_anime (
+    series_id INT PRIMARY KEY,
+    staffeln INT NOT NULL DEFAULT 0,
+    episoden INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_statistik_anime_episoden ON statistik_anime (episoden);
+CREATE INDEX idx_downloads_datum ON downloads (download_datum);
+
+-- Standarddaten für Sprachen einfügen
+INSERT INTO languages (name, code) VALUES 
+('German Dub', 'de_dub'),
+('German Sub', 'de_sub'),
+('English Sub', 'en_sub');
+
+-- Standarddaten für Provider einfügen
+INSERT INTO providers (name, base_url) VALUES 
+('Vidoza', 'https://vidoza.net'),
+('VOE', 'https://voe.sx'),
+('Doodstream', 'https://dood.to'),
+('Vidmoly', 'https://vidmoly.to'),
+('Streamtape', 'https://streamtape.com'),
+('SpeedFiles', NULL);
+
+-- Eintrag für NordVPN
+INSERT INTO vpn_services (name, aktiv, standard_service, api_basis_url, beschreibung) VALUES
+('NordVPN', 1, 1, 'https://api.nordvpn.com', 'NordVPN-Dienst für sichere Downloads');
+
+-- Standardwerte für Konfiguration
+INSERT INTO konfiguration (schluessel, wert, beschreibung, kategorie, typ) VALUES
+('standard_download_pfad', '/home/media/downloads', 'Standardpfad für Downloads', 'downloads', 'pfad'),
+('max_gleichzeitige_downloads', '3', 'Maximale Anzahl gleichzeitiger Downloads', 'downloads', 'zahl'),
+('download_geschwindigkeit_limit', '0', '0 = unbegrenzt, sonst in KB/s', 'downloads', 'zahl'),
+('vpn_immer_nutzen', 'true', 'VPN für alle Downloads aktivieren', 'sicherheit', 'boolean'),
+('automatisches_tagging', 'true', 'Automatische Erstellung von Tags basierend auf Metadaten', 'metadaten', 'boolean'),
+('webui_port', '8080', 'Port für die WebUI', 'server', 'zahl'),
+('api_token_lebensdauer', '86400', 'Lebensdauer von API-Tokens in Sekunden (24h)', 'sicherheit', 'zahl');
+
+-- Standardpfad für Downloads einfügen
+INSERT INTO download_pfade (pfad, beschreibung, standard_pfad) VALUES
+('/home/media/downloads', 'Standard-Download-Verzeichnis', 1);
+
+-- Leere Datenbank: Statistiken sind aktuell und müssen nicht neu aufgebaut werden
+INSERT INTO statistik_zaehler (schluessel, wert) VALUES ('aufgebaut', 1);
+
+-- Admin-Benutzer für WebUI erstellen
+INSERT INTO benutzer (benutzername, passwort_hash, email, vorname, nachname, rolle) VALUES
+('admin', '$2y$10$3eJwbj.XgmpjR5zF4UCdje1wxKymVjXWU2ipFXZOfrUfTjC5jBgEW', 'admin@example.com', 'Admin', 'User', 'admin');
+-- Passwort-Hash für 'admin123'
+
+-- Ersatz für ON UPDATE CURRENT_TIMESTAMP (greift nur, wenn das UPDATE die Spalte nicht selbst setzt)
+CREATE TRIGGER anime_series_aktualisiert_am
+AFTER UPDATE ON anime_series
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE anime_series SET aktualisiert_am = datetime('now', 'localtime') WHERE series_id = NEW.series_id;
+END;
+
+CREATE TRIGGER vpn_services_aktualisiert_am
+AFTER UPDATE ON vpn_services
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE vpn_services SET aktualisiert_am = datetime('now', 'localtime') WHERE vpn_id = NEW.vpn_id;
+END;
+
+CREATE TRIGGER vpn_credentials_aktualisiert_am
+AFTER UPDATE ON vpn_credentials
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE vpn_credentials SET aktualisiert_am = datetime('now', 'localtime') WHERE credential_id = NEW.credential_id;
+END;
+
+CREATE TRIGGER download_pfade_aktualisiert_am
+AFTER UPDATE ON download_pfade
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE download_pfade SET aktualisiert_am = datetime('now', 'localtime') WHERE pfad_id = NEW.pfad_id;
+END;
+
+CREATE TRIGGER benutzer_aktualisiert_am
+AFTER UPDATE ON benutzer
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE benutzer SET aktualisiert_am = datetime('now', 'localtime') WHERE benutzer_id = NEW.benutzer_id;
+END;
+
+CREATE TRIGGER playback_status_letzter_zugriff
+AFTER UPDATE ON playback_status
+FOR EACH ROW WHEN NEW.letzter_zugriff IS OLD.letzter_zugriff
+BEGIN
+    UPDATE playback_status SET letzter_zugriff = datetime('now', 'localtime') WHERE status_id = NEW.status_id;
+END;
+
+CREATE TRIGGER konfiguration_aktualisiert_am
+AFTER UPDATE ON konfiguration
+FOR EACH ROW WHEN NEW.aktualisiert_am IS OLD.aktualisiert_am
+BEGIN
+    UPDATE konfiguration SET aktualisiert_am = datetime('now', 'localtime') WHERE config_id = NEW.config_id;
+END;
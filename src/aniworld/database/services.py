@@ -5,23 +5,40 @@ Verbinden Repository-Zugriffe mit der Anwendungslogik
 
 import logging
 import os
-from typing import List, Optional, Dict, Any, Tuple, Union
+import time
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
 from datetime import datetime
 import hashlib
-import requests
 from io import BytesIO
 
+from .cover_store import get_cover_fetcher
+from .write_behind import get_writer
 from .models import (
     AnimeSeries, Season, Episode, Download, Provider, 
     Language, Genre, Tag, VpnService, DownloadPfad, Benutzer
 )
 from .repositories import (
-    AnimeRepository, SeasonRepository, EpisodeRepository, DownloadRepository
+    AnimeRepository, SeasonRepository, EpisodeRepository, DownloadRepository, StatisticsRepository
 )
 
 class LookupService:
     """Service für das Nachschlagen von IDs und Codes"""
     
+    # Mapping-Tabellen statt Datenbankabfragen (IDs wie in create_database.sql)
+    PROVIDER_IDS = {
+        "VOE": 2,
+        "Vidoza": 1,
+        "Doodstream": 3,
+        "Vidmoly": 4,
+        "Streamtape": 5,
+        "SpeedFiles": 6
+    }
+    LANGUAGE_IDS = {
+        "German Dub": 1,
+        "German Sub": 2,
+        "English Sub": 3
+    }
+    
     @staticmethod
     def get_provider_id(provider_name: str) -> int:
         """
@@ -34,15 +51,7 @@ class LookupService:
         Returns:
             Provider-ID oder 0, wenn nicht gefunden
         """
-        provider_map = {
-            "VOE": 2,
-            "Vidoza": 1,
-            "Doodstream": 3,
-            "Vidmoly": 4,
-            "Streamtape": 5,
-            "SpeedFiles": 6
-        }
-        return provider_map.get(provider_name, 0)
+        return LookupService.PROVIDER_IDS.get(provider_name, 0)
     
     @staticmethod
     def get_language_id(language_name: str) -> int:
@@ -56,12 +65,33 @@ class LookupService:
         Returns:
             Sprach-ID oder 0, wenn nicht gefunden
         """
-        language_map = {
-            "German Dub": 1,
-            "German Sub": 2,
-            "English Sub": 3
-        }
-        return language_map.get(language_name, 0)
+        return LookupService.LANGUAGE_IDS.get(language_name, 0)
+    
+    @staticmethod
+    def get_provider_name(provider_id: int) -> Optional[str]:
+        """
+        Gibt den Namen eines Providers anhand seiner ID zurück
+        
+        Args:
+            provider_id: ID des Providers
+            
+        Returns:
+            Name des Providers oder None, wenn nicht gefunden
+        """
+        return next((name for name, pid in LookupService.PROVIDER_IDS.items() if pid == provider_id), None)
+    
+    @staticmethod
+    def get_language_name(language_id: int) -> Optional[str]:
+        """
+        Gibt den Namen einer Sprache anhand ihrer ID zurück
+        
+        Args:
+            language_id: ID der Sprache
+            
+        Returns:
+            Name der Sprache oder None, wenn nicht gefunden
+        """
+        return next((name for name, lid in LookupService.LANGUAGE_IDS.items() if lid == language_id), None)
 
 
 class AnimeService:
@@ -204,6 +234,19 @@ class AnimeService:
         """
         return self.anime_repo.find_all()
     
+    def iter_animes(self, status: Optional[str] = None, search: Optional[str] = None) -> Iterator[AnimeSeries]:
+        """
+        Liefert die Anime-Serien nacheinander, ohne alle auf einmal zu laden.
+        
+        Args:
+            status: Nur Serien mit diesem Status
+            search: Nur Serien, deren Titel diesen Text enthält
+            
+        Returns:
+            Iterator über AnimeSeries-Objekte, sortiert nach ID
+        """
+        return self.anime_repo.iter_all(status=status, search=search)
+    
     def get_episode_by_url(self, url: str) -> Optional[Episode]:
         """
         Findet eine Episode anhand ihrer URL.
@@ -216,6 +259,26 @@ class AnimeService:
         """
         return self.episode_repo.find_by_url(url)
     
+    def fetch_cover(self, anime: AnimeSeries):
+        """
+        Lädt das Cover einer Anime-Serie in den Cover-Speicher und speichert den Hash,
+        sobald das Bild vorliegt und sich geändert hat
+        
+        Args:
+            anime: AnimeSeries-Objekt mit series_id und cover_url
+            
+        Returns:
+            Future aus dem CoverFetcher mit dem Hash des Covers
+        """
+        series_id, known_hash = anime.series_id, anime.cover_hash
+        
+        def store_hash(cover_hash: str) -> None:
+            if cover_hash != known_hash:
+                self.anime_repo.save_cover_hash(series_id, cover_hash)
+                logging.info(f"Cover-Bild für Anime {series_id} gespeichert")
+        
+        return get_cover_fetcher().submit(anime.cover_url, store_hash)
+    
     def save_from_scraper_data(self, anime_data: Dict[str, Any]) -> int:
         """
         Speichert Daten, die vom Scraper gesammelt wurden, in der Datenbank
@@ -247,15 +310,9 @@ class AnimeService:
         self.anime_repo.save(anime)
         logging.debug(f"AnimeService: Anime-Grunddaten gespeichert für ID {anime.series_id}")
         
-        # Speichere Cover-Bild, wenn URL vorhanden und noch nicht gespeichert
-        if anime.cover_url and not anime.cover_data:
-            try:
-                response = requests.get(anime.cover_url, timeout=10)
-                if response.status_code == 200:
-                    self.anime_repo.save_cover_data(anime.series_id, response.content)
-                    logging.info(f"Cover-Bild für Anime {anime.series_id} gespeichert")
-            except Exception as e:
-                logging.error(f"Fehler beim Speichern des Cover-Bilds: {e}")
+        # Cover-Bild im Hintergrund laden bzw. bedingt prüfen, die Ingestion wartet nicht darauf
+        if anime.cover_url:
+            self.fetch_cover(anime)
         
         # Verarbeite Staffel- und Episodeninformationen, wenn vorhanden
         if 'seasons' in anime_data:
@@ -309,6 +366,139 @@ class AnimeService:
         return anime.series_id
 
 
+class DownloadLifecycle:
+    """
+    Ein Download vom Start bis zum Ende
+    
+    Angelegt wird der Download mit einem einzigen INSERT (Status 'läuft'). Danach werden nur
+    noch einzelne Spalten geschrieben: Fortschritt (Bytes, Geschwindigkeit) höchstens alle
+    progress_interval Sekunden, am Ende Status, Größe, Hash und Format in einer Anweisung.
+    Da der bisherige Stand hier bekannt ist, wird der Download dafür nicht erneut gelesen.
+    """
+    
+    # Mindestabstand zwischen zwei Fortschrittsschreibvorgängen in Sekunden
+    PROGRESS_INTERVAL = 5.0
+    
+    def __init__(self, service: 'DownloadService', download: Download,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        self.service = service
+        self.download = download
+        self.progress_interval = progress_interval
+        self.started_at = time.monotonic()
+        self.downloaded_at: Optional[float] = None
+        self._last_write = self.started_at
+        self._pending: Dict[str, Any] = {}
+    
+    @property
+    def download_id(self) -> int:
+        return self.download.download_id
+    
+    def _write(self, columns: Dict[str, Any]) -> bool:
+        """
+        Schreibt geänderte Spalten und die daraus folgenden Zähleränderungen
+        
+        Args:
+            columns: Spaltenname -> neuer Wert
+            
+        Returns:
+            True, wenn der Download existiert
+        """
+        columns = {k: v for k, v in columns.items() if getattr(self.download, k) != v}
+        if not columns:
+            return True
+        
+        previous = Download(**vars(self.download))
+        for column, value in columns.items():
+            setattr(self.download, column, value)
+        deltas = StatisticsRepository.merge_deltas(
+            StatisticsRepository.download_deltas(previous, -1),
+            StatisticsRepository.download_deltas(self.download, 1)
+        )
+        
+        self._last_write = time.monotonic()
+        writer = get_writer()
+        if writer is not None:
+            writer.submit('download', self.download_id,
+                          {'download_id': self.download_id, 'columns': columns, 'deltas': deltas})
+            return True
+        return self.service.download_repo.update_columns(self.download_id, columns, deltas)
+    
+    def progress(self, info: Dict[str, Any]) -> bool:
+        """
+        Nimmt eine Fortschrittsmeldung des Downloaders entgegen (siehe aniworld.common.downloader)
+        
+        Args:
+            info: Dictionary mit 'downloaded_bytes' und 'speed' (Bytes pro Sekunde)
+            
+        Returns:
+            True, wenn die Meldung in die Datenbank geschrieben wurde
+        """
+        if info.get('downloaded_bytes') is not None:
+            self._pending['dateigroesse'] = int(info['downloaded_bytes'])
+        if info.get('speed'):
+            self._pending['download_geschwindigkeit'] = round(info['speed'] / (1024 * 1024), 3)
+        
+        if not self._pending or time.monotonic() - self._last_write < self.progress_interval:
+            return False
+        
+        pending, self._pending = self._pending, {}
+        try:
+            self._write(pending)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # ein fehlgeschlagener Zwischenstand darf den Download nicht abbrechen
+            logging.warning(f"Fortschritt für Download {self.download_id} nicht gespeichert: {e}")
+            return False
+        return True
+    
+    def downloaded(self) -> None:
+        """
+        Merkt das Ende der Übertragung vor
+        
+        Wird der Download erst nach einer Nachbearbeitung abgeschlossen, zählt deren Dauer
+        so nicht zur Durchschnittsgeschwindigkeit.
+        """
+        self.downloaded_at = time.monotonic()
+    
+    def finish(self, status: str = "abgeschlossen", notizen: Optional[str] = None,
+               columns: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Schließt den Download ab
+        
+        Größe, Durchschnittsgeschwindigkeit, Hash und Format werden bei einer vorhandenen
+        Zieldatei aus dieser bestimmt. 'abgebrochen' ist kein eigener Status, sondern wird als
+        'fehlgeschlagen' mit entsprechender Notiz gespeichert.
+        
+        Args:
+            status: Endstatus ('abgeschlossen', 'fehlgeschlagen' oder 'abgebrochen')
+            notizen: Notiz (optional)
+            columns: Weitere zu setzende Spalten (optional)
+            
+        Returns:
+            True, wenn der Download existiert
+        """
+        if status == "abgebrochen":
+            status, notizen = "fehlgeschlagen", notizen or "abgebrochen"
+        
+        columns = {**self._pending, **(columns or {}), 'status': status}
+        self._pending = {}
+        if notizen:
+            columns['notizen'] = notizen
+        
+        path = columns.get('lokaler_pfad') or self.download.lokaler_pfad
+        if status == "abgeschlossen" and path and os.path.exists(path):
+            size = os.path.getsize(path)
+            elapsed = (self.downloaded_at or time.monotonic()) - self.started_at
+            columns['dateigroesse'] = size
+            if elapsed > 0:
+                columns['download_geschwindigkeit'] = round(size / elapsed / (1024 * 1024), 3)
+            columns['hash_wert'] = self.service._calculate_file_hash(path)  # pylint: disable=protected-access
+            columns['format'] = self.service._get_file_format(path)  # pylint: disable=protected-access
+        
+        result = self._write(columns)
+        logging.info(f"Download {self.download_id} beendet mit Status {status}")
+        return result
+
+
 class DownloadService:
     """Service für Download-Verwaltung"""
     
@@ -337,24 +527,22 @@ class DownloadService:
         Returns:
             ID des aufgezeichneten Downloads oder None, wenn fehlgeschlagen
         """
-        # Finde Episode, Staffel und Serie
-        result = self.anime_service.get_episode_by_url(episode_url)
-        if not result:
-            logging.error(f"Episode für URL {episode_url} nicht gefunden")
+        # Finde die Episode
+        episode = self.anime_service.get_episode_by_url(episode_url)
+        if not episode:
+            logging.warning(f"Episode für URL {episode_url} nicht gefunden")
             return None
         
-        anime, season, episode = result
-        
         # Finde Provider und Sprache
         provider_id = self.lookup_service.get_provider_id(provider_name)
         language_id = self.lookup_service.get_language_id(language_name)
         
         if provider_id == 0:
-            logging.error(f"Provider {provider_name} nicht gefunden")
+            logging.warning(f"Provider {provider_name} nicht gefunden")
             return None
         
         if language_id == 0:
-            logging.error(f"Sprache {language_name} nicht gefunden")
+            logging.warning(f"Sprache {language_name} nicht gefunden")
             return None
         
         # Berechne Hash-Wert für die Datei, wenn lokaler Pfad vorhanden
@@ -384,6 +572,54 @@ class DownloadService:
         
         return download_id
     
+    def start_download(self, episode_url: str, provider_name: str, language_name: str,
+                       speicherlink: str, lokaler_pfad: str,
+                       progress_interval: float = DownloadLifecycle.PROGRESS_INTERVAL) -> Optional[DownloadLifecycle]:
+        """
+        Legt einen laufenden Download mit einem einzigen INSERT an
+        
+        Args:
+            episode_url: AniWorld-URL der Episode
+            provider_name: Name des Providers (z.B. "VOE", "Vidoza")
+            language_name: Name der Sprache (z.B. "German Dub", "English Sub")
+            speicherlink: Direkter Link zum Herunterladen
+            lokaler_pfad: Zieldatei
+            progress_interval: Mindestabstand zwischen zwei Fortschrittsschreibvorgängen in Sekunden
+            
+        Returns:
+            DownloadLifecycle für Fortschritt und Abschluss oder None, wenn Episode, Provider
+            oder Sprache unbekannt sind
+        """
+        # mit write_behind ist der Anime der Episode womöglich erst eingereiht
+        writer = get_writer()
+        if writer is not None and not writer.wait_for(episode_url):
+            logging.debug(f"Anime zu {episode_url} noch nicht gespeichert")
+        
+        episode = self.anime_service.get_episode_by_url(episode_url)
+        if not episode:
+            logging.debug(f"Episode für URL {episode_url} nicht gefunden, Download wird nicht aufgezeichnet")
+            return None
+        
+        provider_id = self.lookup_service.get_provider_id(provider_name)
+        language_id = self.lookup_service.get_language_id(language_name)
+        if provider_id == 0 or language_id == 0:
+            logging.warning(f"Provider {provider_name} oder Sprache {language_name} nicht gefunden")
+            return None
+        
+        download = Download(
+            episode_id=episode.episode_id,
+            provider_id=provider_id,
+            language_id=language_id,
+            speicherlink=speicherlink,
+            lokaler_pfad=lokaler_pfad,
+            format=self._get_file_format(lokaler_pfad),
+            status="läuft"
+        )
+        download.download_id = self.download_repo.save(download)
+        logging.info(f"Download für Episode {episode.episode_id} gestartet (ID: {download.download_id})")
+        
+        return DownloadLifecycle(self, download, progress_interval)
+    
     def update_download_status(self, download_id: int, status: str, 
                             lokaler_pfad: str = None, dateigroesse: int = None,
                             download_geschwindigkeit: float = None) -> bool:
@@ -400,31 +636,25 @@ class DownloadService:
         Returns:
             True, wenn erfolgreich, sonst False
         """
+        # bisheriger Stand (meist aus der Identity-Map) nur für die Statistiken; geschrieben
+        # werden ausschließlich die geänderten Spalten
         download = self.download_repo.find_by_id(download_id)
         if not download:
-            logging.error(f"Download mit ID {download_id} nicht gefunden")
+            logging.warning(f"Download mit ID {download_id} nicht gefunden")
             return False
         
-        download.status = status
-        
+        columns: Dict[str, Any] = {}
         if lokaler_pfad:
-            download.lokaler_pfad = lokaler_pfad
-        
+            columns['lokaler_pfad'] = lokaler_pfad
         if dateigroesse:
-            download.dateigroesse = dateigroesse
-        
+            columns['dateigroesse'] = dateigroesse
         if download_geschwindigkeit:
-            download.download_geschwindigkeit = download_geschwindigkeit
+            columns['download_geschwindigkeit'] = download_geschwindigkeit
         
-        # Bei abgeschlossenem Download Hash berechnen
-        if status == "abgeschlossen" and download.lokaler_pfad and os.path.exists(download.lokaler_pfad):
-            download.hash_wert = self._calculate_file_hash(download.lokaler_pfad)
-            download.format = self._get_file_format(download.lokaler_pfad)
-        
-        self.download_repo.save(download)
+        result = DownloadLifecycle(self, download).finish(status, columns=columns)
         logging.info(f"Download-Status für ID {download_id} aktualisiert auf {status}")
         
-        return True
+        return result
     
     def get_active_downloads(self) -> List[Download]:
         """
@@ -435,6 +665,28 @@ class DownloadService:
         """
         return self.download_repo.find_active_downloads()
     
+    def get_completed_files(self) -> List[Dict[str, Any]]:
+        """
+        Gibt die Zieldateien aller abgeschlossenen Downloads zurück (für den Bibliotheksindex)
+        
+        Returns:
+            Liste von Dictionaries mit episode_url, sprache, lokaler_pfad und dateigroesse
+        """
+        return self.download_repo.find_completed_files()
+    
+    def iter_downloads(self, status: Optional[str] = None, episode_id: Optional[int] = None) -> Iterator[Download]:
+        """
+        Liefert die Downloads nacheinander, ohne alle auf einmal zu laden
+        
+        Args:
+            status: Nur Downloads mit diesem Status
+            episode_id: Nur Downloads dieser Episode
+            
+        Returns:
+            Iterator über Download-Objekte, sortiert nach ID
+        """
+        return self.download_repo.iter_all(status=status, episode_id=episode_id)
+    
     def _calculate_file_hash(self, file_path: str) -> str:
         """
         Berechnet einen SHA-256-Hash für eine Datei
@@ -486,15 +738,21 @@ class DownloadService:
 
 
 class StatisticsService:
-    """Service für Datenbankstatistiken"""
+    """
+    Service für Datenbankstatistiken
+    
+    Liest die materialisierten Statistiken (statistik_zaehler, statistik_anime), die die
+    Repositories beim Speichern und Löschen fortschreiben; die Laufzeit hängt daher nicht
+    von der Größe der Bibliothek ab. rebuild() berechnet sie bei Bedarf komplett neu.
+    """
     
     def __init__(self):
-        """Initialisiert den Statistik-Service mit den erforderlichen Repositories"""
+        """Initialisiert den Statistik-Service mit dem Statistik-Repository"""
         self.logger = logging.getLogger('aniworld.db.service.stats')
-        self.anime_repo = AnimeRepository()
-        self.season_repo = SeasonRepository()
-        self.episode_repo = EpisodeRepository()
-        self.download_repo = DownloadRepository()
+        self.stats_repo = StatisticsRepository()
+    
+    def _counter(self, key: str) -> int:
+        return self.stats_repo.get_counters().get(key, 0)
     
     def count_animes(self) -> int:
         """
@@ -503,9 +761,7 @@ class StatisticsService:
         Returns:
             Anzahl der Anime-Serien
         """
-        query = "SELECT COUNT(*) FROM anime_series"
-        result = self.anime_repo._execute_query_one(query)
-        return result[0] if result else 0
+        return self._counter('anime')
     
     def count_seasons(self) -> int:
         """
@@ -514,9 +770,7 @@ class StatisticsService:
         Returns:
             Anzahl der Staffeln
         """
-        query = "SELECT COUNT(*) FROM seasons"
-        result = self.season_repo._execute_query_one(query)
-        return result[0] if result else 0
+        return self._counter('staffeln')
     
     def count_episodes(self) -> int:
         """
@@ -525,9 +779,7 @@ class StatisticsService:
         Returns:
             Anzahl der Episoden
         """
-        query = "SELECT COUNT(*) FROM episodes"
-        result = self.episode_repo._execute_query_one(query)
-        return result[0] if result else 0
+        return self._counter('episoden')
     
     def count_downloads(self) -> int:
         """
@@ -536,9 +788,7 @@ class StatisticsService:
         Returns:
             Anzahl der Downloads
         """
-        query = "SELECT COUNT(*) FROM downloads"
-        result = self.download_repo._execute_query_one(query)
-        return result[0] if result else 0
+        return self._counter('downloads')
     
     def get_top_anime(self, limit: int = 5) -> List[Tuple[AnimeSeries, int]]:
         """
@@ -550,40 +800,7 @@ class StatisticsService:
         Returns:
             Liste von Tupeln aus (AnimeSeries, Episodenanzahl)
         """
-        query = """
-            SELECT a.series_id, a.titel, a.original_titel, a.beschreibung, 
-                   a.erscheinungsjahr, a.status, a.studio, a.regisseur, 
-                   a.aniworld_url, a.cover_url, a.letzte_aktualisierung,
-                   COUNT(e.episode_id) as episode_count
-            FROM anime_series a
-            JOIN seasons s ON a.series_id = s.series_id
-            JOIN episodes e ON s.season_id = e.season_id
-            GROUP BY a.series_id
-            ORDER BY episode_count DESC
-            LIMIT %s
-        """
-        
-        results = self.anime_repo._execute_query(query, (limit,))
-        top_anime = []
-        
-        for row in results:
-            anime = AnimeSeries(
-                series_id=row[0],
-                titel=row[1],
-                original_titel=row[2],
-                beschreibung=row[3],
-                erscheinungsjahr=row[4],
-                status=row[5],
-                studio=row[6],
-                regisseur=row[7],
-                aniworld_url=row[8],
-                cover_url=row[9],
-                letzte_aktualisierung=row[10]
-            )
-            episode_count = row[11]
-            top_anime.append((anime, episode_count))
-        
-        return top_anime
+        return self.stats_repo.find_top_anime(limit)
     
     def get_recent_downloads(self, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -593,33 +810,13 @@ class StatisticsService:
             limit: Anzahl der zurückzugebenden Downloads
             
         Returns:
-            Liste mit Download-Informationen
-        """
-        query = """
-            SELECT d.download_id, d.status, d.zieldatei, d.sprache, d.provider,
-                   e.titel as episode_titel, s.titel as season_titel, a.titel as anime_titel
-            FROM downloads d
-            JOIN episodes e ON d.episode_id = e.episode_id
-            JOIN seasons s ON e.season_id = s.season_id
-            JOIN anime_series a ON s.series_id = a.series_id
-            ORDER BY d.download_datum DESC
-            LIMIT %s
+            Liste mit Download-Informationen (Provider und Sprache als Namen)
         """
-        
-        results = self.download_repo._execute_query(query, (limit,))
         recent_downloads = []
-        
-        for row in results:
-            download_info = {
-                'download_id': row[0],
-                'status': row[1],
-                'zieldatei': row[2],
-                'sprache': row[3],
-                'provider': row[4],
-                'episode_titel': row[5],
-                'season_titel': row[6],
-                'anime_titel': row[7]
-            }
+        for row in self.stats_repo.find_recent_downloads(limit):
+            download_info = dict(row)
+            download_info['provider'] = LookupService.get_provider_name(row['provider_id']) or row['provider_id']
+            download_info['sprache'] = LookupService.get_language_name(row['language_id']) or row['language_id']
             recent_downloads.append(download_info)
         
         return recent_downloads
@@ -631,49 +828,39 @@ class StatisticsService:
         Returns:
             Dictionary mit Download-Statistiken
         """
+        counters = self.stats_repo.get_counters()
+        
+        def grouped(prefix: str) -> Dict[str, int]:
+            return {key[len(prefix):]: value for key, value in counters.items() if key.startswith(prefix) and value > 0}
+        
         stats = {}
         
         # Gesamtzahl Downloads nach Status
-        query_status = """
-            SELECT status, COUNT(*) 
-            FROM downloads 
-            GROUP BY status
-        """
-        results = self.download_repo._execute_query(query_status)
-        status_counts = {row[0]: row[1] for row in results}
-        stats['status_counts'] = status_counts
+        stats['status_counts'] = grouped('status.')
         
         # Durchschnittliche Dateigröße
-        query_size = """
-            SELECT AVG(dateigroesse) 
-            FROM downloads 
-            WHERE dateigroesse IS NOT NULL
-        """
-        result = self.download_repo._execute_query_one(query_size)
-        stats['avg_file_size'] = result[0] if result and result[0] else 0
-        
-        # Beliebteste Provider
-        query_provider = """
-            SELECT provider, COUNT(*) as count 
-            FROM downloads 
-            GROUP BY provider 
-            ORDER BY count DESC 
-            LIMIT 3
-        """
-        results = self.download_repo._execute_query(query_provider)
-        top_providers = [(row[0], row[1]) for row in results]
-        stats['top_providers'] = top_providers
-        
-        # Beliebteste Sprachen
-        query_language = """
-            SELECT sprache, COUNT(*) as count 
-            FROM downloads 
-            GROUP BY sprache 
-            ORDER BY count DESC 
-            LIMIT 3
-        """
-        results = self.download_repo._execute_query(query_language)
-        top_languages = [(row[0], row[1]) for row in results]
-        stats['top_languages'] = top_languages
-        
-        return stats 
\ No newline at end of file
+        with_size = counters.get('downloads.mit_groesse', 0)
+        stats['avg_file_size'] = counters.get('downloads.bytes', 0) / with_size if with_size else 0
+        
+        # Beliebteste Provider und Sprachen
+        providers = sorted(grouped('provider.').items(), key=lambda item: item[1], reverse=True)[:3]
+        stats['top_providers'] = [
+            (provider_id.isdigit() and LookupService.get_provider_name(int(provider_id)) or provider_id, count)
+            for provider_id, count in providers
+        ]
+        languages = sorted(grouped('sprache.').items(), key=lambda item: item[1], reverse=True)[:3]
+        stats['top_languages'] = [
+            (language_id.isdigit() and LookupService.get_language_name(int(language_id)) or language_id, count)
+            for language_id, count in languages
+        ]
+        
+        return stats
+    
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Berechnet alle Statistiken aus den Tabellen neu
+        
+        Returns:
+            Die neu berechneten Zähler
+        """
+        return self.stats_repo.rebuild()
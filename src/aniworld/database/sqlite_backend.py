@@ -0,0 +1,303 @@
+"""
+Eingebettetes SQLite-Backend für die Repository-Schicht
+
+Die Repositories und Services sind für mysql.connector geschrieben (%s-Platzhalter,
+NOW(), cursor(dictionary=True)). Die Klassen hier bilden genau diese Schnittstelle
+auf sqlite3 ab, sodass dieselben Abfragen ohne Netzwerk-Roundtrip gegen eine lokale
+Datei im WAL-Modus laufen.
+"""
+
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .migrations import move_covers_to_store
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+SCHEMA_VERSION = 3
+
+# Änderungen für Dateien mit älterem Schema: Zielversion -> Anweisungen
+# (Funktionen erhalten einen Cursor der laufenden Migrationstransaktion)
+MIGRATIONS = {
+    # Cover liegen im Cover-Speicher, die Tabelle hält nur noch den Hash;
+    # DROP COLUMN gibt es erst ab SQLite 3.35, davor wird die Spalte nur geleert
+    2: (
+        "ALTER TABLE anime_series ADD COLUMN cover_hash CHAR(64)",
+        move_covers_to_store,
+        "ALTER TABLE anime_series DROP COLUMN cover_data" if sqlite3.sqlite_version_info >= (3, 35, 0)
+        else "UPDATE anime_series SET cover_data = NULL",
+    ),
+    # Materialisierte Statistiken; ohne Eintrag 'aufgebaut' werden sie beim ersten Lesen neu berechnet
+    3: (
+        "CREATE TABLE statistik_zaehler (schluessel VARCHAR(100) PRIMARY KEY, wert BIGINT NOT NULL DEFAULT 0)",
+        "CREATE TABLE statistik_anime (series_id INT PRIMARY KEY, staffeln INT NOT NULL DEFAULT 0, "
+        "episoden INT NOT NULL DEFAULT 0, "
+        "FOREIGN KEY (series_id) REFERENCES anime_series(series_id) ON DELETE CASCADE)",
+        "CREATE INDEX idx_statistik_anime_episoden ON statistik_anime (episoden)",
+        "CREATE INDEX idx_downloads_datum ON downloads (download_datum)",
+    ),
+}
+
+# MySQL-Funktionen und -Syntax, die in den Repositories vorkommen, und ihre SQLite-Entsprechung
+_FUNCTION_MAP = (
+    ("NOW()", "datetime('now', 'localtime')"),
+    ("VERSION()", "sqlite_version()"),
+    ("INSERT IGNORE", "INSERT OR IGNORE"),
+)
+
+
+def _adapt_datetime(value: datetime.datetime) -> str:
+    return value.isoformat(" ")
+
+
+def _convert_datetime(value: bytes) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value: bytes) -> datetime.date:
+    return datetime.date.fromisoformat(value.decode()[:10])
+
+
+# Eigene Adapter/Konverter statt der seit Python 3.12 veralteten Standardkonverter
+sqlite3.register_adapter(datetime.datetime, _adapt_datetime)
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+
+
+@lru_cache(maxsize=512)
+def translate_query(query: str) -> str:
+    """
+    Übersetzt eine Abfrage im MySQL-Dialekt der Repositories nach SQLite.
+
+    Args:
+        query: SQL-Abfrage mit %s-Platzhaltern
+
+    Returns:
+        SQL-Abfrage mit ?-Platzhaltern
+    """
+    translated = query.replace("%s", "?").replace("%%", "%")
+    for mysql_function, sqlite_function in _FUNCTION_MAP:
+        translated = translated.replace(mysql_function, sqlite_function)
+    return translated
+
+
+def split_script(script: str) -> List[str]:
+    """
+    Zerlegt ein SQL-Skript in einzelne Anweisungen (Trigger bleiben zusammen).
+
+    Args:
+        script: Inhalt einer .sql-Datei
+
+    Returns:
+        Liste der Anweisungen
+    """
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        if not buffer and (not line.strip() or line.lstrip().startswith("--")):
+            continue
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    return statements
+
+
+class SQLiteCursor:
+    """
+    Cursor mit der Schnittstelle von mysql.connector (dictionary=True, %s-Platzhalter).
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+        self._inserted = False
+
+    def __enter__(self) -> 'SQLiteCursor':
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.close()
+        return False
+
+    def _convert(self, row: Optional[sqlite3.Row]) -> Union[Dict[str, Any], Tuple, None]:
+        if row is None:
+            return None
+        return dict(row) if self._dictionary else tuple(row)
+
+    def execute(self, query: str, params: Tuple = ()) -> None:
+        self._cursor.execute(translate_query(query), params or ())
+        self._inserted = query.lstrip()[:6].upper() == "INSERT"
+
+    def fetchone(self) -> Union[Dict[str, Any], Tuple, None]:
+        return self._convert(self._cursor.fetchone())
+
+    def fetchall(self) -> List[Union[Dict[str, Any], Tuple]]:
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self) -> Iterator[Union[Dict[str, Any], Tuple]]:
+        for row in self._cursor:
+            yield self._convert(row)
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        # sqlite3 liefert auch nach UPDATE/DELETE die letzte eingefügte ID der Verbindung,
+        # mysql.connector nur nach einem INSERT
+        return self._cursor.lastrowid if self._inserted else None
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Verbindung mit der Schnittstelle von mysql.connector.MySQLConnection.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, dictionary: bool = False, **_kwargs) -> SQLiteCursor:
+        return SQLiteCursor(self._connection.cursor(), dictionary=dictionary)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class SQLiteDatabase:
+    """
+    Eine SQLite-Datenbankdatei im WAL-Modus mit einer Verbindung pro Thread.
+
+    Die Verbindungen bleiben für die Lebensdauer des Threads offen; das Schema aus
+    schema_sqlite.sql wird beim ersten Öffnen einer neuen Datei angelegt.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Args:
+            path: Pfad zur Datenbankdatei (":memory:" für eine flüchtige Datenbank pro Thread)
+            timeout: Wartezeit in Sekunden, wenn eine andere Verbindung schreibt
+        """
+        self.logger = logging.getLogger('aniworld.db.sqlite')
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def connect(self, autocommit: bool = False) -> SQLiteConnection:
+        """
+        Öffnet eine neue Verbindung und legt bei Bedarf das Schema an.
+
+        Args:
+            autocommit: Jede Anweisung sofort festschreiben (wie autocommit=True bei MySQL)
+
+        Returns:
+            SQLiteConnection-Objekt
+        """
+        if self.path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None if autocommit else ""
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        self.ensure_schema(connection)
+
+        self.logger.debug("SQLite-Verbindung geöffnet: %s", self.path)
+        return SQLiteConnection(connection)
+
+    def ensure_schema(self, connection: sqlite3.Connection) -> None:
+        """
+        Legt das Schema an, wenn die Datei noch keines hat (PRAGMA user_version = 0),
+        und bringt ältere Schemata über MIGRATIONS auf SCHEMA_VERSION.
+
+        Args:
+            connection: Geöffnete sqlite3-Verbindung
+        """
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+            statements = split_script(f.read())
+
+        # BEGIN IMMEDIATE sperrt andere Schreiber, damit das Schema nur einmal angelegt wird
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                for statement in statements:
+                    connection.execute(statement)
+                self.logger.info("SQLite-Schema angelegt: %s", self.path)
+            elif version < SCHEMA_VERSION:
+                for target in range(version + 1, SCHEMA_VERSION + 1):
+                    for statement in MIGRATIONS.get(target, ()):
+                        if callable(statement):
+                            statement(SQLiteCursor(connection.cursor()))
+                        else:
+                            connection.execute(statement)
+                self.logger.info("SQLite-Schema von Version %d auf %d aktualisiert: %s", version, SCHEMA_VERSION, self.path)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def connection(self) -> Iterator[SQLiteConnection]:
+        """
+        Gibt die Verbindung des aktuellen Threads zurück und öffnet sie beim ersten Aufruf.
+
+        Yields:
+            SQLiteConnection-Objekt; bei einer Ausnahme wird die offene Transaktion zurückgerollt
+
+        Raises:
+            sqlite3.Error: Bei Problemen mit der Datenbank
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self.connect()
+
+        try:
+            yield connection
+        except sqlite3.Error as e:
+            self.logger.error("Fehler bei der SQLite-Datenbank: %s", e)
+            connection.rollback()
+            raise
+        except Exception:
+            connection.rollback()
+            raise
+
+    def close(self) -> None:
+        """
+        Schließt die Verbindung des aktuellen Threads, falls eine offen ist.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            connection.close()
@@ -0,0 +1,372 @@
+"""
+Verzögertes Schreiben (Write-Behind) für Scraping und Downloads
+
+Statt auf jede Datenbankoperation zu warten, legen Scraper und Downloads Ereignisse
+in eine begrenzte Warteschlange. Ein Hintergrund-Thread fasst sie zusammen (pro
+Schlüssel zählt der letzte Stand, Download-Aktualisierungen werden zu einem UPDATE
+vereinigt) und schreibt sie in gemeinsamen Transaktionen. Ist die Warteschlange voll,
+wartet der Aufrufer (Gegendruck). Ist die Datenbank nicht erreichbar, landen die
+Ereignisse in einer Ausweichdatei, die beim nächsten Start nachgeholt wird. Beim
+Beenden des Programms wird die Warteschlange geleert.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import mysql.connector
+except ImportError:  # Das SQLite-Backend kommt ohne MySQL-Treiber aus
+    mysql = None
+
+# (Art, Schlüssel, Nutzdaten) eines Ereignisses
+Event = Tuple[str, str, Dict[str, Any]]
+
+# Fehler, bei denen die Datenbank als nicht erreichbar gilt
+UNREACHABLE_ERRORS: Tuple[type, ...] = (OSError, sqlite3.OperationalError)
+if mysql is not None:
+    UNREACHABLE_ERRORS += (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError)
+
+# So lange (Sekunden) wartet submit() bei voller Warteschlange, bevor es in die Ausweichdatei schreibt
+BACKPRESSURE_TIMEOUT = 30.0
+
+# So lange (Sekunden) wird beim Beenden höchstens auf das Schreiben gewartet
+EXIT_FLUSH_TIMEOUT = 10.0
+
+# So lange (Sekunden) wartet wait_for() höchstens, z.B. ein Download auf seine Episode
+WAIT_FOR_TIMEOUT = 30.0
+
+
+def is_unreachable(error: BaseException) -> bool:
+    """
+    Prüft, ob ein Fehler (oder eine seiner Ursachen) auf eine nicht erreichbare Datenbank hinweist.
+
+    Ein ERROR-Log während des Fehlers beendet über ExitOnError den Thread mit SystemExit;
+    der eigentliche Fehler steckt dann in __context__.
+
+    Args:
+        error: Die aufgetretene Ausnahme
+
+    Returns:
+        True, wenn die Ereignisse später erneut geschrieben werden sollen
+    """
+    while error is not None:
+        if isinstance(error, UNREACHABLE_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _save_anime(payload: Dict[str, Any]) -> None:
+    from .services import AnimeService  # pylint: disable=import-outside-toplevel
+    AnimeService().save_from_scraper_data(payload)
+
+
+def _update_download(payload: Dict[str, Any]) -> None:
+    from .repositories import DownloadRepository  # pylint: disable=import-outside-toplevel
+    DownloadRepository().update_columns(payload['download_id'], payload['columns'], payload['deltas'])
+
+
+def _merge_download(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    from .repositories import StatisticsRepository  # pylint: disable=import-outside-toplevel
+    return {
+        'download_id': new['download_id'],
+        'columns': {**old['columns'], **new['columns']},
+        'deltas': StatisticsRepository.merge_deltas(old['deltas'], new['deltas']),
+    }
+
+
+class WriteBehindWriter:
+    """
+    Warteschlange mit Hintergrund-Thread für verzögerte Datenbankschreibvorgänge
+
+    Ereignisarten:
+        anime: Anime-Daten samt Staffeln und Episoden für AnimeService.save_from_scraper_data
+               (Schlüssel: URL)
+        download: Spalten und Zähleränderungen für DownloadRepository.update_columns
+                  (Schlüssel: Download-ID)
+    """
+
+    # Art -> Funktion, die ein Ereignis schreibt
+    HANDLERS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+        'anime': _save_anime,
+        'download': _update_download,
+    }
+
+    # Art -> Funktion, die zwei Ereignisse mit demselben Schlüssel vereinigt (sonst gilt das neuere)
+    MERGERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = {
+        'download': _merge_download,
+    }
+
+    def __init__(self, spill_path: str, queue_size: int = 1000, batch_size: int = 100,
+                 flush_interval: float = 0.5):
+        """
+        Args:
+            spill_path: Ausweichdatei für Ereignisse, die nicht geschrieben werden konnten
+            queue_size: Maximale Anzahl wartender Ereignisse
+            batch_size: Maximale Anzahl Ereignisse pro Transaktion
+            flush_interval: So lange (Sekunden) werden nach dem ersten Ereignis weitere gesammelt
+        """
+        self.logger = logging.getLogger('aniworld.db.write_behind')
+        self.spill_path = spill_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: 'queue.Queue[Event]' = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        # Ereignisse, die eingereiht, aber noch nicht geschrieben sind, gesamt und pro (Art, Schlüssel)
+        self._unfinished = 0
+        self._pending: 'Counter[Tuple[str, str]]' = Counter()
+        self._idle = threading.Condition(self._lock)
+
+    def start(self) -> None:
+        """
+        Startet den Hintergrund-Thread und holt Ereignisse aus der Ausweichdatei nach.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            replay = self._load_spill()
+            self._unfinished += len(replay)
+            self._pending.update((kind, key) for kind, key, _payload in replay)
+            self._thread = threading.Thread(target=self._run, args=(replay,), name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, kind: str, key: Any, payload: Dict[str, Any]) -> None:
+        """
+        Reiht ein Ereignis ein; wartet bei voller Warteschlange (höchstens BACKPRESSURE_TIMEOUT).
+
+        Args:
+            kind: Ereignisart (siehe HANDLERS)
+            key: Schlüssel, unter dem Ereignisse zusammengefasst werden
+            payload: Nutzdaten (müssen als JSON speicherbar sein)
+        """
+        if kind not in self.HANDLERS:
+            raise ValueError(f"Unbekannte Ereignisart: {kind}")
+
+        event = (kind, str(key), payload)
+        self.start()
+        with self._lock:
+            self._unfinished += 1
+            self._pending[event[:2]] += 1
+        try:
+            self._queue.put(event, timeout=BACKPRESSURE_TIMEOUT)
+        except queue.Full:
+            self.logger.warning("Write-Behind-Warteschlange voll, schreibe Ereignis in %s", self.spill_path)
+            self._spill([event])
+            self._done([event])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wartet, bis alle eingereihten Ereignisse geschrieben (oder ausgelagert) sind.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (None: unbegrenzt)
+
+        Returns:
+            True, wenn die Warteschlange leer ist
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._unfinished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def wait_for(self, url: str, timeout: Optional[float] = WAIT_FOR_TIMEOUT) -> bool:
+        """
+        Wartet, bis die eingereihten Anime zu einer URL geschrieben (oder ausgelagert) sind,
+        z.B. bevor ein Download seine Episode in der Datenbank sucht. Gewartet wird auf alle
+        Ereignisse, deren Schlüssel ein Anfang der URL ist; andere Ereignisse bleiben liegen.
+
+        Args:
+            url: URL eines Anime oder einer Episode
+            timeout: Maximale Wartezeit in Sekunden (None: unbegrenzt)
+
+        Returns:
+            True, wenn keine passenden Ereignisse mehr ausstehen
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while any(kind == 'anime' and url.startswith(key) for kind, key in self._pending):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = EXIT_FLUSH_TIMEOUT) -> None:
+        """
+        Schreibt ausstehende Ereignisse und beendet den Hintergrund-Thread; was in der
+        Wartezeit nicht geschrieben wurde, landet in der Ausweichdatei.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        if self._thread is None:
+            return
+
+        if not self.flush(timeout):
+            self.logger.warning("Datenbank zu langsam, lagere ausstehende Ereignisse aus")
+        self._stopped.set()
+        self._thread.join(self.flush_interval + 1)
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if remaining:
+            self._spill(remaining)
+            self._done(remaining)
+        self._thread = None
+
+    def _done(self, events: List[Event]) -> None:
+        with self._idle:
+            self._unfinished -= len(events)
+            self._pending.subtract(event[:2] for event in events)
+            # Schlüssel ohne ausstehende Ereignisse entfernen
+            self._pending += Counter()
+            self._idle.notify_all()
+
+    def _next_batch(self) -> Optional[List[Event]]:
+        try:
+            events = [self._queue.get(timeout=self.flush_interval or 0.1)]
+        except queue.Empty:
+            return None
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return events
+
+    def coalesce(self, events: List[Event]) -> List[Event]:
+        """
+        Fasst Ereignisse gleicher Art und gleichen Schlüssels zusammen.
+
+        Args:
+            events: Ereignisse in Eingangsreihenfolge
+
+        Returns:
+            Zusammengefasste Ereignisse in der Reihenfolge ihres ersten Auftretens
+        """
+        merged: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
+        for kind, key, payload in events:
+            previous = merged.get((kind, key))
+            if previous is not None and kind in self.MERGERS:
+                payload = self.MERGERS[kind](previous, payload)
+            merged[(kind, key)] = payload
+        return [(kind, key, payload) for (kind, key), payload in merged.items()]
+
+    def _run(self, replay: List[Event]) -> None:
+        if replay:
+            self.logger.info("Hole %s ausgelagerte Ereignisse nach", len(replay))
+            for start in range(0, len(replay), self.batch_size):
+                events = replay[start:start + self.batch_size]
+                try:
+                    self._write(self.coalesce(events))
+                finally:
+                    self._done(events)
+
+        while not (self._stopped.is_set() and self._queue.empty()):
+            events = self._next_batch()
+            if events is None:
+                continue
+            try:
+                self._write(self.coalesce(events))
+            finally:
+                self._done(events)
+
+    def _write(self, events: List[Event]) -> None:
+        from .connection import DatabaseConnection  # pylint: disable=import-outside-toplevel
+
+        # SystemExit eingeschlossen: ein ERROR-Log beendet sonst über ExitOnError den Thread;
+        # die Identity-Maps übernehmen neue Einträge erst nach dem Commit (siehe batch())
+        try:
+            with DatabaseConnection().batch():
+                for kind, _key, payload in events:
+                    self.HANDLERS[kind](payload)
+            return
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            if is_unreachable(e):
+                self.logger.warning("Datenbank nicht erreichbar (%s), lagere %s Ereignisse aus", e, len(events))
+                self._spill(events)
+                return
+            if len(events) == 1:
+                self.logger.warning("Ereignis %s/%s konnte nicht geschrieben werden: %s", events[0][0], events[0][1], e)
+                return
+
+        # ein fehlerhaftes Ereignis soll nicht den ganzen Batch verwerfen
+        for event in events:
+            self._write([event])
+
+    def _spill(self, events: List[Event]) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            with self._lock, open(self.spill_path, 'a', encoding='utf-8') as f:
+                for kind, key, payload in events:
+                    f.write(json.dumps({'kind': kind, 'key': key, 'payload': payload}, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            self.logger.warning("Ausweichdatei %s nicht beschreibbar, %s Ereignisse verloren: %s",
+                                self.spill_path, len(events), e)
+
+    def _load_spill(self) -> List[Event]:
+        if not os.path.exists(self.spill_path):
+            return []
+
+        events = []
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        events.append((entry['kind'], entry['key'], entry['payload']))
+                    except (ValueError, KeyError):
+                        self.logger.warning("Ungültiger Eintrag in %s übersprungen", self.spill_path)
+            # was erneut scheitert, wird vom Thread wieder ausgelagert
+            os.remove(self.spill_path)
+        except OSError as e:
+            self.logger.warning("Ausweichdatei %s nicht lesbar: %s", self.spill_path, e)
+        return [event for event in events if event[0] in self.HANDLERS]
+
+
+# Singleton-Instanz
+_writer_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_writer() -> Optional[WriteBehindWriter]:
+    """
+    Gibt den gemeinsamen WriteBehindWriter zurück, wenn write_behind aktiviert ist.
+
+    Returns:
+        WriteBehindWriter-Instanz oder None (Schreibvorgänge laufen dann direkt)
+    """
+    global _writer_instance  # pylint: disable=global-statement
+    with _instance_lock:
+        if _writer_instance is None:
+            from .config import get_config  # pylint: disable=import-outside-toplevel
+            config = get_config()
+            enabled, queue_size, batch_size, flush_interval = config.get_write_behind_settings()
+            if not enabled:
+                return None
+            _writer_instance = WriteBehindWriter(config.get_write_spill_path(), queue_size, batch_size, flush_interval)
+            atexit.register(_writer_instance.close)
+        return _writer_instance
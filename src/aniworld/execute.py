@@ -4,10 +4,19 @@ import getpass
 import platform
 import hashlib
 import logging
-from typing import Dict, List, Optional, Any
-
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
 from bs4 import BeautifulSoup
 
+from aniworld import globals as aniworld_globals
+from aniworld.common import downloader, library, metrics, mpv, postprocess
+
 
 from aniworld.extractors import (
     doodstream_get_direct_link,
@@ -25,6 +34,7 @@ from aniworld.common import (
     setup_aniskip,
     fetch_url_content,
     check_dependencies,
+    get_language_keys,
     get_language_string,
     get_season_and_episode_numbers,
     print_progress_info,
@@ -36,6 +46,7 @@ from aniworld.common import (
 
 
 from aniworld.aniskip import aniskip
+from aniworld.aniskip.aniskip import SeasonChapters
 
 
 def providers(soup: BeautifulSoup) -> Dict[str, Dict[int, str]]:
@@ -52,7 +63,7 @@ def providers(soup: BeautifulSoup) -> Dict[str, Dict[int, str]]:
             provider_name = provider.find('h4').text.strip()
             if provider_name not in extracted_data:
                 extracted_data[provider_name] = {}
-            extracted_data[provider_name][lang_key] = f"https://aniworld.to{redirect_link}"
+            extracted_data[provider_name][lang_key] = f"{aniworld_globals.ANIWORLD_BASE_URL}{redirect_link}"
         logging.debug("Extracted provider data: %s", extracted_data)
         return extracted_data
     except AttributeError:
@@ -80,7 +91,7 @@ def build_command(  # pylint: disable=too-many-arguments, too-many-positional-ar
         f"--force-media-title={mpv_title}"
     ]
 
-    doodstream_referer = "https://dood.li/"
+    doodstream_referer = f"{aniworld_globals.DOODSTREAM_BASE_URL}/"
     vidmoly_referer = "https://vidmoly.to/"
 
     if selected_provider == "Doodstream":
@@ -99,6 +110,14 @@ def build_command(  # pylint: disable=too-many-arguments, too-many-positional-ar
     return command
 
 
+def get_provider_referer(provider: str) -> Optional[str]:
+    if provider == "Doodstream":
+        return f"{aniworld_globals.DOODSTREAM_BASE_URL}/"
+    if provider == "Vidmoly":
+        return "https://vidmoly.to/"
+    return None
+
+
 def build_yt_dlp_command(link: str, output_file: str, selected_provider: str) -> List[str]:
     logging.debug("Building yt-dlp command with link: %s, output_file: %s", link, output_file)
     command = [
@@ -112,15 +131,10 @@ def build_yt_dlp_command(link: str, output_file: str, selected_provider: str) ->
         "--progress"
     ]
 
-    doodstream_referer = "https://dood.li/"
-    vidmoly_referer = "https://vidmoly.to/"
-
-    if selected_provider == "Doodstream":
-        command.append("--add-header")
-        command.append(f"Referer: {doodstream_referer}")
-    elif selected_provider == "Vidmoly":
+    referer = get_provider_referer(selected_provider)
+    if referer:
         command.append("--add-header")
-        command.append(f"Referer: {vidmoly_referer}")
+        command.append(f"Referer: {referer}")
 
     logging.debug("Built yt-dlp command: %s", command)
     return command
@@ -189,8 +203,10 @@ def get_provider_data(soup: BeautifulSoup) -> Dict[str, Dict[int, str]]:
 def fetch_direct_link(provider_function, request_url: str) -> str:
     logging.debug("Fetching direct link from URL: %s", request_url)
     html_content = fetch_url_content(request_url)
-    soup = BeautifulSoup(html_content, 'html.parser')
-    direct_link = provider_function(soup)
+    with metrics.timed("parse", page="embed"):
+        soup = BeautifulSoup(html_content, 'html.parser')
+    with metrics.timed("extract", provider=provider_function.__name__.replace("_get_direct_link", "")):
+        direct_link = provider_function(soup)
     logging.debug("Fetched direct link: %s", direct_link)
     return direct_link
 
@@ -257,7 +273,7 @@ def build_syncplay_command(
         f"--force-media-title={mpv_title}"
     ])
 
-    doodstream_referer = "https://dood.li/"
+    doodstream_referer = f"{aniworld_globals.DOODSTREAM_BASE_URL}/"
     vidmoly_referer = "https://vidmoly.to/"
 
     if selected_provider == "Doodstream":
@@ -292,24 +308,24 @@ def perform_action(params: Dict[str, Any]) -> None:
                 anime_title = "Unknown"
         else:
             episode_title = 'Unknown Episode'
-            anime_title = 'Unknown Anime'
+            anime_title = params.get('anime_title') or 'Unknown Anime'
 
-        link_page = params.get('link_page', '')
+        link_page = params.get('link', '')
         slug = params.get('anime_slug', '')
         season_number = params.get('season_number', 0)
         episode_number = params.get('episode_number', 0)
         action = params.get('action', 'Watch')
         aniskip_selected = params.get('aniskip_selected', False)
         only_command = params.get('only_command', False)
-        selected_provider = params.get('selected_provider', 'VOE')
+        selected_provider = params.get('provider', 'VOE')
         mpv_title = f"{anime_title} - Season {season_number} - Episode {episode_number}"
-        output_directory = params.get('output_directory', anime_title)
-        output_directory = params.get('output', '')
 
         if action in ('Watch', 'Syncplay'):
-            aniskip_options = process_aniskip_options(
-                aniskip_selected, anime_title, season_number, episode_number, slug
-            )
+            aniskip_options = params.get('aniskip_options')
+            if aniskip_options is None:
+                aniskip_options = process_aniskip_options(
+                    aniskip_selected, anime_title, season_number, episode_number, slug
+                )
             logging.debug("Aniskip options: %s", aniskip_options)
 
             if action == 'Watch':
@@ -322,50 +338,7 @@ def perform_action(params: Dict[str, Any]) -> None:
                     link_page, mpv_title, aniskip_options, only_command, selected_provider
                 )
         else:  # action == 'Download'
-            # Datenbankintegration für Downloads
-            download_id = -1
-            try:
-                from aniworld.database.integration import DatabaseIntegration
-                db = DatabaseIntegration()
-                episode_url = params.get('episode_url', '')
-                language = params.get('language', 'Deutsch')
-                sanitized_title = sanitize_path(mpv_title)
-                download_path = os.path.join(output_directory, f"{sanitized_title}.mp4")
-                
-                # Zeichne Download auf, bevor wir beginnen
-                download_id = db.record_download(
-                    episode_url=episode_url,
-                    provider=selected_provider,
-                    sprache=language,
-                    zieldatei=download_path
-                )
-                logging.info(f"Download in Datenbank aufgezeichnet mit ID: {download_id}")
-            except ImportError:
-                logging.debug("Datenbankmodul nicht verfügbar, Download wird nicht protokolliert")
-            except Exception as e:
-                logging.error(f"Fehler beim Aufzeichnen des Downloads: {e}")
-            
-            # Führe den eigentlichen Download durch
-            try:
-                handle_download_action(params)
-                
-                # Aktualisiere den Download-Status in der Datenbank, wenn möglich
-                if download_id > 0:
-                    try:
-                        db.update_download_status(download_id, "abgeschlossen")
-                        logging.info(f"Download-Status aktualisiert auf 'abgeschlossen' für ID: {download_id}")
-                    except Exception as e:
-                        logging.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
-            except Exception as download_error:
-                logging.error(f"Download fehlgeschlagen: {download_error}")
-                
-                # Aktualisiere den Download-Status in der Datenbank als fehlgeschlagen
-                if download_id > 0:
-                    try:
-                        db.update_download_status(download_id, "fehlgeschlagen")
-                        logging.info(f"Download-Status aktualisiert auf 'fehlgeschlagen' für ID: {download_id}")
-                    except Exception as e:
-                        logging.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
+            handle_download_action(params)
 
     except Exception as e:
         logging.error("Error while performing action: %s", e)
@@ -413,24 +386,25 @@ def handle_watch_action(  # pylint: disable=too-many-arguments, too-many-positio
     command = build_command(
         link, mpv_title, "mpv", aniskip_selected, selected_provider, aniskip_options)
     logging.debug("Executing command: %s", command)
-    execute_command(command, only_command)
+    if not only_command:
+        start_prefetch()
+    if _mpv_session is not None and not only_command:
+        play_in_session(command)
+    else:
+        execute_command(command, only_command)
     logging.debug("MPV has finished.\nBye bye!")
 
 
 def handle_download_action(params: Dict[str, Any]) -> None:
     logging.debug("Action is Download")
-    check_dependencies(["yt-dlp"])
+    in_process = _downloader is not None and not params['only_command']
+    if not in_process:
+        check_dependencies(["yt-dlp"])
 
     logging.debug("Params: %s", params)
 
     def get_language_from_key(key: int) -> str:
-        key_mapping = {
-            1: "German Dub",
-            2: "English Sub",
-            3: "German Sub"
-        }
-
-        language = key_mapping.get(key, "Unknown Key")
+        language = library.LANGUAGE_NAMES.get(key, "Unknown Key")
 
         if language == "Unknown Key":
             raise ValueError("Key not valid.")
@@ -455,41 +429,32 @@ def handle_download_action(params: Dict[str, Any]) -> None:
 
     os.makedirs(os.path.join(output_directory, sanitize_anime_title), exist_ok=True)
 
-    if seasons < 10:
-        seasons = "0" + str(seasons)
-
-    if episodes < 10:
-        episodes = "0" + str(episodes)
-
-    file_name = (
-        f"{sanitize_anime_title} - S{seasons}E{episodes}"
-        if params['season_number']
-        else f"{sanitize_anime_title} - Movie {episodes}"
+    file_path = library.get_download_path(
+        output_directory, sanitize_anime_title, seasons, episodes, get_language_from_key(int(language))
     )
 
-    file_path = os.path.join(
-        output_directory,
-        sanitize_anime_title,
-        f"{file_name} ({get_language_from_key(int(params['language']))}).mp4"
-    )
+    # ein Datensatz pro Download: angelegt vor dem Start, danach nur noch Fortschritt und Status
+    lifecycle = None
+    if not params['only_command']:
+        try:
+            from aniworld.database.pipeline import get_pipeline  # pylint: disable=import-outside-toplevel
+            lifecycle = get_pipeline().start_download({
+                'episode_url': params.get('episode_url', ''),
+                'provider': provider,
+                'sprache': get_language_from_key(int(language)),
+                'zieldatei': file_path,
+                'speicherlink': link
+            })
+        except ImportError:
+            logging.debug("Datenbankmodul nicht verfügbar, Download wird nicht protokolliert")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.warning("Fehler beim Aufzeichnen des Downloads: %s", e)
 
-    # Speichere Download in der Datenbank über die Pipeline, wenn verfügbar
-    download_id = -1
-    try:
-        from aniworld.database.pipeline import get_pipeline
-        pipeline = get_pipeline()
-        download_data = {
-            'episode_url': params.get('episode_url', ''),
-            'provider': provider,
-            'sprache': get_language_from_key(int(language)),
-            'zieldatei': file_path
-        }
-        download_id = pipeline.record_download(download_data)
-        logging.info(f"Download in Datenbank aufgezeichnet mit ID: {download_id}")
-    except ImportError:
-        logging.debug("Datenbankmodul nicht verfügbar, Download wird nicht protokolliert")
-    except Exception as e:
-        logging.error(f"Fehler beim Aufzeichnen des Downloads: {e}")
+    postprocessor = _postprocessor if not params['only_command'] else None
+    chapters = _chapters if postprocessor is not None else None
+    if chapters is not None:
+        # looked up while the episode downloads
+        chapters.prefetch(params.get('anime_title', ''), seasons)
 
     if not params['only_command']:
         msg = f"Downloading to '{file_path}'"
@@ -499,50 +464,55 @@ def handle_download_action(params: Dict[str, Any]) -> None:
             print_progress_info(msg)
     command = build_yt_dlp_command(params['link'], file_path, params['provider'])
     logging.debug("Executing command: %s", command)
-    
-    # Führe den eigentlichen Download durch
+
+    status, notizen = "abgeschlossen", None
+    postprocessing = False
     try:
-        execute_command(command, params['only_command'])
-        
-        # Aktualisiere den Download-Status in der Datenbank, wenn verfügbar
-        if download_id > 0:
-            try:
-                from aniworld.database.pipeline import get_pipeline
-                pipeline = get_pipeline()
-                status_data = {
-                    'download_id': download_id,
-                    'status': 'abgeschlossen'
-                }
-                pipeline.update_download_status(download_id, 'abgeschlossen')
-                logging.info(f"Download-Status aktualisiert auf 'abgeschlossen' für ID: {download_id}")
-            except Exception as e:
-                logging.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
+        with metrics.timed("download", provider=provider):
+            if in_process:
+                referer = get_provider_referer(params['provider'])
+                _downloader.download(
+                    params['link'], file_path, headers={'Referer': referer} if referer else None,
+                    progress_hook=lifecycle.progress if lifecycle else None
+                )
+            else:
+                execute_command(command, params['only_command'])
+
+        if metrics.is_enabled() and not params['only_command'] and os.path.exists(file_path):
+            metrics.inc("download_bytes", os.path.getsize(file_path), provider=provider)
+        if postprocessor is not None and os.path.exists(file_path):
+            # the next download starts right away; probing, remuxing, chapters, hashing and
+            # the final record follow in the pool
+            if lifecycle is not None:
+                lifecycle.downloaded()
+            postprocessor.submit(postprocess_download, {
+                'file_path': file_path,
+                'lifecycle': lifecycle,
+                'chapters': chapters,
+                'anime_title': params.get('anime_title', ''),
+                'season_number': seasons,
+                'episode_number': episodes,
+                'episode_url': params.get('episode_url', ''),
+                'language': str(language),
+                'postprocessor': postprocessor,
+            })
+            postprocessing = True
+        elif not params['only_command']:
+            add_to_library(file_path, params.get('episode_url', ''), get_language_from_key(int(language)))
     except KeyboardInterrupt:
         logging.debug("KeyboardInterrupt encountered, cleaning up leftovers")
         clean_up_leftovers(os.path.dirname(file_path))
-        
-        # Aktualisiere den Download-Status als abgebrochen, wenn möglich
-        if download_id > 0:
+        status = "abgebrochen"
+    except Exception as download_error:  # pylint: disable=broad-exception-caught
+        logging.warning("Download fehlgeschlagen: %s", download_error)
+        status, notizen = "fehlgeschlagen", str(download_error)[:500]
+    finally:
+        if lifecycle is not None and not postprocessing:
             try:
-                from aniworld.database.pipeline import get_pipeline
-                pipeline = get_pipeline()
-                pipeline.update_download_status(download_id, 'abgebrochen')
-                logging.info(f"Download-Status aktualisiert auf 'abgebrochen' für ID: {download_id}")
-            except Exception as e:
-                logging.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
-    except Exception as download_error:
-        logging.error(f"Download fehlgeschlagen: {download_error}")
-        
-        # Aktualisiere den Download-Status als fehlgeschlagen, wenn möglich
-        if download_id > 0:
-            try:
-                from aniworld.database.pipeline import get_pipeline
-                pipeline = get_pipeline()
-                pipeline.update_download_status(download_id, 'fehlgeschlagen')
-                logging.info(f"Download-Status aktualisiert auf 'fehlgeschlagen' für ID: {download_id}")
-            except Exception as e:
-                logging.error(f"Fehler beim Aktualisieren des Download-Status: {e}")
-                
+                lifecycle.finish(status, notizen)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.warning("Fehler beim Aktualisieren des Download-Status: %s", e)
+
     logging.debug("yt-dlp has finished.\nBye bye!")
     if not platform.system() == "Windows":
         print(f"Downloaded to '{file_path}'")
@@ -550,6 +520,76 @@ def handle_download_action(params: Dict[str, Any]) -> None:
         print_progress_info(f"Downloaded to '{file_path}'")
 
 
+def add_to_library(file_path: str, episode_url: str, language: str) -> None:
+    if aniworld_globals.DEFAULT_LIBRARY_INDEX and os.path.exists(file_path):
+        library.get_library_index().add(file_path, episode_url, language, os.path.getsize(file_path))
+
+
+def postprocess_download(job: Dict[str, Any]) -> None:
+    file_path = job['file_path']
+    status, notizen = "abgeschlossen", None
+    try:
+        with metrics.timed("postprocess", step="probe"):
+            info = postprocess.probe(file_path)
+
+        metadata = None
+        if job['chapters'] is not None:
+            metadata = job['chapters'].get(job['anime_title'], job['season_number'], job['episode_number'])
+        remux = postprocess.needs_remux(info)
+        if metadata or remux:
+            with metrics.timed("postprocess", step="rewrite"):
+                if postprocess.rewrite(file_path, metadata, remux):
+                    logging.debug("Rewrote %s (chapters: %s, remux: %s)", file_path, bool(metadata), remux)
+
+        add_to_library(file_path, job['episode_url'], library.LANGUAGE_NAMES.get(int(job['language'])))
+    except postprocess.CorruptFileError as e:
+        logging.warning("Corrupt download %s: %s", file_path, e)
+        metrics.inc("postprocess_corrupt")
+        status, notizen = "fehlgeschlagen", f"beschädigt: {e}"[:500]
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        job['postprocessor'].requeue({
+            'file_path': file_path, 'episode_url': job['episode_url'], 'lang': job['language']
+        })
+    finally:
+        # recorded after the file is final, so size and hash match what is on disk
+        if job['lifecycle'] is not None:
+            try:
+                job['lifecycle'].finish(status, notizen)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.warning("Fehler beim Aktualisieren des Download-Status: %s", e)
+
+
+def retry_corrupt_downloads(params: Dict[str, Any]) -> None:
+    # runs after the last download: waits for the pool and downloads corrupt files again
+    if _postprocessor.pending:
+        print(f"Finishing {_postprocessor.pending} download(s)...")
+
+    attempts: Dict[Tuple[str, str], int] = {}
+    while True:
+        _postprocessor.wait()
+        retries = []
+        for item in _postprocessor.take_requeued():
+            key = (item['episode_url'], item['lang'])
+            if attempts.get(key, 0) >= aniworld_globals.DEFAULT_POSTPROCESS_RETRIES:
+                print(f"Giving up on '{item['file_path']}', the download stays corrupt")
+                continue
+            attempts[key] = attempts.get(key, 0) + 1
+            retries.append(item)
+        if not retries:
+            return
+
+        for item in retries:
+            msg = f"Downloading again, the file was corrupt: '{item['file_path']}'"
+            if not platform.system() == "Windows":
+                print(msg)
+            else:
+                print_progress_info(msg)
+            process_episode({**params, 'episode_url': item['episode_url'], 'lang': item['lang']})
+
+
 def handle_syncplay_action(
     link: str,
     mpv_title: str,
@@ -568,11 +608,208 @@ def handle_syncplay_action(
             print_progress_info(msg)
     command = build_syncplay_command(link, mpv_title, selected_provider, aniskip_options)
     logging.debug("Executing command: %s", command)
+    if not only_command:
+        start_prefetch()
     execute_command(command, only_command)
     logging.debug("Syncplay has finished.\nBye bye!")
 
 
+def get_provider_headers(provider: str) -> Dict[str, str]:
+    headers = {'User-Agent': aniworld_globals.DEFAULT_USER_AGENT}
+    referer = get_provider_referer(provider)
+    if referer:
+        headers['Referer'] = referer
+    return headers
+
+
+def get_link_expiry(link: str) -> Optional[float]:
+    # signed CDN links usually carry their expiry as a unix timestamp in the query string
+    query = parse_qs(urlparse(link).query)
+    for key in ("expires", "expiry", "exp", "e"):
+        value = query.get(key, [""])[0]
+        if value.isdigit() and int(value) > 1_000_000_000:
+            return float(value)
+    return None
+
+
+def is_link_usable(link: str, resolved_at: float, provider: str) -> bool:
+    expiry = get_link_expiry(link)
+    if expiry is not None and expiry - time.time() < aniworld_globals.DEFAULT_PREFETCH_EXPIRY_MARGIN:
+        logging.debug("Prefetched link expires soon: %s", link)
+        return False
+
+    if time.time() - resolved_at < aniworld_globals.DEFAULT_PREFETCH_REVALIDATE_AFTER:
+        return True
+
+    try:
+        response = requests.head(
+            link, headers=get_provider_headers(provider), timeout=5, allow_redirects=True
+        )
+    except requests.exceptions.RequestException as e:
+        logging.debug("Could not revalidate prefetched link %s: %s", link, e)
+        return False
+
+    logging.debug("Revalidated prefetched link %s: HTTP %s", link, response.status_code)
+    # some hosts answer HEAD with 405 although GET works
+    return response.status_code < 400 or response.status_code == 405
+
+
+def warm_hls_segments(link: str, provider: str, count: int) -> None:
+    if count <= 0 or not urlparse(link).path.endswith(".m3u8"):
+        return
+
+    headers = get_provider_headers(provider)
+    playlist_url = link
+    response = requests.get(playlist_url, headers=headers, timeout=10)
+    response.raise_for_status()
+
+    # master playlist: follow the variant with the highest bandwidth, as mpv does by default
+    variants = re.findall(r'#EXT-X-STREAM-INF:[^\n]*?BANDWIDTH=(\d+)[^\n]*\n\s*([^#\s][^\n]*)', response.text)
+    if variants:
+        playlist_url = urljoin(playlist_url, max(variants, key=lambda v: int(v[0]))[1].strip())
+        response = requests.get(playlist_url, headers=headers, timeout=10)
+        response.raise_for_status()
+
+    segments = [
+        line.strip() for line in response.text.splitlines()
+        if line.strip() and not line.startswith('#')
+    ]
+    for segment in segments[:count]:
+        requests.get(urljoin(playlist_url, segment), headers=headers, timeout=30).raise_for_status()
+    logging.debug("Warmed %d HLS segments of %s", min(count, len(segments)), playlist_url)
+
+
+def prefetch_episode(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    episode_url = params['episode_url']
+    logging.debug("Prefetching episode: %s", episode_url)
+
+    episode_html = fetch_url_content(episode_url)
+    if episode_html is None:
+        return None
+
+    soup = BeautifulSoup(episode_html, 'html.parser')
+    data = get_provider_data(soup) or {}
+    prefetched = {'html': episode_html, 'links': {}, 'aniskip_options': None}
+
+    # same choice as process_episode(): the first available provider, playing the first
+    # selected language it offers
+    providers_to_try = [params['provider_selected']] + [
+        p for p in params['provider_mapping'] if p != params['provider_selected']
+    ]
+    provider = next((p for p in providers_to_try if p in data), None)
+    languages = [key for key in get_language_keys(params['lang']) if key in data.get(provider, {})]
+    request_url = data[provider][languages[0]] if languages else None
+
+    if request_url:
+        link = fetch_direct_link(params['provider_mapping'][provider], request_url)
+        if link:
+            prefetched['links'][request_url] = (link, time.time())
+            try:
+                warm_hls_segments(link, provider, aniworld_globals.DEFAULT_PREFETCH_HLS_SEGMENTS)
+            except requests.exceptions.RequestException as e:
+                logging.debug("Could not warm HLS segments of %s: %s", link, e)
+
+    if params['aniskip_selected']:
+        season_number, episode_number = get_season_and_episode_numbers(episode_url)
+        prefetched['aniskip_options'] = process_aniskip_options(
+            True, get_anime_title(soup) or 'Unknown Anime',
+            season_number, episode_number, params['anime_slug']
+        )
+
+    return prefetched
+
+
+class EpisodePrefetcher:
+    def __init__(self):
+        self._pending: Optional[Dict[str, Any]] = None
+        self._futures: Dict[str, Future] = {}
+
+    def schedule(self, params: Dict[str, Any]) -> None:
+        # started by start() once the current episode is playing
+        self._pending = params
+
+    def start(self) -> None:
+        params, self._pending = self._pending, None
+        if params is None or params['episode_url'] in self._futures:
+            return
+
+        future = Future()
+
+        def run():
+            try:
+                with metrics.timed("prefetch"):
+                    future.set_result(prefetch_episode(params))
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                # includes SystemExit from ExitOnError when a fetch logs an error
+                future.set_exception(e)
+
+        self._futures[params['episode_url']] = future
+        # daemon thread: quitting during playback must not wait for a pending fetch
+        threading.Thread(target=run, name="prefetch", daemon=True).start()
+
+    def take(self, episode_url: str) -> Optional[Dict[str, Any]]:
+        future = self._futures.pop(episode_url, None)
+        if future is None:
+            return None
+
+        # a prefetch that is still running is never slower to wait for than to start over
+        try:
+            prefetched = future.result()
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            logging.debug("Prefetching %s failed: %s", episode_url, e)
+            prefetched = None
+
+        metrics.inc("prefetch", result="hit" if prefetched else "miss")
+        return prefetched
+
+
+_prefetcher: Optional[EpisodePrefetcher] = None
+
+# watching several episodes: one mpv for all of them, see play_in_session()
+_mpv_session: Optional[mpv.MpvSession] = None
+
+# downloading: one yt_dlp.YoutubeDL for the whole batch instead of a yt-dlp process per episode
+_downloader: Optional[downloader.YtDlpDownloader] = None
+
+# downloading with --aniskip: chapters per season and the pool that embeds them into finished files
+_chapters: Optional[SeasonChapters] = None
+_postprocessor: Optional[postprocess.PostProcessor] = None
+
+
+def start_prefetch() -> None:
+    if _prefetcher is not None:
+        _prefetcher.start()
+
+
+def get_prefetched_link(
+    prefetched: Optional[Dict[str, Any]], request_url: str, provider: str
+) -> Optional[str]:
+    entry: Optional[Tuple[str, float]] = (prefetched or {}).get('links', {}).get(request_url)
+    if entry is None:
+        return None
+
+    link, resolved_at = entry
+    if not is_link_usable(link, resolved_at, provider):
+        metrics.inc("prefetch_links", result="stale")
+        return None
+
+    metrics.inc("prefetch_links", result="used")
+    return link
+
+
+def play_in_session(command: List[str]) -> None:
+    global _mpv_session  # pylint: disable=global-statement
+    try:
+        _mpv_session.play(command)
+    except OSError as e:
+        # e.g. an mpv without --input-ipc-server support: one process per episode as before
+        logging.warning("Could not control mpv over IPC, starting it per episode: %s", e)
+        _mpv_session = None
+        execute_command(command, False)
+
+
 def execute(params: Dict[str, Any]) -> None:
+    global _prefetcher, _mpv_session, _downloader, _chapters, _postprocessor  # pylint: disable=global-statement
     logging.debug("Executing with params: %s", params)
     provider_mapping = {
         "Vidoza": vidoza_get_direct_link,
@@ -596,34 +833,130 @@ def execute(params: Dict[str, Any]) -> None:
 
     logging.debug("aniskip_selected: %s", aniskip_selected)
 
-    for episode_url in selected_episodes:
-        process_episode({
-            'episode_url': episode_url,
-            'provider_mapping': provider_mapping,
-            'provider_selected': provider_selected,
-            'lang': lang,
-            'action_selected': action_selected,
-            'aniskip_selected': aniskip_selected,
-            'output_directory': output_directory,
-            'anime_title': anime_title,
-            "anime_slug": anime_slug,
-            'only_direct_link': only_direct_link,
-            'only_command': only_command
-        })
+    prefetcher = None
+    if (
+        aniworld_globals.DEFAULT_PREFETCH and action_selected in ('Watch', 'Syncplay')
+        and len(selected_episodes) > 1 and not only_direct_link and not only_command
+    ):
+        prefetcher = EpisodePrefetcher()
+    _prefetcher = prefetcher
+
+    if (
+        aniworld_globals.DEFAULT_MPV_IPC and action_selected == 'Watch'
+        and len(selected_episodes) > 1 and not only_direct_link and not only_command
+    ):
+        _mpv_session = mpv.MpvSession()
+
+    if action_selected == 'Download' and not only_direct_link and not only_command:
+        _downloader = downloader.YtDlpDownloader()
+
+        if aniworld_globals.DEFAULT_POSTPROCESS:
+            _postprocessor = postprocess.PostProcessor(aniworld_globals.DEFAULT_POSTPROCESS_WORKERS)
+        if aniskip_selected and (_postprocessor is None or postprocess.find_ffmpeg() is None):
+            logging.warning("ffmpeg not found or post-processing disabled, aniskip chapters are not embedded")
+        elif aniskip_selected:
+            _chapters = SeasonChapters(anime_slug, get_episodes_by_season(selected_episodes))
+
+    downloaded = {}
+    if (
+        aniworld_globals.DEFAULT_LIBRARY_INDEX and action_selected == 'Download'
+        and not only_direct_link and not only_command
+    ):
+        downloaded = library.get_downloaded_episodes(anime_slug, anime_title, output_directory)
+
+    base_params = {
+        'provider_mapping': provider_mapping,
+        'provider_selected': provider_selected,
+        'action_selected': action_selected,
+        'aniskip_selected': aniskip_selected,
+        'output_directory': output_directory,
+        'anime_title': anime_title,
+        "anime_slug": anime_slug,
+        'only_direct_link': only_direct_link,
+        'only_command': only_command
+    }
+
+    try:
+        for index, episode_url in enumerate(selected_episodes):
+            episode_lang = lang
+            existing = get_library_paths(downloaded, episode_url, lang)
+            if existing:
+                for path in existing.values():
+                    msg = f"Already downloaded: '{path}'"
+                    if not platform.system() == "Windows":
+                        print(msg)
+                    else:
+                        print_progress_info(msg)
+                    metrics.inc("library", result="hit")
+
+                # only the languages that are still missing are fetched
+                missing = [key for key in get_language_keys(lang) if key not in existing]
+                if not missing:
+                    continue
+                episode_lang = ",".join(str(key) for key in missing)
+
+            episode_params = {**base_params, 'episode_url': episode_url, 'lang': episode_lang}
+            if prefetcher is not None:
+                if index + 1 < len(selected_episodes):
+                    prefetcher.schedule({**episode_params, 'episode_url': selected_episodes[index + 1]})
+                episode_params['prefetched'] = prefetcher.take(episode_url)
+            process_episode(episode_params)
+
+        if _postprocessor is not None:
+            retry_corrupt_downloads(base_params)
+    finally:
+        _prefetcher = None
+        if _mpv_session is not None:
+            _mpv_session.close()
+            _mpv_session = None
+        if _downloader is not None:
+            _downloader.close()
+            _downloader = None
+        if _postprocessor is not None:
+            _postprocessor.close()
+            _postprocessor = None
+        _chapters = None
+
+
+def get_episodes_by_season(episode_urls: List[str]) -> Dict[int, List[int]]:
+    episodes: Dict[int, List[int]] = {}
+    for episode_url in episode_urls:
+        season_number, episode_number = get_season_and_episode_numbers(episode_url)
+        episodes.setdefault(season_number, []).append(episode_number)
+    return episodes
+
+
+def get_library_paths(downloaded: Dict[Tuple[int, int, str], str], episode_url: str, lang: str) -> Dict[int, str]:
+    if not downloaded:
+        return {}
+    season_number, episode_number = get_season_and_episode_numbers(episode_url)
+    paths = {}
+    for language in get_language_keys(lang):
+        path = downloaded.get((season_number, episode_number, library.LANGUAGE_NAMES.get(language)))
+        # entries from the database may point to files that were deleted since
+        if path is not None and os.path.isfile(path):
+            paths[language] = path
+    return paths
 
 
 def process_episode(params: Dict[str, Any]) -> None:
     try:
-        logging.debug("Fetching episode HTML for URL: %s", params['episode_url'])
-        episode_html = fetch_url_content(params['episode_url'])
+        prefetched = params.get('prefetched')
+        if prefetched:
+            logging.debug("Using prefetched episode HTML for URL: %s", params['episode_url'])
+            episode_html = prefetched['html']
+        else:
+            logging.debug("Fetching episode HTML for URL: %s", params['episode_url'])
+            episode_html = fetch_url_content(params['episode_url'])
         if episode_html is None:
             logging.debug("No HTML content fetched for URL: %s", params['episode_url'])
             return
 
-        soup = BeautifulSoup(episode_html, 'html.parser')
-        episode_title = get_episode_title(soup)
-        anime_title = get_anime_title(soup)
-        data = get_provider_data(soup)
+        with metrics.timed("parse", page="episode"):
+            soup = BeautifulSoup(episode_html, 'html.parser')
+            episode_title = get_episode_title(soup)
+            anime_title = get_anime_title(soup)
+            data = get_provider_data(soup)
 
         logging.debug("Language Code: %s", params['lang'])
         logging.debug("Available Providers: %s", data.keys())
@@ -664,7 +997,8 @@ def process_episode(params: Dict[str, Any]) -> None:
                     "anime_slug": params['anime_slug'],
                     'episode_title': episode_title,
                     'only_direct_link': params['only_direct_link'],
-                    'only_command': params['only_command']
+                    'only_command': params['only_command'],
+                    'prefetched': prefetched
                 })
                 break
             logging.info("Provider %s not available, trying next provider.", provider)
@@ -682,50 +1016,66 @@ def process_provider(params: Dict[str, Any]) -> None:
     available_languages = params['data'].get(params['provider'], {}).keys()
     logging.debug("Available Languages for %s: %s", params['provider'], available_languages)
 
-    for language in params['data'][params['provider']]:
-        if language == int(params['lang']):
-            season_number, episode_number = get_season_and_episode_numbers(params['episode_url'])
-            action = params['action_selected']
-
-            provider_function = params['provider_mapping'][params['provider']]
-            request_url = params['data'][params['provider']][language]
+    # downloads and direct links fan out to every selected language of the one parsed page,
+    # watching plays the first selected language that is available
+    fan_out = params['action_selected'] == 'Download' or params['only_direct_link']
+    selected_languages = get_language_keys(params['lang'])
+    season_number, episode_number = get_season_and_episode_numbers(params['episode_url'])
+    action = params['action_selected']
+    provider_function = params['provider_mapping'][params['provider']]
+
+    processed = []
+    for language in selected_languages:
+        if language not in available_languages:
+            continue
+
+        request_url = params['data'][params['provider']][language]
+        link = get_prefetched_link(params.get('prefetched'), request_url, params['provider'])
+        if link is None:
             link = fetch_direct_link(provider_function, request_url)
 
-            if link is None:
-                continue
-
-            if params['only_direct_link']:
-                logging.debug("Only direct link requested: %s", link)
-                print(link)
-                break
-
-            mpv_title = (
-                f"{params['anime_title']} --- S{season_number}E{episode_number} - "
-                f"{params['episode_title']}"
-                if season_number and episode_number
-                else f"{params['anime_title']} --- Movie {episode_number} - "
-                f"{params['episode_title']}"
-            )
+        if link is None:
+            continue
+        processed.append(language)
+
+        if params['only_direct_link']:
+            logging.debug("Only direct link requested: %s", link)
+            print(link)
+            continue
+
+        mpv_title = (
+            f"{params['anime_title']} --- S{season_number}E{episode_number} - "
+            f"{params['episode_title']}"
+            if season_number and episode_number
+            else f"{params['anime_title']} --- Movie {episode_number} - "
+            f"{params['episode_title']}"
+        )
 
-            episode_params = {
-                "action": action,
-                "link": link,
-                "mpv_title": mpv_title,
-                "anime_title": params['anime_title'],
-                "anime_slug": params['anime_slug'],
-                "episode_number": episode_number,
-                "season_number": season_number,
-                "output_directory": params['output_directory'],
-                "only_command": params['only_command'],
-                "aniskip_selected": params['aniskip_selected'],
-                "provider": params['provider'],
-                "language": params['lang']
-            }
+        episode_params = {
+            "action": action,
+            "link": link,
+            "mpv_title": mpv_title,
+            "anime_title": params['anime_title'],
+            "anime_slug": params['anime_slug'],
+            "episode_number": episode_number,
+            "season_number": season_number,
+            "output_directory": params['output_directory'],
+            "only_command": params['only_command'],
+            "aniskip_selected": params['aniskip_selected'],
+            "provider": params['provider'],
+            "language": str(language),
+            "episode_url": params['episode_url']
+        }
+        if params.get('prefetched'):
+            episode_params["aniskip_options"] = params['prefetched']['aniskip_options']
 
-            logging.debug("Performing action with params: %s", episode_params)
-            perform_action(episode_params)
+        logging.debug("Performing action with params: %s", episode_params)
+        perform_action(episode_params)
+        if not fan_out:
             break
-    else:
+
+    missing_languages = [language for language in selected_languages if language not in processed]
+    if not processed or (fan_out and missing_languages):
         available_languages = [
             get_language_string(lang_code)
             for lang_code in params['data'][params['provider']].keys()
@@ -733,7 +1083,8 @@ def process_provider(params: Dict[str, Any]) -> None:
 
         message = (
             f"No available languages for provider {params['provider']} "
-            f"matching the selected language {get_language_string(int(params['lang']))}. "
+            f"matching the selected language "
+            f"{', '.join(get_language_string(language) for language in missing_languages)}. "
             f"\nAvailable languages: {available_languages}"
         )
 
@@ -4,13 +4,15 @@ import time
 
 import requests
 
+from aniworld import globals as aniworld_globals
 from aniworld.globals import DEFAULT_USER_AGENT
+from aniworld.common.ratelimit import get_rate_limiter
 
 
 def doodstream_get_direct_link(soup):
     headers = {
         'User-Agent': DEFAULT_USER_AGENT,
-        'Referer': 'https://dood.li/'
+        'Referer': f"{aniworld_globals.DOODSTREAM_BASE_URL}/"
     }
 
     def extract_data(pattern, content):
@@ -30,13 +32,14 @@ def doodstream_get_direct_link(soup):
     if not pass_md5_url:
         raise ValueError('pass_md5 URL not found.')
 
-    full_md5_url = f"https://dood.li{pass_md5_url}"
+    full_md5_url = f"{aniworld_globals.DOODSTREAM_BASE_URL}{pass_md5_url}"
 
     token_pattern = r"token=([a-zA-Z0-9]+)"
     token = extract_data(token_pattern, content)
     if not token:
         raise ValueError('Token not found.')
 
+    get_rate_limiter().acquire(full_md5_url)
     md5_response = requests.get(full_md5_url, headers=headers, timeout=30, verify=False)
     md5_response.raise_for_status()
     video_base_url = md5_response.text.strip()
@@ -6,7 +6,7 @@ from base64 import b64decode
 
 from aniworld import globals as aniworld_globals
 
-REDIRECT_PATTERN = re.compile(r"window\.location\.href\s*=\s*'(https://[^/]+/e/\w+)';")
+REDIRECT_PATTERN = re.compile(r"window\.location\.href\s*=\s*'(https?://[^/]+/e/\w+)';")
 EXTRACT_VEO_HLS_PATTERN = re.compile(r"'hls': '(?P<hls>.*)'")
 
 
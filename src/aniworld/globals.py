@@ -6,6 +6,8 @@ import sys
 
 import colorlog
 
+from aniworld.common.logqueue import parse_levels, start_logging
+
 IS_DEBUG_MODE = os.getenv('IS_DEBUG_MODE', 'False').lower() in ('true', '1', 't', 'y', 'yes')
 LOG_FILE_PATH = os.path.join(tempfile.gettempdir(), 'aniworld.log')
 
@@ -19,9 +21,100 @@ DEFAULT_KEEP_WATCHING = False
 DEFAULT_ONLY_DIRECT_LINK = False
 DEFAULT_ONLY_COMMAND = False
 DEFAULT_PROXY = None
-DEFAULT_USE_PLAYWRIGHT = True
+DEFAULT_USE_PLAYWRIGHT = False
 DEFAULT_TERMINAL_SIZE = (90, 32)
 
+# Base URLs of the site and of the Doodstream pass_md5 endpoint; override them to point
+# the scraper at a local stand-in server (see tests/loadtest/server.py).
+ANIWORLD_BASE_URL = os.getenv('ANIWORLD_BASE_URL', 'https://aniworld.to').rstrip('/')
+DOODSTREAM_BASE_URL = os.getenv('ANIWORLD_DOODSTREAM_BASE_URL', 'https://dood.li').rstrip('/')
+
+# Startup checks (connectivity, PATH lookups, update check, database) run in parallel
+# with this deadline in seconds; passed checks are cached for DEFAULT_PREFLIGHT_CACHE_TTL
+# seconds in the aniworld data directory (0 disables the cache).
+DEFAULT_PREFLIGHT_TIMEOUT = float(os.getenv('ANIWORLD_PREFLIGHT_TIMEOUT', '2'))
+DEFAULT_PREFLIGHT_CACHE_TTL = int(os.getenv('ANIWORLD_PREFLIGHT_CACHE_TTL', '3600'))
+
+# --aniskip: MAL IDs, episode counts and skip times are cached in the aniworld data directory
+# for DEFAULT_ANISKIP_CACHE_TTL seconds (0 disables the cache); lookups that found nothing are
+# retried after DEFAULT_ANISKIP_NEGATIVE_TTL seconds.
+DEFAULT_ANISKIP_CACHE_TTL = int(os.getenv('ANIWORLD_ANISKIP_CACHE_TTL', str(30 * 24 * 3600)))
+DEFAULT_ANISKIP_NEGATIVE_TTL = int(os.getenv('ANIWORLD_ANISKIP_NEGATIVE_TTL', str(24 * 3600)))
+
+# Watching several episodes: while one plays, the next one (page, direct link, aniskip flags)
+# is resolved in the background. A prefetched link older than DEFAULT_PREFETCH_REVALIDATE_AFTER
+# seconds is checked with a HEAD request before use, one that expires within
+# DEFAULT_PREFETCH_EXPIRY_MARGIN seconds is resolved again. DEFAULT_PREFETCH_HLS_SEGMENTS > 0
+# also requests that many HLS segments of the next episode to warm the CDN edge cache.
+DEFAULT_PREFETCH = os.getenv('ANIWORLD_PREFETCH', 'True').lower() in ('true', '1', 't', 'y', 'yes')
+DEFAULT_PREFETCH_REVALIDATE_AFTER = int(os.getenv('ANIWORLD_PREFETCH_REVALIDATE_AFTER', '300'))
+DEFAULT_PREFETCH_EXPIRY_MARGIN = int(os.getenv('ANIWORLD_PREFETCH_EXPIRY_MARGIN', '120'))
+DEFAULT_PREFETCH_HLS_SEGMENTS = int(os.getenv('ANIWORLD_PREFETCH_HLS_SEGMENTS', '0'))
+
+# Watching several episodes: one mpv instance plays all of them, controlled over its JSON IPC
+# socket; DEFAULT_MPV_IPC_TIMEOUT is how long to wait for the socket after starting mpv.
+DEFAULT_MPV_IPC = os.getenv('ANIWORLD_MPV_IPC', 'True').lower() in ('true', '1', 't', 'y', 'yes')
+DEFAULT_MPV_IPC_TIMEOUT = float(os.getenv('ANIWORLD_MPV_IPC_TIMEOUT', '5'))
+
+# Downloads skip episodes that already exist in the output directory or are recorded as
+# completed in the database; the index of existing files lives in ~/.aniworld/cache/library.db.
+DEFAULT_LIBRARY_INDEX = os.getenv('ANIWORLD_LIBRARY_INDEX', 'True').lower() in ('true', '1', 't', 'y', 'yes')
+
+# Finished downloads are post-processed on DEFAULT_POSTPROCESS_WORKERS threads while the next
+# episode downloads: ffprobe integrity check, remux to MP4 and --aniskip OP/ED chapters with ffmpeg
+# (stream copy, no re-encoding), hashing and the final database record. Corrupt files are
+# downloaded again up to DEFAULT_POSTPROCESS_RETRIES times. The skip times of a season are
+# fetched with DEFAULT_ANISKIP_WORKERS parallel requests.
+DEFAULT_POSTPROCESS = os.getenv('ANIWORLD_POSTPROCESS', 'True').lower() in ('true', '1', 't', 'y', 'yes')
+DEFAULT_POSTPROCESS_WORKERS = int(os.getenv('ANIWORLD_POSTPROCESS_WORKERS', '2'))
+DEFAULT_POSTPROCESS_RETRIES = int(os.getenv('ANIWORLD_POSTPROCESS_RETRIES', '1'))
+DEFAULT_ANISKIP_WORKERS = int(os.getenv('ANIWORLD_ANISKIP_WORKERS', '8'))
+
+# Requests per host are paced by a token bucket ("domain=requests per second[:burst]", subdomains
+# included, other hosts are not limited). A 429 or the AniWorld spam page halves the rate, waits
+# (Retry-After if given) and retries up to DEFAULT_RATE_LIMIT_RETRIES times; answered requests
+# slowly raise the rate back to the configured one.
+DEFAULT_RATE_LIMITS = os.getenv(
+    'ANIWORLD_RATE_LIMITS', 'aniworld.to=2:5,voe.sx=4:8,myanimelist.net=1:3,api.aniskip.com=5:10'
+)
+DEFAULT_RATE_LIMIT_RETRIES = int(os.getenv('ANIWORLD_RATE_LIMIT_RETRIES', '3'))
+
+# Page requests time out after DEFAULT_HTTP_CONNECT_TIMEOUT seconds without a connection or
+# DEFAULT_HTTP_READ_TIMEOUT seconds without data. Timeouts, connection errors and 5xx answers are
+# retried DEFAULT_HTTP_RETRIES times with exponential backoff (DEFAULT_HTTP_BACKOFF seconds, doubled
+# per attempt, with jitter). After DEFAULT_CIRCUIT_BREAKER_THRESHOLD failures in a row a host is
+# skipped for DEFAULT_CIRCUIT_BREAKER_COOLDOWN seconds.
+DEFAULT_HTTP_CONNECT_TIMEOUT = float(os.getenv('ANIWORLD_HTTP_CONNECT_TIMEOUT', '10'))
+DEFAULT_HTTP_READ_TIMEOUT = float(os.getenv('ANIWORLD_HTTP_READ_TIMEOUT', '60'))
+DEFAULT_HTTP_RETRIES = int(os.getenv('ANIWORLD_HTTP_RETRIES', '3'))
+DEFAULT_HTTP_BACKOFF = float(os.getenv('ANIWORLD_HTTP_BACKOFF', '0.5'))
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('ANIWORLD_CIRCUIT_BREAKER_THRESHOLD', '5'))
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = int(os.getenv('ANIWORLD_CIRCUIT_BREAKER_COOLDOWN', '60'))
+
+# Pages are fetched with plain HTTP; a challenge or JavaScript-only answer is loaded again with
+# Playwright and its URL pattern (host and first path segment, e.g. aniworld.to/ajax) stays on the
+# browser, with one plain HTTP probe every DEFAULT_FETCH_REPROBE seconds. DEFAULT_FETCH_STRATEGIES
+# pins patterns or whole hosts ("aniworld.to/ajax=playwright,voe.sx=http"); DEFAULT_USE_PLAYWRIGHT
+# (--use-playwright) sends every page through the browser.
+DEFAULT_FETCH_STRATEGIES = os.getenv('ANIWORLD_FETCH_STRATEGIES', '')
+DEFAULT_FETCH_REPROBE = int(os.getenv('ANIWORLD_FETCH_REPROBE', '600'))
+
+# Per-stage metrics (fetch, parse, extract, aniskip, db, download) are off unless one of these
+# is set: a JSON summary at exit ("-" = stderr, otherwise a file path) and/or an OpenMetrics port.
+DEFAULT_METRICS_SUMMARY = os.getenv('ANIWORLD_METRICS') or None
+DEFAULT_METRICS_PORT = int(os.getenv('ANIWORLD_METRICS_PORT', '0')) or None
+
+# --profile: stack sampling interval for the flame graph and length of the hot-function report
+DEFAULT_PROFILE_INTERVAL_MS = float(os.getenv('ANIWORLD_PROFILE_INTERVAL_MS', '5'))
+DEFAULT_PROFILE_TOP = int(os.getenv('ANIWORLD_PROFILE_TOP', '30'))
+
+# Logging: per-module levels as "logger=LEVEL,..." (e.g. "aniworld.db=WARNING,aniworld.search=DEBUG");
+# records from one call site beyond DEFAULT_LOG_RATE_BURST per DEFAULT_LOG_RATE_INTERVAL seconds
+# are dropped and counted (0 disables the limit, errors are never dropped).
+DEFAULT_LOG_LEVELS = os.getenv('ANIWORLD_LOG_LEVELS', '')
+DEFAULT_LOG_RATE_INTERVAL = float(os.getenv('ANIWORLD_LOG_RATE_INTERVAL', '10'))
+DEFAULT_LOG_RATE_BURST = int(os.getenv('ANIWORLD_LOG_RATE_BURST', '20'))
+
 log_colors = {
     'DEBUG': 'bold_blue',
     'INFO': 'bold_green',
@@ -58,13 +151,15 @@ handlers = [console_handler]
 if file_handler:
     handlers.append(file_handler)
 
-logging.basicConfig(
+# console and file output run on a listener thread; callers only pay for enqueueing the record
+start_logging(
+    handlers,
     level=logging.DEBUG if IS_DEBUG_MODE else logging.INFO,
-    handlers=handlers
+    levels={'urllib3': logging.WARNING, **parse_levels(DEFAULT_LOG_LEVELS)},
+    rate_interval=DEFAULT_LOG_RATE_INTERVAL,
+    rate_burst=DEFAULT_LOG_RATE_BURST
 )
 
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.3",
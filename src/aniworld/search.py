@@ -4,65 +4,33 @@ import os
 import webbrowser
 import re
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Union
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Union
 from json import loads
 from json.decoder import JSONDecodeError
 from urllib.parse import quote
 import traceback
 
-import curses
 from bs4 import BeautifulSoup
-from sqlalchemy.orm import Session
-from mysql.connector import MySQLConnection
 
+from aniworld import globals as aniworld_globals
 from aniworld.common import (
     clear_screen,
     fetch_url_content,
-    display_ascii_art,
     show_messagebox,
 )
-from aniworld.models import AnimeSeries, Season, Episode
-from aniworld.database.repositories import AnimeRepository, SeasonRepository, EpisodeRepository
+from aniworld.database import HAS_DATABASE
+
+if TYPE_CHECKING:
+    # Nur für Typannotationen; sqlalchemy, mysql und curses werden zur Laufzeit
+    # erst dort importiert, wo sie tatsächlich gebraucht werden.
+    import curses
+    from mysql.connector import MySQLConnection
+    from aniworld.models import AnimeSeries
 
 # Logger für dieses Modul einrichten
 module_log = logging.getLogger(__name__)
 
-# Datenbankintegration (optional für Systeme ohne Datenbank)
-try:
-    from aniworld.database import HAS_DATABASE, get_pipeline
-except ImportError:
-    HAS_DATABASE = False
-
-    def get_pipeline():
-        return None
-
-# Temporärer Test der Datenbankverbindung
-print("=== DATENBANK-TEST ===")
-print(f"HAS_DATABASE vor Import: {HAS_DATABASE}")
-try:
-    from aniworld.database.pipeline import get_pipeline
-    HAS_DATABASE = True
-    print(f"HAS_DATABASE nach Import: {HAS_DATABASE}")
-    pipeline = get_pipeline()
-    print(f"Pipeline erstellt: {pipeline}")
-    if pipeline.db is None:
-        print("FEHLER: Datenbankverbindung konnte nicht hergestellt werden")
-    else:
-        print("ERFOLG: Datenbankverbindung erfolgreich hergestellt")
-        # Teste eine einfache Datenbankoperation
-        try:
-            animes = pipeline.db.find_all_animes()
-            print(f"Anzahl Anime in der Datenbank: {len(animes)}")
-        except Exception as e:
-            print(f"FEHLER bei Datenbankabfrage: {str(e)}")
-except Exception as e:
-    print(f"FEHLER bei Datenbanktest: {str(e)}")
-print("=== ENDE DATENBANK-TEST ===")
-
-try:
-    from aniworld.database.pipeline import get_pipeline
-    HAS_DATABASE = True
-except ImportError:
+if not HAS_DATABASE:
     logging.debug("Datenbankmodul nicht verfügbar, Speicherung wird deaktiviert")
 
 
@@ -82,7 +50,7 @@ def search_anime(slug: str = None, link: str = None, query: str = None) -> str:
 
 
 def fetch_by_slug(slug: str, not_found: str) -> str:
-    url = f"https://aniworld.to/anime/stream/{slug}"
+    url = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/{slug}"
     logging.debug("Fetching using slug: %s", url)
     response = fetch_url_content(url)
     if response and not_found not in response.decode():
@@ -96,7 +64,7 @@ def fetch_by_slug(slug: str, not_found: str) -> str:
                 soup = BeautifulSoup(html_content, 'html.parser')
                 save_anime_data_from_html(soup, url)
             except Exception as e:
-                logging.error(f"Fehler beim Speichern der Anime-Daten in der Datenbank: {e}")
+                logging.error("Fehler beim Speichern der Anime-Daten in der Datenbank: %s", e)
         
         return slug
     return None
@@ -118,7 +86,7 @@ def fetch_by_link(link: str, not_found: str) -> str:
                     soup = BeautifulSoup(html_content, 'html.parser')
                     save_anime_data_from_html(soup, link)
                 except Exception as e:
-                    logging.error(f"Fehler beim Speichern der Anime-Daten in der Datenbank: {e}")
+                    logging.error("Fehler beim Speichern der Anime-Daten in der Datenbank: %s", e)
             
             return slug
     except ValueError:
@@ -127,8 +95,8 @@ def fetch_by_link(link: str, not_found: str) -> str:
 
 
 def save_anime_data_from_html(
-    soup: BeautifulSoup, anime_link: str, session: Optional[MySQLConnection] = None
-) -> Union[AnimeSeries, None]:
+    soup: BeautifulSoup, anime_link: str, session: Optional["MySQLConnection"] = None
+) -> Union["AnimeSeries", None]:
     """
     Extracts anime data from the HTML content and saves it to the database.
 
@@ -140,12 +108,12 @@ def save_anime_data_from_html(
     Returns:
         AnimeSeries object if successful, None otherwise
     """
-    module_log.debug(f"Starte Extraktion und Speicherung für: {anime_link}")
+    module_log.debug("Starte Extraktion und Speicherung für: %s", anime_link)
     
     try:
         soup_content = soup.prettify()
         if "Wartungsarbeiten" in soup_content or "Wir aktualisieren" in soup_content:
-            module_log.error(f"Wartungsarbeiten oder Update der Seite: {anime_link}")
+            module_log.error("Wartungsarbeiten oder Update der Seite: %s", anime_link)
             return None
 
         # Erstelle das Dictionary im Format für AnimeService.save_from_scraper_data
@@ -177,16 +145,16 @@ def save_anime_data_from_html(
                     # Bei normalen HTML-Elementen den Text verwenden
                     anime_title = element.text.strip()
                 
-                module_log.debug(f"Titel mit Selektor '{selector}' gefunden: {anime_title}")
+                module_log.debug("Titel mit Selektor '%s' gefunden: %s", selector, anime_title)
                 break
         
         if anime_title:
             anime_data["title"] = anime_title
-            module_log.debug(f"Extrahierter Titel: {anime_title}")
+            module_log.debug("Extrahierter Titel: %s", anime_title)
         else:
-            module_log.error(f"Kein Anime-Titel gefunden in: {anime_link}")
+            module_log.error("Kein Anime-Titel gefunden in: %s", anime_link)
             # HTML-Vorschau ausgeben für Debugging
-            module_log.debug(f"HTML-Vorschau (erste 500 Zeichen):\n{soup_content[:500]}")
+            module_log.debug("HTML-Vorschau (erste 500 Zeichen):\n%s", soup_content[:500])
             
             # Versuche einen Titel aus der URL zu extrahieren
             try:
@@ -194,7 +162,7 @@ def save_anime_data_from_html(
                 slug = url_parts[-1]
                 title_from_slug = slug.replace('-', ' ').title()
                 anime_data["title"] = title_from_slug
-                module_log.info(f"Titel aus URL-Slug extrahiert: {title_from_slug}")
+                module_log.info("Titel aus URL-Slug extrahiert: %s", title_from_slug)
             except:
                 return None
 
@@ -207,7 +175,7 @@ def save_anime_data_from_html(
             anime_data["description"] = description_element.text.strip()
         else:
             anime_data["description"] = None
-            module_log.debug(f"Keine Beschreibung gefunden für: {anime_title}")
+            module_log.debug("Keine Beschreibung gefunden für: %s", anime_title)
 
         # Extract cover image URL - verbessert mit mehreren Selektoren
         cover_selectors = [
@@ -223,7 +191,7 @@ def save_anime_data_from_html(
             element = soup.select_one(selector)
             if element and (element.get("src") or element.get("content")):
                 cover_image = element.get("src") or element.get("content")
-                module_log.debug(f"Cover mit Selektor '{selector}' gefunden: {cover_image}")
+                module_log.debug("Cover mit Selektor '%s' gefunden: %s", selector, cover_image)
                 break
         
         # Korrekter Schlüssel für AnimeService ist cover_url, nicht cover_image
@@ -240,7 +208,7 @@ def save_anime_data_from_html(
         anime_data["genres"] = genres if genres else None
         
         if anime_data["genres"]:
-            module_log.debug(f"Extrahierte Genres für {anime_title}: {anime_data['genres']}")
+            module_log.debug("Extrahierte Genres für %s: %s", anime_title, anime_data['genres'])
 
         # Extract seasons and episodes - verbesserte Staffel- und Episodenextraktion
         seasons = []
@@ -252,7 +220,7 @@ def save_anime_data_from_html(
             if season_id and season_id.isdigit():
                 season_ids.add(int(season_id))
         
-        module_log.debug(f"Gefundene Staffel-IDs mit data-season-id: {season_ids}")
+        module_log.debug("Gefundene Staffel-IDs mit data-season-id: %s", season_ids)
         
         # Erweiterte Staffelerkennung: Suche nach allen Links, die auf Staffeln verweisen
         all_season_links = soup.select("a[href*='/staffel-']")
@@ -264,7 +232,7 @@ def save_anime_data_from_html(
                 if match:
                     season_id = int(match.group(1))
                     season_ids.add(season_id)
-                    module_log.debug(f"Staffel {season_id} aus Link {href} extrahiert")
+                    module_log.debug("Staffel %s aus Link %s extrahiert", season_id, href)
         
         # Auch nach Textmustern in den Überschriften und Containern suchen
         for heading in soup.select("h2, h3, div.seasonHeader, div.seasonSelection"):
@@ -273,9 +241,9 @@ def save_anime_data_from_html(
             if match:
                 season_id = int(match.group(1))
                 season_ids.add(season_id)
-                module_log.debug(f"Staffel {season_id} aus Text '{text}' extrahiert")
+                module_log.debug("Staffel %s aus Text '%s' extrahiert", season_id, text)
         
-        module_log.debug(f"Alle gefundenen Staffel-IDs: {season_ids}")
+        module_log.debug("Alle gefundenen Staffel-IDs: %s", season_ids)
         
         # Wenn immer noch keine Staffeln gefunden wurden, erstelle eine Standardstaffel
         if not season_ids:
@@ -307,9 +275,9 @@ def save_anime_data_from_html(
                         title = episode_title_cell.text.strip()
                         if title:
                             episode_titles[episode_num] = title
-                            module_log.debug(f"Extrahierter Episodentitel: Episode {episode_num} - {title}")
+                            module_log.debug("Extrahierter Episodentitel: Episode %s - %s", episode_num, title)
                     except (ValueError, IndexError) as e:
-                        module_log.debug(f"Fehler beim Extrahieren des Episodentitels: {e}")
+                        module_log.debug("Fehler beim Extrahieren des Episodentitels: %s", e)
         
         # Extrahiere Informationen für jede Staffel
         for season_id in sorted(season_ids):
@@ -320,7 +288,7 @@ def save_anime_data_from_html(
             episode_links = soup.select(f"[data-season-id='{season_id}'] a[data-episode-id], a[href*='/staffel-{season_id}/episode-']")
             
             if not episode_links:
-                module_log.debug(f"Keine Episoden-Links für Staffel {season_id} gefunden. Versuche alternative Methode.")
+                module_log.debug("Keine Episoden-Links für Staffel %s gefunden. Versuche alternative Methode.", season_id)
                 # Alternativer Ansatz: Suche nach allen Links, die die Staffel im Pfad haben
                 for link in soup.select("a[href*='/staffel-']"):
                     href = link.get("href", "")
@@ -329,7 +297,7 @@ def save_anime_data_from_html(
             
             # Erweiterte Episodenerkennung für Staffel
             if not episode_links or len(episode_links) == 0:
-                module_log.debug(f"Immer noch keine Episoden-Links für Staffel {season_id} gefunden. Versuche weitere Methoden.")
+                module_log.debug("Immer noch keine Episoden-Links für Staffel %s gefunden. Versuche weitere Methoden.", season_id)
                 
                 # Methode 1: Suche nach Episoden-Tabellen für diese Staffel
                 for table in soup.select("table.seasonEpisodesTable, div.episodes-table"):
@@ -341,7 +309,7 @@ def save_anime_data_from_html(
                         for link in table.select("a[href*='/episode-']"):
                             if link not in episode_links:
                                 episode_links.append(link)
-                                module_log.debug(f"Episode-Link für Staffel {season_id} in Tabelle gefunden: {link.get('href', '')}")
+                                module_log.debug("Episode-Link für Staffel %s in Tabelle gefunden: %s", season_id, link.get('href', ''))
                 
                 # Methode 2: Suche nach allen Episode-Links und überprüfe, ob sie zur aktuellen Staffel gehören
                 for link in soup.select("a[href*='/episode-']"):
@@ -351,9 +319,9 @@ def save_anime_data_from_html(
                     if staffel_match and int(staffel_match.group(1)) == season_id:
                         if link not in episode_links:
                             episode_links.append(link)
-                            module_log.debug(f"Episode-Link für Staffel {season_id} gefunden: {href}")
+                            module_log.debug("Episode-Link für Staffel %s gefunden: %s", season_id, href)
             
-            module_log.debug(f"Anzahl Episoden-Links für Staffel {season_id}: {len(episode_links)}")
+            module_log.debug("Anzahl Episoden-Links für Staffel %s: %s", season_id, len(episode_links))
             
             for episode_link in episode_links:
                 # Versuche die Episoden-ID aus dem data-attribute zu lesen
@@ -403,33 +371,33 @@ def save_anime_data_from_html(
                 episode_data = {
                     "number": episode_number,
                     "title": episode_title,
-                    "url": f"https://aniworld.to{episode_url}" if episode_url.startswith("/") else episode_url,
+                    "url": f"{aniworld_globals.ANIWORLD_BASE_URL}{episode_url}" if episode_url.startswith("/") else episode_url,
                 }
                 season_data["episodes"].append(episode_data)
             
             if season_data["episodes"]:
                 seasons.append(season_data)
-                module_log.debug(f"Staffel {season_id} mit {len(season_data['episodes'])} Episoden hinzugefügt")
+                module_log.debug("Staffel %s mit %s Episoden hinzugefügt", season_id, len(season_data['episodes']))
 
         anime_data["seasons"] = seasons
-        module_log.debug(f"Anzahl Staffeln in den Daten: {len(seasons)}")
+        module_log.debug("Anzahl Staffeln in den Daten: %s", len(seasons))
         
-        # Detaillierte Debug-Ausgabe zu den gefundenen Staffeln
-        for idx, season in enumerate(seasons):
-            module_log.debug(f"Staffel {idx+1}: Nummer={season.get('number')}, Titel={season.get('title')}, Episoden={len(season.get('episodes', []))}")
+        # Detaillierte Debug-Ausgabe zu den gefundenen Staffeln (nur wenn DEBUG aktiv ist)
+        for idx, season in enumerate(seasons if module_log.isEnabledFor(logging.DEBUG) else []):
+            module_log.debug("Staffel %s: Nummer=%s, Titel=%s, Episoden=%s", idx+1, season.get('number'), season.get('title'), len(season.get('episodes', [])))
             # Zeige die ersten 3 Episoden als Beispiel
             for ep_idx, episode in enumerate(season.get('episodes', [])[:3]):
-                module_log.debug(f"  - Episode {ep_idx+1}: Nummer={episode.get('number')}, Titel={episode.get('title')}")
+                module_log.debug("  - Episode %s: Nummer=%s, Titel=%s", ep_idx+1, episode.get('number'), episode.get('title'))
             
             if len(season.get('episodes', [])) > 3:
-                module_log.debug(f"  - ... und {len(season.get('episodes', [])) - 3} weitere Episoden")
+                module_log.debug("  - ... und %s weitere Episoden", len(season.get('episodes', [])) - 3)
 
         # Im Anime Link keine trailing slashes für die Datenbank
         if anime_link.endswith("/"):
             anime_link = anime_link[:-1]
 
         if "seasons" not in anime_data or not anime_data["seasons"]:
-            module_log.debug(f"Keine Staffeldaten im anime_data Dictionary gefunden! Versuche Standardstaffel zu erstellen.")
+            module_log.debug("Keine Staffeldaten im anime_data Dictionary gefunden! Versuche Standardstaffel zu erstellen.")
             # Wenn keine Staffeln gefunden wurden, erstelle eine leere Staffel 1
             anime_data["seasons"] = [{
                 "number": 1,
@@ -437,6 +405,14 @@ def save_anime_data_from_html(
                 "episodes": []
             }]
 
+        # Mit write_behind schreibt ein Hintergrund-Thread, der Aufrufer wartet nicht auf die Datenbank
+        from aniworld.database.write_behind import get_writer  # pylint: disable=import-outside-toplevel
+        writer = get_writer()
+        if writer is not None:
+            writer.submit('anime', anime_link, anime_data)
+            module_log.debug("Anime '%s' zum Speichern eingereiht", anime_data['title'])
+            return None
+
         # GEÄNDERT: Verwende AnimeService anstelle von direktem SQL
         try:
             from aniworld.database.services import AnimeService
@@ -445,11 +421,11 @@ def save_anime_data_from_html(
             
             # Hole das vollständige Anime-Objekt
             anime = anime_service.get_anime_by_id(anime_id)
-            module_log.info(f"Anime '{anime_data['title']}' in Datenbank gespeichert mit ID: {anime_id}")
+            module_log.info("Anime '%s' in Datenbank gespeichert mit ID: %s", anime_data['title'], anime_id)
             
             return anime
         except Exception as e:
-            module_log.error(f"Fehler beim Speichern über AnimeService: {e}")
+            module_log.error("Fehler beim Speichern über AnimeService: %s", e)
             module_log.error(traceback.format_exc())
             
             # Fallback: Versuche minimale Anime-Daten zu speichern
@@ -459,15 +435,15 @@ def save_anime_data_from_html(
                 anime_id = db.save_minimal_anime(anime_link.split('/')[-1], anime_data["title"])
                 if anime_id:
                     anime = db.get_anime_by_id(anime_id)
-                    module_log.info(f"Minimale Anime-Daten gespeichert mit ID: {anime_id}")
+                    module_log.info("Minimale Anime-Daten gespeichert mit ID: %s", anime_id)
                     return anime
             except Exception as e2:
-                module_log.error(f"Auch Fallback für minimale Speicherung fehlgeschlagen: {e2}")
+                module_log.error("Auch Fallback für minimale Speicherung fehlgeschlagen: %s", e2)
             
             return None
 
     except Exception as e:
-        module_log.error(f"Fehler bei der Extraktion oder Speicherung der Anime-Daten: {e}")
+        module_log.error("Fehler bei der Extraktion oder Speicherung der Anime-Daten: %s", e)
         module_log.error(traceback.format_exc())
         return None
 
@@ -476,6 +452,7 @@ def search_by_query(query: str) -> str:
     while True:
         clear_screen()
         if not query:
+            from aniworld.common.ascii_art import display_ascii_art  # pylint: disable=import-outside-toplevel
             print(display_ascii_art())
             query = input("Search for a series: ")
             if query.lower().strip() == "boku no piko":
@@ -483,7 +460,7 @@ def search_by_query(query: str) -> str:
         else:
             logging.debug("Using provided query: %s", query)
 
-        url = f"https://aniworld.to/ajax/seriesSearch?keyword={quote(query)}"
+        url = f"{aniworld_globals.ANIWORLD_BASE_URL}/ajax/seriesSearch?keyword={quote(query)}"
         logging.debug("Fetching Anime List with query: %s", query)
 
         json_data = fetch_anime_json(url)
@@ -501,21 +478,21 @@ def search_by_query(query: str) -> str:
         # Hier speichern wir alle gefundenen Anime in der Datenbank, bevor wir fortfahren
         if HAS_DATABASE:
             try:
-                logging.info(f"Speichere {len(json_data)} gefundene Anime in die Datenbank...")
+                logging.info("Speichere %s gefundene Anime in die Datenbank...", len(json_data))
                 for anime_item in json_data:
                     try:
                         # Anime-Link extrahieren und Details abrufen
                         anime_link = anime_item.get('link')
                         if anime_link:
                             print(f"Original Link aus Suchergebnissen: '{anime_link}'")
-                            logging.debug(f"Hole Details für Anime: {anime_link}")
+                            logging.debug("Hole Details für Anime: %s", anime_link)
                             # Vollständige URL erstellen, falls notwendig
                             if not anime_link.startswith('http'):
                                 print(f"Link beginnt nicht mit http, füge Präfix hinzu")
                                 # Prüfen, ob der Link bereits mit / beginnt
                                 if not anime_link.startswith('/'):
                                     anime_link = f"/anime/stream/{anime_link}"
-                                anime_link = f"https://aniworld.to{anime_link}"
+                                anime_link = f"{aniworld_globals.ANIWORLD_BASE_URL}{anime_link}"
                             
                             print(f"Endgültiger Link für Abfrage: '{anime_link}'")
                             
@@ -527,13 +504,13 @@ def search_by_query(query: str) -> str:
                                 soup = BeautifulSoup(html_content, 'html.parser')
                                 # Anime-Daten aus HTML extrahieren und in Datenbank speichern
                                 anime_id = save_anime_data_from_html(soup, anime_link)
-                                logging.info(f"Anime '{anime_item.get('name', 'Unbekannt')}' in Datenbank gespeichert mit ID: {anime_id}")
+                                logging.info("Anime '%s' in Datenbank gespeichert mit ID: %s", anime_item.get('name', 'Unbekannt'), anime_id)
                     except Exception as e:
-                        logging.error(f"Fehler beim Speichern des Anime {anime_item.get('name', 'Unbekannt')}: {e}")
+                        logging.error("Fehler beim Speichern des Anime %s: %s", anime_item.get('name', 'Unbekannt'), e)
                         print(f"Fehler beim Speichern von '{anime_item.get('name', 'Unbekannt')}': {e}")
                         traceback.print_exc()
             except Exception as e:
-                logging.error(f"Kritischer Fehler beim Datenbankvorgang: {e}")
+                logging.error("Kritischer Fehler beim Datenbankvorgang: %s", e)
                 print(f"Kritischer Fehler bei der Datenbankoperation: {e}")
                 traceback.print_exc()
                 # Wenn ein kritischer Fehler auftritt, deaktivieren wir temporär die Datenbankfunktionalität
@@ -544,6 +521,7 @@ def search_by_query(query: str) -> str:
             logging.debug("Only one anime found: %s", json_data[0])
             return json_data[0].get('link', 'No Link Found')
 
+        import curses  # pylint: disable=import-outside-toplevel
         selected_slug = curses.wrapper(display_menu, json_data)
         logging.debug("Found matching slug: %s", selected_slug)
         return selected_slug
@@ -552,7 +530,7 @@ def search_by_query(query: str) -> str:
 def fetch_anime_json(url: str) -> Optional[List[Dict]]:
     """Abrufen der JSON-Daten für die Suche"""
     print(f"\nSende Suchanfrage an: {url}")
-    logging.debug(f"Fetching anime JSON data from: {url}")
+    logging.debug("Fetching anime JSON data from: %s", url)
     
     response = fetch_url_content(url)
     if not response:
@@ -583,35 +561,37 @@ def fetch_anime_json(url: str) -> Optional[List[Dict]]:
                     return None
         
         # Log erste 200 Zeichen der Antwort
-        logging.debug(f"Response first 200 chars: {response_text[:200]}")
+        logging.debug("Response first 200 chars: %s", response_text[:200])
         print(f"Antwort erhalten, verarbeite Daten...")
         
         # Versuche die JSON-Daten zu parsen
         decoded_data = loads(response_text)
         
         if isinstance(decoded_data, list):
-            logging.debug(f"Parsed JSON data: Found {len(decoded_data)} items")
+            logging.debug("Parsed JSON data: Found %s items", len(decoded_data))
             print(f"Gefunden: {len(decoded_data)} Anime-Einträge")
             return decoded_data
         else:
             print(f"Unerwartetes Antwortformat: {type(decoded_data)}")
-            logging.error(f"Unexpected response format: {type(decoded_data)}")
+            logging.error("Unexpected response format: %s", type(decoded_data))
             return None
             
     except JSONDecodeError as e:
         print(f"Fehler beim Dekodieren der JSON-Antwort: {str(e)}")
-        logging.error(f"JSON decode error: {str(e)}")
+        logging.error("JSON decode error: %s", str(e))
         # Zeige die ersten 200 Zeichen der Antwort an
         if response:
             print(f"Antwort (erste 200 Zeichen): {response.decode('utf-8', errors='replace')[:200]}...")
         return None
     except Exception as e:
         print(f"Unerwarteter Fehler bei der Verarbeitung der Suchantwort: {str(e)}")
-        logging.error(f"Unexpected error processing search response: {str(e)}")
+        logging.error("Unexpected error processing search response: %s", str(e))
         return None
 
 
-def display_menu(stdscr: curses.window, items: List[Dict[str, Optional[str]]]) -> Optional[str]:
+def display_menu(stdscr: "curses.window", items: List[Dict[str, Optional[str]]]) -> Optional[str]:
+    import curses  # pylint: disable=import-outside-toplevel
+
     logging.debug("Starting display_menu function")
     current_row = 0
 
@@ -666,6 +646,8 @@ def display_menu(stdscr: curses.window, items: List[Dict[str, Optional[str]]]) -
 
 
 def konami_code_activated():
+    import curses  # pylint: disable=import-outside-toplevel
+
     logging.debug("Konami Code activated!")
     curses.endwin()
     webbrowser.open('https://www.youtube.com/watch?v=PDJLvF1dUek')
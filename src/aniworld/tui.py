@@ -0,0 +1,579 @@
+import os
+import sys
+import re
+import logging
+import platform
+import threading
+import random
+import signal
+import textwrap
+
+import npyscreen
+
+from aniworld import execute
+from aniworld.common import (
+    get_season_data,
+    get_version,
+    get_season_and_episode_numbers,
+    get_anime_season_title,
+    show_messagebox,
+    get_description,
+    get_description_with_id
+)
+from aniworld.common.preflight import get_preflight_result
+from aniworld.database import HAS_DATABASE
+from aniworld.extractors import (
+    nhentai,
+    streamkiste,
+    jav,
+    hanime
+)
+
+def format_anime_title(anime_slug):
+    logging.debug("Formatting anime title for slug: %s", anime_slug)
+    try:
+        formatted_title = anime_slug.replace("-", " ").title()
+        logging.debug("Formatted title: %s", formatted_title)
+        return formatted_title
+    except AttributeError:
+        logging.debug("AttributeError encountered in format_anime_title")
+        sys.exit()
+
+
+class CustomTheme(npyscreen.ThemeManager):
+    default_colors = {
+        'DEFAULT': 'WHITE_BLACK',
+        'FORMDEFAULT': 'MAGENTA_BLACK',  # Form border
+        'NO_EDIT': 'BLUE_BLACK',
+        'STANDOUT': 'CYAN_BLACK',
+        'CURSOR': 'WHITE_BLACK',  # Text (focused)
+        'CURSOR_INVERSE': 'BLACK_WHITE',
+        'LABEL': 'CYAN_BLACK',  # Form labels
+        'LABELBOLD': 'CYAN_BLACK',  # Form labels (focused)
+        'CONTROL': 'GREEN_BLACK',  # Items in form
+        'IMPORTANT': 'GREEN_BLACK',
+        'SAFE': 'GREEN_BLACK',
+        'WARNING': 'YELLOW_BLACK',
+        'DANGER': 'RED_BLACK',
+        'CRITICAL': 'BLACK_RED',
+        'GOOD': 'GREEN_BLACK',
+        'GOODHL': 'GREEN_BLACK',
+        'VERYGOOD': 'BLACK_GREEN',
+        'CAUTION': 'YELLOW_BLACK',
+        'CAUTIONHL': 'BLACK_YELLOW',
+    }
+
+
+# pylint: disable=too-many-ancestors, too-many-instance-attributes
+class EpisodeForm(npyscreen.ActionForm):
+    def create(self):
+        logging.debug("Creating EpisodeForm")
+        try:
+            anime_slug = self.parentApp.anime_slug
+            if not anime_slug:
+                raise ValueError("Anime-Slug ist nicht gesetzt.")
+                
+            logging.debug(f"EpisodeForm: Verarbeite Anime-Slug: {anime_slug}")
+
+            self.season_episodes = []
+            try:
+                self.season_episodes = get_season_data(anime_slug)
+                logging.debug(f"Gefundene Staffelepisoden für {anime_slug}: {len(self.season_episodes)}")
+            except Exception as e:
+                logging.error(f"Fehler beim Laden der Staffeldaten für {anime_slug}: {e}", exc_info=True)
+                npyscreen.notify_confirm(f"Fehler beim Laden der Staffeldaten: {e}", "Fehler")
+                self.season_episodes = [] # Fallback: Leere Liste, um Abstürze zu vermeiden
+
+            if not self.season_episodes:
+                logging.warning(f"Keine Staffel- oder Episodendaten für {anime_slug} gefunden oder geladen.")
+                npyscreen.notify_confirm(
+                    "Keine Episoden für diesen Anime gefunden.",
+                    "Keine Episoden"
+                )
+                self.editing = False
+                self.parentApp.switchFormPrevious()
+                return
+
+            # Umfassender try-except-Block für den gesamten Erstellungsprozess der Formularelemente
+            try:
+                season_titles = {}
+                try:
+                    # Sammle eindeutige Staffeltitel
+                    unique_seasons = set()
+                    for episode_url in self.season_episodes:
+                        season_match = re.search(r'staffel-(\d+)', episode_url)
+                        if season_match:
+                            season_num = int(season_match.group(1))
+                            unique_seasons.add(season_num)
+
+                    for season_num in unique_seasons:
+                        try:
+                            season_titles[season_num] = get_anime_season_title(anime_slug, season_num)
+                        except Exception as e:
+                            logging.error(f"Fehler beim Abrufen des Titels für Staffel {season_num}: {e}", exc_info=True)
+                            season_titles[season_num] = f"Staffel {season_num}"
+                except Exception as e:
+                    logging.error(f"Fehler beim Abrufen der Staffeltitel für {anime_slug}: {e}", exc_info=True)
+                    season_titles = {} # Fallback: Leeres Dictionary, um Abstürze zu vermeiden
+
+                episode_urls_by_season = {}
+                try:
+                    for episode_url in self.season_episodes:
+                        season_match = re.search(r'staffel-(\d+)', episode_url)
+                        if season_match:
+                            season_num = int(season_match.group(1))
+                            if season_num not in episode_urls_by_season:
+                                episode_urls_by_season[season_num] = []
+                            episode_urls_by_season[season_num].append(episode_url)
+                        else:
+                            # Filme oder Specials ohne Staffelnummer
+                            if 0 not in episode_urls_by_season:
+                                episode_urls_by_season[0] = []
+                            episode_urls_by_season[0].append(episode_url)
+                except Exception as e:
+                    logging.error(f"Fehler beim Gruppieren der Episoden-URLs nach Staffeln für {anime_slug}: {e}", exc_info=True)
+                    # Fallback: Falls die Gruppierung fehlschlägt, erstelle eine generische Gruppierung
+                    episode_urls_by_season = {1: self.season_episodes}
+
+                # Wenn immer noch keine Episoden nach Staffeln gruppiert sind, erstelle einen Notfall-Fallback
+                if not episode_urls_by_season:
+                    logging.warning("Keine Episoden nach Staffeln gruppiert. Erstelle Notfall-Fallback.")
+                    episode_urls_by_season = {1: self.season_episodes}
+
+                season_list = []
+                try:
+                    # Erstelle eine sortierte Liste von Staffeln
+                    sorted_seasons = sorted(episode_urls_by_season.keys())
+                    for season_num in sorted_seasons:
+                        season_title = season_titles.get(season_num, f"Staffel {season_num}")
+                        episodes_for_season = episode_urls_by_season[season_num]
+                        season_list.append(f"{season_title} ({len(episodes_for_season)} Episoden)")
+                except Exception as e:
+                    logging.error(f"Fehler beim Erstellen der Staffelliste für die Anzeige für {anime_slug}: {e}", exc_info=True)
+                    season_list = ["Fehler beim Laden der Staffelliste"] # Fallback: Fehlermeldung, um Abstürze zu vermeiden
+
+                # Sicherstellen, dass die Liste nicht leer ist, um Abstürze zu vermeiden
+                if not season_list:
+                    logging.warning(f"Keine Staffeln zum Anzeigen für {anime_slug} gefunden. Erstelle Fallback-Eintrag.")
+                    season_list = [f"Alle Episoden ({len(self.season_episodes)} Stück)"]
+                    episode_urls_by_season = {0: self.season_episodes}
+
+                # Erstelle die UI-Elemente
+                self.add(npyscreen.FixedText,
+                        value=f"Anime: {format_anime_title(anime_slug)}", editable=False)
+                self.season_selector = self.add(
+                    npyscreen.TitleSelectOne,
+                    max_height=min(12, len(season_list)),
+                    value=[0],
+                    name="Staffel auswählen:",
+                    values=season_list,
+                    scroll_exit=True,
+                )
+
+                # Sichere Initialisierung der Episode-Liste
+                initial_episodes = []
+                selected_season_idx = 0  # Standardmäßig wählen wir Staffel 1
+                if season_list and selected_season_idx < len(sorted_seasons):
+                    selected_season = sorted_seasons[selected_season_idx]
+                    initial_episodes = episode_urls_by_season.get(selected_season, [])
+
+                self.episode_selector = self.add(
+                    npyscreen.TitleMultiSelect,
+                    max_height=min(12, len(initial_episodes) if initial_episodes else 1),
+                    value=[],
+                    name="Episoden auswählen:",
+                    values=self._format_episode_list(initial_episodes) if initial_episodes else ["Keine Episoden gefunden"],
+                    scroll_exit=True,
+                )
+
+                # Speichere die Daten für spätere Verwendung und Event-Handling
+                self.episode_urls_by_season = episode_urls_by_season
+                self.sorted_seasons = sorted_seasons
+                
+                # Füge den Rest der UI-Elemente hinzu
+                self._setup_remaining_ui_elements()
+                
+                # Richte Signal-Handling und Event-Handling ein
+                self.setup_signal_handling()
+                
+                # Nachricht für erfolgreiche Formularerstellung
+                logging.debug(f"EpisodeForm erfolgreich erstellt für {anime_slug}")
+                
+            except Exception as e:
+                logging.error(f"Kritischer Fehler bei der Erstellung des Formulars für {anime_slug}: {e}", exc_info=True)
+                npyscreen.notify_confirm(
+                    f"Es ist ein kritischer Fehler aufgetreten: {str(e)}\n\nDie Anwendung kehrt zum Hauptmenü zurück.",
+                    "Kritischer Fehler"
+                )
+                # Versuche, zum vorherigen Formular zurückzukehren
+                try:
+                    self.editing = False
+                    self.parentApp.switchFormPrevious()
+                except:
+                    # Wenn alles andere fehlschlägt, beende die Anwendung sauber
+                    self.parentApp.switchForm(None)
+                return
+                
+        except Exception as outer_e:
+            # Äußerste Fehlerbehandlung - sollte nur bei kritischen Fehlern erreicht werden
+            logging.critical(f"Fataler Fehler in EpisodeForm.create(): {outer_e}", exc_info=True)
+            try:
+                npyscreen.notify_confirm(
+                    "Ein schwerwiegender Fehler ist aufgetreten. Die Anwendung kehrt zum Hauptmenü zurück.",
+                    "Fataler Fehler"
+                )
+                self.editing = False
+                self.parentApp.switchFormPrevious()
+            except:
+                # Wenn alles andere fehlschlägt
+                try:
+                    self.parentApp.switchForm(None)
+                except:
+                    pass
+            return
+
+    def _format_episode_list(self, episode_urls):
+        """Hilfsmethode zur Formatierung der Episodenliste"""
+        try:
+            episode_list = []
+            for url in episode_urls:
+                try:
+                    season_number, episode_number = get_season_and_episode_numbers(url)
+                    episode_list.append(f"Episode {episode_number}")
+                except:
+                    # Fallback für URLs ohne erkennbare Staffel/Episode
+                    episode_list.append(f"Episode (URL: {url.split('/')[-1]})")
+            return episode_list
+        except Exception as e:
+            logging.error(f"Fehler beim Formatieren der Episodenliste: {e}", exc_info=True)
+            return ["Fehler beim Formatieren der Episodenliste"]
+            
+    def _setup_remaining_ui_elements(self):
+        """Richtet die restlichen UI-Elemente ein"""
+        try:
+            # Ab hier den restlichen Code aus der create-Methode kopieren
+            self.language_selector = self.add(
+                npyscreen.TitleSelectOne,
+                max_height=5,
+                value=[0],
+                name="Sprache auswählen:",
+                values=["Deutsch", "Englisch", "Japanisch (mit Untertiteln)"],
+                scroll_exit=True,
+            )
+            
+            self.provider_selector = self.add(
+                npyscreen.TitleSelectOne,
+                max_height=3,
+                value=[0],
+                name="Anbieter auswählen:",
+                values=["Vidoza", "Streamtape", "VOE", "Vidmoly", "SpeedFiles"],
+                scroll_exit=True,
+            )
+            
+            self.action_selector = self.add(
+                npyscreen.TitleSelectOne,
+                max_height=3,
+                value=[0],
+                name="Aktion auswählen:",
+                values=['Play', 'Download'],
+                scroll_exit=True,
+            )
+            
+            # Sichere Standard-Download-Pfad verwenden
+            DEFAULT_DOWNLOAD_PATH = os.path.expanduser("~/Downloads")
+            try:
+                from aniworld.globals import DEFAULT_DOWNLOAD_PATH as CONFIG_PATH
+                if CONFIG_PATH:
+                    DEFAULT_DOWNLOAD_PATH = CONFIG_PATH
+            except:
+                pass
+                
+            try:
+                # Versuche das originale DownloadPathActionPrompted Widget zu verwenden
+                self.download_path_input = self.add_widget(
+                    DownloadPathActionPrompted(
+                        name="Download Pfad:",
+                        value=DEFAULT_DOWNLOAD_PATH,
+                        labelColor="LABEL",
+                    ),
+                    rely=22,
+                )
+            except Exception as widget_error:
+                # Fallback: Einfaches Textfeld verwenden
+                logging.error(f"Fehler beim Erstellen des DownloadPathActionPrompted Widgets: {widget_error}")
+                self.download_path_input = self.add(
+                    npyscreen.TitleText,
+                    name="Download Pfad:",
+                    value=DEFAULT_DOWNLOAD_PATH
+                )
+                
+            # Zusätzliche Elemente wie weitere Optionen, Status-Anzeigen usw. hinzufügen
+            # Diese können je nach vorherigem Code variieren
+            
+        except Exception as e:
+            logging.error(f"Fehler beim Einrichten der restlichen UI-Elemente: {e}", exc_info=True)
+            # Ignorieren und weitermachen mit minimaler UI, damit die Anwendung nicht abstürzt
+
+    def setup_signal_handling(self):
+        def signal_handler(_signal_number, _frame):
+            try:
+                self.parentApp.switchForm(None)
+            except AttributeError:
+                pass
+            self.cancel_timer()
+            sys.exit()
+
+        signal.signal(signal.SIGINT, signal_handler)
+        logging.debug("Signal handler for SIGINT registered")
+
+    def start_timer(self):
+        self.timer = threading.Timer(  # pylint: disable=attribute-defined-outside-init
+            random.randint(600, 900),
+            self.delayed_message_box
+        )
+        self.timer.start()
+
+    def cancel_timer(self):
+        if self.timer and self.timer.is_alive():
+            self.timer.cancel()
+            logging.debug("Timer canceled")
+
+    def delayed_message_box(self):
+        show_messagebox("Are you still there?", "Uhm...", "info")
+
+    def update_directory_visibility(self):
+        logging.debug("Updating directory visibility")
+        selected_action = self.action_selector.get_selected_objects()
+        logging.debug("Selected action: %s", selected_action)
+        if selected_action and selected_action[0] == "Watch" or selected_action[0] == "Syncplay":
+            self.directory_field.hidden = True
+            self.aniskip_selector.hidden = False
+            logging.debug("Directory field hidden, Aniskip selector shown")
+        else:
+            self.directory_field.hidden = False
+            self.aniskip_selector.hidden = True
+            logging.debug("Directory field shown, Aniskip selector hidden")
+        self.display()
+
+    def on_ok(self):
+        logging.debug("EpisodeForm.on_ok called")
+        try:
+            selected_item = self.action_selector.value[0]
+            selected_action = self.action_options[selected_item]
+            selected_episodes = [url for _, url in
+                                 self.episode_selector.get_selected_objects()]
+            logging.debug("Selected episodes: %s", selected_episodes)
+
+            language = "German Dub"
+            if hasattr(self, 'language_selector'):
+                language_value = self.language_selector.value[0]
+                language = self.language_options[language_value]
+            logging.debug("Selected language: %s", language)
+
+            provider_selected = "StreamingProvider"
+            if hasattr(self, 'provider_selector'):
+                provider_value = self.provider_selector.value[0]
+                provider_selected = self.provider_options[provider_value]
+            logging.debug("Selected provider: %s", provider_selected)
+
+            provider_validated = self.validate_provider(provider_selected)
+
+            download_directory = ""
+            if hasattr(self, 'directory_field'):
+                download_directory = self.directory_field.value
+            logging.debug("Selected download directory: %s", download_directory)
+
+            download_directory_name = ""
+            if hasattr(self, 'directory_field'):
+                download_directory_name = self.directory_field.value
+            logging.debug(
+                "Selected download directory name: %s", download_directory_name
+            )
+
+            if language == "Japanese Dub":
+                lang_code = "jap"
+            elif language == "English Sub":
+                lang_code = "en"
+            elif language == "German Sub":
+                lang_code = "ger-sub"
+            else:
+                lang_code = "ger"
+
+            if platform.system() == "Windows":
+                lang_code = self.get_language_code(language)
+
+            logging.debug("Language code: %s", lang_code)
+
+            if not selected_episodes:
+                logging.debug("No episodes selected")
+                self.parentApp.setNextForm(None)
+                self.editing = False
+                self.cancel_timer()
+                return
+
+            # Speichere die Anime-Auswahl in der Datenbank, wenn verfügbar
+            anime_slug = self.parentApp.anime_slug
+            if HAS_DATABASE:
+                try:
+                    from aniworld.database.integration import DatabaseIntegration
+                    db = DatabaseIntegration()
+                    
+                    # Prüfe, ob der Anime vorhanden ist, wenn nicht, füge ihn hinzu
+                    anime = db.get_anime_by_slug(anime_slug)
+                    if not anime:
+                        # Wir haben keinen vollständigen Anime, aber zumindest den Slug und Titel
+                        anime_title = format_anime_title(anime_slug)
+                        db.save_minimal_anime(slug=anime_slug, title=anime_title)
+                        logging.info(f"Minimaler Anime-Eintrag für '{anime_title}' gespeichert")
+                except Exception as e:
+                    logging.error(f"Fehler bei der Datenbankoperation für Anime '{anime_slug}': {e}")
+                    print(f"Datenbankfehler: {e}")
+                    
+            self.parentApp.setNextForm(None)
+            self.editing = False
+            self.cancel_timer()
+
+            # Check if Streamkiste is selected
+            if provider_validated == "Streamkiste":
+                streamkiste.execute_with_params(
+                    selected_action,
+                    selected_episodes,
+                    download_directory,
+                    download_directory_name
+                )
+            # Check if NHentai is selected
+            elif provider_validated == "NHentai":
+                if len(selected_episodes) != 1:
+                    npyscreen.notify_confirm(
+                        "Please select just one episode for NHentai",
+                        "Info"
+                    )
+                else:
+                    nhentai.execute_with_params(
+                        selected_action,
+                        selected_episodes,
+                        download_directory,
+                        download_directory_name
+                    )
+            # Check if JAV is selected
+            elif provider_validated == "JAV":
+                if len(selected_episodes) != 1:
+                    npyscreen.notify_confirm(
+                        "Please select just one episode for JAV",
+                        "Info"
+                    )
+                else:
+                    jav.execute_with_params(
+                        selected_action,
+                        selected_episodes,
+                        download_directory,
+                        download_directory_name
+                    )
+            # Check if Hanime is selected
+            elif provider_validated == "Hanime":
+                if len(selected_episodes) != 1:
+                    npyscreen.notify_confirm(
+                        "Please select just one episode for Hanime",
+                        "Info"
+                    )
+                else:
+                    hanime.execute_with_params(
+                        selected_action,
+                        selected_episodes,
+                        download_directory,
+                        download_directory_name
+                    )
+            # Default - execute with parameters
+            else:
+                execute.execute_with_params(
+                    selected_action,
+                    selected_episodes,
+                    download_directory,
+                    download_directory_name,
+                    lang_code
+                )
+        except Exception as e:
+            logging.error(f"Fehler in EpisodeForm.on_ok: {e}")
+            npyscreen.notify_confirm(
+                f"Ein Fehler ist aufgetreten: {str(e)}\n\nDie Anwendung wird fortgesetzt.",
+                "Fehler"
+            )
+            # Verhindere, dass die Anwendung beendet wird
+            self.editing = True
+            return
+
+    def get_language_code(self, language):
+        logging.debug("Getting language code for: %s", language)
+        return {
+            'German Dub': "1",
+            'English Sub': "2",
+            'German Sub': "3"
+        }.get(language, "")
+
+    def validate_provider(self, provider_selected):
+        logging.debug("Validating provider: %s", provider_selected)
+        valid_providers = ["Vidoza", "Streamtape", "VOE", "Vidmoly", "SpeedFiles"]
+        while provider_selected[0] not in valid_providers:
+            logging.debug("Invalid provider selected, falling back to Vidoza")
+            npyscreen.notify_confirm(
+                "Doodstream is currently broken.\nFalling back to Vidoza.",
+                title="Provider Error"
+            )
+            self.provider_selector.value = 0
+            provider_selected = ["Vidoza"]
+        return provider_selected[0]
+
+    def on_cancel(self):
+        logging.debug("Cancel button pressed")
+        self.cancel_timer()
+        self.parentApp.setNextForm(None)
+
+    def go_to_second_form(self):
+        self.parentApp.switchForm("SECOND")
+
+
+# pylint: disable=R0901
+class SecondForm(npyscreen.ActionFormV2):
+    def create(self):
+        anime_slug = self.parentApp.anime_slug
+        anime_title = format_anime_title(anime_slug)
+
+        text_content1 = get_description(anime_slug)
+        text_content2 = get_description_with_id(anime_title, 1)
+
+        wrapped_text1 = "\n".join(textwrap.wrap(text_content1, width=100))
+        wrapped_text2 = "\n".join(textwrap.wrap(text_content2, width=100))
+
+        text_content = f"{wrapped_text1}\n\n{wrapped_text2}"
+
+        self.expandable_text = self.add(
+            npyscreen.MultiLineEdit,
+            value=text_content,
+            max_height=None,
+            editable=False
+        )
+
+    def on_ok(self):
+        self.parentApp.switchForm("MAIN")
+
+    def on_cancel(self):
+        self.parentApp.switchForm("MAIN")
+
+
+class AnimeApp(npyscreen.NPSAppManaged):
+    def __init__(self, anime_slug):
+        logging.debug("Initializing AnimeApp with slug: %s", anime_slug)
+        super().__init__()
+        self.anime_slug = anime_slug
+
+    def onStart(self):
+        logging.debug("Starting AnimeApp")
+        npyscreen.setTheme(CustomTheme)
+        version = get_version()
+        update_notice = " (Update Available)" if get_preflight_result("version") else ""
+        name = f"AniWorld-Downloader{version}{update_notice}"
+        self.addForm(
+            "MAIN", EpisodeForm,
+            name=name
+        )
+        self.addForm("SECOND", SecondForm, name="Description")
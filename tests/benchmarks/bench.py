@@ -0,0 +1,480 @@
+"""
+Offline-Benchmarks für Parser, Extraktoren und Datenbank-Ingestion
+
+Alle Fälle laufen gegen die aufgezeichneten Seiten in tests/fixtures, es wird
+kein Netzwerk benötigt; die Ingestion schreibt in eine temporäre SQLite-Datenbank.
+Pro Fall werden ops/s und der Spitzenspeicher (tracemalloc) ermittelt und mit
+tests/benchmarks/baseline.json verglichen.
+
+Aufruf:
+    python tests/benchmarks/bench.py                  # alle Fälle, Vergleich mit Baseline
+    python tests/benchmarks/bench.py -k provider      # nur Fälle, deren Name "provider" enthält
+    python tests/benchmarks/bench.py --save-baseline  # aktuelle Werte als Baseline speichern
+
+Umgebungsvariablen:
+    ANIWORLD_BENCHMARK_TOLERANCE  erlaubte Abweichung zur Baseline (Standard 0.25 = 25 %)
+    ANIWORLD_BENCHMARK_MIN_TIME   Messdauer pro Fall in Sekunden (Standard 0.5)
+"""
+
+import argparse
+import atexit
+import importlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import MagicMock, patch
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), 'fixtures')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+TOLERANCE = float(os.getenv('ANIWORLD_BENCHMARK_TOLERANCE', '0.25'))
+MIN_TIME = float(os.getenv('ANIWORLD_BENCHMARK_MIN_TIME', '0.5'))
+
+
+class BenchmarkSkipped(Exception):
+    """Wird von setup() geworfen, wenn ein Fall in dieser Umgebung nicht laufen kann"""
+
+
+class BenchmarkCase:
+    """
+    Ein Benchmark-Fall.
+
+    Args:
+        name: Eindeutiger Name des Falls
+        setup: Liefert die Argumente für func (wird nicht gemessen)
+        func: Die gemessene Funktion
+        check: Prüft das Ergebnis eines Aufrufs (z.B. in den Tests)
+        patches: Fabrik für Context-Manager, die während der Messung aktiv sind
+    """
+
+    def __init__(self, name: str, setup: Callable[[], tuple], func: Callable,
+                 check: Optional[Callable[[Any], bool]] = None,
+                 patches: Optional[Callable[[], list]] = None):
+        self.name = name
+        self.setup = setup
+        self.func = func
+        self.check = check
+        self.patches = patches or (lambda: [])
+
+    def run_once(self) -> Any:
+        """
+        Führt den Fall genau einmal aus (ohne Messung).
+
+        Returns:
+            Rückgabewert der gemessenen Funktion
+        """
+        args = self.setup()
+        with ExitStack() as stack:
+            for patcher in self.patches():
+                stack.enter_context(patcher)
+            return self.func(*args)
+
+    def measure(self, min_time: float = MIN_TIME) -> Dict[str, float]:
+        """
+        Misst Durchsatz und Spitzenspeicher des Falls.
+
+        Args:
+            min_time: Mindestdauer der Zeitmessung in Sekunden
+
+        Returns:
+            Dict mit ops_per_sec, mean_ms, rounds und peak_kib
+        """
+        args = self.setup()
+        with ExitStack() as stack:
+            for patcher in self.patches():
+                stack.enter_context(patcher)
+
+            # Aufwärmen (Imports, Regex-Caches)
+            self.func(*args)
+
+            tracemalloc.start()
+            try:
+                self.func(*args)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            rounds = 0
+            start = time.perf_counter()
+            elapsed = 0.0
+            while elapsed < min_time or rounds < 5:
+                self.func(*args)
+                rounds += 1
+                elapsed = time.perf_counter() - start
+
+        return {
+            'ops_per_sec': rounds / elapsed,
+            'mean_ms': elapsed / rounds * 1000,
+            'rounds': rounds,
+            'peak_kib': peak / 1024,
+        }
+
+
+def read_fixture(name: str, mode: str = 'r'):
+    """
+    Liest eine aufgezeichnete Seite aus tests/fixtures.
+
+    Args:
+        name: Dateiname der Fixture
+        mode: 'r' für Text, 'rb' für Bytes
+
+    Returns:
+        Inhalt der Datei
+    """
+    encoding = None if 'b' in mode else 'utf-8'
+    with open(os.path.join(FIXTURE_DIR, name), mode, encoding=encoding) as f:
+        return f.read()
+
+
+def soup_of(name: str):
+    """Parst eine Fixture mit BeautifulSoup (wie fetch_direct_link)"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(read_fixture(name), 'html.parser')
+
+
+def fake_response(content: bytes, status_code: int = 200):
+    """Minimale requests.Response-Attrappe für aufgezeichnete Antworten"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.text = content.decode('utf-8')
+    response.raise_for_status.return_value = None
+    return response
+
+
+class FakeUrlopenResponse:
+    """Context-Manager-Attrappe für urllib.request.urlopen"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def read(self) -> bytes:
+        return self.content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def fake_anime_service_module():
+    """
+    Ersetzt aniworld.database.services für den reinen Parser-Benchmark,
+    damit save_anime_data_from_html ohne Datenbank läuft.
+    """
+    captured = []
+
+    class RecordingAnimeService:
+        def save_from_scraper_data(self, anime_data):
+            captured.append(anime_data)
+            return 1
+
+        def get_anime_by_id(self, anime_id):
+            return captured[-1] if captured else None
+
+    module = types.ModuleType('aniworld.database.services')
+    module.AnimeService = RecordingAnimeService
+    return module
+
+
+def build_cases() -> List[BenchmarkCase]:
+    """
+    Erstellt alle Benchmark-Fälle.
+
+    Returns:
+        Liste der BenchmarkCase-Objekte
+    """
+    from bs4 import BeautifulSoup
+    # aniworld.execute ist im Paket als Funktion re-exportiert, daher über importlib
+    execute_module = importlib.import_module('aniworld.execute')
+    from aniworld.common.common import parse_season_episode_count
+    from aniworld.extractors import (
+        doodstream_get_direct_link,
+        speedfiles_get_direct_link,
+        streamtape_get_direct_link,
+        vidmoly_get_direct_link,
+        vidoza_get_direct_link,
+        voe_get_direct_link
+    )
+    from aniworld.search import save_anime_data_from_html
+
+    episode_html = read_fixture('episode.html')
+    season_html = read_fixture('season.html', 'rb')
+
+    def parse_episode_page():
+        return (BeautifulSoup(episode_html, 'html.parser'),)
+
+    cases = [
+        BenchmarkCase(
+            'parse_episode_page',
+            lambda: (episode_html,),
+            lambda html: BeautifulSoup(html, 'html.parser'),
+            check=lambda soup: soup.find(class_='hosterSiteVideo') is not None
+        ),
+        BenchmarkCase(
+            'providers',
+            parse_episode_page,
+            execute_module.providers,
+            check=lambda data: len(data) == 6 and data['VOE'][1].endswith('/redirect/3000001')
+        ),
+        BenchmarkCase(
+            'get_episode_title',
+            parse_episode_page,
+            execute_module.get_episode_title,
+            check=lambda title: title == 'Der Anfang / The Beginning'
+        ),
+        BenchmarkCase(
+            'parse_season_episode_count',
+            lambda: (season_html, 'test-anime', '2'),
+            parse_season_episode_count,
+            check=lambda count: count == 24
+        ),
+        BenchmarkCase(
+            'save_anime_data_from_html',
+            lambda: (soup_of('series.html'), 'https://aniworld.to/anime/stream/test-anime'),
+            save_anime_data_from_html,
+            check=lambda data: data['title'] == 'Test Anime'
+            and {e['number'] for e in data['seasons'][0]['episodes']} == set(range(1, 25)),
+            patches=lambda: [patch.dict(sys.modules, {
+                'aniworld.database.services': fake_anime_service_module()
+            })]
+        ),
+        BenchmarkCase(
+            'provider_voe',
+            lambda: (soup_of('voe.html'),),
+            voe_get_direct_link,
+            check=lambda link: link.endswith('/master.m3u8'),
+            patches=lambda: [patch(
+                'aniworld.extractors.provider.voe.urlopen',
+                side_effect=lambda *a, **k: FakeUrlopenResponse(read_fixture('voe_redirect.html', 'rb'))
+            )]
+        ),
+        BenchmarkCase(
+            'provider_doodstream',
+            lambda: (soup_of('doodstream.html'),),
+            doodstream_get_direct_link,
+            check=lambda link: link.startswith('https://dood-cdn.example.test/') and 'token=' in link,
+            patches=lambda: [patch(
+                'aniworld.extractors.provider.doodstream.requests.get',
+                side_effect=lambda *a, **k: fake_response(read_fixture('doodstream_pass_md5.txt', 'rb'))
+            )]
+        ),
+        BenchmarkCase(
+            'provider_vidoza',
+            lambda: (soup_of('vidoza.html'),),
+            vidoza_get_direct_link,
+            check=lambda link: link.endswith('.mp4')
+        ),
+        BenchmarkCase(
+            'provider_streamtape',
+            lambda: (soup_of('streamtape.html'),),
+            streamtape_get_direct_link,
+            check=lambda link: link.startswith('https://streamtape.com/get_video')
+        ),
+        BenchmarkCase(
+            'provider_vidmoly',
+            lambda: (soup_of('vidmoly.html'),),
+            vidmoly_get_direct_link,
+            check=lambda link: link.endswith('/master.m3u8')
+        ),
+        BenchmarkCase(
+            'provider_speedfiles',
+            lambda: (soup_of('speedfiles.html'),),
+            speedfiles_get_direct_link,
+            check=lambda link: link.endswith('.mp4')
+        ),
+        BenchmarkCase(
+            'ingest_save_from_scraper_data',
+            setup_ingest,
+            lambda service, data: service.save_from_scraper_data(data),
+            check=lambda anime_id: isinstance(anime_id, int) and anime_id > 0,
+            patches=lambda: [patch(
+                'aniworld.database.services.get_cover_fetcher',
+                return_value=fake_cover_fetcher()
+            )]
+        ),
+    ]
+    return cases
+
+
+def scraper_data_from_fixture() -> Dict[str, Any]:
+    """
+    Erzeugt das Dict für save_from_scraper_data aus der Serien-Fixture.
+
+    Returns:
+        anime_data wie von save_anime_data_from_html erzeugt
+    """
+    from aniworld.search import save_anime_data_from_html
+
+    with patch.dict(sys.modules, {'aniworld.database.services': fake_anime_service_module()}):
+        return save_anime_data_from_html(
+            soup_of('series.html'), 'https://aniworld.to/anime/stream/test-anime'
+        )
+
+
+def setup_ingest():
+    """
+    Bereitet den Ingestion-Fall gegen eine frische SQLite-Datenbank (WAL) in einem
+    temporären Verzeichnis vor; ein MySQL-Server wird nicht benötigt.
+
+    Returns:
+        AnimeService mit eigener Datenbank und die Scraper-Daten aus der Fixture
+    """
+    from aniworld.database import config as database_config
+    from aniworld.database.connection import DatabaseConnection
+    from aniworld.database.services import AnimeService
+
+    db_dir = tempfile.mkdtemp(prefix='aniworld-bench-')
+    atexit.register(shutil.rmtree, db_dir, ignore_errors=True)
+
+    # Die Repositories behalten die beim Erzeugen aktive DatabaseConnection,
+    # die globalen Singletons werden danach wiederhergestellt
+    with patch.dict(os.environ, {'DB_BACKEND': 'sqlite', 'DB_SQLITE_PATH': os.path.join(db_dir, 'bench.db')}), \
+            patch.object(database_config, '_config_instance', None), \
+            patch.object(DatabaseConnection, '_instance', None):
+        service = AnimeService()
+
+    return service, scraper_data_from_fixture()
+
+
+def fake_cover_fetcher():
+    """
+    CoverFetcher mit temporärem Cover-Speicher und aufgezeichneter Bildantwort.
+
+    Returns:
+        CoverFetcher, der keine Netzwerkanfragen stellt
+    """
+    from aniworld.database.cover_store import CoverFetcher, CoverStore
+
+    cover_dir = tempfile.mkdtemp(prefix='aniworld-bench-covers-')
+    atexit.register(shutil.rmtree, cover_dir, ignore_errors=True)
+
+    session = MagicMock()
+    session.get.return_value = MagicMock(
+        status_code=200,
+        content=b'\x89PNG\r\n\x1a\n' + b'\0' * 2048,
+        headers={'ETag': '"bench"'}
+    )
+    return CoverFetcher(CoverStore(cover_dir), max_workers=2, session=session)
+
+
+def quiet_logging() -> None:
+    """
+    Schaltet Log-Ausgaben ab und entfernt den ExitOnError-Handler, damit
+    Fehlerpfade der Parser den Benchmark nicht beenden.
+    """
+    from aniworld import globals as aniworld_globals
+
+    root = logging.getLogger()
+    root.removeHandler(aniworld_globals.exit_on_error_handler)
+    root.setLevel(logging.CRITICAL)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('cases', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: str = BASELINE_PATH) -> None:
+    existing = load_baseline(path)
+    existing.update(results)
+    payload = {
+        'python': sys.version.split()[0],
+        'cases': {
+            name: {
+                'ops_per_sec': round(values['ops_per_sec'], 2),
+                'peak_kib': round(values['peak_kib'], 1)
+            }
+            for name, values in sorted(existing.items())
+        }
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+        f.write('\n')
+
+
+def compare(name: str, result: Dict[str, float], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = TOLERANCE) -> List[str]:
+    """
+    Vergleicht ein Messergebnis mit der Baseline.
+
+    Returns:
+        Liste der Regressionsmeldungen (leer, wenn alles im Rahmen liegt)
+    """
+    reference = baseline.get(name)
+    if not reference:
+        return []
+
+    problems = []
+    if result['ops_per_sec'] < reference['ops_per_sec'] * (1 - tolerance):
+        problems.append(
+            f"{name}: {result['ops_per_sec']:.1f} ops/s < Baseline {reference['ops_per_sec']:.1f} ops/s"
+        )
+    if result['peak_kib'] > reference['peak_kib'] * (1 + tolerance) + 16:
+        problems.append(
+            f"{name}: {result['peak_kib']:.1f} KiB Spitzenspeicher > Baseline {reference['peak_kib']:.1f} KiB"
+        )
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline-Benchmarks für aniworld")
+    parser.add_argument('-k', '--filter', help='Nur Fälle, deren Name diesen Text enthält')
+    parser.add_argument('--save-baseline', action='store_true', help='Ergebnisse als Baseline speichern')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help='Messdauer pro Fall in Sekunden')
+    args = parser.parse_args(argv)
+
+    quiet_logging()
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'Fall':<32} {'ops/s':>12} {'ms/op':>10} {'Peak KiB':>10} {'vs. Baseline':>13}")
+    for case in build_cases():
+        if args.filter and args.filter not in case.name:
+            continue
+        try:
+            result = case.measure(args.min_time)
+        except BenchmarkSkipped as e:
+            print(f"{case.name:<32} übersprungen: {e}")
+            continue
+
+        results[case.name] = result
+        reference = baseline.get(case.name)
+        delta = (
+            f"{(result['ops_per_sec'] / reference['ops_per_sec'] - 1) * 100:+.1f} %"
+            if reference else "neu"
+        )
+        print(f"{case.name:<32} {result['ops_per_sec']:>12.1f} {result['mean_ms']:>10.3f} "
+              f"{result['peak_kib']:>10.1f} {delta:>13}")
+        regressions.extend(compare(case.name, result, baseline))
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"\nBaseline gespeichert: {BASELINE_PATH}")
+        return 0
+
+    if regressions:
+        print("\nRegressionen gegenüber der Baseline:")
+        for problem in regressions:
+            print(f"  - {problem}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -163,8 +163,8 @@ class TestAnimeService(unittest.TestCase):
         self.service.episode_repo.find_by_season_id.assert_called_once_with(5)
         self.service.episode_repo.save.assert_called_once()
     
-    @patch('src.aniworld.database.services.requests.get')
-    def test_save_from_scraper_data(self, mock_requests_get):
+    @patch('src.aniworld.database.services.get_cover_fetcher')
+    def test_save_from_scraper_data(self, mock_get_cover_fetcher):
         """Test für save_from_scraper_data"""
         # Mocks für Repositories einrichten
         self.service.anime_repo.find_by_url.return_value = None
@@ -174,11 +174,8 @@ class TestAnimeService(unittest.TestCase):
         self.service.episode_repo.find_by_season_id.return_value = []
         self.service.episode_repo.save.return_value = 10
         
-        # Mock für die HTTP-Anfrage
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b"fake_image_data"
-        mock_requests_get.return_value = mock_response
+        # Mock für den Cover-Download im Hintergrund
+        mock_submit = mock_get_cover_fetcher.return_value.submit
         
         # Scraped Daten einrichten
         anime_data = {
@@ -221,12 +218,15 @@ class TestAnimeService(unittest.TestCase):
         # Ergebnis prüfen
         self.assertEqual(result, 1)  # Series ID
         self.service.anime_repo.save.assert_called()
-        self.service.anime_repo.save_cover_data.assert_called_once_with(1, b"fake_image_data")
         self.service.season_repo.save.assert_called()
         self.assertEqual(self.service.episode_repo.save.call_count, 2)  # 2 Episoden
         
-        # Prüfen der Cover-Bildabfrage
-        mock_requests_get.assert_called_once_with("https://aniworld.to/img/test.jpg", timeout=10)
+        # Prüfen der Cover-Bildabfrage: der Hash wird gespeichert, sobald das Cover vorliegt
+        mock_submit.assert_called_once()
+        cover_url, store_hash = mock_submit.call_args[0]
+        self.assertEqual(cover_url, "https://aniworld.to/img/test.jpg")
+        store_hash("a" * 64)
+        self.service.anime_repo.save_cover_hash.assert_called_once_with(1, "a" * 64)
     
     def test_get_episode_by_url_found(self):
         """Test für get_episode_by_url, wenn die Episode gefunden wird"""
@@ -0,0 +1,120 @@
+"""
+Tests für den inhaltsadressierten Cover-Speicher
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.aniworld.database import cover_store
+from src.aniworld.database.cover_store import REVALIDATE_AFTER, CoverFetcher, CoverStore
+
+COVER = b'\x89PNG\r\n\x1a\n' + b'\0' * 64
+COVER_URL = 'https://aniworld.test/img/cover.png'
+
+
+def response(status_code, content=b'', headers=None):
+    """Erzeugt eine requests.Response-Attrappe"""
+    return MagicMock(status_code=status_code, content=content, headers=headers or {})
+
+
+class TestCoverStore(unittest.TestCase):
+    """Testklasse für CoverStore"""
+
+    def setUp(self):
+        """Test-Setup: Speicher in einem temporären Verzeichnis"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.store = CoverStore(self.tmp_dir.name)
+
+    def test_put_is_content_addressed(self):
+        """Test, ob Cover unter ihrem SHA-256 abgelegt und gleiche Inhalte nur einmal geschrieben werden"""
+        cover_hash = self.store.put(COVER)
+
+        self.assertEqual(cover_hash, hashlib.sha256(COVER).hexdigest())
+        self.assertEqual(self.store.path(cover_hash), os.path.join(self.tmp_dir.name, cover_hash[:2], cover_hash))
+        self.assertEqual(self.store.get(cover_hash), COVER)
+
+        with patch.object(CoverStore, '_write_atomic') as write:
+            self.assertEqual(self.store.put(COVER), cover_hash)
+        write.assert_not_called()
+
+    def test_thumbnail_falls_back_to_original_without_pillow(self):
+        """Test, ob ohne Pillow der Pfad des Originals als Vorschaubild geliefert wird"""
+        with patch.object(cover_store, 'Image', None):
+            cover_hash = self.store.put(COVER)
+            self.assertEqual(self.store.thumbnail_path(cover_hash), self.store.path(cover_hash))
+        self.assertIsNone(self.store.thumbnail_path('0' * 64))
+
+
+class TestCoverFetcher(unittest.TestCase):
+    """Testklasse für CoverFetcher"""
+
+    def setUp(self):
+        """Test-Setup: Fetcher mit Session-Attrappe"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.session = MagicMock()
+        self.fetcher = CoverFetcher(CoverStore(self.tmp_dir.name), max_workers=2, session=self.session)
+        self.addCleanup(self.fetcher.shutdown)
+
+    def test_conditional_revalidation(self):
+        """Test, ob bekannte Cover erst nach REVALIDATE_AFTER und dann bedingt abgefragt werden"""
+        self.session.get.return_value = response(200, COVER, {'ETag': '"v1"', 'Last-Modified': 'Mon, 19 Oct 2026 10:00:00 GMT'})
+        with patch('time.time', return_value=1000.0):
+            cover_hash = self.fetcher.fetch(COVER_URL)
+        self.assertEqual(cover_hash, hashlib.sha256(COVER).hexdigest())
+        self.assertEqual(self.session.get.call_args[1]['headers'], {})
+
+        # innerhalb des Intervalls keine Anfrage
+        with patch('time.time', return_value=1000.0 + REVALIDATE_AFTER - 1):
+            self.assertEqual(self.fetcher.fetch(COVER_URL), cover_hash)
+        self.assertEqual(self.session.get.call_count, 1)
+
+        # danach bedingt; 304 liefert den bekannten Hash
+        self.session.get.return_value = response(304)
+        with patch('time.time', return_value=1000.0 + REVALIDATE_AFTER + 1):
+            self.assertEqual(self.fetcher.fetch(COVER_URL), cover_hash)
+        self.assertEqual(self.session.get.call_args[1]['headers'], {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Mon, 19 Oct 2026 10:00:00 GMT',
+        })
+
+    def test_failed_request_keeps_known_cover(self):
+        """Test, ob ein Serverfehler den bekannten Hash behält und bei unbekannten Covern None liefert"""
+        self.session.get.return_value = response(500)
+        self.assertIsNone(self.fetcher.fetch(COVER_URL))
+
+        self.session.get.return_value = response(200, COVER)
+        with patch('time.time', return_value=1000.0):
+            cover_hash = self.fetcher.fetch(COVER_URL)
+        self.session.get.return_value = response(500)
+        with patch('time.time', return_value=1000.0 + REVALIDATE_AFTER + 1):
+            self.assertEqual(self.fetcher.fetch(COVER_URL), cover_hash)
+
+    def test_submit_deduplicates_and_runs_callback(self):
+        """Test, ob gleichzeitige Aufträge für dieselbe URL nur einen Download auslösen"""
+        release = threading.Event()
+
+        def slow_get(*_args, **_kwargs):
+            release.wait(5)
+            return response(200, COVER)
+
+        self.session.get.side_effect = slow_get
+        hashes = []
+        first = self.fetcher.submit(COVER_URL, hashes.append)
+        second = self.fetcher.submit(COVER_URL, hashes.append)
+        release.set()
+
+        self.assertIs(first, second)
+        self.assertEqual(first.result(timeout=5), hashlib.sha256(COVER).hexdigest())
+        self.fetcher.shutdown()
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(hashes, [first.result()] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests für den Lebenszyklus eines Downloads (ein INSERT, danach nur einzelne Spalten)
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.models import AnimeSeries, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository, StatisticsRepository
+)
+from src.aniworld.database.services import DownloadService
+
+EPISODE_URL = 'https://x.test/anime/stream/test/staffel-1/episode-1'
+
+
+class TestDownloadLifecycle(unittest.TestCase):
+    """Testklasse für DownloadService.start_download und DownloadLifecycle (gegen eine temporäre SQLite-Datei)"""
+
+    def setUp(self):
+        """Test-Setup: ein Anime mit einer Episode"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        series_id = AnimeRepository().save(AnimeSeries(titel='Test', aniworld_url='https://x.test/anime/stream/test'))
+        season_id = SeasonRepository().save(Season(series_id=series_id, staffel_nummer=1))
+        self.episode_id = EpisodeRepository().save(
+            Episode(season_id=season_id, episode_nummer=1, aniworld_url=EPISODE_URL)
+        )
+
+        self.service = DownloadService()
+        self.download_repo = DownloadRepository()
+        self.stats_repo = StatisticsRepository()
+        self.file_path = os.path.join(self.tmp_dir.name, 'Test - S01E01 (German Dub).mp4')
+
+    def start(self, progress_interval=0.0):
+        """Startet einen Download und zählt die Schreibzugriffe auf die Tabelle downloads"""
+        self.statements = []
+        original = DownloadRepository._execute_update  # pylint: disable=protected-access
+
+        def execute_update(repo, query, *args, **kwargs):
+            if 'downloads' in query:
+                self.statements.append(' '.join(query.split()))
+            return original(repo, query, *args, **kwargs)
+
+        patcher = patch.object(DownloadRepository, '_execute_update', execute_update)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        return self.service.start_download(
+            EPISODE_URL, 'VOE', 'German Dub', 'https://cdn.test/v.mp4', self.file_path,
+            progress_interval=progress_interval
+        )
+
+    def assert_matches_rebuild(self):
+        """Prüft, ob die fortgeschriebenen Zähler einer vollständigen Neuberechnung entsprechen"""
+        counters = {key: value for key, value in self.stats_repo.get_counters().items() if value}
+        rebuilt = {key: value for key, value in self.stats_repo.rebuild().items() if value}
+        self.assertEqual(counters, rebuilt)
+        return counters
+
+    def test_completed_download(self):
+        """Test, ob ein Download mit einem INSERT, Fortschritt und einem abschließenden UPDATE gespeichert wird"""
+        lifecycle = self.start()
+        self.assertIsNotNone(lifecycle)
+        self.assertEqual(self.download_repo.find_by_id(lifecycle.download_id).status, 'läuft')
+
+        self.assertTrue(lifecycle.progress({'downloaded_bytes': 1024 * 1024, 'speed': 2 * 1024 * 1024}))
+        download = self.download_repo.find_by_id(lifecycle.download_id)
+        self.assertEqual((download.dateigroesse, download.download_geschwindigkeit), (1024 * 1024, 2.0))
+        self.assertEqual(self.assert_matches_rebuild()['downloads.bytes'], 1024 * 1024)
+
+        with open(self.file_path, 'wb') as f:
+            f.write(b'\x00' * 4096)
+        self.assertTrue(lifecycle.finish())
+
+        download = self.download_repo.find_by_id(lifecycle.download_id)
+        self.assertEqual(download.status, 'abgeschlossen')
+        self.assertEqual(download.dateigroesse, 4096)
+        self.assertEqual(download.format, 'MP4')
+        self.assertIsNotNone(download.hash_wert)
+
+        self.assertEqual(len(self.statements), 3)
+        self.assertTrue(self.statements[0].startswith('INSERT INTO downloads'))
+        self.assertTrue(self.statements[1].startswith('UPDATE downloads SET dateigroesse = %s, download_geschwindigkeit = %s WHERE'))
+        self.assertTrue(self.statements[2].startswith('UPDATE downloads SET'))
+
+        counters = self.assert_matches_rebuild()
+        self.assertEqual((counters['downloads'], counters['status.abgeschlossen']), (1, 1))
+        self.assertNotIn('status.läuft', counters)
+        self.assertEqual(counters['downloads.bytes'], 4096)
+
+    def test_progress_throttled(self):
+        """Test, ob Fortschrittsmeldungen höchstens einmal pro Intervall geschrieben werden"""
+        lifecycle = self.start(progress_interval=3600)
+        for n in range(1, 50):
+            self.assertFalse(lifecycle.progress({'downloaded_bytes': n * 1024, 'speed': 1024.0}))
+
+        # der letzte Stand geht mit dem Abschluss in dieselbe Anweisung
+        self.assertTrue(lifecycle.finish('abgebrochen'))
+        self.assertEqual(len(self.statements), 2)
+
+        download = self.download_repo.find_by_id(lifecycle.download_id)
+        self.assertEqual((download.status, download.notizen), ('fehlgeschlagen', 'abgebrochen'))
+        self.assertEqual(download.dateigroesse, 49 * 1024)
+        self.assert_matches_rebuild()
+
+    def test_unknown_episode_not_recorded(self):
+        """Test, ob Downloads unbekannter Episoden nicht aufgezeichnet werden"""
+        self.assertIsNone(self.service.start_download(
+            'https://x.test/unbekannt', 'VOE', 'German Dub', '', self.file_path
+        ))
+        self.assertIsNone(self.service.start_download(
+            EPISODE_URL, 'Unbekannt', 'German Dub', '', self.file_path
+        ))
+
+    def test_update_download_status(self):
+        """Test, ob update_download_status nur den Status schreibt"""
+        lifecycle = self.start()
+        self.assertTrue(self.service.update_download_status(lifecycle.download_id, 'fehlgeschlagen'))
+
+        self.assertEqual(self.statements[-1], 'UPDATE downloads SET status = %s WHERE download_id = %s')
+        self.assertEqual(self.download_repo.find_by_id(lifecycle.download_id).status, 'fehlgeschlagen')
+        self.assertFalse(self.service.update_download_status(12345, 'fehlgeschlagen'))
+        self.assert_matches_rebuild()
+
+    def test_unchanged_value_is_success(self):
+        """Test, ob ein Update mit unverändertem Wert als Erfolg gilt (MySQL mit CLIENT_FOUND_ROWS)"""
+        lifecycle = self.start()
+        self.assertTrue(self.download_repo.update_columns(lifecycle.download_id, {'notizen': 'x'}))
+        self.assertTrue(self.download_repo.update_columns(lifecycle.download_id, {'notizen': 'x'}))
+        self.assertFalse(self.download_repo.update_columns(12345, {'notizen': 'x'}))
+
+        self.assertIn(database_config.CLIENT_FOUND_ROWS,
+                      database_config.get_config().get_connection_params()['client_flags'])
+
+
+if __name__ == '__main__':
+    unittest.main()
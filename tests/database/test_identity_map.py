@@ -0,0 +1,206 @@
+"""
+Tests für die Identity-Map der Repository-Schicht
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.identity_map import MISSING, IdentityMap, deferred
+from src.aniworld.database.models import AnimeSeries, Download, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository
+)
+
+
+class TestIdentityMap(unittest.TestCase):
+    """Testklasse für IdentityMap"""
+
+    def test_lookup_by_primary_and_natural_key(self):
+        """Test, ob Einträge über Primärschlüssel und URL gefunden und als Kopie zurückgegeben werden"""
+        identity_map = IdentityMap('anime')
+        anime = AnimeSeries(series_id=1, titel='Test', aniworld_url='https://x.test/a')
+        identity_map.put(1, anime, url=anime.aniworld_url)
+
+        found = identity_map.get_by('url', 'https://x.test/a')
+        self.assertEqual(found, anime)
+        found.titel = 'Geändert'
+        self.assertEqual(identity_map.get(1).titel, 'Test')
+
+        identity_map.invalidate(1)
+        self.assertIs(identity_map.get(1), MISSING)
+        self.assertIs(identity_map.get_by('url', 'https://x.test/a'), MISSING)
+
+    def test_lru_eviction(self):
+        """Test, ob bei Überschreiten der Maximalgröße der älteste Eintrag verdrängt wird"""
+        identity_map = IdentityMap('episode', max_size=2)
+        identity_map.put(1, 'a')
+        identity_map.put(2, 'b')
+        identity_map.get(1)
+        identity_map.put(3, 'c')
+
+        self.assertEqual(identity_map.get(1), 'a')
+        self.assertIs(identity_map.get(2), MISSING)
+        self.assertEqual(len(identity_map), 2)
+
+    def test_eviction_drops_natural_keys(self):
+        """Test, ob mit einer verdrängten Entität auch ihre natürlichen Schlüssel verschwinden"""
+        identity_map = IdentityMap('episode', max_size=10)
+        for pk in range(100):
+            identity_map.put(pk, str(pk), url=f'https://x.test/{pk}')
+
+        self.assertLessEqual(len(identity_map), 10)
+        self.assertLessEqual(len(identity_map._natural_keys), 5)  # pylint: disable=protected-access
+        self.assertEqual(identity_map.get_by('url', 'https://x.test/99'), '99')
+        self.assertIs(identity_map.get_by('url', 'https://x.test/0'), MISSING)
+
+    def test_ttl(self):
+        """Test, ob Einträge nach Ablauf der TTL nicht mehr zurückgegeben werden"""
+        identity_map = IdentityMap('season', ttl=10)
+        with patch('time.monotonic', return_value=100.0):
+            identity_map.put(1, 'a')
+            identity_map.put_collection('series', 7, ['a'])
+        with patch('time.monotonic', return_value=109.0):
+            self.assertEqual(identity_map.get(1), 'a')
+        with patch('time.monotonic', return_value=111.0):
+            self.assertIs(identity_map.get(1), MISSING)
+            self.assertIs(identity_map.get_collection('series', 7), MISSING)
+
+    def test_deferred_until_commit(self):
+        """Test, ob Einträge einer Transaktion erst nach ihrem Ende und bei einem Fehler gar nicht übernommen werden"""
+        identity_map = IdentityMap('anime')
+        identity_map.put(1, 'alt', url='u1')
+
+        with deferred():
+            identity_map.put(2, 'neu', url='u2')
+            identity_map.invalidate(1)
+            self.assertIs(identity_map.get(2), MISSING)
+            self.assertIs(identity_map.get(1), MISSING)
+        self.assertEqual(identity_map.get_by('url', 'u2'), 'neu')
+
+        with self.assertRaises(RuntimeError), deferred():
+            identity_map.put(3, 'zurückgerollt')
+            raise RuntimeError("Rollback")
+        self.assertIs(identity_map.get(3), MISSING)
+
+    def test_disabled(self):
+        """Test, ob max_size = 0 den Cache abschaltet"""
+        identity_map = IdentityMap('anime', max_size=0)
+        identity_map.put(1, 'a', url='u')
+        identity_map.put_collection('series', 1, ['a'])
+
+        self.assertIs(identity_map.get(1), MISSING)
+        self.assertIs(identity_map.get_collection('series', 1), MISSING)
+
+
+class TestRepositoryIdentityMap(unittest.TestCase):
+    """Testklasse für das Caching in den Repositories (gegen eine temporäre SQLite-Datei)"""
+
+    def setUp(self):
+        """Test-Setup: Repositories gegen eine temporäre SQLite-Datei"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        self.anime_repo = AnimeRepository()
+        self.season_repo = SeasonRepository()
+        self.episode_repo = EpisodeRepository()
+        self.series_id = self.anime_repo.save(AnimeSeries(titel='Test', aniworld_url='https://x.test/a'))
+        self.season_id = self.season_repo.save(Season(series_id=self.series_id, staffel_nummer=1))
+
+    def count_queries(self, repo):
+        """Zählt die Datenbankabfragen eines Repositories"""
+        return patch.object(repo, '_execute_query', wraps=repo._execute_query)  # pylint: disable=protected-access
+
+    def test_find_by_url_hits_database_once(self):
+        """Test, ob wiederholte find_by_url-Aufrufe nur eine Abfrage auslösen"""
+        with self.count_queries(self.anime_repo) as query:
+            for _ in range(3):
+                self.assertEqual(self.anime_repo.find_by_url('https://x.test/a').series_id, self.series_id)
+            self.assertEqual(self.anime_repo.find_by_id(self.series_id).titel, 'Test')
+
+        self.assertEqual(query.call_count, 1)
+
+    def test_save_invalidates(self):
+        """Test, ob save() veraltete Einträge und Listen ersetzt"""
+        anime = self.anime_repo.find_by_url('https://x.test/a')
+        anime.titel = 'Umbenannt'
+        self.anime_repo.save(anime)
+        self.assertEqual(self.anime_repo.find_by_url('https://x.test/a').titel, 'Umbenannt')
+
+        self.assertEqual(self.episode_repo.find_by_season_id(self.season_id), [])
+        episode_id = self.episode_repo.save(Episode(season_id=self.season_id, episode_nummer=1, aniworld_url='https://x.test/e1'))
+        self.assertEqual([e.episode_id for e in self.episode_repo.find_by_season_id(self.season_id)], [episode_id])
+
+        episode = self.episode_repo.find_by_url('https://x.test/e1')
+        episode.aniworld_url = 'https://x.test/e1-neu'
+        self.episode_repo.save(episode)
+        self.assertIsNone(self.episode_repo.find_by_url('https://x.test/e1'))
+        self.assertEqual(self.episode_repo.find_by_id(episode_id).aniworld_url, 'https://x.test/e1-neu')
+
+    def test_save_merges_into_cached_list(self):
+        """Test, ob gespeicherte Episoden in die gecachte Liste der Staffel übernommen werden, ohne sie neu zu laden"""
+        self.episode_repo.save(Episode(season_id=self.season_id, episode_nummer=2, titel='Zwei'))
+        self.episode_repo.find_by_season_id(self.season_id)
+
+        with self.count_queries(self.episode_repo) as query:
+            self.episode_repo.save(Episode(season_id=self.season_id, episode_nummer=1, titel='Eins'))
+            episode = self.episode_repo.find_by_season_id(self.season_id)[1]
+            episode.titel = 'Zwei (neu)'
+            self.episode_repo.save(episode)
+            titles = [e.titel for e in self.episode_repo.find_by_season_id(self.season_id)]
+
+        self.assertEqual(query.call_count, 0)
+        self.assertEqual(titles, ['Eins', 'Zwei (neu)'])
+
+    def test_delete_invalidates_cascade(self):
+        """Test, ob nach dem Löschen eines Anime auch gecachte Staffeln, Episoden und Downloads verschwinden"""
+        episode_id = self.episode_repo.save(Episode(season_id=self.season_id, episode_nummer=1))
+        download_repo = DownloadRepository()
+        download_id = download_repo.save(Download(episode_id=episode_id, provider_id=2, language_id=1))
+
+        self.assertIsNotNone(self.season_repo.find_by_id(self.season_id))
+        self.assertIsNotNone(self.episode_repo.find_by_id(episode_id))
+        self.assertIsNotNone(download_repo.find_by_id(download_id))
+
+        self.assertTrue(self.anime_repo.delete(self.series_id))
+        self.assertIsNone(self.anime_repo.find_by_id(self.series_id))
+        self.assertIsNone(self.season_repo.find_by_id(self.season_id))
+        self.assertEqual(self.season_repo.find_by_series_id(self.series_id), [])
+        self.assertIsNone(self.episode_repo.find_by_id(episode_id))
+        self.assertIsNone(download_repo.find_by_id(download_id))
+
+    def test_download_status_update_served_from_cache(self):
+        """Test, ob ein Statuswechsel über find_by_id/save ohne erneutes Lesen auskommt"""
+        episode_id = self.episode_repo.save(Episode(season_id=self.season_id, episode_nummer=1))
+        repo = DownloadRepository()
+        download_id = repo.save(Download(episode_id=episode_id, provider_id=2, language_id=1))
+
+        with self.count_queries(repo) as query:
+            for status in ('läuft', 'abgeschlossen'):
+                download = repo.find_by_id(download_id)
+                download.status = status
+                repo.save(download)
+
+        self.assertEqual(query.call_count, 1)
+        self.assertEqual(repo.find_by_id(download_id).status, 'abgeschlossen')
+        self.assertEqual(repo.find_active_downloads(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests für die Schema-Migrationen bestehender Datenbanken
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database import cover_store, migrations, repositories
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.cover_store import CoverStore
+from src.aniworld.database.models import AnimeSeries, Episode, Season
+from src.aniworld.database.repositories import AnimeRepository, EpisodeRepository, SeasonRepository
+from src.aniworld.database.services import StatisticsService
+from src.aniworld.database.sqlite_backend import SQLiteConnection, SQLiteDatabase
+
+COVER = b'\x89PNG\r\n\x1a\n' + b'\1' * 64
+
+
+def columns(connection, table):
+    """Spaltennamen einer Tabelle"""
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+
+
+class TestMigrate(unittest.TestCase):
+    """Testklasse für migrations.migrate (Datenbank von vor den Migrationen)"""
+
+    def setUp(self):
+        """Test-Setup: altes Schema mit Cover-BLOBs, Cover-Speicher im temporären Verzeichnis"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.store = CoverStore(self.tmp_dir.name)
+
+        self.statistics = MagicMock()
+        for patcher in (
+            patch.object(cover_store, '_cover_store_instance', self.store),
+            patch.object(repositories, 'StatisticsRepository', self.statistics),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.raw = sqlite3.connect(':memory:')
+        self.addCleanup(self.raw.close)
+        self.raw.execute("CREATE TABLE anime_series (series_id INTEGER PRIMARY KEY, titel TEXT, cover_data BLOB)")
+        self.raw.execute("CREATE TABLE downloads (download_id INTEGER PRIMARY KEY, download_datum TIMESTAMP)")
+        self.raw.execute("CREATE TABLE konfiguration (config_id INTEGER PRIMARY KEY, schluessel TEXT UNIQUE, "
+                         "wert TEXT, beschreibung TEXT, kategorie TEXT, typ TEXT, bearbeitbar BOOLEAN)")
+        self.raw.executemany("INSERT INTO anime_series (series_id, titel, cover_data) VALUES (?, ?, ?)",
+                             [(n, f"Anime {n}", COVER if n % 2 else None) for n in range(1, 8)])
+        self.raw.commit()
+        self.connection = SQLiteConnection(self.raw)
+
+    def test_covers_moved_to_store(self):
+        """Test, ob die BLOBs im Cover-Speicher landen, cover_hash gesetzt und cover_data entfernt wird"""
+        with patch.object(migrations, 'COVER_BATCH_SIZE', 2):
+            self.assertEqual(migrations.migrate(self.connection), migrations.SCHEMA_VERSION)
+
+        cover_hash = self.store.hash_of(COVER)
+        self.assertEqual(self.store.get(cover_hash), COVER)
+        self.assertEqual(dict(self.raw.execute("SELECT series_id, cover_hash FROM anime_series")),
+                         {n: cover_hash if n % 2 else None for n in range(1, 8)})
+        self.assertNotIn('cover_data', columns(self.raw, 'anime_series'))
+        self.assertEqual(migrations.get_version(self.connection), migrations.SCHEMA_VERSION)
+
+        # erneuter Aufruf ändert nichts mehr
+        with patch.object(migrations, 'STEPS', {}):
+            self.assertEqual(migrations.migrate(self.connection), migrations.SCHEMA_VERSION)
+
+    def test_statistics_created_and_rebuilt(self):
+        """Test, ob die Statistiktabellen angelegt und aus den vorhandenen Daten aufgebaut werden"""
+        self.raw.execute("CREATE INDEX idx_downloads_datum ON downloads (download_datum)")
+
+        self.assertEqual(migrations.migrate(self.connection), 3)
+
+        tables = {row[0] for row in self.raw.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertLessEqual({'statistik_zaehler', 'statistik_anime'}, tables)
+        self.statistics.return_value.rebuild.assert_called_once_with()
+
+    def test_failed_step_keeps_data(self):
+        """Test, ob ein fehlgeschlagener Schritt die Version und die BLOBs stehen lässt"""
+        with patch.object(CoverStore, 'put', side_effect=OSError('read-only')):
+            self.assertEqual(migrations.migrate(self.connection), 1)
+
+        self.assertEqual(migrations.get_version(self.connection), 1)
+        self.assertEqual(self.raw.execute("SELECT COUNT(cover_data) FROM anime_series").fetchone()[0], 4)
+        self.statistics.return_value.rebuild.assert_not_called()
+
+
+class TestSQLiteMigration(unittest.TestCase):
+    """Testklasse für die Migration einer SQLite-Datei mit Schema-Version 1"""
+
+    def setUp(self):
+        """Test-Setup: Datei auf das alte Schema mit cover_data zurückbauen"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, 'aniworld.db')
+        self.store = CoverStore(os.path.join(self.tmp_dir.name, 'covers'))
+
+        patcher = patch.object(cover_store, '_cover_store_instance', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        SQLiteDatabase(self.path).connect().close()
+        raw = sqlite3.connect(self.path)
+        for statement in (
+            "DROP TABLE statistik_anime",
+            "DROP TABLE statistik_zaehler",
+            "DROP INDEX idx_downloads_datum",
+            "ALTER TABLE anime_series DROP COLUMN cover_hash",
+            "ALTER TABLE anime_series ADD COLUMN cover_data MEDIUMBLOB",
+        ):
+            raw.execute(statement)
+        raw.execute("INSERT INTO anime_series (titel, cover_data) VALUES ('Alt', ?)", (COVER,))
+        raw.execute("PRAGMA user_version = 1")
+        raw.commit()
+        raw.close()
+
+    def test_covers_kept(self):
+        """Test, ob die Migration auf Version 2 die Cover in den Cover-Speicher überträgt"""
+        connection = SQLiteDatabase(self.path).connect()
+        self.addCleanup(connection.close)
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT cover_hash FROM anime_series WHERE titel = 'Alt'")
+        cover_hash = cursor.fetchone()['cover_hash']
+        self.assertEqual(self.store.get(cover_hash), COVER)
+
+
+class TestBeforeMigration(unittest.TestCase):
+    """Testklasse für die Repositories auf einer noch nicht migrierten Datenbank"""
+
+    def setUp(self):
+        """Test-Setup: SQLite-Datenbank ohne cover_hash und Statistiktabellen, Schema-Version 1"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        with DatabaseConnection().get_connection() as connection:
+            cursor = connection.cursor()
+            for statement in ("ALTER TABLE anime_series DROP COLUMN cover_hash",
+                              "DROP TABLE statistik_anime", "DROP TABLE statistik_zaehler"):
+                cursor.execute(statement)
+            connection.commit()
+        DatabaseConnection().schema_version = 1
+
+    def test_reads_and_writes_without_cover_hash(self):
+        """Test, ob Anime ohne die Spalte cover_hash gespeichert und gelesen werden"""
+        repo = AnimeRepository()
+        series_id = repo.save(AnimeSeries(titel='Alt', aniworld_url='https://aniworld.test/anime/stream/alt'))
+        repo._identity_map('anime').invalidate(series_id)  # pylint: disable=protected-access
+
+        anime = repo.find_by_url('https://aniworld.test/anime/stream/alt')
+        self.assertEqual(anime.series_id, series_id)
+        self.assertIsNone(anime.cover_hash)
+        self.assertEqual([a.titel for a in repo.find_all()], ['Alt'])
+        self.assertFalse(repo.save_cover_hash(series_id, 'f' * 64))
+
+    def test_saves_and_statistics_without_tables(self):
+        """Test, ob Staffeln und Episoden ohne Statistiktabellen gespeichert und trotzdem gezählt werden"""
+        series_id = AnimeRepository().save(AnimeSeries(titel='Alt', aniworld_url='https://aniworld.test/anime/stream/alt'))
+        season_id = SeasonRepository().save(Season(series_id=series_id, staffel_nummer=1))
+        for n in (1, 2):
+            EpisodeRepository().save(Episode(season_id=season_id, episode_nummer=n))
+
+        service = StatisticsService()
+        self.assertEqual((service.count_animes(), service.count_seasons(), service.count_episodes()), (1, 1, 2))
+        self.assertEqual([(anime.titel, count) for anime, count in service.get_top_anime()], [('Alt', 2)])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
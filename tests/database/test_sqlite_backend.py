@@ -0,0 +1,210 @@
+"""
+Tests für das eingebettete SQLite-Backend
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.models import AnimeSeries, Download, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository
+)
+from src.aniworld.database.sqlite_backend import SCHEMA_PATH, SCHEMA_VERSION, split_script, translate_query
+
+MYSQL_SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'create_database.sql'
+)
+
+
+def mysql_tables():
+    """
+    Liest Tabellen und Spalten aus create_database.sql.
+
+    Returns:
+        Dict Tabellenname -> Liste der Spaltennamen
+    """
+    with open(MYSQL_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        script = f.read()
+
+    tables = {}
+    for name, body in re.findall(r'CREATE TABLE (\w+) \((.*?)\n\);', script, re.S):
+        columns = []
+        for line in body.strip().splitlines():
+            first = line.strip().split(' ', 1)[0]
+            if first not in ('PRIMARY', 'FOREIGN', 'UNIQUE'):
+                columns.append(first)
+        tables[name] = columns
+    return tables
+
+
+class TestSQLiteSchema(unittest.TestCase):
+    """Testklasse für schema_sqlite.sql"""
+
+    def setUp(self):
+        """Test-Setup: Schema in eine In-Memory-Datenbank laden"""
+        self.connection = sqlite3.connect(':memory:')
+        with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+            for statement in split_script(f.read()):
+                self.connection.execute(statement)
+
+    def tearDown(self):
+        """Test-Teardown"""
+        self.connection.close()
+
+    def test_same_tables_and_columns_as_mysql_schema(self):
+        """Test, ob das SQLite-Schema dieselben Tabellen und Spalten wie create_database.sql hat"""
+        expected = mysql_tables()
+        self.assertTrue(expected)
+
+        for table, columns in expected.items():
+            with self.subTest(table=table):
+                rows = self.connection.execute(f"PRAGMA table_info({table})").fetchall()
+                self.assertEqual([row[1] for row in rows], columns)
+
+    def test_seed_data(self):
+        """Test, ob die Standarddaten (Sprachen, Provider) mit den IDs aus LookupService angelegt werden"""
+        providers = dict(self.connection.execute("SELECT name, provider_id FROM providers"))
+        languages = dict(self.connection.execute("SELECT name, language_id FROM languages"))
+
+        self.assertEqual(providers['Vidoza'], 1)
+        self.assertEqual(providers['VOE'], 2)
+        self.assertEqual(languages, {'German Dub': 1, 'German Sub': 2, 'English Sub': 3})
+
+    def test_translate_query(self):
+        """Test, ob Platzhalter und MySQL-Funktionen übersetzt werden"""
+        self.assertEqual(
+            translate_query("UPDATE t SET a = %s, b = NOW() WHERE c LIKE 'x%%'"),
+            "UPDATE t SET a = ?, b = datetime('now', 'localtime') WHERE c LIKE 'x%'"
+        )
+
+
+class TestSQLiteRepositories(unittest.TestCase):
+    """Testklasse für die Repositories mit backend = sqlite"""
+
+    def setUp(self):
+        """Test-Setup: Repositories gegen eine temporäre SQLite-Datei"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.db_path = os.path.join(self.tmp_dir.name, 'aniworld.db')
+
+        for patcher in (
+            patch.dict(os.environ, {'DB_BACKEND': 'sqlite', 'DB_SQLITE_PATH': self.db_path}),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+    def test_backend_selected_from_environment(self):
+        """Test, ob DB_BACKEND=sqlite eine WAL-Datenbank mit Schema anlegt"""
+        db = DatabaseConnection()
+
+        self.assertEqual(db.backend, 'sqlite')
+        self.assertTrue(db.test_connection())
+        with db.get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone(), ('wal',))
+
+    def test_migration_from_schema_version_1(self):
+        """Test, ob eine Datei mit cover_data-Spalte (Version 1) auf cover_hash umgestellt wird"""
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("CREATE TABLE anime_series (series_id INTEGER PRIMARY KEY, titel TEXT, cover_data BLOB)")
+        connection.execute("INSERT INTO anime_series VALUES (1, 'Alt', x'89504e47')")
+        connection.execute("CREATE TABLE downloads (download_id INTEGER PRIMARY KEY, download_datum TIMESTAMP)")
+        connection.execute("PRAGMA user_version = 1")
+        connection.commit()
+        connection.close()
+
+        with DatabaseConnection().get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA table_info(anime_series)")
+            columns = [row[1] for row in cursor.fetchall()]
+            cursor.execute("PRAGMA user_version")
+            self.assertEqual(cursor.fetchone(), (SCHEMA_VERSION,))
+
+        self.assertIn('cover_hash', columns)
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            self.assertNotIn('cover_data', columns)
+
+    def test_anime_season_episode_roundtrip(self):
+        """Test, ob Anime, Staffel und Episode gespeichert und wiedergefunden werden"""
+        anime_repo = AnimeRepository()
+        season_repo = SeasonRepository()
+        episode_repo = EpisodeRepository()
+
+        series_id = anime_repo.save(AnimeSeries(titel='Test', aniworld_url='https://aniworld.to/anime/stream/test'))
+        season_id = season_repo.save(Season(series_id=series_id, staffel_nummer=1))
+        episode_id = episode_repo.save(Episode(season_id=season_id, episode_nummer=1, titel='Pilot'))
+
+        anime = anime_repo.find_by_url('https://aniworld.to/anime/stream/test')
+        self.assertEqual(anime.series_id, series_id)
+        self.assertIsInstance(anime.aktualisiert_am, datetime)
+
+        anime.titel = 'Umbenannt'
+        self.assertEqual(anime_repo.save(anime), series_id)
+        self.assertEqual(anime_repo.find_by_id(series_id).titel, 'Umbenannt')
+
+        self.assertEqual([s.season_id for s in season_repo.find_by_series_id(series_id)], [season_id])
+        self.assertEqual(episode_repo.find_by_season_id(season_id)[0].titel, 'Pilot')
+
+        # ON DELETE CASCADE über die Fremdschlüssel
+        self.assertTrue(anime_repo.delete(series_id))
+        self.assertIsNone(episode_repo.find_by_id(episode_id))
+
+    def test_download_roundtrip(self):
+        """Test, ob Downloads inklusive Zeitstempel und Status gespeichert werden"""
+        series_id = AnimeRepository().save(AnimeSeries(titel='Test'))
+        season_id = SeasonRepository().save(Season(series_id=series_id, staffel_nummer=1))
+        episode_id = EpisodeRepository().save(Episode(season_id=season_id, episode_nummer=1))
+
+        repo = DownloadRepository()
+        download_id = repo.save(Download(
+            episode_id=episode_id, provider_id=2, language_id=1,
+            speicherlink='https://example.test/v.mp4', status='läuft'
+        ))
+
+        self.assertEqual([d.download_id for d in repo.find_active_downloads()], [download_id])
+        download = repo.find_by_id(download_id)
+        self.assertIsInstance(download.download_datum, datetime)
+
+        download.status = 'abgeschlossen'
+        repo.save(download)
+        self.assertEqual(repo.find_active_downloads(), [])
+
+    def test_connection_per_thread(self):
+        """Test, ob parallele Threads eigene Verbindungen nutzen und gleichzeitig schreiben können"""
+        repo = AnimeRepository()
+        errors = []
+
+        def worker(index):
+            try:
+                for i in range(10):
+                    repo.save(AnimeSeries(titel=f'T{index}-{i}', aniworld_url=f'https://x.test/{index}/{i}'))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                errors.append(e)
+            finally:
+                DatabaseConnection().sqlite.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(repo.find_all()), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
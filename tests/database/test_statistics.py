@@ -0,0 +1,149 @@
+"""
+Tests für die materialisierten Statistiken
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.models import AnimeSeries, Download, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository, StatisticsRepository
+)
+from src.aniworld.database.services import StatisticsService
+
+
+class TestStatistics(unittest.TestCase):
+    """Testklasse für StatisticsRepository und StatisticsService (gegen eine temporäre SQLite-Datei)"""
+
+    def setUp(self):
+        """Test-Setup: zwei Anime mit Staffeln, Episoden und Downloads"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        self.anime_repo = AnimeRepository()
+        self.episode_repo = EpisodeRepository()
+        self.download_repo = DownloadRepository()
+        self.stats_repo = StatisticsRepository()
+        self.service = StatisticsService()
+
+        self.series_ids, self.episode_ids = [], []
+        for n, episode_count in ((1, 3), (2, 1)):
+            series_id = self.anime_repo.save(AnimeSeries(titel=f'Anime {n}', aniworld_url=f'https://x.test/{n}'))
+            season_id = SeasonRepository().save(Season(series_id=series_id, staffel_nummer=1))
+            self.series_ids.append(series_id)
+            for e in range(1, episode_count + 1):
+                self.episode_ids.append(self.episode_repo.save(Episode(season_id=season_id, episode_nummer=e)))
+
+        self.download_ids = [
+            self.download_repo.save(Download(episode_id=self.episode_ids[0], provider_id=2, language_id=1,
+                                             dateigroesse=100, status='abgeschlossen')),
+            self.download_repo.save(Download(episode_id=self.episode_ids[1], provider_id=2, language_id=2,
+                                             dateigroesse=300, status='abgeschlossen')),
+            self.download_repo.save(Download(episode_id=self.episode_ids[3], provider_id=1, language_id=1)),
+        ]
+
+    def assert_matches_rebuild(self):
+        """Prüft, ob die fortgeschriebenen Zähler einer vollständigen Neuberechnung entsprechen"""
+        counters = {key: value for key, value in self.stats_repo.get_counters().items() if value}
+        top_anime = [(a.series_id, n) for a, n in self.stats_repo.find_top_anime(10)]
+
+        rebuilt = {key: value for key, value in self.stats_repo.rebuild().items() if value}
+        self.assertEqual(counters, rebuilt)
+        self.assertEqual(top_anime, [(a.series_id, n) for a, n in self.stats_repo.find_top_anime(10)])
+        return counters
+
+    def test_incremental_counters(self):
+        """Test, ob Anlegen von Anime, Staffeln, Episoden und Downloads die Zähler fortschreibt"""
+        counters = self.assert_matches_rebuild()
+
+        self.assertEqual(self.service.count_animes(), 2)
+        self.assertEqual(self.service.count_seasons(), 2)
+        self.assertEqual(self.service.count_episodes(), 4)
+        self.assertEqual(self.service.count_downloads(), 3)
+        self.assertEqual(counters['status.abgeschlossen'], 2)
+        self.assertEqual(counters['status.geplant'], 1)
+        self.assertEqual(
+            [(anime.titel, count) for anime, count in self.service.get_top_anime()],
+            [('Anime 1', 3), ('Anime 2', 1)]
+        )
+
+        stats = self.service.get_download_statistics()
+        self.assertEqual(stats['avg_file_size'], 200)
+        self.assertEqual(stats['top_providers'], [('VOE', 2), ('Vidoza', 1)])
+        self.assertEqual(dict(stats['top_languages']), {'German Dub': 2, 'German Sub': 1})
+
+    def test_status_transition(self):
+        """Test, ob ein Statuswechsel über DownloadRepository.save verbucht wird"""
+        download = self.download_repo.find_by_id(self.download_ids[2])
+        download.status = 'abgeschlossen'
+        download.dateigroesse = 200
+        self.download_repo.save(download)
+
+        stats = self.service.get_download_statistics()
+        self.assertEqual(stats['status_counts'], {'abgeschlossen': 3})
+        self.assertEqual(stats['avg_file_size'], 200)
+        self.assert_matches_rebuild()
+
+    def test_delete_cascades(self):
+        """Test, ob Löschen einer Episode bzw. eines Anime mitgelöschte Downloads herausrechnet"""
+        self.assertTrue(self.episode_repo.delete(self.episode_ids[1]))
+        self.assertEqual(self.service.count_episodes(), 3)
+        self.assertEqual(self.service.count_downloads(), 2)
+        self.assert_matches_rebuild()
+
+        self.assertTrue(self.anime_repo.delete(self.series_ids[0]))
+        self.assertFalse(self.anime_repo.delete(self.series_ids[0]))
+        counters = self.assert_matches_rebuild()
+        self.assertEqual((counters['anime'], counters['episoden'], counters['downloads']), (1, 1, 1))
+
+    def test_rebuild_when_missing(self):
+        """Test, ob fehlende Statistiken (z.B. nach einer Migration) beim ersten Lesen neu berechnet werden"""
+        with DatabaseConnection().get_connection() as connection:
+            connection.cursor().execute("DELETE FROM statistik_zaehler")
+            connection.commit()
+
+        self.assertEqual(self.service.count_episodes(), 4)
+
+    def test_read_is_independent_of_table_size(self):
+        """Test, ob das Lesen der Statistiken die großen Tabellen nicht abfragt"""
+        queries = []
+        with patch.object(self.stats_repo, '_execute_query', side_effect=lambda q, *a, **k: queries.append(q) or []):
+            self.service.stats_repo = self.stats_repo
+            self.service.count_animes()
+            self.service.get_download_statistics()
+            self.service.get_top_anime()
+
+        self.assertTrue(queries)
+        for query in queries:
+            self.assertNotIn('FROM episodes', query)
+            self.assertNotIn('GROUP BY', query)
+
+    def test_recent_downloads(self):
+        """Test, ob die letzten Downloads mit Anime, Episode, Provider und Sprache geliefert werden"""
+        recent = self.service.get_recent_downloads(limit=1)
+
+        self.assertEqual(len(recent), 1)
+        self.assertIn(recent[0]['download_id'], self.download_ids)
+        self.assertIn(recent[0]['provider'], ('VOE', 'Vidoza'))
+        self.assertIn('anime_titel', recent[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests für die seitenweise gelesenen Listen (Keyset-Pagination)
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.models import AnimeSeries, Download, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository
+)
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Testklasse für iter_all der Repositories (gegen eine temporäre SQLite-Datei)"""
+
+    def setUp(self):
+        """Test-Setup: Repositories gegen eine temporäre SQLite-Datei"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        self.anime_repo = AnimeRepository()
+        self.series_ids = [
+            self.anime_repo.save(AnimeSeries(
+                titel=f'Serie {i}', original_titel='Shingeki' if i % 3 == 0 else None,
+                status='laufend' if i % 2 else 'abgeschlossen',
+                aniworld_url=f'https://x.test/{i}'
+            ))
+            for i in range(7)
+        ]
+
+    def test_pages_cover_all_rows_in_order(self):
+        """Test, ob alle Zeilen genau einmal und nach ID sortiert über mehrere Seiten geliefert werden"""
+        with patch.object(self.anime_repo, '_timed', wraps=self.anime_repo._timed) as timed:  # pylint: disable=protected-access
+            ids = [anime.series_id for anime in self.anime_repo.iter_all(batch_size=3)]
+
+        self.assertEqual(ids, self.series_ids)
+        # 3 + 3 + 1 Zeilen: die dritte Seite ist unvollständig und beendet die Schleife
+        self.assertEqual(timed.call_count, 3)
+
+    def test_first_row_before_later_pages(self):
+        """Test, ob die erste Zeile geliefert wird, bevor weitere Seiten gelesen werden"""
+        with patch.object(self.anime_repo, '_timed', wraps=self.anime_repo._timed) as timed:  # pylint: disable=protected-access
+            iterator = self.anime_repo.iter_all(batch_size=2)
+            self.assertEqual(next(iterator).series_id, self.series_ids[0])
+            self.assertEqual(timed.call_count, 1)
+            iterator.close()
+
+    def test_no_connection_held_between_rows(self):
+        """Test, ob zwischen den gelieferten Zeilen keine Verbindung ausgeliehen bleibt"""
+        db = self.anime_repo.db
+        get_connection = db.get_connection
+        checked_out = []
+
+        @contextmanager
+        def counting_connection():
+            with get_connection() as conn:
+                checked_out.append(conn)
+                try:
+                    yield conn
+                finally:
+                    checked_out.remove(conn)
+
+        with patch.object(db, 'get_connection', counting_connection):
+            iterator = self.anime_repo.iter_all(batch_size=2)
+            for _ in range(3):
+                next(iterator)
+                self.assertEqual(checked_out, [])
+            # abgebrochene Iteration ohne close()
+            del iterator
+            self.assertEqual(checked_out, [])
+
+    def test_filters(self):
+        """Test, ob Status- und Titelfilter mit der Pagination kombiniert werden"""
+        running = [a.series_id for a in self.anime_repo.iter_all(status='laufend', batch_size=2)]
+        self.assertEqual(running, self.series_ids[1::2])
+
+        found = [a.titel for a in self.anime_repo.iter_all(search='shingeki', batch_size=1)]
+        self.assertEqual(found, ['Serie 0', 'Serie 3', 'Serie 6'])
+
+        found = [a.titel for a in self.anime_repo.iter_all(status='laufend', search='Serie 5')]
+        self.assertEqual(found, ['Serie 5'])
+
+    def test_download_iter_all(self):
+        """Test, ob Downloads nach Status gefiltert seitenweise geliefert werden"""
+        season_id = SeasonRepository().save(Season(series_id=self.series_ids[0], staffel_nummer=1))
+        episode_id = EpisodeRepository().save(Episode(season_id=season_id, episode_nummer=1))
+
+        repo = DownloadRepository()
+        download_ids = [
+            repo.save(Download(episode_id=episode_id, provider_id=2, language_id=1,
+                               status='abgeschlossen' if i < 4 else 'fehlgeschlagen'))
+            for i in range(5)
+        ]
+
+        done = [d.download_id for d in repo.iter_all(status='abgeschlossen', batch_size=2)]
+        self.assertEqual(done, download_ids[:4])
+        self.assertEqual(len(list(repo.iter_all(episode_id=episode_id, batch_size=2))), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests für das verzögerte Schreiben (Write-Behind)
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.aniworld.database import config as database_config
+from src.aniworld.database import services
+from src.aniworld.database.connection import DatabaseConnection
+from src.aniworld.database.models import AnimeSeries, Episode, Season
+from src.aniworld.database.repositories import (
+    AnimeRepository, DownloadRepository, EpisodeRepository, SeasonRepository, StatisticsRepository
+)
+from src.aniworld.database.services import DownloadService
+from src.aniworld.database.write_behind import WriteBehindWriter
+
+EPISODE_URL = 'https://x.test/anime/stream/test/staffel-1/episode-1'
+
+
+class TestWriteBehindWriter(unittest.TestCase):
+    """Testklasse für WriteBehindWriter (gegen eine temporäre SQLite-Datei)"""
+
+    def setUp(self):
+        """Test-Setup: ein Anime mit einer Episode und ein Writer mit eigener Ausweichdatei"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for patcher in (
+            patch.dict(os.environ, {
+                'DB_BACKEND': 'sqlite',
+                'DB_SQLITE_PATH': os.path.join(self.tmp_dir.name, 'aniworld.db'),
+            }),
+            patch.object(database_config, '_config_instance', None),
+            patch.object(DatabaseConnection, '_instance', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(lambda: DatabaseConnection().sqlite.close())
+
+        series_id = AnimeRepository().save(AnimeSeries(titel='Test', aniworld_url='https://x.test/anime/stream/test'))
+        season_id = SeasonRepository().save(Season(series_id=series_id, staffel_nummer=1))
+        EpisodeRepository().save(Episode(season_id=season_id, episode_nummer=1, aniworld_url=EPISODE_URL))
+
+        self.spill_path = os.path.join(self.tmp_dir.name, 'write_behind.jsonl')
+        self.writer = self.create_writer()
+
+        # Anzahl der Transaktionen des Writers
+        self.batches = []
+        batch = DatabaseConnection.batch
+
+        def counting_batch(connection):
+            self.batches.append(1)
+            return batch(connection)
+
+        patcher = patch.object(DatabaseConnection, 'batch', counting_batch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_writer(self):
+        """Erzeugt einen Writer, der beim Testende geschlossen wird"""
+        writer = WriteBehindWriter(self.spill_path, queue_size=100, batch_size=50, flush_interval=0.2)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_coalesced_into_one_transaction(self):
+        """Test, ob Fortschritt, Abschluss und ein Anime in einer Transaktion mit einem UPDATE landen"""
+        lifecycle = DownloadService().start_download(
+            EPISODE_URL, 'VOE', 'German Dub', 'https://cdn.test/v.mp4',
+            os.path.join(self.tmp_dir.name, 'fehlt.mp4'), progress_interval=0.0
+        )
+
+        updates = []
+        original = DownloadRepository.update_columns
+
+        def update_columns(repo, download_id, columns, deltas=None):
+            updates.append(dict(columns))
+            return original(repo, download_id, columns, deltas)
+
+        with patch.object(services, 'get_writer', return_value=self.writer), \
+                patch.object(DownloadRepository, 'update_columns', update_columns):
+            for n in range(1, 21):
+                lifecycle.progress({'downloaded_bytes': n * 1024, 'speed': 1024.0 * 1024})
+            self.writer.submit('anime', 'https://x.test/anime/stream/neu', {
+                'url': 'https://x.test/anime/stream/neu', 'title': 'Neu', 'seasons': []
+            })
+            lifecycle.finish('fehlgeschlagen', 'Verbindung abgebrochen')
+            self.assertTrue(self.writer.flush(10))
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(updates, [{
+            'dateigroesse': 20 * 1024, 'download_geschwindigkeit': 1.0,
+            'status': 'fehlgeschlagen', 'notizen': 'Verbindung abgebrochen'
+        }])
+
+        download = DownloadRepository().find_by_id(lifecycle.download_id)
+        self.assertEqual((download.status, download.dateigroesse), ('fehlgeschlagen', 20 * 1024))
+        self.assertIsNotNone(AnimeRepository().find_by_url('https://x.test/anime/stream/neu'))
+
+        stats = StatisticsRepository()
+        counters = {key: value for key, value in stats.get_counters().items() if value}
+        self.assertEqual(counters, {key: value for key, value in stats.rebuild().items() if value})
+
+    def test_download_waits_for_queued_anime(self):
+        """Test, ob ein Download auf den eingereihten Anime seiner Episode wartet und aufgezeichnet wird"""
+        anime_url = 'https://x.test/anime/stream/neu'
+        episode_url = f'{anime_url}/staffel-1/episode-1'
+
+        with patch.object(services, 'get_writer', return_value=self.writer):
+            self.writer.submit('anime', anime_url, {'url': anime_url, 'title': 'Neu', 'seasons': [
+                {'number': 1, 'episodes': [{'number': 1, 'url': episode_url}]}
+            ]})
+            lifecycle = DownloadService().start_download(
+                episode_url, 'VOE', 'German Dub', 'https://cdn.test/v.mp4',
+                os.path.join(self.tmp_dir.name, 'neu.mp4')
+            )
+
+        self.assertIsNotNone(lifecycle)
+        self.assertTrue(self.writer.wait_for(episode_url, timeout=0))
+
+    def test_spill_when_unreachable_and_replay(self):
+        """Test, ob Ereignisse bei nicht erreichbarer Datenbank ausgelagert und beim nächsten Start nachgeholt werden"""
+        anime_data = {'url': 'https://x.test/anime/stream/offline', 'title': 'Offline', 'seasons': []}
+
+        with patch.object(DatabaseConnection, 'batch', side_effect=ConnectionRefusedError("offline")):
+            self.writer.submit('anime', anime_data['url'], anime_data)
+            self.assertTrue(self.writer.flush(10))
+        self.writer.close()
+
+        with open(self.spill_path, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['payload'] for line in f], [anime_data])
+        self.assertIsNone(AnimeRepository().find_by_url(anime_data['url']))
+
+        writer = self.create_writer()
+        writer.start()
+        self.assertTrue(writer.flush(10))
+
+        self.assertIsNotNone(AnimeRepository().find_by_url(anime_data['url']))
+        self.assertFalse(os.path.exists(self.spill_path))
+
+    def test_failing_event_does_not_discard_batch(self):
+        """Test, ob ein fehlerhaftes Ereignis nur sich selbst verwirft"""
+        self.writer.submit('download', 1, {'download_id': 1, 'columns': {'unbekannt': 1}, 'deltas': {}})
+        self.writer.submit('anime', 'https://x.test/anime/stream/ok', {
+            'url': 'https://x.test/anime/stream/ok', 'title': 'OK', 'seasons': []
+        })
+        self.assertTrue(self.writer.flush(10))
+
+        self.assertIsNotNone(AnimeRepository().find_by_url('https://x.test/anime/stream/ok'))
+        self.assertFalse(os.path.exists(self.spill_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
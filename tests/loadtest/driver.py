@@ -0,0 +1,274 @@
+"""
+Lasttest-Treiber für den Scraper gegen den lokalen Ersatzserver
+
+Ermittelt über get_season_data die Episoden einer Serie und arbeitet sie mit
+mehreren Threads ab: Episodenseite laden, Hoster auslesen (providers),
+/redirect/ folgen, Direktlink extrahieren und optional das Video (MP4 oder
+HLS-Segmente) herunterladen. Am Ende werden Seiten/s, Links/s und MB/s
+ausgegeben.
+
+Ohne --base-url startet der Treiber selbst einen Ersatzserver mit den
+angegebenen Latenz- und Fehlerraten.
+
+Aufruf:
+    python tests/loadtest/driver.py --workers 8 --rounds 3 --provider VOE --latency-ms 40
+    python tests/loadtest/driver.py --base-url http://127.0.0.1:8765 --no-media
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import StandInServer, add_server_arguments, config_from_arguments  # noqa: E402  # pylint: disable=wrong-import-position
+
+SPAM_MARKER = "Deine Anfrage wurde als Spam erkannt."
+
+LANGUAGE_KEYS = {"German Dub": 1, "English Sub": 2, "German Sub": 3}
+
+
+class LoadStats:
+    """Threadsichere Zähler für den Lasttest"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {'pages': 0, 'links': 0, 'bytes': 0, 'errors': 0, 'spam': 0}
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += amount
+
+    def report(self, elapsed: float) -> Dict[str, float]:
+        """
+        Berechnet die Durchsätze.
+
+        Args:
+            elapsed: Laufzeit in Sekunden
+
+        Returns:
+            Dict mit den Zählern sowie pages_per_sec, links_per_sec und mb_per_sec
+        """
+        with self._lock:
+            result = dict(self.counters)
+        elapsed = max(elapsed, 1e-9)
+        result['elapsed'] = round(elapsed, 3)
+        result['pages_per_sec'] = round(result['pages'] / elapsed, 2)
+        result['links_per_sec'] = round(result['links'] / elapsed, 2)
+        result['mb_per_sec'] = round(result['bytes'] / elapsed / (1024 * 1024), 2)
+        return result
+
+
+def point_scraper_at(base_url: str) -> None:
+    """
+    Leitet alle Anfragen des Scrapers auf den Ersatzserver um.
+
+    Der Ersatzserver hat keinen Browser; fehlgeschlagene Anfragen werden daher
+    als Fehler gezählt statt auf Playwright auszuweichen.
+    """
+    from aniworld import globals as aniworld_globals  # pylint: disable=import-outside-toplevel
+    from aniworld.common import common  # pylint: disable=import-outside-toplevel
+
+    aniworld_globals.ANIWORLD_BASE_URL = base_url.rstrip('/')
+    aniworld_globals.DOODSTREAM_BASE_URL = base_url.rstrip('/')
+    aniworld_globals.DEFAULT_USE_PLAYWRIGHT = False
+    os.environ.pop('USE_PLAYWRIGHT', None)
+    common.fetch_url_content_with_playwright = lambda url, proxy=None, check=True: None
+
+    # Fehlerseiten sind Teil des Tests und dürfen den Prozess nicht beenden
+    logging.getLogger().removeHandler(aniworld_globals.exit_on_error_handler)
+
+
+def discover_episodes(slug: str, attempts: int = 5) -> List[str]:
+    """
+    Ermittelt die Episoden-URLs einer Serie über get_season_data.
+
+    Returns:
+        Liste der Episoden-URLs (leer, wenn alle Versuche fehlschlagen)
+    """
+    from aniworld.common import get_season_data  # pylint: disable=import-outside-toplevel
+
+    for _ in range(attempts):
+        try:
+            episodes = get_season_data(slug)
+        except (Exception, SystemExit) as e:  # pylint: disable=broad-exception-caught
+            logging.debug("Episode discovery failed: %s", e)
+            continue
+        if episodes:
+            return episodes
+    return []
+
+
+def download_media(session: requests.Session, link: str, stats: LoadStats) -> None:
+    """Lädt ein MP4 oder alle Segmente einer HLS-Playlist und zählt die Bytes"""
+    if link.endswith('.m3u8'):
+        playlist = session.get(link, timeout=30)
+        playlist.raise_for_status()
+        stats.add('bytes', len(playlist.content))
+        targets = [line for line in playlist.text.splitlines() if line and not line.startswith('#')]
+    else:
+        targets = [link]
+
+    for target in targets:
+        with session.get(target, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=65536):
+                stats.add('bytes', len(chunk))
+
+
+def process_episode(episode_url: str, provider: str, lang: int, media: bool,  # pylint: disable=too-many-arguments
+                    session: requests.Session, stats: LoadStats) -> None:
+    # pylint: disable=import-outside-toplevel
+    from bs4 import BeautifulSoup
+    from aniworld.common import fetch_url_content
+    from aniworld.execute import fetch_direct_link, get_episode_title, providers
+    from aniworld.extractors import (
+        doodstream_get_direct_link,
+        speedfiles_get_direct_link,
+        streamtape_get_direct_link,
+        vidmoly_get_direct_link,
+        vidoza_get_direct_link,
+        voe_get_direct_link
+    )
+
+    provider_mapping = {
+        "Vidoza": vidoza_get_direct_link,
+        "VOE": voe_get_direct_link,
+        "Doodstream": doodstream_get_direct_link,
+        "Streamtape": streamtape_get_direct_link,
+        "Vidmoly": vidmoly_get_direct_link,
+        "SpeedFiles": speedfiles_get_direct_link
+    }
+
+    html = fetch_url_content(episode_url, check=False)
+    if html is None:
+        stats.add('errors')
+        return
+    stats.add('pages')
+    stats.add('bytes', len(html))
+    if SPAM_MARKER.encode() in html:
+        stats.add('spam')
+        return
+
+    soup = BeautifulSoup(html, 'html.parser')
+    get_episode_title(soup)
+    data = providers(soup) or {}
+    request_url = data.get(provider, {}).get(lang)
+    if not request_url:
+        stats.add('errors')
+        return
+
+    try:
+        link = fetch_direct_link(provider_mapping[provider], request_url)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.debug("Direct link for %s failed: %s", episode_url, e)
+        link = None
+    if not link:
+        stats.add('errors')
+        return
+    stats.add('links')
+
+    if media:
+        try:
+            download_media(session, link, stats)
+        except requests.exceptions.RequestException as e:
+            logging.debug("Media download for %s failed: %s", link, e)
+            stats.add('errors')
+
+
+def run_load(base_url: str, slug: str = 'load-test-anime', provider: str = 'VOE',  # pylint: disable=too-many-arguments
+             language: str = 'German Sub', workers: int = 4, rounds: int = 1,
+             media: bool = True) -> Dict[str, float]:
+    """
+    Führt den Lasttest aus.
+
+    Args:
+        base_url: Basis-URL des Ersatzservers
+        slug: Serie, deren Episoden abgearbeitet werden
+        provider: Hoster, dessen Direktlinks extrahiert werden
+        language: Sprache (German Dub, English Sub, German Sub)
+        workers: Anzahl paralleler Threads
+        rounds: Wie oft die Episodenliste abgearbeitet wird
+        media: Ob die Videos heruntergeladen werden
+
+    Returns:
+        Ergebnis von LoadStats.report
+    """
+    point_scraper_at(base_url)
+    stats = LoadStats()
+
+    start = time.perf_counter()
+    episodes = discover_episodes(slug)
+    if not episodes:
+        logging.warning("No episodes found at %s", base_url)
+
+    lang = LANGUAGE_KEYS[language]
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loadtest') as pool:
+        futures = [
+            pool.submit(process_episode, episode_url, provider, lang, media, session, stats)
+            for _ in range(rounds)
+            for episode_url in episodes
+        ]
+        for future in futures:
+            future.result()
+
+    return stats.report(time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest gegen den lokalen AniWorld-Ersatzserver")
+    parser.add_argument('--base-url', help='Laufender Ersatzserver; ohne Angabe wird einer gestartet')
+    parser.add_argument('--slug', default='load-test-anime')
+    parser.add_argument('--provider', default='VOE', choices=['VOE', 'Vidoza', 'Doodstream', 'Vidmoly'])
+    parser.add_argument('--language', default='German Sub', choices=list(LANGUAGE_KEYS))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--no-media', action='store_true', help='Videos nicht herunterladen')
+    parser.add_argument('--json', action='store_true', help='Ergebnis als JSON ausgeben')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from aniworld import globals as aniworld_globals  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+    # erst nach dem Import von aniworld.globals, das das Logging einrichtet
+    logging.getLogger().setLevel(logging.CRITICAL + 1)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = StandInServer(config_from_arguments(args)).start()
+        base_url = server.base_url
+
+    try:
+        result = run_load(
+            base_url, args.slug, args.provider, args.language,
+            args.workers, args.rounds, not args.no_media
+        )
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Seiten:  {result['pages']:>8}  ({result['pages_per_sec']:.1f}/s)")
+        print(f"Links:   {result['links']:>8}  ({result['links_per_sec']:.1f}/s)")
+        print(f"Daten:   {result['bytes'] / (1024 * 1024):>8.1f} MB  ({result['mb_per_sec']:.1f} MB/s)")
+        print(f"Fehler:  {result['errors']:>8}  Spam: {result['spam']}")
+        print(f"Dauer:   {result['elapsed']:>8.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+Lokaler AniWorld-Ersatzserver für Last- und End-to-End-Tests
+
+Liefert synthetische, aber strukturgleiche Seiten auf Basis der Fixtures in
+tests/fixtures: Serien-, Staffel- und Episodenseiten (mit hosterSiteVideo),
+/redirect/-Sprünge, Embed-Seiten der Hoster, die seriesSearch-Antwort sowie
+HLS-Playlists und MP4-Körper. Latenz, Fehlerrate und Spam-Sperren sind
+einstellbar.
+
+Aufruf:
+    python tests/loadtest/server.py --port 8765 --latency-ms 50 --error-rate 0.05 --spam-rate 0.01
+
+Den Scraper auf den Server zeigen lassen:
+    ANIWORLD_BASE_URL=http://127.0.0.1:8765 ANIWORLD_DOODSTREAM_BASE_URL=http://127.0.0.1:8765 aniworld ...
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+
+FIXTURE_SLUG = 'test-anime'
+FIXTURE_TITLE = 'Test Anime'
+
+SPAM_PAGE = (
+    b'<!DOCTYPE html><html><head><meta charset="utf-8"><title>AniWorld</title></head>'
+    b'<body><p>Deine Anfrage wurde als Spam erkannt.</p></body></html>'
+)
+
+SERIES_PATTERN = re.compile(r'^/anime/stream/(?P<slug>[\w-]+)/?$')
+SEASON_PATTERN = re.compile(r'^/anime/stream/(?P<slug>[\w-]+)/(?:staffel-(?P<season>\d+)|filme)/?$')
+EPISODE_PATTERN = re.compile(
+    r'^/anime/stream/(?P<slug>[\w-]+)/(?:staffel-(?P<season>\d+)/episode-(?P<episode>\d+)|filme/film-(?P<film>\d+))/?$'
+)
+REDIRECT_PATTERN = re.compile(r'^/redirect/(?P<id>\d+)$')
+PROVIDER_PATTERN = re.compile(
+    r'<li[^>]*data-lang-key="(?P<lang>\d+)"[^>]*data-link-target="(?P<target>/redirect/\d+)"[^>]*>.*?<h4>(?P<name>[^<]+)</h4>',
+    re.S
+)
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+class StandInConfig:
+    """
+    Einstellungen des Ersatzservers.
+
+    Args:
+        latency_ms: Grundlatenz pro Anfrage in Millisekunden
+        jitter_ms: Zusätzliche zufällige Latenz (0 bis jitter_ms)
+        error_rate: Anteil der Seitenanfragen, die mit HTTP 503 beantwortet werden
+        spam_rate: Anteil der Seitenanfragen, die die Spam-Sperrseite liefern
+        media_size: Größe eines Videos (MP4 bzw. Summe der HLS-Segmente) in Bytes
+        hls_segments: Anzahl der Segmente pro HLS-Playlist
+        seed: Startwert für den Zufallsgenerator (reproduzierbare Fehlerfolgen)
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,  # pylint: disable=too-many-arguments
+                 error_rate: float = 0.0, spam_rate: float = 0.0,
+                 media_size: int = 2 * 1024 * 1024, hls_segments: int = 4,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.spam_rate = spam_rate
+        self.media_size = media_size
+        self.hls_segments = max(1, hls_segments)
+        self.seed = seed
+
+
+class StandInSite:
+    """Erzeugt die Antworten des Ersatzservers aus den Fixtures"""
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self.base_url = ''
+        self._random = random.Random(config.seed)
+        self._random_lock = threading.Lock()
+
+        self.series_template = read_fixture('series.html').decode('utf-8')
+        self.season_template = read_fixture('season.html').decode('utf-8')
+        self.episode_template = read_fixture('episode.html').decode('utf-8')
+        self.search_template = read_fixture('search.json').decode('utf-8')
+
+        # /redirect/<id> -> (Hoster, Sprachschlüssel), so wie auf der Episodenseite verlinkt
+        self.redirects: Dict[str, Tuple[str, int]] = {
+            match.group('target'): (match.group('name').strip(), int(match.group('lang')))
+            for match in PROVIDER_PATTERN.finditer(self.episode_template)
+        }
+
+        self.stats = {'requests': 0, 'errors': 0, 'spam': 0, 'bytes': 0}
+        self._stats_lock = threading.Lock()
+
+    def roll(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def wait(self) -> None:
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            delay += self.roll() * self.config.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def fault(self) -> Optional[Tuple[int, bytes]]:
+        """
+        Würfelt Fehler und Spam-Sperren für Seitenanfragen aus.
+
+        Returns:
+            (Statuscode, Körper) oder None, wenn die Anfrage normal beantwortet wird
+        """
+        roll = self.roll()
+        if roll < self.config.error_rate:
+            self.count('errors')
+            return 503, b'Service Unavailable'
+        if roll < self.config.error_rate + self.config.spam_rate:
+            self.count('spam')
+            return 200, SPAM_PAGE
+        return None
+
+    def render(self, template: str, slug: str) -> bytes:
+        title = slug.replace('-', ' ').title()
+        return (
+            template
+            .replace('https://aniworld.to', self.base_url)
+            .replace(FIXTURE_SLUG, slug)
+            .replace(FIXTURE_TITLE, title)
+            .encode('utf-8')
+        )
+
+    def page(self, path: str) -> Optional[Tuple[int, str, bytes, Dict[str, str]]]:  # pylint: disable=too-many-return-statements
+        """
+        Beantwortet Seiten- und Embed-Anfragen.
+
+        Returns:
+            (Statuscode, Content-Type, Körper, zusätzliche Header) oder None, wenn der Pfad unbekannt ist
+        """
+        html_type = 'text/html; charset=utf-8'
+
+        match = EPISODE_PATTERN.match(path)
+        if match:
+            return 200, html_type, self.render(self.episode_template, match.group('slug')), {}
+
+        match = SEASON_PATTERN.match(path)
+        if match:
+            return 200, html_type, self.render(self.season_template, match.group('slug')), {}
+
+        match = SERIES_PATTERN.match(path)
+        if match:
+            return 200, html_type, self.render(self.series_template, match.group('slug')), {}
+
+        if path in ('/ajax/seriesSearch', '/ajax/randomGeneratorSeries'):
+            return 200, 'application/json', self.search_template.encode('utf-8'), {}
+
+        match = REDIRECT_PATTERN.match(path)
+        if match:
+            provider, lang = self.redirects.get(path, ('VOE', 1))
+            location = f"{self.base_url}/embed/{provider.lower()}/{match.group('id')}_{lang}"
+            return 302, html_type, b'', {'Location': location}
+
+        if path.startswith('/embed/'):
+            return self.embed(path)
+
+        if path.startswith('/e/'):
+            media_id = path.rsplit('/', 1)[-1]
+            hls = base64.b64encode(f"{self.base_url}/hls/{media_id}/master.m3u8".encode()).decode()
+            body = read_fixture('voe_redirect.html').decode('utf-8')
+            body = re.sub(r"'hls': '[^']*'", f"'hls': '{hls}'", body)
+            return 200, html_type, body.encode('utf-8'), {}
+
+        if path.startswith('/pass_md5/'):
+            return 200, 'text/plain', f"{self.base_url}/dood/".encode(), {}
+
+        return None
+
+    def embed(self, path: str) -> Optional[Tuple[int, str, bytes, Dict[str, str]]]:
+        _, _, provider, media_id = path.split('/', 3)
+        fixture = {
+            'voe': 'voe.html',
+            'vidoza': 'vidoza.html',
+            'doodstream': 'doodstream.html',
+            'streamtape': 'streamtape.html',
+            'vidmoly': 'vidmoly.html',
+            'speedfiles': 'speedfiles.html',
+        }.get(provider)
+        if not fixture:
+            return None
+
+        body = read_fixture(fixture).decode('utf-8')
+        body = (
+            body
+            .replace('https://voe.example.test/e/abc123def456', f"{self.base_url}/e/{media_id}")
+            .replace('https://delivery.example.test/media/test-anime-s01e01.mp4',
+                     f"{self.base_url}/media/{media_id}.mp4")
+            .replace('https://delivery.example.test/hls/test-anime-s01e01/',
+                     f"{self.base_url}/hls/{media_id}/")
+        )
+        return 200, 'text/html; charset=utf-8', body.encode('utf-8'), {}
+
+    def media_length(self, path: str) -> Optional[int]:
+        """
+        Liefert die Körpergröße für Medienpfade (MP4, HLS-Segmente, Doodstream).
+
+        Returns:
+            Größe in Bytes oder None, wenn es kein Medienpfad ist
+        """
+        if path.startswith('/media/') or path.startswith('/dood/'):
+            return self.config.media_size
+        if path.startswith('/hls/') and path.endswith('.ts'):
+            return self.config.media_size // self.config.hls_segments
+        return None
+
+    def playlist(self, path: str) -> bytes:
+        directory = path.rsplit('/', 1)[0]
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:10', '#EXT-X-MEDIA-SEQUENCE:0']
+        for i in range(self.config.hls_segments):
+            lines.append('#EXTINF:10.0,')
+            lines.append(f"{self.base_url}{directory}/seg-{i}.ts")
+        lines.append('#EXT-X-ENDLIST')
+        return ('\n'.join(lines) + '\n').encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP-Handler; die eigentliche Logik steckt in StandInSite"""
+
+    site: StandInSite = None
+    protocol_version = 'HTTP/1.1'
+    chunk = b'\0' * 65536
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+            self.site.count('bytes', len(body))
+
+    def send_media(self, length: int):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        remaining = length
+        while remaining > 0:
+            part = self.chunk[:min(remaining, len(self.chunk))]
+            self.wfile.write(part)
+            remaining -= len(part)
+        self.site.count('bytes', length)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        site = self.site
+        site.count('requests')
+        path = urlsplit(self.path).path
+        site.wait()
+
+        if path.endswith('.m3u8'):
+            self.send_body(200, 'application/vnd.apple.mpegurl', site.playlist(path))
+            return
+
+        length = site.media_length(path)
+        if length is not None:
+            self.send_media(length)
+            return
+
+        fault = site.fault()
+        if fault:
+            self.send_body(fault[0], 'text/html; charset=utf-8', fault[1])
+            return
+
+        response = site.page(path)
+        if response is None:
+            self.send_body(404, 'text/plain', b'Not Found')
+            return
+        self.send_body(*response)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.do_GET()
+
+
+class StandInServer:
+    """
+    Startet den Ersatzserver in einem Hintergrund-Thread.
+
+    Args:
+        config: Einstellungen (Latenz, Fehlerrate, ...)
+        host: Adresse, an die gebunden wird
+        port: Port, 0 wählt einen freien Port
+    """
+
+    def __init__(self, config: Optional[StandInConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.site = StandInSite(config or StandInConfig())
+        handler = type('BoundStandInHandler', (StandInHandler,), {'site': self.site})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.site.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return self.site.base_url
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.site.stats)
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='standin-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Grundlatenz pro Anfrage')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Zufällige Zusatzlatenz')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Anteil HTTP-503-Antworten (0-1)')
+    parser.add_argument('--spam-rate', type=float, default=0.0, help='Anteil Spam-Sperrseiten (0-1)')
+    parser.add_argument('--media-size', type=int, default=2 * 1024 * 1024, help='Größe eines Videos in Bytes')
+    parser.add_argument('--hls-segments', type=int, default=4, help='Segmente pro HLS-Playlist')
+    parser.add_argument('--seed', type=int, default=None, help='Startwert für reproduzierbare Fehler')
+
+
+def config_from_arguments(args: argparse.Namespace) -> StandInConfig:
+    return StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        spam_rate=args.spam_rate,
+        media_size=args.media_size,
+        hls_segments=args.hls_segments,
+        seed=args.seed
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokaler AniWorld-Ersatzserver")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandInServer(config_from_arguments(args), args.host, args.port)
+    print(f"Ersatzserver läuft auf {server.base_url} (Strg+C zum Beenden)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats))
+
+
+if __name__ == '__main__':
+    main()
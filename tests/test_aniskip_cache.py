@@ -0,0 +1,114 @@
+"""
+Tests für den persistenten Aniskip-Cache (MAL-IDs und Skip-Zeiten)
+"""
+
+import importlib
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld import globals as aniworld_globals
+from aniworld.aniskip import cache as aniskip_cache
+
+# das Paket exportiert die gleichnamige Funktion, daher das Modul direkt laden
+aniskip = importlib.import_module('aniworld.aniskip.aniskip')
+
+SKIP_TIMES = {
+    "found": True,
+    "results": [
+        {"skip_type": "op", "interval": {"start_time": 10.0, "end_time": 100.0}},
+        {"skip_type": "ed", "interval": {"start_time": 1300.0, "end_time": 1390.0}},
+    ],
+}
+
+
+class TestAniskipCache(unittest.TestCase):
+    """Testklasse für aniworld.aniskip.cache und dessen Nutzung in aniskip()"""
+
+    def setUp(self):
+        """Test-Setup: Cache in ein temporäres Verzeichnis umleiten, Netzwerkzugriffe ersetzen"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.fetch_anime_id = MagicMock(return_value="5114")
+        self.check_episodes = MagicMock(return_value=12)
+        self.season_count = MagicMock(return_value=12)
+        self.requests_get = MagicMock(return_value=MagicMock(status_code=200, json=lambda: SKIP_TIMES))
+
+        for patcher in (
+            patch.object(aniskip_cache, 'get_aniskip_cache_path',
+                         return_value=os.path.join(self.tmp_dir.name, 'cache', 'aniskip.db')),
+            patch.object(aniskip, 'fetch_anime_id', self.fetch_anime_id),
+            patch.object(aniskip, 'check_episodes', self.check_episodes),
+            patch.object(aniskip, 'get_season_episode_count', self.season_count),
+            patch.object(aniskip.requests, 'get', self.requests_get),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def network_calls(self):
+        """Anzahl aller Netzwerkzugriffe"""
+        return sum(mock.call_count for mock in (
+            self.fetch_anime_id, self.check_episodes, self.season_count, self.requests_get
+        ))
+
+    def test_next_episode_served_from_cache(self):
+        """Test, ob nach der ersten Episode nur noch die Skip-Zeiten neuer Episoden abgefragt werden"""
+        first = aniskip.aniskip("Fullmetal Alchemist", "fullmetal-alchemist", 1, 2)
+        self.assertIn("--script-opts=skip-op_start=10.0", first)
+        self.assertEqual(self.network_calls(), 4)
+
+        aniskip.aniskip("Fullmetal Alchemist", "fullmetal-alchemist", 2, 2)
+        self.assertEqual(self.network_calls(), 5)
+        self.assertEqual(self.fetch_anime_id.call_count, 1)
+
+        # gleiche Episode erneut (z.B. nach Neustart): keine Anfrage mehr
+        again = aniskip.aniskip("Fullmetal Alchemist", "fullmetal-alchemist", 1, 2)
+        self.assertEqual(self.network_calls(), 5)
+        self.assertEqual(again.split(' --', 1)[1], first.split(' --', 1)[1])
+
+    def test_negative_results_expire_sooner(self):
+        """Test, ob 'nicht gefunden' nur für DEFAULT_ANISKIP_NEGATIVE_TTL zwischengespeichert wird"""
+        self.fetch_anime_id.return_value = None
+        with patch('time.time', return_value=1000.0):
+            self.assertEqual(aniskip.aniskip("Unbekannt", "unbekannt", 1, 1), "")
+        with patch('time.time', return_value=1000.0 + aniworld_globals.DEFAULT_ANISKIP_NEGATIVE_TTL - 1):
+            self.assertEqual(aniskip.aniskip("Unbekannt", "unbekannt", 1, 1), "")
+        self.assertEqual(self.fetch_anime_id.call_count, 1)
+
+        with patch('time.time', return_value=1000.0 + aniworld_globals.DEFAULT_ANISKIP_NEGATIVE_TTL + 1):
+            aniskip.aniskip("Unbekannt", "unbekannt", 1, 1)
+        self.assertEqual(self.fetch_anime_id.call_count, 2)
+
+    def test_mismatching_episode_count_cached(self):
+        """Test, ob auch abweichende Episodenzahlen zwischengespeichert werden"""
+        self.season_count.return_value = 13
+        for _ in range(2):
+            self.assertEqual(aniskip.aniskip("Serie", "serie", 1, 1), "")
+
+        self.assertEqual(self.check_episodes.call_count, 1)
+        self.requests_get.assert_not_called()
+
+    def test_server_error_not_cached(self):
+        """Test, ob ein Fehler der AniSkip-API nicht als 'keine Skip-Zeiten' gespeichert wird"""
+        self.requests_get.return_value = MagicMock(status_code=500)
+        self.assertEqual(aniskip.fetch_skip_times("5114", 1), None)
+
+        self.requests_get.return_value = MagicMock(status_code=200, json=lambda: SKIP_TIMES)
+        self.assertEqual(aniskip.fetch_skip_times("5114", 1), SKIP_TIMES)
+        self.assertEqual(aniskip.fetch_skip_times("5114", 1), SKIP_TIMES)
+        self.assertEqual(self.requests_get.call_count, 2)
+
+    def test_disabled(self):
+        """Test, ob DEFAULT_ANISKIP_CACHE_TTL = 0 den Cache abschaltet"""
+        with patch.object(aniworld_globals, 'DEFAULT_ANISKIP_CACHE_TTL', 0):
+            aniskip.aniskip("Serie", "serie", 1, 1)
+            aniskip.aniskip("Serie", "serie", 1, 1)
+
+        self.assertEqual(self.fetch_anime_id.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name, 'cache', 'aniskip.db')))
+
+
+if __name__ == '__main__':
+    unittest.main()
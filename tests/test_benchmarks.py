@@ -0,0 +1,64 @@
+"""
+Tests für die Offline-Benchmarks
+
+Führt jeden Benchmark-Fall einmal aus und prüft das Ergebnis gegen die
+Fixtures in tests/fixtures. Der vollständige Vergleich mit der Baseline
+(tests/benchmarks/baseline.json) läuft nur mit ANIWORLD_BENCHMARK=1, da
+Durchsatzmessungen auf geteilten CI-Maschinen stark schwanken.
+"""
+
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+import bench  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+class TestBenchmarkCases(unittest.TestCase):
+    """Testklasse für die Benchmark-Fälle"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Test-Setup: Logging abschalten und Fälle laden"""
+        root = logging.getLogger()
+        cls._root_state = (root.level, list(root.handlers))
+        bench.quiet_logging()
+        cls.cases = bench.build_cases()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Test-Cleanup: Logging-Konfiguration wiederherstellen"""
+        root = logging.getLogger()
+        root.setLevel(cls._root_state[0])
+        root.handlers[:] = cls._root_state[1]
+
+    def test_cases_produce_expected_results(self):
+        """Test, ob jeder Fall offline das erwartete Ergebnis liefert"""
+        for case in self.cases:
+            with self.subTest(case=case.name):
+                try:
+                    result = case.run_once()
+                except bench.BenchmarkSkipped as e:
+                    self.skipTest(str(e))
+                self.assertTrue(case.check(result), f"{case.name} lieferte {result!r}")
+
+    def test_compare_detects_regression(self):
+        """Test, ob ein Einbruch des Durchsatzes als Regression erkannt wird"""
+        baseline = {'providers': {'ops_per_sec': 1000.0, 'peak_kib': 10.0}}
+
+        self.assertEqual(bench.compare('providers', {'ops_per_sec': 900.0, 'peak_kib': 10.0}, baseline, 0.25), [])
+        self.assertEqual(len(bench.compare('providers', {'ops_per_sec': 500.0, 'peak_kib': 10.0}, baseline, 0.25)), 1)
+        self.assertEqual(len(bench.compare('providers', {'ops_per_sec': 1000.0, 'peak_kib': 100.0}, baseline, 0.25)), 1)
+        self.assertEqual(bench.compare('unbekannt', {'ops_per_sec': 1.0, 'peak_kib': 1.0}, baseline, 0.25), [])
+
+    @unittest.skipUnless(os.getenv('ANIWORLD_BENCHMARK') == '1', "ANIWORLD_BENCHMARK=1 nicht gesetzt")
+    def test_no_regression_against_baseline(self):
+        """Test, ob kein Fall gegenüber der Baseline langsamer geworden ist"""
+        self.assertEqual(bench.main([]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests für den Download über yt_dlp im selben Prozess
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aniworld.common import downloader
+
+VIDEO = b'\x00\x00\x00\x18ftypmp42' + bytes(64 * 1024)
+
+
+class VideoHandler(BaseHTTPRequestHandler):
+    """Liefert eine MP4-Datei aus und merkt sich die Referer"""
+
+    referers = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Beantwortet GET-Anfragen"""
+        VideoHandler.referers.append(self.headers.get('Referer'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(VIDEO)))
+        self.end_headers()
+        self.wfile.write(VIDEO)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keine Ausgabe pro Anfrage"""
+
+
+class TestYtDlpDownloader(unittest.TestCase):
+    """Testklasse für aniworld.common.downloader"""
+
+    def setUp(self):
+        """Test-Setup: lokaler HTTP-Server und temporäres Zielverzeichnis"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), VideoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        VideoHandler.referers = []
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_batch_with_one_instance(self):
+        """Test, ob mehrere Downloads mit einer Instanz, eigenen Headern und Fortschrittsmeldungen laufen"""
+        progress = []
+        instance = downloader.YtDlpDownloader()
+        self.addCleanup(instance.close)
+
+        first = os.path.join(self.tmp_dir.name, 'Serie - S01E01 (German Dub).mp4')
+        second = os.path.join(self.tmp_dir.name, 'Serie 100% - S01E02 (German Dub).mp4')
+        third = os.path.join(self.tmp_dir.name, 'Serie - S01E03 (German Dub).mp4')
+        instance.download(f"{self.base_url}/1.mp4", first, headers={'Referer': 'https://vidmoly.to/'},
+                          progress_hook=progress.append)
+        instance.download(f"{self.base_url}/2.mp4", second)
+        instance.download(f"{self.base_url}/3.mp4", third, headers={'Referer': 'https://vidmoly.to/'})
+
+        # eine YoutubeDL-Instanz je Header-Satz, die beim nächsten Download gleichen Providers wiederverwendet wird
+        self.assertEqual(len(instance._instances), 2)  # pylint: disable=protected-access
+        for path in (first, second, third):
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), VIDEO)
+
+        # Seitenabruf und Download, jeweils mit bzw. ohne Referer
+        self.assertEqual(VideoHandler.referers, ['https://vidmoly.to/'] * 2 + [None] * 2 + ['https://vidmoly.to/'] * 2)
+        finished = [p for p in progress if p['status'] == 'finished']
+        self.assertEqual(len(finished), 1)
+        self.assertEqual(finished[0]['downloaded_bytes'], len(VIDEO))
+        self.assertEqual(finished[0]['total_bytes'], len(VIDEO))
+        self.assertEqual(set(progress[0]), {'status', 'filename', 'downloaded_bytes', 'total_bytes', 'speed', 'eta'})
+
+    def test_failed_download_raises(self):
+        """Test, ob ein fehlgeschlagener Download als Ausnahme gemeldet wird"""
+        instance = downloader.YtDlpDownloader({'retries': 0})
+        self.addCleanup(instance.close)
+        self.server.shutdown()
+        self.server.server_close()
+
+        with self.assertRaises(Exception):
+            instance.download(f"{self.base_url}/1.mp4", os.path.join(self.tmp_dir.name, 'x.mp4'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests für die Wahl zwischen HTTP und Playwright pro Host und URL-Muster
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import common, fetch_strategy, ratelimit, retry
+
+EPISODE_URL = 'https://anime.test/anime/stream/test-anime/staffel-1/episode-%d'
+SEARCH_URL = 'https://anime.test/ajax/seriesSearch?keyword=%s'
+JAVASCRIPT_PAGE = '<html><body><noscript>Please enable JavaScript</noscript><div id="app"></div></body></html>'
+
+
+class TestFetchStrategies(unittest.TestCase):
+    """Testklasse für FetchStrategies und deren Nutzung in fetch_url_content"""
+
+    def setUp(self):
+        """Test-Setup: frische Strategien, Uhr anhalten, Netzwerk und Browser ersetzen"""
+        self.now = 1000.0
+        self.pages = {}
+        self.playwright = MagicMock(side_effect=lambda url, proxy=None, check=True: b'<html>rendered</html>')
+
+        def requests_get(url, **kwargs):  # pylint: disable=unused-argument
+            text = self.pages.get(url.split('?')[0].rsplit('/', 1)[0], '<html>static</html>')
+            return MagicMock(status_code=200, text=text, content=text.encode(), headers={})
+
+        self.requests_get = MagicMock(side_effect=requests_get)
+
+        for patcher in (
+            patch.dict(retry._breakers, clear=True),  # pylint: disable=protected-access
+            patch.object(fetch_strategy, '_strategies', None),
+            patch.object(fetch_strategy.time, 'monotonic', side_effect=lambda: self.now),
+            patch.object(ratelimit.requests, 'get', self.requests_get),
+            patch.object(common, 'fetch_url_content_with_playwright', self.playwright),
+            patch.object(aniworld_globals, 'DEFAULT_USE_PLAYWRIGHT', False),
+            patch.object(aniworld_globals, 'DEFAULT_FETCH_STRATEGIES', ''),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_patterns(self):
+        """Test, ob URL-Muster und Konfiguration gelesen werden"""
+        self.assertEqual(fetch_strategy.url_pattern(EPISODE_URL % 1), 'anime.test/anime')
+        self.assertEqual(fetch_strategy.url_pattern(SEARCH_URL % 'x'), 'anime.test/ajax')
+        self.assertEqual(fetch_strategy.url_pattern('https://VOE.sx'), 'voe.sx/')
+        self.assertEqual(
+            fetch_strategy.parse_strategies('aniworld.to/ajax/=Playwright, voe.sx=http,x.test=curl,broken'),
+            {'aniworld.to/ajax': 'playwright', 'voe.sx': 'http'}
+        )
+
+    def test_static_pages_stay_on_http(self):
+        """Test, ob statische Seiten ohne Browser geladen werden"""
+        self.assertEqual(common.fetch_url_content(EPISODE_URL % 1), b'<html>static</html>')
+        self.assertEqual(common.fetch_url_content(EPISODE_URL % 2), b'<html>static</html>')
+        self.playwright.assert_not_called()
+
+    def test_escalation_remembered_and_reprobed(self):
+        """Test, ob ein Muster nach einer JavaScript-Seite im Browser bleibt und später erneut geprüft wird"""
+        self.pages['https://anime.test/ajax'] = JAVASCRIPT_PAGE
+
+        self.assertEqual(common.fetch_url_content(SEARCH_URL % 'a'), b'<html>rendered</html>')
+        self.assertEqual(common.fetch_url_content(SEARCH_URL % 'b'), b'<html>rendered</html>')
+        self.assertEqual(common.fetch_url_content(EPISODE_URL % 1), b'<html>static</html>')
+        self.assertEqual(self.requests_get.call_count, 2)
+        self.assertEqual(self.playwright.call_count, 2)
+
+        self.now += aniworld_globals.DEFAULT_FETCH_REPROBE
+        self.pages.clear()
+        self.assertEqual(common.fetch_url_content(SEARCH_URL % 'c'), b'<html>static</html>')
+        self.assertEqual(common.fetch_url_content(SEARCH_URL % 'd'), b'<html>static</html>')
+        self.assertEqual(self.playwright.call_count, 2)
+
+    def test_configured_and_forced(self):
+        """Test, ob konfigurierte Muster und --use-playwright den Browser erzwingen"""
+        with patch.object(aniworld_globals, 'DEFAULT_FETCH_STRATEGIES', 'anime.test/ajax=playwright'):
+            common.fetch_url_content(SEARCH_URL % 'a')
+            common.fetch_url_content(EPISODE_URL % 1)
+        self.assertEqual(self.playwright.call_count, 1)
+        self.assertEqual(self.requests_get.call_count, 1)
+
+        with patch.object(aniworld_globals, 'DEFAULT_USE_PLAYWRIGHT', True):
+            common.fetch_url_content(EPISODE_URL % 1)
+        self.assertEqual(self.playwright.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Tests für den Bibliotheksindex bereits heruntergeladener Episoden
+"""
+
+import importlib
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import aniworld.database
+from aniworld import globals as aniworld_globals
+from aniworld.common import library
+from aniworld.database import pipeline
+
+# das Paket exportiert die gleichnamige Funktion, daher das Modul direkt laden
+execute = importlib.import_module('aniworld.execute')
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+EPISODE_URL = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/test-anime/staffel-1/episode-%d"
+
+
+class TestLibraryIndex(unittest.TestCase):
+    """Testklasse für aniworld.common.library"""
+
+    def setUp(self):
+        """Test-Setup: Index und Ausgabeverzeichnis in einem temporären Verzeichnis, ohne Datenbank"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output = os.path.join(self.tmp_dir.name, 'Anime')
+
+        for patcher in (
+            patch.object(library, 'get_library_index_path',
+                         return_value=os.path.join(self.tmp_dir.name, 'cache', 'library.db')),
+            patch.object(aniworld.database, 'HAS_DATABASE', False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create_file(self, season, episode, language='German Dub', title='Test Anime'):
+        """Legt eine Datei an, wie sie handle_download_action erzeugt"""
+        path = library.get_download_path(self.output, title, season, episode, language)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 16)
+        return path
+
+    def test_file_names(self):
+        """Test, ob die Dateinamen von handle_download_action erkannt werden"""
+        self.assertEqual(library.parse_file_name('Test - Anime - S01E12 (German Sub).mp4'),
+                         ('Test - Anime', 1, 12, 'German Sub'))
+        self.assertEqual(library.parse_file_name('Test - Movie 02 (German Dub).mp4'), ('Test', 0, 2, 'German Dub'))
+        self.assertIsNone(library.parse_file_name('Test - S01E12 (German Dub).mp4.part'))
+        self.assertIsNone(library.parse_file_name('notes.mp4'))
+
+    def test_incremental_scan(self):
+        """Test, ob nur geänderte Verzeichnisse erneut gelesen werden"""
+        first = self.create_file(1, 1)
+        self.create_file(1, 2, 'English Sub')
+        self.create_file(0, 1)
+        self.create_file(1, 1, title='Other Anime')
+
+        episodes = library.get_downloaded_episodes('test-anime', 'Test Anime', self.output)
+        self.assertEqual(episodes, {
+            (1, 1, 'German Dub'): first,
+            (1, 2, 'English Sub'): library.get_download_path(self.output, 'Test Anime', 1, 2, 'English Sub'),
+            (0, 1, 'German Dub'): library.get_download_path(self.output, 'Test Anime', 0, 1, 'German Dub'),
+        })
+
+        index = library.get_library_index()
+        self.assertEqual(index.refresh(self.output), 0)
+
+        third = self.create_file(1, 3)
+        self.assertEqual(index.refresh(self.output), 1)
+        index.add(third, EPISODE_URL % 3, 'German Dub')
+        self.assertIn((1, 3, 'German Dub'), index.episodes('test-anime', 'Umbenannt'))
+
+    def test_page_title_differs_from_slug(self):
+        """Test, ob Dateien mit dem Seitentitel über den Slug gefunden und ihm zugeordnet werden"""
+        path = self.create_file(1, 1, 'German Sub', title='Demon Slayer: Kimetsu no Yaiba')
+
+        episodes = library.get_downloaded_episodes(
+            'demon-slayer-kimetsu-no-yaiba', 'Demon Slayer Kimetsu No Yaiba', self.output
+        )
+        self.assertEqual(episodes, {(1, 1, 'German Sub'): path})
+
+        # der Slug ist nachgetragen, die Datei wird auch unter anderem Titel gefunden
+        self.assertEqual(library.get_library_index().episodes('demon-slayer-kimetsu-no-yaiba', 'Umbenannt'),
+                         {(1, 1, 'German Sub'): path})
+        self.assertEqual(library.get_library_index().episodes('other-anime', 'Other Anime'), {})
+
+    def test_execute_skips_existing_episodes(self):
+        """Test, ob execute() für vorhandene Episoden keine Seite abruft"""
+        self.create_file(1, 1)
+        fetched = []
+
+        with patch.object(execute, 'fetch_url_content', side_effect=lambda url: fetched.append(url)), \
+                patch.object(execute, 'perform_action'), \
+                patch.object(execute, 'check_dependencies'), \
+                patch.object(execute, 'setup_aniskip'), \
+                patch.object(execute, 'downloader', MagicMock()):
+            execute.execute({
+                'selected_episodes': [EPISODE_URL % 1, EPISODE_URL % 2],
+                'provider_selected': 'VOE',
+                'action_selected': 'Download',
+                'aniskip_selected': False,
+                'lang': '1',
+                'output_directory': self.output,
+                'anime_title': 'Test Anime',
+                'anime_slug': 'test-anime',
+                'only_direct_link': False,
+                'only_command': False,
+            })
+
+        self.assertEqual(fetched, [EPISODE_URL % 2])
+
+    def test_execute_downloads_missing_languages(self):
+        """Test, ob mehrere Sprachen aus einem Seitenabruf geladen und vorhandene übersprungen werden"""
+        self.create_file(1, 1)
+        with open(os.path.join(FIXTURES, 'episode.html'), 'rb') as f:
+            episode_html = f.read()
+        fetched = []
+
+        def fetch_url_content(url):
+            fetched.append(url)
+            return episode_html
+
+        with patch.object(execute, 'fetch_url_content', side_effect=fetch_url_content), \
+                patch.object(execute, 'fetch_direct_link', side_effect=lambda function, url: f"{url}.mp4"), \
+                patch.object(execute, 'perform_action') as perform_action, \
+                patch.object(execute, 'check_dependencies'), \
+                patch.object(execute, 'setup_aniskip'), \
+                patch.object(execute, 'downloader', MagicMock()), \
+                patch.object(pipeline, 'get_pipeline'):
+            execute.execute({
+                'selected_episodes': [EPISODE_URL % 1, EPISODE_URL % 2],
+                'provider_selected': 'VOE',
+                'action_selected': 'Download',
+                'aniskip_selected': False,
+                'lang': '1,3',
+                'output_directory': self.output,
+                'anime_title': 'Test Anime',
+                'anime_slug': 'test-anime',
+                'only_direct_link': False,
+                'only_command': False,
+            })
+
+        self.assertEqual(fetched, [EPISODE_URL % 1, EPISODE_URL % 2])
+        self.assertEqual(
+            [(call.args[0]['episode_number'], call.args[0]['language'], call.args[0]['link'])
+             for call in perform_action.call_args_list],
+            [
+                (1, '3', f"{aniworld_globals.ANIWORLD_BASE_URL}/redirect/3000003.mp4"),
+                (2, '1', f"{aniworld_globals.ANIWORLD_BASE_URL}/redirect/3000001.mp4"),
+                (2, '3', f"{aniworld_globals.ANIWORLD_BASE_URL}/redirect/3000003.mp4"),
+            ]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
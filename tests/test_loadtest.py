@@ -0,0 +1,88 @@
+"""
+Tests für den lokalen Ersatzserver und den Lasttest-Treiber
+"""
+
+import logging
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadtest'))
+
+import driver  # noqa: E402  # pylint: disable=wrong-import-position
+from server import StandInConfig, StandInServer  # noqa: E402  # pylint: disable=wrong-import-position
+
+from aniworld import globals as aniworld_globals  # noqa: E402  # pylint: disable=wrong-import-position
+from aniworld.common import common  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+class TestStandInServer(unittest.TestCase):
+    """Testklasse für den Ersatzserver und run_load"""
+
+    def setUp(self):
+        """Test-Setup: Globale Einstellungen nach jedem Test wiederherstellen"""
+        for name in ('ANIWORLD_BASE_URL', 'DOODSTREAM_BASE_URL', 'DEFAULT_USE_PLAYWRIGHT'):
+            patcher = patch.object(aniworld_globals, name, getattr(aniworld_globals, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(common, 'fetch_url_content_with_playwright', common.fetch_url_content_with_playwright)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        root = logging.getLogger()
+        self.addCleanup(root.setLevel, root.level)
+        self.addCleanup(root.handlers.__setitem__, slice(None), list(root.handlers))
+        root.setLevel(logging.CRITICAL + 1)
+
+    def start_server(self, **config) -> StandInServer:
+        server = StandInServer(StandInConfig(media_size=64 * 1024, seed=1, **config)).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_full_pipeline_against_stand_in(self):
+        """Test, ob alle Episoden bis zum Video durchlaufen werden"""
+        server = self.start_server()
+
+        for provider in ('VOE', 'Vidoza', 'Doodstream', 'Vidmoly'):
+            with self.subTest(provider=provider):
+                result = driver.run_load(server.base_url, provider=provider, workers=4)
+
+                self.assertEqual(result['pages'], 24)
+                self.assertEqual(result['links'], 24)
+                self.assertEqual(result['errors'], 0)
+                self.assertGreaterEqual(result['bytes'], 24 * 64 * 1024)
+                self.assertGreater(result['mb_per_sec'], 0)
+
+    def test_base_url_override(self):
+        """Test, ob die Redirect-Links der Episodenseite die überschriebene Basis-URL nutzen"""
+        from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+        from aniworld.execute import providers  # pylint: disable=import-outside-toplevel
+
+        server = self.start_server()
+        driver.point_scraper_at(server.base_url)
+
+        html = common.fetch_url_content(f"{server.base_url}/anime/stream/some-show/staffel-1/episode-3")
+        data = providers(BeautifulSoup(html, 'html.parser'))
+
+        self.assertEqual(data['VOE'][1], f"{server.base_url}/redirect/3000001")
+
+    def test_faults(self):
+        """Test, ob Fehlerrate und Spam-Rate die erwarteten Antworten liefern"""
+        url = '/anime/stream/some-show'
+
+        failing = self.start_server(error_rate=1.0)
+        self.assertEqual(requests.get(failing.base_url + url, timeout=5).status_code, 503)
+        # Medien sind von der Fehlerrate ausgenommen
+        self.assertEqual(requests.get(failing.base_url + '/media/x.mp4', timeout=5).status_code, 200)
+
+        spamming = self.start_server(spam_rate=1.0)
+        response = requests.get(spamming.base_url + url, timeout=5)
+        self.assertIn(driver.SPAM_MARKER, response.text)
+        self.assertEqual(spamming.stats['spam'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests für das warteschlangenbasierte Logging
+"""
+
+import importlib
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from aniworld import globals as aniworld_globals  # noqa: F401  # pylint: disable=unused-import
+from aniworld.aniskip import cache as aniskip_cache
+from aniworld.common import logqueue
+
+# das Paket exportiert die gleichnamige Funktion, daher das Modul direkt laden
+aniskip = importlib.import_module('aniworld.aniskip.aniskip')
+
+
+class ListHandler(logging.Handler):
+    """Handler, der die formatierten Meldungen sammelt"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestLogQueue(unittest.TestCase):
+    """Testklasse für aniworld.common.logqueue"""
+
+    def setUp(self):
+        """Test-Setup: Root-Logger sichern und nach dem Test das globale Logging wiederherstellen"""
+        root = logging.getLogger()
+        self.addCleanup(root.setLevel, root.level)
+        self.addCleanup(root.handlers.__setitem__, slice(None), list(root.handlers))
+        self.addCleanup(lambda: logqueue.start_logging([], root.level))
+        root.handlers[:] = []
+
+        self.handler = ListHandler()
+        self.logger = logging.getLogger('aniworld.test.logqueue')
+        self.addCleanup(self.logger.setLevel, logging.NOTSET)
+
+    def test_records_are_handled_on_listener_thread(self):
+        """Test, ob Meldungen über die Warteschlange im Listener-Thread ausgegeben werden"""
+        threads = []
+        self.handler.emit = lambda record: threads.append(record.getMessage())
+        logqueue.start_logging([self.handler], logging.DEBUG)
+
+        self.logger.debug("Episode %d", 3)
+        logqueue.flush_logging()
+
+        self.assertEqual(threads, ["Episode 3"])
+
+    def test_lazy_formatting_when_disabled(self):
+        """Test, ob Argumente bei abgeschaltetem Level nicht formatiert werden"""
+        logqueue.start_logging([self.handler], logging.INFO)
+
+        class Expensive:
+            def __str__(self):
+                raise AssertionError("darf nicht formatiert werden")
+
+        self.logger.debug("Metadaten: %s", Expensive())
+        logqueue.flush_logging()
+
+        self.assertEqual(self.handler.messages, [])
+
+    def test_per_module_levels(self):
+        """Test, ob Level pro Logger aus der Konfiguration übernommen werden"""
+        levels = logqueue.parse_levels("aniworld.test.logqueue=DEBUG, urllib3 = warning,kaputt")
+        self.assertEqual(levels, {"aniworld.test.logqueue": logging.DEBUG, "urllib3": logging.WARNING})
+
+        logqueue.start_logging([self.handler], logging.WARNING, levels=levels)
+        self.logger.debug("sichtbar")
+        logging.getLogger('aniworld.test.other').info("unsichtbar")
+        logqueue.flush_logging()
+
+        self.assertEqual(self.handler.messages, ["sichtbar"])
+
+    def test_rate_limit(self):
+        """Test, ob wiederholte Meldungen gedrosselt und die unterdrückten gezählt werden"""
+        logqueue.start_logging([self.handler], logging.DEBUG, rate_interval=60, rate_burst=2)
+
+        for i in range(7):
+            # eine Aufrufstelle; die letzten beiden Meldungen fallen in ein neues Zeitfenster
+            with patch('time.time', return_value=1000.0 if i < 5 else 1061.0):
+                self.logger.debug("Episode %d gespeichert", i)
+        logqueue.flush_logging()
+
+        self.assertEqual(self.handler.messages, [
+            "Episode 0 gespeichert",
+            "Episode 1 gespeichert",
+            "Episode 5 gespeichert (3 similar messages suppressed)",
+            "Episode 6 gespeichert",
+        ])
+
+
+class TestAniskipLogging(unittest.TestCase):
+    """Testklasse für die Debug-Ausgaben in aniworld.aniskip"""
+
+    def setUp(self):
+        """Test-Setup: Aniskip-Cache in ein temporäres Verzeichnis umleiten"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        patcher = patch.object(
+            aniskip_cache, 'get_aniskip_cache_path', return_value=os.path.join(self.tmp_dir.name, 'aniskip.db')
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_episode_counts_fetched_once(self):
+        """Test, ob die Episodenzahlen bei Abweichung nicht erneut für die Debug-Ausgabe abgerufen werden"""
+        with patch.object(aniskip, 'check_episodes', return_value=12) as check_episodes, \
+                patch.object(aniskip, 'get_season_episode_count', return_value=24) as season_count:
+            self.assertEqual(aniskip.aniskip("123", "test-anime", 1, 1), "")
+
+        self.assertEqual(check_episodes.call_count, 1)
+        self.assertEqual(season_count.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests für die Laufzeitmetriken pro Verarbeitungsschritt
+"""
+
+import json
+import time
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import common, metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Testklasse für aniworld.common.metrics"""
+
+    def setUp(self):
+        """Test-Setup: Metriken zurücksetzen und nach dem Test abschalten"""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+
+    def test_disabled_records_nothing(self):
+        """Test, ob ohne Aktivierung nichts gemessen wird"""
+        with metrics.timed("fetch", method="http") as timer:
+            metrics.inc("fetch_bytes", 10, method="http")
+
+        self.assertIs(timer, metrics.timed("parse"))
+        self.assertEqual(metrics.summary(), {"stages": [], "counters": [], "download_throughput": {}})
+
+    def test_timed_and_summary(self):
+        """Test, ob Dauer, Fehler und Durchsatz in der JSON-Zusammenfassung landen"""
+        metrics.enable()
+
+        with metrics.timed("download", provider="VOE"):
+            time.sleep(0.02)
+        with self.assertRaises(ValueError):
+            with metrics.timed("extract", provider="voe"):
+                raise ValueError("kaputt")
+        metrics.inc("download_bytes", 4 * 1024 * 1024, provider="VOE")
+
+        data = json.loads(json.dumps(metrics.summary()))
+        download = next(s for s in data["stages"] if s["stage"] == "download")
+        self.assertEqual(download["provider"], "VOE")
+        self.assertEqual(download["count"], 1)
+        self.assertGreaterEqual(download["mean_ms"], 20)
+        self.assertIn(
+            {"name": "stage_errors", "stage": "extract", "provider": "voe", "value": 1},
+            data["counters"]
+        )
+        self.assertGreater(data["download_throughput"]["VOE"]["mb_per_sec"], 0)
+
+    def test_openmetrics_endpoint(self):
+        """Test, ob der Endpunkt gültiges OpenMetrics mit Histogramm und Zählern liefert"""
+        metrics.enable()
+        port = metrics.start_metrics_server(0)
+        metrics.observe("fetch", 0.03, method="http")
+        metrics.inc("fetch_bytes", 512, method="http")
+
+        response = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5)
+        text = response.text
+
+        self.assertTrue(response.headers["Content-Type"].startswith("application/openmetrics-text"))
+        self.assertIn('aniworld_stage_seconds_bucket{stage="fetch",method="http",le="0.025"} 0', text)
+        self.assertIn('aniworld_stage_seconds_bucket{stage="fetch",method="http",le="0.05"} 1', text)
+        self.assertIn('aniworld_stage_seconds_bucket{stage="fetch",method="http",le="+Inf"} 1', text)
+        self.assertIn('aniworld_fetch_bytes_total{method="http"} 512', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+    def test_fetch_url_content_hook(self):
+        """Test, ob fetch_url_content nach Playwright und HTTP getrennt misst"""
+        metrics.enable()
+
+        with patch.object(aniworld_globals, 'DEFAULT_USE_PLAYWRIGHT', False), \
+                patch.object(common, 'fetch_url_content_without_playwright', return_value=b'<html></html>'):
+            common.fetch_url_content("http://127.0.0.1/anime/stream/x")
+        with patch.object(aniworld_globals, 'DEFAULT_USE_PLAYWRIGHT', True), \
+                patch.object(common, 'fetch_url_content_with_playwright', return_value=None):
+            common.fetch_url_content("http://127.0.0.1/anime/stream/x")
+
+        data = metrics.summary()
+        methods = {s["method"] for s in data["stages"] if s["stage"] == "fetch"}
+        self.assertEqual(methods, {"http", "playwright"})
+        self.assertIn({"name": "fetch_failures", "method": "playwright", "value": 1}, data["counters"])
+        self.assertIn({"name": "fetch_bytes", "method": "http", "value": 13}, data["counters"])
+
+    def test_repository_operation_label(self):
+        """Test, ob Datenbankzugriffe nach Repository-Methode benannt werden"""
+        from aniworld.database.repositories import AnimeRepository  # pylint: disable=import-outside-toplevel
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        connection = MagicMock()
+        connection.cursor.return_value = cursor
+
+        @contextmanager
+        def get_connection():
+            yield connection
+
+        repository = AnimeRepository.__new__(AnimeRepository)
+        repository.db = MagicMock(get_connection=get_connection)
+
+        metrics.enable()
+        repository.find_all()
+
+        operations = [s["operation"] for s in metrics.summary()["stages"] if s["stage"] == "db"]
+        self.assertEqual(operations, ["AnimeRepository.find_all"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests für die mpv-Sitzung über die JSON-IPC-Schnittstelle
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld.common import mpv
+
+
+def decode_file_options(encoded):
+    """Dekodiert die %n%-kodierten Optionen eines loadfile-Befehls"""
+    options = {}
+    while encoded:
+        key, rest = encoded.split('=%', 1)
+        length, rest = rest.split('%', 1)
+        value = rest.encode('utf-8')[:int(length)].decode('utf-8')
+        options[key] = value
+        encoded = rest[len(value):].lstrip(',')
+    return options
+
+
+class FakeMpv:
+    """Ersetzt subprocess.Popen: ein IPC-Server, der loadfile beantwortet und das Dateiende meldet"""
+
+    def __init__(self, end_reason='eof'):
+        self.end_reason = end_reason
+        self.commands = []
+        self.loaded = []
+        self.processes = []
+
+    def __call__(self, command):
+        self.commands.append(command)
+        ipc_path = next(arg.split('=', 1)[1] for arg in command if arg.startswith('--input-ipc-server='))
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(ipc_path)
+        server.listen(1)
+
+        process = MagicMock()
+        process.poll.return_value = None
+        process.wait.side_effect = lambda timeout=None: setattr(process.poll, 'return_value', 0)
+        self.processes.append(process)
+        threading.Thread(target=self.serve, args=(server, process), daemon=True).start()
+        return process
+
+    def serve(self, server, process):
+        """Beantwortet Befehle einer Verbindung"""
+        connection, _ = server.accept()
+        server.close()
+        with connection, connection.makefile('rwb', buffering=0) as stream:
+            for line in stream:
+                message = json.loads(line)
+                command = message['command']
+                if command == ['quit']:
+                    break
+                self.loaded.append(command)
+                entry_id = len(self.loaded)
+                for reply in (
+                    {'event': 'start-file', 'playlist_entry_id': entry_id},
+                    {'request_id': message['request_id'], 'error': 'success',
+                     'data': {'playlist_entry_id': entry_id}},
+                    {'event': 'end-file', 'reason': self.end_reason, 'playlist_entry_id': entry_id},
+                ):
+                    stream.write(json.dumps(reply).encode('utf-8') + b'\n')
+                if self.end_reason == 'quit':
+                    break
+        process.poll.return_value = 0
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "benötigt Unix-Sockets")
+class TestMpvSession(unittest.TestCase):
+    """Testklasse für aniworld.common.mpv"""
+
+    def setUp(self):
+        """Test-Setup: Socket in einem temporären Verzeichnis"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.session = mpv.MpvSession(os.path.join(self.tmp_dir.name, 'mpv.sock'))
+        self.addCleanup(self.session.close)
+
+    def build_command(self, episode, provider_args=()):
+        """Befehl wie von execute.build_command()"""
+        return [
+            'mpv', f'https://cdn.test/{episode}.m3u8', '--fs', '--quiet', '--really-quiet', '--profile=fast',
+            '--hwdec=auto-safe', '--video-sync=display-resample',
+            f'--force-media-title=Test - S1E{episode} - Folge, mit Komma', *provider_args
+        ]
+
+    def test_one_process_for_all_episodes(self):
+        """Test, ob mehrere Episoden in einem mpv-Prozess mit eigenen Optionen pro Datei laufen"""
+        fake = FakeMpv()
+        with patch.object(mpv.subprocess, 'Popen', fake):
+            self.assertEqual(self.session.play(self.build_command(1, [
+                '--http-header-fields=Referer: https://vidmoly.to/',
+                '--chapters-file=/tmp/chapters.txt',
+                '--script-opts=skip-op_start=10.0,skip-op_end=100.0',
+            ])), 'eof')
+            self.assertEqual(self.session.play(self.build_command(2)), 'eof')
+
+        self.assertEqual(len(fake.commands), 1)
+        self.assertEqual(fake.commands[0][:7], self.build_command(1)[:1] + self.build_command(1)[2:8])
+        self.assertIn('--idle=yes', fake.commands[0])
+
+        first, second = fake.loaded
+        self.assertEqual((first['name'], first['url'], first['flags']), ('loadfile', 'https://cdn.test/1.m3u8', 'replace'))
+        self.assertEqual(decode_file_options(first['options']), {
+            'force-media-title': 'Test - S1E1 - Folge, mit Komma',
+            'http-header-fields': 'Referer: https://vidmoly.to/',
+            'chapters-file': '/tmp/chapters.txt',
+            'script-opts': 'skip-op_start=10.0,skip-op_end=100.0',
+        })
+        self.assertEqual(decode_file_options(second['options']), {
+            'force-media-title': 'Test - S1E2 - Folge, mit Komma'
+        })
+
+    def test_closed_window_starts_new_process(self):
+        """Test, ob nach dem Schließen von mpv die nächste Episode in einem neuen Prozess startet"""
+        fake = FakeMpv(end_reason='quit')
+        with patch.object(mpv.subprocess, 'Popen', fake):
+            self.assertEqual(self.session.play(self.build_command(1)), 'quit')
+            self.assertFalse(self.session.is_running())
+            self.session.play(self.build_command(2))
+
+        self.assertEqual(len(fake.commands), 2)
+
+    def test_unreachable_ipc_server(self):
+        """Test, ob ein mpv ohne IPC-Server als OSError gemeldet und beendet wird"""
+        process = MagicMock()
+        process.poll.return_value = None
+        with patch.object(mpv.subprocess, 'Popen', return_value=process), \
+                patch.object(mpv.aniworld_globals, 'DEFAULT_MPV_IPC_TIMEOUT', 0.1):
+            with self.assertRaises(OSError):
+                self.session.play(self.build_command(1))
+
+        process.terminate.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+"""
+Tests für die Nachbearbeitung heruntergeladener Episoden (Prüfung, Remux, Aniskip-Kapitel)
+"""
+
+import importlib
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld import globals as aniworld_globals
+from aniworld.aniskip import cache as aniskip_cache
+from aniworld.common import postprocess
+from aniworld.database import pipeline
+
+# die Pakete exportieren die gleichnamigen Funktionen, daher die Module direkt laden
+aniskip = importlib.import_module('aniworld.aniskip.aniskip')
+execute = importlib.import_module('aniworld.execute')
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+EPISODE_URL = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/test-anime/staffel-1/episode-%d"
+
+SKIP_TIMES = {
+    "found": True,
+    "results": [
+        {"skip_type": "ed", "interval": {"start_time": 1300.0, "end_time": 1390.0}},
+        {"skip_type": "op", "interval": {"start_time": 10.0, "end_time": 100.0}},
+    ],
+}
+
+
+class TestSeasonChapters(unittest.TestCase):
+    """Testklasse für die Kapitel einer ganzen Staffel"""
+
+    def setUp(self):
+        """Test-Setup: Cache in ein temporäres Verzeichnis umleiten, Netzwerkzugriffe ersetzen"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.fetch_anime_id = MagicMock(return_value="5114")
+        self.threads = set()
+
+        def requests_get(url, **kwargs):  # pylint: disable=unused-argument
+            self.threads.add(threading.current_thread().name)
+            if url.endswith('/3?types=op&types=ed'):
+                return MagicMock(status_code=200, json=lambda: {"found": False, "results": []})
+            return MagicMock(status_code=200, json=lambda: SKIP_TIMES)
+
+        self.requests_get = MagicMock(side_effect=requests_get)
+
+        for patcher in (
+            patch.object(aniskip_cache, 'get_aniskip_cache_path',
+                         return_value=os.path.join(self.tmp_dir.name, 'cache', 'aniskip.db')),
+            patch.object(aniskip, 'fetch_anime_id', self.fetch_anime_id),
+            patch.object(aniskip, 'check_episodes', MagicMock(return_value=12)),
+            patch.object(aniskip, 'get_season_episode_count', MagicMock(return_value=12)),
+            patch.object(aniskip.requests, 'get', self.requests_get),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_lookup_per_season(self):
+        """Test, ob die MAL-ID einmal pro Staffel und die Skip-Zeiten parallel abgefragt werden"""
+        chapters = aniskip.SeasonChapters('fullmetal-alchemist', {2: [1, 2, 3]})
+        chapters.prefetch('Fullmetal Alchemist', 2)
+
+        self.assertEqual(
+            chapters.get('Fullmetal Alchemist', 2, 1),
+            ";FFMETADATA1"
+            "\n[CHAPTER]\nTIMEBASE=1/1000\nSTART=10000\nEND=100000\nTITLE=Opening\n"
+            "\n[CHAPTER]\nTIMEBASE=1/1000\nSTART=100000\nEND=1300000\nTITLE=Episode\n"
+            "\n[CHAPTER]\nTIMEBASE=1/1000\nSTART=1300000\nEND=1390000\nTITLE=Ending\n"
+        )
+        self.assertIsNotNone(chapters.get('Fullmetal Alchemist', 2, 2))
+        self.assertIsNone(chapters.get('Fullmetal Alchemist', 2, 3))
+
+        self.assertEqual(self.fetch_anime_id.call_count, 1)
+        self.assertEqual(self.requests_get.call_count, 3)
+        self.assertTrue(all(name.startswith('aniskip') for name in self.threads))
+
+    def test_mpv_chapters_unchanged(self):
+        """Test, ob die Kapiteldatei für mpv weiterhin in der Reihenfolge der API geschrieben wird"""
+        chapters_file = os.path.join(self.tmp_dir.name, 'chapters.txt')
+        options = aniskip.build_options(SKIP_TIMES, chapters_file)
+
+        self.assertEqual(options, "skip-ed_start=1300.0,skip-ed_end=1390.0,skip-op_start=10.0,skip-op_end=100.0")
+        with open(chapters_file, encoding='utf-8') as f:
+            self.assertEqual([line for line in f if line.startswith('TITLE=')],
+                             ['TITLE=Ending\n', 'TITLE=Opening\n', 'TITLE=Episode\n'])
+
+
+class TestDownloadPostProcessing(unittest.TestCase):
+    """Testklasse für das Einbetten der Kapitel nach dem Download"""
+
+    def setUp(self):
+        """Test-Setup: Netzwerk, yt-dlp, ffmpeg und Datenbank ersetzen"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        with open(os.path.join(FIXTURES, 'episode.html'), 'rb') as f:
+            episode_html = f.read()
+
+        self.events = []
+        self.last_download = threading.Event()
+
+        def start_download(download_data):
+            name = os.path.basename(download_data['zieldatei'])
+            return MagicMock(finish=MagicMock(
+                side_effect=lambda status, notizen=None: self.events.append((status, name))
+            ))
+
+        def download(link, output_file, **kwargs):  # pylint: disable=unused-argument
+            self.events.append(('download', os.path.basename(output_file)))
+            with open(output_file, 'wb') as f:
+                f.write(b'\x00' * 16)
+            if 'E02' in output_file:
+                self.last_download.set()
+
+        # Ergebnis von ffprobe je Dateiname, ohne Eintrag eine intakte MP4-Datei
+        self.probes = {}
+        self.ffmpeg_commands = []
+
+        def run(command, **kwargs):  # pylint: disable=unused-argument
+            name = os.path.basename(command[command.index('-i') + 1] if '-i' in command else command[-1])
+            if command[0] == 'ffprobe':
+                self.events.append(('probe', name))
+                return self.probes.pop(name, MagicMock(returncode=0, stdout=json.dumps({
+                    'format': {'format_name': 'mov,mp4,m4a,3gp,3g2,mj2', 'duration': '1420.5'},
+                    'streams': [{'codec_type': 'video'}, {'codec_type': 'audio'}],
+                })))
+
+            # erst nach dem letzten Download fertig: würde ein Download warten, liefe dies in den Timeout
+            self.assertTrue(self.last_download.wait(5))
+            self.ffmpeg_commands.append(command)
+            metadata = ''
+            if command.count('-i') == 2:
+                with open(command[command.index('-i') + 3], encoding='utf-8') as f:
+                    metadata = f.read()
+            with open(command[-1], 'w', encoding='utf-8') as f:
+                f.write(metadata)
+            self.events.append(('rewrite', name))
+            return MagicMock(returncode=0)
+
+        ytdlp = MagicMock()
+        ytdlp.return_value.download.side_effect = download
+
+        for patcher in (
+            patch.object(execute, 'fetch_url_content', return_value=episode_html),
+            patch.object(execute, 'fetch_direct_link', side_effect=lambda function, url: f"{url}.mp4"),
+            patch.object(execute, 'check_dependencies'),
+            patch.object(execute.downloader, 'YtDlpDownloader', ytdlp),
+            patch.object(aniskip, 'season_chapters', return_value={1: ";FFMETADATA1\n", 2: ";FFMETADATA1\n"}),
+            patch.object(postprocess, 'find_ffmpeg', return_value='ffmpeg'),
+            patch.object(postprocess, 'find_ffprobe', return_value='ffprobe'),
+            patch.object(postprocess.subprocess, 'run', side_effect=run),
+            patch.object(pipeline, 'get_pipeline', return_value=MagicMock(
+                start_download=MagicMock(side_effect=start_download)
+            )),
+            patch.object(aniworld_globals, 'DEFAULT_LIBRARY_INDEX', False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_execute(self, aniskip_selected):
+        """Lädt die Episoden 1 und 2 herunter"""
+        execute.execute({
+            'selected_episodes': [EPISODE_URL % 1, EPISODE_URL % 2],
+            'provider_selected': 'VOE',
+            'action_selected': 'Download',
+            'aniskip_selected': aniskip_selected,
+            'lang': '1',
+            'output_directory': self.tmp_dir.name,
+            'anime_title': 'Test Anime',
+            'anime_slug': 'test-anime',
+            'only_direct_link': False,
+            'only_command': False,
+        })
+
+    def file_events(self, episode):
+        """Ereignisse zur Datei einer Episode"""
+        name = f"Test Anime - S01E0{episode} (German Dub).mp4"
+        return [event for event, file_name in self.events if file_name == name]
+
+    def test_chapters_embedded_before_record_finished(self):
+        """Test, ob Kapitel eingebettet und der Download erst danach abgeschlossen wird"""
+        self.run_execute(aniskip_selected=True)
+
+        for n in (1, 2):
+            name = f"Test Anime - S01E0{n} (German Dub).mp4"
+            self.assertEqual(self.file_events(n), ['download', 'probe', 'rewrite', 'abgeschlossen'])
+            with open(os.path.join(self.tmp_dir.name, 'Test Anime', name), encoding='utf-8') as f:
+                self.assertEqual(f.read(), ";FFMETADATA1\n")
+
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir.name, 'Test Anime'))), 2)
+        self.assertIsNone(execute._postprocessor)  # pylint: disable=protected-access
+
+    def test_corrupt_file_downloaded_again(self):
+        """Test, ob eine beschädigte Datei verworfen und erneut heruntergeladen wird"""
+        self.probes['Test Anime - S01E01 (German Dub).mp4'] = MagicMock(
+            returncode=1, stderr='moov atom not found'
+        )
+        self.last_download.set()
+        self.run_execute(aniskip_selected=False)
+
+        self.assertEqual(self.file_events(1), [
+            'download', 'probe', 'fehlgeschlagen', 'download', 'probe', 'abgeschlossen'
+        ])
+        self.assertEqual(self.file_events(2), ['download', 'probe', 'abgeschlossen'])
+        self.assertEqual(self.ffmpeg_commands, [])
+
+    def test_remux_without_reencoding(self):
+        """Test, ob eine als MPEG-TS geschriebene Datei per Stream-Kopie nach MP4 umverpackt wird"""
+        self.probes['Test Anime - S01E02 (German Dub).mp4'] = MagicMock(returncode=0, stdout=json.dumps({
+            'format': {'format_name': 'mpegts', 'duration': '1420.5'},
+            'streams': [{'codec_type': 'video'}, {'codec_type': 'audio'}],
+        }))
+        self.run_execute(aniskip_selected=False)
+
+        self.assertEqual(self.file_events(1), ['download', 'probe', 'abgeschlossen'])
+        self.assertEqual(self.file_events(2), ['download', 'probe', 'rewrite', 'abgeschlossen'])
+        self.assertEqual(len(self.ffmpeg_commands), 1)
+        self.assertEqual(self.ffmpeg_commands[0][-5:-1], ['-c', 'copy', '-movflags', '+faststart'])
+        self.assertNotIn('-map_chapters', self.ffmpeg_commands[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
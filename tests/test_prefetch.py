@@ -0,0 +1,178 @@
+"""
+Tests für das Vorladen der nächsten Episode während der Wiedergabe
+"""
+
+import importlib
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from aniworld import globals as aniworld_globals
+from aniworld.database import pipeline
+
+# das Paket exportiert die gleichnamige Funktion, daher das Modul direkt laden
+execute = importlib.import_module('aniworld.execute')
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+EPISODE_URL = f"{aniworld_globals.ANIWORLD_BASE_URL}/anime/stream/test-anime/staffel-1/episode-%d"
+
+
+class TestEpisodePrefetch(unittest.TestCase):
+    """Testklasse für EpisodePrefetcher und dessen Nutzung in execute()"""
+
+    def setUp(self):
+        """Test-Setup: Netzwerk, mpv und Datenbank ersetzen"""
+        with open(os.path.join(FIXTURES, 'episode.html'), 'rb') as f:
+            self.episode_html = f.read()
+
+        self.fetch_threads = []
+        self.links = iter(f"https://cdn.test/{n}/index.mp4" for n in range(1, 10))
+        self.played = []
+
+        def fetch_url_content(url):
+            self.fetch_threads.append((url, threading.current_thread().name))
+            return self.episode_html
+
+        def execute_command(command, only_command):  # pylint: disable=unused-argument
+            # Zustand beim Start von mpv: die nächste Episode muss bereits angestoßen sein
+            prefetcher = execute._prefetcher  # pylint: disable=protected-access
+            self.played.append((command[1], list(prefetcher._futures) if prefetcher else None))  # pylint: disable=protected-access
+
+        self.fetch_direct_link = MagicMock(side_effect=lambda function, url: next(self.links))
+        self.process_aniskip = MagicMock(return_value=['--script-opts=skip-op_start=10.0'])
+
+        for patcher in (
+            patch.object(execute, 'fetch_url_content', side_effect=fetch_url_content),
+            patch.object(execute, 'fetch_direct_link', self.fetch_direct_link),
+            patch.object(execute, 'process_aniskip', self.process_aniskip),
+            patch.object(execute, 'execute_command', side_effect=execute_command),
+            patch.object(execute, 'check_dependencies'),
+            patch.object(execute, 'setup_aniskip'),
+            patch.object(pipeline, 'get_pipeline'),
+            patch.object(aniworld_globals, 'DEFAULT_PREFETCH', True),
+            patch.object(aniworld_globals, 'DEFAULT_MPV_IPC', False),
+            patch.object(aniworld_globals, 'DEFAULT_LIBRARY_INDEX', False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_execute(self, episodes, **overrides):
+        """Führt execute() für die angegebenen Episodennummern aus"""
+        params = {
+            'selected_episodes': [EPISODE_URL % n for n in episodes],
+            'provider_selected': 'VOE',
+            'action_selected': 'Watch',
+            'aniskip_selected': True,
+            'lang': '1',
+            'output_directory': '',
+            'anime_title': 'Test Anime',
+            'anime_slug': 'test-anime',
+            'only_direct_link': False,
+            'only_command': False,
+        }
+        params.update(overrides)
+        execute.execute(params)
+
+    def test_next_episode_resolved_during_playback(self):
+        """Test, ob Episode 2 während Episode 1 läuft vollständig im Hintergrund aufgelöst wird"""
+        self.run_execute([1, 2])
+
+        self.assertEqual(self.played, [
+            ("https://cdn.test/1/index.mp4", [EPISODE_URL % 2]),
+            ("https://cdn.test/2/index.mp4", []),
+        ])
+        # Seite, Direktlink und Aniskip der zweiten Episode nur einmal, und zwar im Hintergrund
+        self.assertEqual(self.fetch_threads, [(EPISODE_URL % 1, 'MainThread'), (EPISODE_URL % 2, 'prefetch')])
+        self.assertEqual(self.fetch_direct_link.call_count, 2)
+        self.assertEqual(self.process_aniskip.call_count, 2)
+        self.assertEqual(self.process_aniskip.call_args.kwargs['anime_title'], 'Test Anime')
+        self.assertIsNone(execute._prefetcher)  # pylint: disable=protected-access
+
+    def test_failed_prefetch_falls_back(self):
+        """Test, ob ein Fehler beim Vorladen (inkl. ExitOnError) zum normalen Auflösen führt"""
+        prefetcher = execute.EpisodePrefetcher()
+        with patch.object(execute, 'prefetch_episode', side_effect=SystemExit(1)):
+            prefetcher.schedule({'episode_url': EPISODE_URL % 2})
+            prefetcher.start()
+            self.assertIsNone(prefetcher.take(EPISODE_URL % 2))
+
+        self.assertIsNone(prefetcher.take(EPISODE_URL % 3))
+
+    def test_no_prefetch_for_single_episode_or_download(self):
+        """Test, ob ohne Folgeepisode bzw. bei Downloads nichts vorgeladen wird"""
+        self.run_execute([1])
+        with patch.object(execute, 'perform_action'):
+            self.run_execute([1, 2], action_selected='Download')
+
+        self.assertEqual([thread for _, thread in self.fetch_threads], ['MainThread'] * 3)
+
+
+class TestPrefetchedLinks(unittest.TestCase):
+    """Testklasse für die Prüfung vorgeladener Direktlinks"""
+
+    def test_fresh_link_used_without_request(self):
+        """Test, ob ein frischer Link ohne weitere Anfrage verwendet wird"""
+        prefetched = {'links': {'https://aniworld.test/redirect/1': ('https://cdn.test/v.mp4', time.time())}}
+        with patch.object(requests, 'head') as head:
+            link = execute.get_prefetched_link(prefetched, 'https://aniworld.test/redirect/1', 'VOE')
+
+        self.assertEqual(link, 'https://cdn.test/v.mp4')
+        head.assert_not_called()
+        self.assertIsNone(execute.get_prefetched_link(prefetched, 'https://aniworld.test/redirect/2', 'VOE'))
+
+    def test_expiring_link_discarded(self):
+        """Test, ob ein Link, der bald abläuft, verworfen wird"""
+        link = f"https://cdn.test/v.mp4?token=abc&expires={int(time.time()) + 30}"
+        self.assertFalse(execute.is_link_usable(link, time.time(), 'VOE'))
+
+        link = f"https://cdn.test/v.mp4?token=abc&expires={int(time.time()) + 3600}"
+        self.assertTrue(execute.is_link_usable(link, time.time(), 'VOE'))
+
+    def test_old_link_revalidated(self):
+        """Test, ob ältere Links per HEAD (mit Referer des Providers) geprüft werden"""
+        resolved_at = time.time() - aniworld_globals.DEFAULT_PREFETCH_REVALIDATE_AFTER - 1
+
+        with patch.object(requests, 'head', return_value=MagicMock(status_code=200)) as head:
+            self.assertTrue(execute.is_link_usable('https://cdn.test/v.mp4', resolved_at, 'Vidmoly'))
+        self.assertEqual(head.call_args.kwargs['headers']['Referer'], 'https://vidmoly.to/')
+
+        with patch.object(requests, 'head', return_value=MagicMock(status_code=403)):
+            self.assertFalse(execute.is_link_usable('https://cdn.test/v.mp4', resolved_at, 'VOE'))
+
+        with patch.object(requests, 'head', side_effect=requests.exceptions.ConnectionError()):
+            self.assertFalse(execute.is_link_usable('https://cdn.test/v.mp4', resolved_at, 'VOE'))
+
+    def test_warm_hls_segments(self):
+        """Test, ob die Variante mit der höchsten Bandbreite und deren erste Segmente geladen werden"""
+        playlists = {
+            'https://cdn.test/master.m3u8': (
+                "#EXTM3U\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360\nlow/index.m3u8\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720\nhigh/index.m3u8\n"
+            ),
+            'https://cdn.test/high/index.m3u8': (
+                "#EXTM3U\n#EXTINF:4.0,\nseg-0.ts\n#EXTINF:4.0,\nseg-1.ts\n#EXTINF:4.0,\nseg-2.ts\n"
+            ),
+        }
+        with patch.object(requests, 'get', side_effect=lambda url, **kwargs: MagicMock(text=playlists.get(url))) as get:
+            execute.warm_hls_segments('https://cdn.test/master.m3u8', 'VOE', 2)
+
+        self.assertEqual([c.args[0] for c in get.call_args_list], [
+            'https://cdn.test/master.m3u8',
+            'https://cdn.test/high/index.m3u8',
+            'https://cdn.test/high/seg-0.ts',
+            'https://cdn.test/high/seg-1.ts',
+        ])
+
+        with patch.object(requests, 'get') as get:
+            execute.warm_hls_segments('https://cdn.test/v.mp4', 'VOE', 2)
+            execute.warm_hls_segments('https://cdn.test/master.m3u8', 'VOE', 0)
+        get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
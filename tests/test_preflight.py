@@ -0,0 +1,164 @@
+"""
+Tests für die parallelen Startprüfungen (Preflight)
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+
+from aniworld import __main__ as aniworld_main
+from aniworld.common import preflight
+
+
+class TestPreflight(unittest.TestCase):
+    """Testklasse für run_preflight und den Ergebnis-Cache"""
+
+    def setUp(self):
+        """Test-Setup: Cache in ein temporäres Verzeichnis umleiten"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(
+            preflight, 'get_preflight_cache_path',
+            return_value=os.path.join(self.tmp_dir.name, 'cache', 'preflight.json')
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        preflight._results.clear()
+
+    def _patch_check(self, name, func):
+        patcher = patch.dict(preflight.CHECKS, {name: func})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_checks_run_concurrently(self):
+        """Test, ob langsame Prüfungen parallel und nicht nacheinander laufen"""
+        def slow_check(_timeout):
+            time.sleep(0.3)
+            return True
+
+        self._patch_check('internet', slow_check)
+        self._patch_check('version', slow_check)
+
+        start = time.monotonic()
+        results = preflight.run_preflight(['internet', 'version'], timeout=2, ttl=0)
+
+        self.assertEqual(results, {'internet': True, 'version': True})
+        self.assertLess(time.monotonic() - start, 0.55)
+
+    def test_background_check_does_not_block(self):
+        """Test, ob die Datenbankprüfung den Start nicht aufhält"""
+        def slow_check(_timeout):
+            time.sleep(0.3)
+            return True
+
+        self._patch_check('database', slow_check)
+
+        start = time.monotonic()
+        results = preflight.run_preflight(['database'], timeout=2, ttl=0)
+
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertIsNone(results['database'])
+
+        time.sleep(0.5)
+        self.assertTrue(preflight.get_preflight_result('database'))
+
+    def test_deadline(self):
+        """Test, ob eine hängende Prüfung nach Ablauf der Frist als None gilt"""
+        self._patch_check('internet', lambda _timeout: time.sleep(5) or True)
+
+        start = time.monotonic()
+        results = preflight.run_preflight(['internet'], timeout=0.2, ttl=0)
+
+        self.assertIsNone(results['internet'])
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_successful_results_are_cached(self):
+        """Test, ob erfolgreiche Ergebnisse für die TTL aus dem Cache kommen"""
+        calls = []
+        self._patch_check('internet', lambda _timeout: calls.append(1) or True)
+
+        preflight.run_preflight(['internet'], timeout=1, ttl=60)
+        results = preflight.run_preflight(['internet'], timeout=1, ttl=60)
+
+        self.assertEqual(results['internet'], True)
+        self.assertEqual(len(calls), 1)
+
+    def test_expired_cache_is_ignored(self):
+        """Test, ob abgelaufene Cache-Einträge erneut geprüft werden"""
+        calls = []
+        self._patch_check('internet', lambda _timeout: calls.append(1) or True)
+
+        preflight.run_preflight(['internet'], timeout=1, ttl=60)
+        with patch.object(preflight.time, 'time', return_value=time.time() + 120):
+            preflight.run_preflight(['internet'], timeout=1, ttl=60)
+
+        self.assertEqual(len(calls), 2)
+
+    def test_failures_are_not_cached(self):
+        """Test, ob fehlgeschlagene Prüfungen (auch per SystemExit) nicht gecacht werden"""
+        calls = []
+
+        def failing_check(_timeout):
+            calls.append(1)
+            raise SystemExit(1)
+
+        self._patch_check('version', failing_check)
+
+        first = preflight.run_preflight(['version'], timeout=1, ttl=60)
+        preflight.run_preflight(['version'], timeout=1, ttl=60)
+
+        self.assertIsNone(first['version'])
+        self.assertEqual(len(calls), 2)
+
+    def test_false_is_a_valid_result(self):
+        """Test, ob False (z.B. kein Update verfügbar) als Ergebnis erhalten bleibt"""
+        self._patch_check('version', lambda _timeout: False)
+
+        results = preflight.run_preflight(['version'], timeout=1, ttl=60)
+
+        self.assertIs(results['version'], False)
+        self.assertIs(preflight.get_preflight_result('version', True), False)
+
+    def test_dependency_path_from_preflight(self):
+        """Test, ob check_dependencies gefundene Pfade aus dem Preflight nutzt"""
+        executable = os.path.join(self.tmp_dir.name, 'mpv')
+        with open(executable, 'w', encoding='utf-8'):
+            pass
+
+        with patch.object(preflight.shutil, 'which', return_value=executable) as which:
+            preflight.run_preflight(['dependency:mpv'], timeout=1, ttl=0)
+            self.assertEqual(which.call_count, 1)
+
+            self.assertEqual(preflight.get_dependency_path('mpv'), executable)
+            self.assertEqual(which.call_count, 1)
+
+
+
+class TestPreflightChecks(unittest.TestCase):
+    """Testklasse für die Auswahl der Startprüfungen je nach Aufruf"""
+
+    @staticmethod
+    def _checks(**kwargs):
+        args = Namespace(episode=['https://aniworld.test/anime/stream/a/staffel-1/episode-1'],
+                         episode_file=None, query=None, only_direct_link=False, only_command=False,
+                         action='Watch')
+        vars(args).update(kwargs)
+        with patch.object(aniworld_main, 'HAS_DATABASE', True):
+            return aniworld_main.get_preflight_checks(args)
+
+    def test_database_only_for_recorded_downloads(self):
+        """Test, ob die Datenbank nur geprüft wird, wenn ein Download protokolliert werden kann"""
+        self.assertIn('database', self._checks(action='Download'))
+        self.assertIn('database', self._checks(episode=None))
+
+        self.assertNotIn('database', self._checks())
+        self.assertNotIn('database', self._checks(action='Syncplay'))
+        self.assertNotIn('database', self._checks(action='Download', only_command=True))
+        self.assertNotIn('database', self._checks(action='Download', only_direct_link=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
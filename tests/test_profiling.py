@@ -0,0 +1,75 @@
+"""
+Tests für den Profiling-Modus (--profile)
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld.common import common
+from aniworld.common.profiling import RunProfiler
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+class TestRunProfiler(unittest.TestCase):
+    """Testklasse für RunProfiler"""
+
+    def setUp(self):
+        """Test-Setup: Ausgabeverzeichnis und Seitenabrufe aus den Fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        season_response = MagicMock(content=read_fixture('season.html'))
+        for patcher in (
+            patch.object(common, 'fetch_url_content', return_value=read_fixture('series.html')),
+            patch.object(common.requests, 'get', return_value=season_response),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_profile_files_and_stage_attribution(self):
+        """Test, ob Flamegraph, Bericht und Speicher-Diff geschrieben werden"""
+        profiler = RunProfiler(output_dir=self.tmp_dir.name, interval=0.001, top=10, memory=True)
+        profiler.start()
+        for _ in range(2):
+            episodes = common.get_season_data('test-anime')
+        paths = profiler.stop()
+
+        self.assertEqual(len(episodes), 24)
+        self.assertEqual(set(paths), {'folded', 'report', 'pstats', 'memory'})
+        for path in paths.values():
+            self.assertTrue(os.path.getsize(path) > 0, path)
+
+        with open(paths['report'], encoding='utf-8') as f:
+            report = f.read()
+        self.assertRegex(report, r'get_season_data\s+[\d.]+ s\s+[\d.]+ %\s+2 calls')
+        self.assertIn('Top 10 functions by self time', report)
+
+        with open(paths['folded'], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any('aniworld.common.common.get_season_data' in line for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack)
+            self.assertGreater(int(count), 0)
+
+        with open(paths['memory'], encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith('Memory growth:'))
+
+    def test_stop_without_start(self):
+        """Test, ob stop() ohne vorheriges start() nichts schreibt"""
+        profiler = RunProfiler(output_dir=self.tmp_dir.name)
+
+        self.assertEqual(profiler.stop(), {})
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
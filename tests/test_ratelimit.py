@@ -0,0 +1,103 @@
+"""
+Tests für die Drosselung der Anfragen pro Host
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aniworld.common import ratelimit
+
+SPAM_PAGE = '<html><body><p>Deine Anfrage wurde als Spam erkannt.</p></body></html>'
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Testklasse für TokenBucket und RateLimiter"""
+
+    def setUp(self):
+        """Test-Setup: Uhr anhalten"""
+        self.now = 1000.0
+        patcher = patch.object(ratelimit.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_limits(self):
+        """Test, ob die Konfiguration pro Domain gelesen und Fehlerhaftes übersprungen wird"""
+        self.assertEqual(
+            ratelimit.parse_limits('AniWorld.to=2:5, voe.sx=4,myanimelist.net=x,api.aniskip.com=0,broken'),
+            {'aniworld.to': (2.0, 5), 'voe.sx': (4.0, 4)}
+        )
+
+    def test_burst_then_paced(self):
+        """Test, ob nach dem Burst im Abstand der Rate gewartet wird"""
+        bucket = ratelimit.TokenBucket(rate=2, burst=2)
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+
+        self.now += 10
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_backoff_and_recovery(self):
+        """Test, ob eine Sperre die Rate halbiert, pausiert und die Rate schrittweise zurückkehrt"""
+        bucket = ratelimit.TokenBucket(rate=4, burst=4)
+        self.assertEqual(bucket.penalize(retry_after=3), 2.0)
+        self.assertEqual(bucket.reserve(), 3.0)
+
+        for _ in range(10):
+            bucket.penalize()
+        self.assertEqual(bucket.rate, 4 * ratelimit.MIN_RATE_FACTOR)
+
+        for _ in range(100):
+            bucket.reward()
+        self.assertEqual(bucket.rate, 4)
+
+    def test_hosts(self):
+        """Test, ob Subdomains den Bucket ihrer Domain teilen und andere Hosts frei sind"""
+        limiter = ratelimit.RateLimiter({'aniworld.to': (2.0, 5), 'api.aniworld.to': (1.0, 1)})
+        self.assertIs(limiter.bucket('https://aniworld.to/anime'), limiter.bucket('https://www.aniworld.to/'))
+        self.assertIsNot(limiter.bucket('https://api.aniworld.to/'), limiter.bucket('https://aniworld.to/'))
+        self.assertIsNone(limiter.bucket('https://cdn.test/index.m3u8'))
+
+
+class TestLimitedGet(unittest.TestCase):
+    """Testklasse für limited_get"""
+
+    def setUp(self):
+        """Test-Setup: eigener Limiter, Netzwerk und Warten ersetzen"""
+        self.limiter = ratelimit.RateLimiter({'aniworld.to': (2.0, 5)})
+        self.sleep = MagicMock()
+        self.requests_get = MagicMock()
+
+        for patcher in (
+            patch.object(ratelimit, 'get_rate_limiter', return_value=self.limiter),
+            patch.object(ratelimit.time, 'sleep', self.sleep),
+            patch.object(ratelimit.requests, 'get', self.requests_get),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_retry_after_throttling(self):
+        """Test, ob 429 und die Spam-Seite gebremst und wiederholt werden"""
+        ok = MagicMock(status_code=200, text='<html></html>', headers={})
+        self.requests_get.side_effect = [
+            MagicMock(status_code=429, text='', headers={'Retry-After': '7'}),
+            MagicMock(status_code=200, text=SPAM_PAGE, headers={}),
+            ok,
+        ]
+
+        self.assertIs(ratelimit.limited_get('https://aniworld.to/anime', timeout=5), ok)
+        self.assertEqual(self.requests_get.call_count, 3)
+        self.requests_get.assert_called_with('https://aniworld.to/anime', timeout=5)
+        self.assertGreaterEqual(self.sleep.call_args_list[0].args[0], 6.9)
+        self.assertEqual(self.limiter.bucket('https://aniworld.to/').rate, 2.0 / 4 + 2.0 * ratelimit.RECOVERY_STEP)
+
+    def test_gives_up(self):
+        """Test, ob nach den Wiederholungen die gesperrte Antwort zurückgegeben wird"""
+        blocked = MagicMock(status_code=200, text=SPAM_PAGE, headers={})
+        self.requests_get.return_value = blocked
+
+        with patch.object(ratelimit.aniworld_globals, 'DEFAULT_RATE_LIMIT_RETRIES', 2):
+            self.assertIs(ratelimit.limited_get('https://aniworld.to/anime'), blocked)
+        self.assertEqual(self.requests_get.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
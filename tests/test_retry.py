@@ -0,0 +1,167 @@
+"""
+Tests für Wiederholungen, Circuit Breaker und die Eskalation zum Browser
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from aniworld import globals as aniworld_globals
+from aniworld.common import common, fetch_strategy, ratelimit, retry
+
+URL = 'https://provider.test/e/abc'
+CHALLENGE_PAGE = '<html><head><title>Just a moment...</title></head><body></body></html>'
+SPAM_PAGE = '<html><body><p>Deine Anfrage wurde als Spam erkannt.</p></body></html>'
+
+
+def response(status_code=200, text='<html></html>'):
+    """requests.Response-Attrappe"""
+    mock = MagicMock(status_code=status_code, text=text, content=text.encode(), headers={})
+    if status_code >= 400:
+        mock.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Error")
+    return mock
+
+
+class TestRetryingGet(unittest.TestCase):
+    """Testklasse für retrying_get und CircuitBreaker"""
+
+    def setUp(self):
+        """Test-Setup: frische Breaker, Netzwerk und Warten ersetzen"""
+        self.now = 1000.0
+        self.sleep = MagicMock()
+        self.requests_get = MagicMock()
+
+        for patcher in (
+            patch.dict(retry._breakers, clear=True),  # pylint: disable=protected-access
+            patch.object(retry.time, 'sleep', self.sleep),
+            patch.object(retry.time, 'monotonic', side_effect=lambda: self.now),
+            patch.object(ratelimit.requests, 'get', self.requests_get),
+            patch.object(aniworld_globals, 'DEFAULT_HTTP_RETRIES', 2),
+            patch.object(aniworld_globals, 'DEFAULT_CIRCUIT_BREAKER_THRESHOLD', 3),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_classify(self):
+        """Test, ob Fehler und Antworten richtig eingeordnet werden"""
+        self.assertEqual(retry.classify(error=requests.exceptions.ConnectTimeout()), retry.RETRY)
+        self.assertEqual(retry.classify(error=requests.exceptions.ConnectionError()), retry.RETRY)
+        self.assertEqual(retry.classify(error=requests.exceptions.InvalidURL()), retry.FAIL)
+        self.assertEqual(retry.classify(response(503)), retry.RETRY)
+        self.assertEqual(retry.classify(response(404)), retry.OK)
+        self.assertEqual(retry.classify(response(403)), retry.OK)
+        self.assertEqual(retry.classify(response(403, CHALLENGE_PAGE)), retry.BROWSER)
+
+    def test_transient_errors_retried(self):
+        """Test, ob Timeouts und 5xx mit Backoff wiederholt werden"""
+        ok = response()
+        self.requests_get.side_effect = [requests.exceptions.ReadTimeout('read timed out'), response(502), ok]
+
+        self.assertIs(retry.retrying_get(URL), ok)
+        self.assertEqual(self.requests_get.call_count, 3)
+        self.assertEqual(self.requests_get.call_args.kwargs['timeout'], (
+            aniworld_globals.DEFAULT_HTTP_CONNECT_TIMEOUT, aniworld_globals.DEFAULT_HTTP_READ_TIMEOUT
+        ))
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertLessEqual(delays[0], aniworld_globals.DEFAULT_HTTP_BACKOFF)
+        self.assertLessEqual(delays[1], aniworld_globals.DEFAULT_HTTP_BACKOFF * 2)
+        self.assertFalse(retry.get_circuit_breaker(URL).is_open)
+
+    def test_not_found_not_retried(self):
+        """Test, ob eine 404 sofort zurückgegeben wird"""
+        self.requests_get.return_value = response(404)
+
+        self.assertEqual(retry.retrying_get(URL).status_code, 404)
+        self.assertEqual(self.requests_get.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_circuit_breaker(self):
+        """Test, ob ein ausgefallener Host übersprungen und nach der Pause erneut geprüft wird"""
+        self.requests_get.side_effect = requests.exceptions.ConnectionError('refused')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            retry.retrying_get(URL)
+        self.assertEqual(self.requests_get.call_count, 3)
+        self.assertTrue(retry.get_circuit_breaker(URL).is_open)
+
+        with self.assertRaises(retry.CircuitOpenError):
+            retry.retrying_get(f"{URL}/other")
+        self.assertEqual(self.requests_get.call_count, 3)
+
+        self.now += aniworld_globals.DEFAULT_CIRCUIT_BREAKER_COOLDOWN
+        self.requests_get.side_effect = None
+        self.requests_get.return_value = response()
+        self.assertEqual(retry.retrying_get(URL).status_code, 200)
+        self.assertFalse(retry.get_circuit_breaker(URL).is_open)
+
+    def test_probe_without_verdict(self):
+        """Test, ob eine Probe-Anfrage ohne Aussage über den Host den Breaker nicht blockiert"""
+        breaker = retry.get_circuit_breaker(URL)
+        for _ in range(aniworld_globals.DEFAULT_CIRCUIT_BREAKER_THRESHOLD):
+            breaker.failure()
+        self.now += aniworld_globals.DEFAULT_CIRCUIT_BREAKER_COOLDOWN
+
+        for error in (requests.exceptions.TooManyRedirects('loop'), KeyboardInterrupt()):
+            self.requests_get.side_effect = error
+            with self.assertRaises(type(error)):
+                retry.retrying_get(URL)
+            self.assertTrue(breaker.is_open)
+
+        self.requests_get.side_effect = None
+        self.requests_get.return_value = response()
+        self.assertEqual(retry.retrying_get(URL).status_code, 200)
+        self.assertFalse(breaker.is_open)
+
+
+class TestBrowserEscalation(unittest.TestCase):
+    """Testklasse für fetch_url_content_without_playwright"""
+
+    def setUp(self):
+        """Test-Setup: Netzwerk und Browser ersetzen"""
+        self.requests_get = MagicMock()
+        self.playwright = MagicMock(return_value=b'<html>rendered</html>')
+
+        for patcher in (
+            patch.dict(retry._breakers, clear=True),  # pylint: disable=protected-access
+            patch.object(retry.time, 'sleep'),
+            patch.object(ratelimit.requests, 'get', self.requests_get),
+            patch.object(common, 'fetch_url_content_with_playwright', self.playwright),
+            patch.object(fetch_strategy, '_strategies', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_challenge_page_escalates(self):
+        """Test, ob nur eine Challenge-Seite im Browser geladen wird"""
+        self.requests_get.return_value = response(503, CHALLENGE_PAGE)
+
+        self.assertEqual(common.fetch_url_content_without_playwright(URL), b'<html>rendered</html>')
+        self.assertEqual(self.requests_get.call_count, 1)
+        self.playwright.assert_called_once_with(URL, None, True)
+
+    def test_errors_stay_on_http(self):
+        """Test, ob 404 und ausgefallene Hosts nicht zum Browser führen"""
+        self.requests_get.return_value = response(404)
+        self.assertIsNone(common.fetch_url_content_without_playwright(URL, check=False))
+
+        self.requests_get.side_effect = requests.exceptions.ConnectionError('refused')
+        self.assertIsNone(common.fetch_url_content_without_playwright(URL, check=False))
+
+        self.playwright.assert_not_called()
+
+    def test_spam_page_not_returned(self):
+        """Test, ob die Spam-Sperrseite nach allen Wiederholungen nicht als Inhalt zurückkommt"""
+        self.requests_get.return_value = response(200, SPAM_PAGE)
+
+        with patch.object(ratelimit, 'get_rate_limiter'):
+            self.assertIsNone(common.fetch_url_content_without_playwright(URL, check=False))
+
+        self.assertEqual(self.requests_get.call_count, aniworld_globals.DEFAULT_RATE_LIMIT_RETRIES + 1)
+        self.assertEqual(fetch_strategy.get_fetch_strategies().choose(URL), fetch_strategy.PLAYWRIGHT)
+        self.playwright.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
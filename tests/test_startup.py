@@ -0,0 +1,88 @@
+"""
+Startzeit-Benchmark für den CLI-Einstiegspunkt
+
+Misst mit "python -X importtime" die Importzeit von aniworld.__main__ und
+prüft, dass schwere Abhängigkeiten erst auf dem Befehlspfad geladen werden,
+der sie braucht. Das Budget kann über ANIWORLD_STARTUP_BUDGET_MS angepasst
+werden (z.B. auf langsamen CI-Maschinen).
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+STARTUP_BUDGET_MS = float(os.getenv('ANIWORLD_STARTUP_BUDGET_MS', '500'))
+
+# Module, die beim reinen Start (z.B. --version, --db-*) nicht geladen werden dürfen
+LAZY_MODULES = (
+    'npyscreen',
+    'curses',
+    'sqlalchemy',
+    'mysql.connector',
+    'bs4',
+    'py7zr',
+    'aniworld.common.ascii_art',
+    'aniworld.common.adventure',
+    'aniworld.database.connection',
+    'aniworld.database.services',
+    'aniworld.search',
+    'aniworld.execute',
+    'aniworld.tui',
+)
+
+
+def measure_import(module: str):
+    """
+    Importiert ein Modul in einem frischen Interpreter mit -X importtime.
+
+    Args:
+        module: Name des zu importierenden Moduls
+
+    Returns:
+        Tuple aus (kumulierte Zeit in ms, Menge der importierten Module)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported[name.strip()] = int(cumulative) / 1000
+
+    return imported.get(module, 0.0), set(imported)
+
+
+class TestStartupTime(unittest.TestCase):
+    """Testklasse für die Startzeit des CLI"""
+
+    def test_main_import_budget(self):
+        """Test, ob der Import von aniworld.__main__ im Zeitbudget bleibt"""
+        # Erster Lauf wärmt den Bytecode-Cache des Betriebssystems auf
+        measure_import('aniworld.__main__')
+        elapsed_ms, _ = measure_import('aniworld.__main__')
+
+        self.assertLess(
+            elapsed_ms, STARTUP_BUDGET_MS,
+            f"Import von aniworld.__main__ dauerte {elapsed_ms:.1f} ms "
+            f"(Budget: {STARTUP_BUDGET_MS:.0f} ms)"
+        )
+
+    def test_heavy_modules_are_lazy(self):
+        """Test, ob schwere Abhängigkeiten nicht beim Start importiert werden"""
+        _, imported = measure_import('aniworld.__main__')
+
+        for module in LAZY_MODULES:
+            with self.subTest(module=module):
+                self.assertNotIn(module, imported)
+
+
+if __name__ == '__main__':
+    unittest.main()